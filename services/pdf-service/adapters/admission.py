@@ -0,0 +1,252 @@
+import os
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from adapters.render_pool import RENDER_POOL_WORKERS
+
+# Per-caller admission control in front of every work-submitting request.
+# Callers are told apart by ADMISSION_CLIENT_HEADER (the tenant/user the
+# calling route signs in), falling back to the client address. Off by default:
+# the Next.js routes don't send the header yet and all reach the service from
+# one address (with one shared x-internal-token), so every request would land
+# in a single caller's quota. Turn it on once callers identify themselves.
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "false").lower() in ["true", "1", "yes"]
+ADMISSION_CLIENT_HEADER = os.getenv("ADMISSION_CLIENT_HEADER", "x-client-id")
+
+# Token bucket per caller: sustained requests/second and burst size
+ADMISSION_RATE = float(os.getenv("ADMISSION_RATE", "10"))
+ADMISSION_BURST = float(os.getenv("ADMISSION_BURST", "30"))
+
+# Requests one caller may have running at once; more wait in the caller's queue
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "4"))
+ADMISSION_MAX_QUEUED = int(os.getenv("ADMISSION_MAX_QUEUED", "16"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))
+
+# Requests running across all callers (rendering itself is bounded by the render pool)
+ADMISSION_CAPACITY = int(os.getenv("ADMISSION_CAPACITY", str(max(1, RENDER_POOL_WORKERS) * 4)))
+
+# Idle callers are forgotten once more than this many are tracked
+ADMISSION_MAX_CLIENTS = 1024
+
+
+class AdmissionRejected(Exception):
+    """A request refused by admission control; retry_after is in whole seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills rate tokens per second up to burst; each request takes one."""
+
+    def __init__(self, rate: float, burst: float, now: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: Optional[float] = None) -> float:
+        """Take a token and return 0, or return the seconds until one is available."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.burst
+
+
+class AdmissionController:
+    """
+    Token-bucket rate limits plus per-caller and global in-flight limits.
+
+    A caller over its rate is rejected at once. A caller at its in-flight limit
+    (or arriving while the service is full) waits in its own queue; each freed
+    slot goes to the waiting caller with the fewest requests running, oldest
+    request first on ties, so a caller with a long queue cannot crowd out one
+    that has just arrived.
+    """
+
+    def __init__(self, rate: float = ADMISSION_RATE, burst: float = ADMISSION_BURST,
+                 max_in_flight: int = ADMISSION_MAX_IN_FLIGHT, capacity: int = ADMISSION_CAPACITY,
+                 max_queued: int = ADMISSION_MAX_QUEUED, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max(1, max_in_flight)
+        self.capacity = max(1, capacity)
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.waiting: Dict[str, Deque[tuple]] = {}
+        self.admitted = 0
+        self.rejected = {"rate": 0, "queue_full": 0, "queue_timeout": 0}
+        # Moving average of request duration, for Retry-After estimates
+        self.avg_duration = 1.0
+
+    def _busy(self) -> int:
+        return sum(self.in_flight.values())
+
+    def _eligible(self, client: str) -> bool:
+        return self.in_flight.get(client, 0) < self.max_in_flight
+
+    def _start(self, client: str):
+        self.in_flight[client] = self.in_flight.get(client, 0) + 1
+        self.admitted += 1
+
+    def _dispatch(self):
+        while self._busy() < self.capacity:
+            candidates = [client for client, queue in self.waiting.items() if queue and self._eligible(client)]
+            if not candidates:
+                return
+            client = min(candidates, key=lambda name: (self.in_flight.get(name, 0), self.waiting[name][0][0]))
+            _, waiter = self.waiting[client].popleft()
+            if waiter.cancelled():
+                continue
+            self._start(client)
+            waiter.set_result(None)
+
+    def _prune(self, now: float):
+        if len(self.buckets) <= ADMISSION_MAX_CLIENTS:
+            return
+        for client in list(self.buckets):
+            if not self.in_flight.get(client) and not self.waiting.get(client) and self.buckets[client].full(now):
+                self.buckets.pop(client, None)
+                self.in_flight.pop(client, None)
+                self.waiting.pop(client, None)
+
+    def _retry_after(self, seconds: float) -> int:
+        return max(1, math.ceil(seconds))
+
+    async def acquire(self, client: str, background: bool = False):
+        """
+        Admit a request from client, waiting for a slot if needed; raises
+        AdmissionRejected. background work the client submitted earlier (job
+        rows) takes no rate token and waits for its slot without a queue
+        limit or timeout, but holds the slot like a request.
+        """
+        now = time.monotonic()
+        self._prune(now)
+        if not background:
+            bucket = self.buckets.get(client)
+            if bucket is None:
+                bucket = self.buckets[client] = TokenBucket(self.rate, self.burst, now)
+            wait = bucket.take(now)
+            if wait > 0:
+                self.rejected["rate"] += 1
+                raise AdmissionRejected("rate limit exceeded", self._retry_after(wait))
+
+        queue = self.waiting.setdefault(client, deque())
+        if self._busy() < self.capacity and self._eligible(client) and not queue:
+            self._start(client)
+            return
+
+        if not background and len(queue) >= self.max_queued:
+            self.rejected["queue_full"] += 1
+            # Roughly the time for this caller's queue to drain through its slots
+            raise AdmissionRejected("too many queued requests",
+                                    self._retry_after(self.avg_duration * (len(queue) + 1) / self.max_in_flight))
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append((now, waiter))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), None if background else self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                return
+            self._withdraw(client, waiter)
+            self.rejected["queue_timeout"] += 1
+            raise AdmissionRejected("timed out waiting for a slot",
+                                    self._retry_after(self.avg_duration * (len(queue) + 1) / self.max_in_flight))
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as the caller gave up; hand it on
+                self.release(client)
+            else:
+                self._withdraw(client, waiter)
+            raise
+
+    def _withdraw(self, client: str, waiter: asyncio.Future):
+        """Drop a waiter that gave up, so it never holds up the caller's queue."""
+        waiter.cancel()
+        queue = self.waiting.get(client, ())
+        for entry in queue:
+            if entry[1] is waiter:
+                queue.remove(entry)
+                break
+        self._dispatch()
+
+    def release(self, client: str, duration: Optional[float] = None):
+        self.in_flight[client] = max(0, self.in_flight.get(client, 0) - 1)
+        if duration is not None:
+            self.avg_duration = 0.9 * self.avg_duration + 0.1 * duration
+        self._dispatch()
+
+    def stats(self) -> Dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "max_in_flight": self.max_in_flight,
+            "capacity": self.capacity,
+            "in_flight": self._busy(),
+            "waiting": sum(len(queue) for queue in self.waiting.values()),
+            "clients": len(self.buckets),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "avg_duration_ms": round(self.avg_duration * 1000, 2),
+        }
+
+
+def client_key(request) -> str:
+    """The caller a request is accounted to: the client header, else the client address."""
+    client = (request.headers.get(ADMISSION_CLIENT_HEADER) or "").strip()
+    if not client:
+        client = request.client.host if request.client else "unknown"
+    return client[:128]
+
+
+_controller: Optional[AdmissionController] = None
+_controller_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the admission controller of the running event loop."""
+    global _controller, _controller_loop
+    loop = asyncio.get_running_loop()
+    if _controller is None or _controller_loop is not loop:
+        _controller = AdmissionController()
+        _controller_loop = loop
+    return _controller
+
+
+@asynccontextmanager
+async def admitted_background(client: Optional[str]):
+    """Hold one of client's slots while running work it submitted (job rows); a no-op when admission is off."""
+    if not ADMISSION_CONTROL or not client:
+        yield
+        return
+    controller = get_admission_controller()
+    await controller.acquire(client, background=True)
+    try:
+        yield
+    finally:
+        controller.release(client)
+
+
+def get_admission_stats() -> Dict:
+    if _controller is None:
+        return AdmissionController().stats()
+    return _controller.stats()
@@ -0,0 +1,210 @@
+import os
+import io
+import json
+import time
+import asyncio
+import zipfile
+import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, AsyncIterator
+from starlette.concurrency import run_in_threadpool
+from rise.generate_certificate import parse_word_form, parse_pdf_form
+from rise.ocr_engine import OCR_WORKERS
+from rise.resources import temp_path
+
+SUPPORTED_FORM_EXTENSIONS = ['docx', 'pdf', 'png', 'jpg', 'jpeg']
+
+# Per-type concurrency limits so slow OCR jobs can't starve the fast docx path.
+# Image forms are OCRed on the OCR pool, so by default they hold no more
+# threads than it has workers. PDFs have no limit here: they go through the
+# single PDF lane below.
+BULK_CONCURRENCY = {
+    "docx": int(os.getenv("BULK_EXTRACT_DOCX_CONCURRENCY", "8")),
+    "image": int(os.getenv("BULK_EXTRACT_OCR_CONCURRENCY", str(OCR_WORKERS))),
+}
+
+# Guard rails for ZIP uploads
+BULK_MAX_FILES = int(os.getenv("BULK_EXTRACT_MAX_FILES", "500"))
+BULK_MAX_UNZIPPED_BYTES = int(os.getenv("BULK_EXTRACT_MAX_UNZIPPED_MB", "200")) * 1024 * 1024
+
+# PyMuPDF is not thread-safe (see adapters/render_pool.py), so PDF forms are
+# parsed one at a time on one dedicated thread. OCR of scanned pages is
+# submitted from there to the OCR pool, which bounds it together with image
+# forms and /extract-fields.
+_pdf_executor: Optional[ThreadPoolExecutor] = None
+_pdf_executor_lock = threading.Lock()
+
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+_semaphores_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_pdf_executor() -> ThreadPoolExecutor:
+    """Return the single-thread PDF lane, creating it on first use."""
+    global _pdf_executor
+    if _pdf_executor is None:
+        with _pdf_executor_lock:
+            if _pdf_executor is None:
+                _pdf_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-extract")
+    return _pdf_executor
+
+
+async def run_in_pdf_lane(fn: Callable, *args):
+    """Run a PyMuPDF parse on the PDF lane without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(get_pdf_executor(), fn, *args)
+
+
+def shutdown_pdf_lane():
+    """Stop the PDF lane's thread."""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is not None:
+            _pdf_executor.shutdown(wait=True, cancel_futures=True)
+            _pdf_executor = None
+
+
+def _get_semaphore(kind: str) -> asyncio.Semaphore:
+    """Return the running event loop's semaphore for a form kind (shared across requests)."""
+    global _semaphores_loop
+    loop = asyncio.get_running_loop()
+    if _semaphores_loop is not loop:
+        _semaphores.clear()
+        _semaphores_loop = loop
+    if kind not in _semaphores:
+        _semaphores[kind] = asyncio.Semaphore(max(1, BULK_CONCURRENCY[kind]))
+    return _semaphores[kind]
+
+
+def form_kind(filename: str) -> str:
+    """Map a filename to its extraction path: docx, pdf or image (OCR)."""
+    extension = filename.lower().rsplit('.', 1)[-1] if '.' in filename else ""
+    if extension == "docx":
+        return "docx"
+    if extension == "pdf":
+        return "pdf"
+    if extension in ["png", "jpg", "jpeg"]:
+        return "image"
+    return ""
+
+
+def expand_zip(filename: str, content: bytes) -> List[Tuple[str, bytes]]:
+    """
+    Return the supported form files inside a ZIP archive.
+
+    The size budget counts the bytes actually decompressed, not the sizes the
+    archive declares, and each member is read no further than the budget left.
+    """
+    files = []
+    total_bytes = 0
+    limit_mb = BULK_MAX_UNZIPPED_BYTES // (1024 * 1024)
+
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or pathlib.PurePosixPath(name).name.startswith("."):
+                continue
+            if not form_kind(name):
+                print(f"⏭️ [BULK-EXTRACT] Skipping unsupported file in {filename}: {name}")
+                continue
+
+            if len(files) >= BULK_MAX_FILES:
+                raise ValueError(f"ZIP archive {filename} has more than {BULK_MAX_FILES} form files")
+
+            remaining = BULK_MAX_UNZIPPED_BYTES - total_bytes
+            with archive.open(info) as member:
+                data = member.read(remaining + 1)
+            total_bytes += len(data)
+            if total_bytes > BULK_MAX_UNZIPPED_BYTES:
+                raise ValueError(f"ZIP archive {filename} exceeds the {limit_mb}MB limit")
+
+            files.append((name, data))
+
+    return files
+
+
+async def collect_form_files(uploads) -> List[Tuple[str, bytes]]:
+    """Read uploaded files, expanding ZIP archives, into (filename, content) pairs."""
+    files = []
+
+    for upload in uploads:
+        content = await upload.read()
+        if upload.filename.lower().endswith(".zip"):
+            # Decompressing is CPU-bound; keep it off the event loop
+            files.extend(await run_in_threadpool(expand_zip, upload.filename, content))
+        else:
+            files.append((upload.filename, content))
+
+    if len(files) > BULK_MAX_FILES:
+        raise ValueError(f"Too many files: {len(files)} (maximum {BULK_MAX_FILES})")
+
+    return files
+
+
+def _extract_file(filename: str, content: bytes, kind: str) -> Dict[str, str]:
+    """Write one form to a temporary file and run the matching parser."""
+    suffix = "." + filename.lower().rsplit('.', 1)[-1]
+    with temp_path(suffix, content) as tmp_file_path:
+        if kind == "docx":
+            return parse_word_form(tmp_file_path)
+        # PDFs and images share parse_pdf_form, which routes images to OCR
+        return parse_pdf_form(tmp_file_path)
+
+
+async def _extract_one(index: int, filename: str, content: bytes) -> Dict:
+    """Extract one form under its type's concurrency limit and build its result row."""
+    kind = form_kind(filename)
+    started = time.perf_counter()
+
+    if not kind:
+        return {
+            "index": index,
+            "filename": filename,
+            "status": "error",
+            "error": f"Unsupported file type. Form must be one of: {', '.join(SUPPORTED_FORM_EXTENSIONS)}",
+        }
+
+    try:
+        if kind == "pdf":
+            fields = await run_in_pdf_lane(_extract_file, filename, content, kind)
+        else:
+            async with _get_semaphore(kind):
+                fields = await run_in_threadpool(_extract_file, filename, content, kind)
+        row = {"index": index, "filename": filename, "status": "ok", "kind": kind, "fields": fields}
+    except Exception as e:
+        print(f"❌ [BULK-EXTRACT] {filename}: {e}")
+        row = {"index": index, "filename": filename, "status": "error", "kind": kind, "error": str(e)}
+
+    row["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return row
+
+
+async def stream_bulk_extraction(files: List[Tuple[str, bytes]]) -> AsyncIterator[str]:
+    """
+    Extract fields from many forms in parallel, yielding one NDJSON line per
+    file as soon as it completes, followed by a summary line.
+
+    Each successful row's "fields" uses the same keys as /extract-fields
+    (Company Name, Address, ISO Standard, Scope), so rows can be merged with
+    the batch sheet and posted to /generate-certificate-json unchanged.
+    """
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(_extract_one(i, name, content)) for i, (name, content) in enumerate(files)]
+    succeeded = 0
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            row = await next_done
+            if row["status"] == "ok":
+                succeeded += 1
+            yield json.dumps(row) + "\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    yield json.dumps({
+        "summary": True,
+        "total": len(files),
+        "succeeded": succeeded,
+        "failed": len(files) - succeeded,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }) + "\n"
@@ -0,0 +1,179 @@
+import os
+import time
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from adapters.admission import admitted_background
+from adapters.job_store import JobStore, get_job_store
+from adapters.render_pool import run_in_render_pool
+
+# Rows of one job rendered concurrently; the render pool bounds total CPU use
+JOB_ROW_CONCURRENCY = int(os.getenv("JOB_ROW_CONCURRENCY", "4"))
+
+# A row whose worker process died is retried this many times before it fails
+JOB_MAX_ROW_ATTEMPTS = int(os.getenv("JOB_MAX_ROW_ATTEMPTS", "2"))
+
+
+def render_final_row(content: bytes, params: Dict, save_profile: Optional[str]) -> bytes:
+    """Job row: convert one draft PDF into a final certificate."""
+    from rise.generate_final_certificate import convert_draft_to_final
+    return convert_draft_to_final(content, params, save_profile)
+
+
+def render_reissue_row(content: bytes, params: Dict, save_profile: Optional[str]) -> bytes:
+    """Job row: reissue one soft copy/printable with new dates (always saved incrementally)."""
+    from rise.reissue import reissue_certificate
+    params = dict(params)
+    template_type = params.pop("template_type", None)
+    return reissue_certificate(content, params, template_type)
+
+
+def render_softcopy_row(template_path: str, params: Dict, save_profile: Optional[str], logos: Dict[str, bytes]) -> bytes:
+    """Job row: render one soft copy from its field values onto the job's template."""
+    from rise.render_rows import render_softcopy_pdf
+    return render_softcopy_pdf(template_path, params["values"], params["template_type"], save_profile, logos)["pdf"]
+
+
+def render_printable_row(template_path: str, params: Dict, save_profile: Optional[str], logos: Dict[str, bytes]) -> bytes:
+    """Job row: render one printable from its field values onto the job's template."""
+    from rise.render_rows import render_printable_pdf
+    return render_printable_pdf(template_path, params["values"], params["template_type"], save_profile, logos)["pdf"]
+
+
+def render_draft_row(template_path: str, params: Dict, save_profile: Optional[str], logos: Dict[str, bytes]) -> bytes:
+    """Job row: render one draft certificate from its field values onto the job's template."""
+    from rise.render_rows import render_certificate_pdf
+    return render_certificate_pdf(template_path, params["values"], params["template_type"], save_profile, logos)["pdf"]
+
+
+# Job kind -> (row function run in the render pool, output filename prefix)
+JOB_KINDS = {
+    "final": (render_final_row, "final"),
+    "reissue": (render_reissue_row, "reissued"),
+    "softcopy": (render_softcopy_row, "softcopy"),
+    "printable": (render_printable_row, "printable"),
+    "draft": (render_draft_row, "draft"),
+}
+
+# Kinds whose rows are field values rendered onto a template stored with the
+# job (params: values, template, template_type, logos) rather than uploaded PDFs
+FIELD_KINDS = {"softcopy", "printable", "draft"}
+
+# Running job tasks, kept referenced so they are not garbage collected
+_running: Dict[str, asyncio.Task] = {}
+_background: Set[asyncio.Task] = set()
+
+
+def output_name_for(kind: str, name: str) -> str:
+    prefix = JOB_KINDS[kind][1]
+    return f"{prefix}_{os.path.splitext(os.path.basename(name))[0]}.pdf"
+
+
+def _row_args(store: JobStore, job: Dict, row: Dict) -> Tuple:
+    """Arguments of a row's render call, read from the job directory."""
+    if job["kind"] in FIELD_KINDS:
+        params = row["params"]
+        logos = {}
+        for filename, asset in (params.get("logos") or {}).items():
+            with open(store.asset_path(job["id"], asset), "rb") as f:
+                logos[filename] = f.read()
+        return store.asset_path(job["id"], params["template"]), params, job["save_profile"], logos
+    with open(store.input_path(job["id"], row["idx"]), "rb") as f:
+        return f.read(), row["params"], job["save_profile"]
+
+
+async def _run_row(store: JobStore, job: Dict, row: Dict, semaphore: asyncio.Semaphore):
+    row_fn, _ = JOB_KINDS[job["kind"]]
+    index = row["idx"]
+    attempts = row["attempts"]
+
+    # SQLite checkpoints and row files are blocking I/O, so they run in the threadpool
+    async with semaphore:
+        while True:
+            attempts += 1
+            await run_in_threadpool(store.mark_row_running, job["id"], index)
+            start = time.perf_counter()
+            try:
+                args = await run_in_threadpool(_row_args, store, job, row)
+                # Each row holds one of the submitter's admission slots while it renders
+                async with admitted_background(job.get("client")):
+                    result = await run_in_render_pool(row_fn, *args, lane="bulk")
+            except BrokenProcessPool as e:
+                # The pool is replaced on the next call; retry unless this row keeps killing workers
+                if attempts < JOB_MAX_ROW_ATTEMPTS:
+                    print(f"⚠️ [JOBS] {job['id']} row {index}: worker died, retrying")
+                    await run_in_threadpool(store.mark_row_pending, job["id"], index, "worker process died")
+                    continue
+                await run_in_threadpool(store.mark_row_failed, job["id"], index, f"worker process died: {e}")
+                return
+            except Exception as e:
+                print(f"❌ [JOBS] {job['id']} row {index} ({row['name']}): {e}")
+                await run_in_threadpool(store.mark_row_failed, job["id"], index, str(e))
+                return
+
+            # Checkpoint: artifact first, then the row status
+            await run_in_threadpool(store.write_output, job["id"], index, result)
+            await run_in_threadpool(store.mark_row_done, job["id"], index, output_name_for(job["kind"], row["name"]),
+                                    (time.perf_counter() - start) * 1000)
+            return
+
+
+async def run_job(job_id: str, store: Optional[JobStore] = None):
+    """Render every row of a job that has no checkpoint yet, then mark the job finished."""
+    store = store or await run_in_threadpool(get_job_store)
+    job = await run_in_threadpool(store.get_job, job_id)
+    if job is None:
+        return
+
+    pending = await run_in_threadpool(store.pending_rows, job_id)
+    if job["status"] == "running":
+        print(f"🔍 [JOBS] Resuming job {job_id}: {len(pending)}/{job['total']} row(s) left")
+    await run_in_threadpool(store.set_job_status, job_id, "running")
+
+    semaphore = asyncio.Semaphore(max(1, JOB_ROW_CONCURRENCY))
+    await asyncio.gather(*[_run_row(store, job, row, semaphore) for row in pending])
+
+    progress = await run_in_threadpool(store.progress, job_id)
+    status = "completed" if progress["failed"] == 0 else "completed_with_errors"
+    await run_in_threadpool(store.set_job_status, job_id, status)
+    print(f"✅ [JOBS] Job {job_id} {status}: {progress['done']}/{job['total']} row(s) rendered")
+
+
+def start_job(job_id: str) -> asyncio.Task:
+    """Run a job in the background, detached from the request that submitted it."""
+    if job_id in _running and not _running[job_id].done():
+        return _running[job_id]
+    task = asyncio.create_task(run_job(job_id))
+    _running[job_id] = task
+    task.add_done_callback(lambda _: _running.pop(job_id, None))
+    return task
+
+
+def resume_jobs() -> int:
+    """Restart jobs left queued or running by a previous process and purge expired ones."""
+    store = get_job_store()
+    store.purge_expired()
+    job_ids = store.active_job_ids()
+    for job_id in job_ids:
+        start_job(job_id)
+    if job_ids:
+        print(f"🔍 [JOBS] Resuming {len(job_ids)} unfinished job(s)")
+    return len(job_ids)
+
+
+def schedule_purge():
+    """Purge expired jobs without blocking the caller."""
+    task = asyncio.get_running_loop().run_in_executor(None, get_job_store().purge_expired)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def shutdown_jobs():
+    """Stop running job tasks; their unfinished rows resume on the next start."""
+    tasks = list(_running.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
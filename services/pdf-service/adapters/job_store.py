@@ -0,0 +1,227 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import closing, contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Job state lives in a local SQLite file and row inputs/outputs on disk next to
+# it, so bulk runs survive client disconnects and service restarts
+JOBS_DIR = os.getenv("JOBS_DIR", os.path.join(tempfile.gettempdir(), "pdf-service-jobs"))
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(JOBS_DIR, "jobs.sqlite3"))
+
+# Finished jobs (and their artifacts) are purged after this many hours
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+
+# Job statuses: queued -> running -> completed / completed_with_errors
+ACTIVE_STATUSES = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    save_profile TEXT,
+    client TEXT,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_rows (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    output_name TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    elapsed_ms REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+
+class JobStore:
+    """SQLite-backed job and row checkpoints plus the on-disk row artifacts."""
+
+    def __init__(self, db_path: str = JOBS_DB_PATH, jobs_dir: str = JOBS_DIR):
+        self.db_path = db_path
+        self.jobs_dir = jobs_dir
+        self._lock = threading.Lock()
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # Databases created before jobs recorded their submitter
+            if "client" not in {column["name"] for column in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN client TEXT")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """A connection that commits (or rolls back) and is closed when the block exits."""
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn:
+            conn.row_factory = sqlite3.Row
+            with conn:
+                yield conn
+
+    def _execute(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock, self._connect() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    # Artifacts
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, job_id)
+
+    def input_path(self, job_id: str, index: int) -> str:
+        return os.path.join(self.job_dir(job_id), "input", f"{index:05d}.pdf")
+
+    def asset_path(self, job_id: str, name: str) -> str:
+        return os.path.join(self.job_dir(job_id), "assets", name)
+
+    def output_path(self, job_id: str, index: int) -> str:
+        return os.path.join(self.job_dir(job_id), "output", f"{index:05d}.pdf")
+
+    def write_output(self, job_id: str, index: int, content: bytes):
+        """Write a row artifact atomically, so a crash never leaves a half-written PDF behind."""
+        path = self.output_path(job_id, index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    # Jobs
+
+    def create_job(self, kind: str, rows: List[Dict], save_profile: Optional[str] = None,
+                   assets: Optional[Dict[str, bytes]] = None, client: Optional[str] = None) -> str:
+        """
+        Persist a new job; each row is {"name", "content" (input PDF bytes, or
+        None for rows rendered from params alone), "params"}. assets are files
+        shared by every row (templates, logos), stored once per job; client is
+        the submitter the rows are accounted to. Inputs are written to disk
+        before the job becomes visible as queued.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        os.makedirs(os.path.join(self.job_dir(job_id), "input"), exist_ok=True)
+        for index, row in enumerate(rows):
+            if row.get("content") is None:
+                continue
+            with open(self.input_path(job_id, index), "wb") as f:
+                f.write(row["content"])
+        if assets:
+            os.makedirs(os.path.join(self.job_dir(job_id), "assets"), exist_ok=True)
+            for name, content in assets.items():
+                with open(self.asset_path(job_id, name), "wb") as f:
+                    f.write(content)
+
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO job_rows (job_id, idx, name, params, status, updated_at) VALUES (?, ?, ?, ?, 'pending', ?)",
+                [(job_id, index, row["name"], json.dumps(row.get("params") or {}), now) for index, row in enumerate(rows)]
+            )
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, save_profile, client, total, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, kind, save_profile, client, len(rows), now, now)
+            )
+        print(f"🔍 [JOBS] Created {kind} job {job_id} with {len(rows)} row(s)")
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return dict(rows[0]) if rows else None
+
+    def set_job_status(self, job_id: str, status: str):
+        now = time.time()
+        finished_at = now if status not in ACTIVE_STATUSES else None
+        self._execute("UPDATE jobs SET status = ?, updated_at = ?, finished_at = ? WHERE id = ?",
+                      (status, now, finished_at, job_id))
+
+    def active_job_ids(self) -> List[str]:
+        """Jobs that were queued or running, e.g. when the service last stopped."""
+        rows = self._execute(
+            f"SELECT id FROM jobs WHERE status IN ({','.join('?' * len(ACTIVE_STATUSES))}) ORDER BY created_at",
+            ACTIVE_STATUSES
+        )
+        return [row["id"] for row in rows]
+
+    # Rows
+
+    def get_rows(self, job_id: str) -> List[Dict]:
+        rows = self._execute("SELECT * FROM job_rows WHERE job_id = ? ORDER BY idx", (job_id,))
+        return [{**dict(row), "params": json.loads(row["params"])} for row in rows]
+
+    def pending_rows(self, job_id: str) -> List[Dict]:
+        """Rows without a checkpoint yet; rows left 'running' by a crash are retried."""
+        return [row for row in self.get_rows(job_id) if row["status"] in ("pending", "running")]
+
+    def mark_row_running(self, job_id: str, index: int):
+        self._execute(
+            "UPDATE job_rows SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE job_id = ? AND idx = ?",
+            (time.time(), job_id, index)
+        )
+
+    def mark_row_pending(self, job_id: str, index: int, error: str):
+        self._execute(
+            "UPDATE job_rows SET status = 'pending', error = ?, updated_at = ? WHERE job_id = ? AND idx = ?",
+            (error, time.time(), job_id, index)
+        )
+
+    def mark_row_done(self, job_id: str, index: int, output_name: str, elapsed_ms: float):
+        self._execute(
+            "UPDATE job_rows SET status = 'done', output_name = ?, error = NULL, elapsed_ms = ?, updated_at = ? WHERE job_id = ? AND idx = ?",
+            (output_name, round(elapsed_ms, 2), time.time(), job_id, index)
+        )
+
+    def mark_row_failed(self, job_id: str, index: int, error: str):
+        self._execute(
+            "UPDATE job_rows SET status = 'error', error = ?, updated_at = ? WHERE job_id = ? AND idx = ?",
+            (error, time.time(), job_id, index)
+        )
+
+    def progress(self, job_id: str) -> Dict[str, int]:
+        rows = self._execute("SELECT status, COUNT(*) AS count FROM job_rows WHERE job_id = ? GROUP BY status", (job_id,))
+        counts = {row["status"]: row["count"] for row in rows}
+        return {
+            "done": counts.get("done", 0),
+            "failed": counts.get("error", 0),
+            "remaining": counts.get("pending", 0) + counts.get("running", 0),
+        }
+
+    # Retention
+
+    def purge_expired(self, retention_hours: float = JOB_RETENTION_HOURS) -> int:
+        """Delete finished jobs older than the retention window together with their artifacts."""
+        cutoff = time.time() - retention_hours * 3600
+        expired = [row["id"] for row in self._execute(
+            f"SELECT id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ? "
+            f"AND status NOT IN ({','.join('?' * len(ACTIVE_STATUSES))})",
+            (cutoff, *ACTIVE_STATUSES)
+        )]
+        for job_id in expired:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+            self._execute("DELETE FROM job_rows WHERE job_id = ?", (job_id,))
+            self._execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        if expired:
+            print(f"🔍 [JOBS] Purged {len(expired)} expired job(s)")
+        return len(expired)
+
+
+_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    """Return the process-wide job store, creating the database on first use."""
+    global _store
+    if _store is None:
+        _store = JobStore()
+    return _store
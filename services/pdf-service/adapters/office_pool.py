@@ -0,0 +1,358 @@
+import os
+import time
+import queue
+import shutil
+import socket
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# Word -> PDF conversion runs on a pool of headless LibreOffice processes that
+# stay up between documents, so a conversion pays for loading the document,
+# not for starting the office suite. Each process gets its own user profile
+# and is driven over UNO (the python "uno" bindings, imported lazily). Without
+# them every conversion falls back to a one-shot `soffice --convert-to`,
+# still using the slot's already initialised profile.
+OFFICE_BINARY = os.getenv("OFFICE_BINARY", "soffice")
+OFFICE_POOL_SIZE = int(os.getenv("OFFICE_POOL_SIZE", "2"))
+
+# Restart a process after this many documents (office processes grow over time)
+OFFICE_MAX_DOCS_PER_PROCESS = int(os.getenv("OFFICE_MAX_DOCS_PER_PROCESS", "200"))
+
+# Seconds allowed for one conversion (the process is killed and restarted past
+# it) and for a process to start accepting connections
+OFFICE_CONVERT_TIMEOUT = float(os.getenv("OFFICE_CONVERT_TIMEOUT", "60"))
+OFFICE_START_TIMEOUT = float(os.getenv("OFFICE_START_TIMEOUT", "30"))
+
+# Conversions allowed to wait for a free process, and for how long
+OFFICE_MAX_QUEUED = int(os.getenv("OFFICE_MAX_QUEUED", "16"))
+OFFICE_QUEUE_TIMEOUT = float(os.getenv("OFFICE_QUEUE_TIMEOUT", "60"))
+
+# Largest number of documents accepted by /convert/batch
+OFFICE_MAX_BATCH_FILES = int(os.getenv("OFFICE_MAX_BATCH_FILES", "100"))
+
+OFFICE_PROFILE_ROOT = os.path.join(tempfile.gettempdir(), f"pdf-service-office-{os.getpid()}")
+
+
+class ConversionError(Exception):
+    """A document could not be converted."""
+
+
+class ConverterUnavailable(ConversionError):
+    """LibreOffice is not installed or could not be started."""
+
+
+class ConversionTimeout(ConversionError):
+    """A conversion ran past OFFICE_CONVERT_TIMEOUT."""
+
+
+class ConverterBusy(ConversionError):
+    """Every converter is busy and the wait queue is full; retry_after is in whole seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+def office_available() -> bool:
+    return shutil.which(OFFICE_BINARY) is not None
+
+
+def uno_available() -> bool:
+    try:
+        import uno  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _uno_properties(**values):
+    from com.sun.star.beans import PropertyValue
+    return tuple(PropertyValue(Name=name, Value=value) for name, value in values.items())
+
+
+class OfficeProcess:
+    """One headless LibreOffice process with its own profile; converts one document at a time."""
+
+    def __init__(self, slot: int, use_uno: bool):
+        self.slot = slot
+        self.use_uno = use_uno
+        self.profile_dir = os.path.join(OFFICE_PROFILE_ROOT, f"slot-{slot}")
+        self.process: Optional[subprocess.Popen] = None
+        self.desktop = None
+        self.documents = 0
+        self.restarts = 0
+        self._timed_out = False
+
+    def _command(self, *args) -> List[str]:
+        return [OFFICE_BINARY, "--headless", "--invisible", "--nologo", "--norestore", "--nodefault",
+                "--nolockcheck", f"-env:UserInstallation=file://{self.profile_dir}", *args]
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        if not self.use_uno:
+            return
+        import uno
+        port = _free_port()
+        self.process = subprocess.Popen(
+            self._command(f"--accept=socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        deadline = time.monotonic() + OFFICE_START_TIMEOUT
+        while True:
+            try:
+                context = resolver.resolve(f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext")
+                break
+            except Exception:
+                if not self.alive() or time.monotonic() > deadline:
+                    self.stop()
+                    raise ConverterUnavailable(f"office process {self.slot} did not start within {OFFICE_START_TIMEOUT:.0f}s")
+                time.sleep(0.25)
+        self.desktop = context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+        self.documents = 0
+        print(f"✅ [OFFICE-POOL] Office process {self.slot} ready (pid {self.process.pid}, port {port})")
+
+    def stop(self):
+        self.desktop = None
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def restart(self, reason: str):
+        print(f"🔍 [OFFICE-POOL] Restarting office process {self.slot}: {reason}")
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def _kill_hung(self):
+        self._timed_out = True
+        if self.process is not None:
+            self.process.kill()
+
+    def convert(self, source_path: str, target_path: str, timeout: float):
+        """Convert source_path to a PDF at target_path."""
+        if not self.use_uno:
+            self._convert_cli(source_path, target_path, timeout)
+            return
+
+        if not self.alive():
+            self.restart("not running" if self.process is None else "process exited")
+        elif self.documents >= OFFICE_MAX_DOCS_PER_PROCESS:
+            self.restart(f"document limit ({OFFICE_MAX_DOCS_PER_PROCESS}) reached")
+
+        import uno
+        self._timed_out = False
+        watchdog = threading.Timer(timeout, self._kill_hung)
+        watchdog.start()
+        document = None
+        try:
+            document = self.desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(source_path), "_blank", 0, _uno_properties(Hidden=True, ReadOnly=True)
+            )
+            if document is None:
+                raise ConversionError("LibreOffice could not open the document")
+            document.storeToURL(uno.systemPathToFileUrl(target_path), _uno_properties(FilterName="writer_pdf_Export"))
+        except ConversionError:
+            raise
+        except Exception as e:
+            if self._timed_out:
+                raise ConversionTimeout(f"conversion took longer than {timeout:.0f}s")
+            raise ConversionError(f"LibreOffice conversion failed: {e}")
+        finally:
+            watchdog.cancel()
+            self.documents += 1
+            if document is not None and self.alive():
+                try:
+                    document.close(True)
+                except Exception:
+                    pass
+            if not self.alive():
+                # Crashed or killed by the watchdog; the next conversion restarts it
+                self.stop()
+
+    def _convert_cli(self, source_path: str, target_path: str, timeout: float):
+        out_dir = os.path.dirname(target_path)
+        try:
+            completed = subprocess.run(
+                self._command("--convert-to", "pdf", "--outdir", out_dir, source_path),
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise ConversionTimeout(f"conversion took longer than {timeout:.0f}s")
+        produced = os.path.join(out_dir, os.path.splitext(os.path.basename(source_path))[0] + ".pdf")
+        if completed.returncode != 0 or not os.path.exists(produced):
+            raise ConversionError(f"LibreOffice conversion failed: {completed.stdout.decode(errors='replace')[-300:]}")
+        self.documents += 1
+        if produced != target_path:
+            os.replace(produced, target_path)
+
+
+class OfficeConverterPool:
+    """
+    Hands each conversion to an idle OfficeProcess. Callers beyond the pool
+    size wait (at most max_queued of them, each for at most queue_timeout);
+    anyone past that is turned away with ConverterBusy.
+    """
+
+    def __init__(self, size: int = OFFICE_POOL_SIZE, max_queued: int = OFFICE_MAX_QUEUED,
+                 queue_timeout: float = OFFICE_QUEUE_TIMEOUT):
+        self.size = max(1, size)
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.use_uno = uno_available()
+        self.processes = [OfficeProcess(slot, self.use_uno) for slot in range(self.size)]
+        self._idle: "queue.LifoQueue[OfficeProcess]" = queue.LifoQueue()
+        for process in self.processes:
+            self._idle.put(process)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._stats = {"converted": 0, "failed": 0, "timeouts": 0, "rejected": 0}
+        self._avg_duration = 2.0
+        # Threads that wait for and drive the office processes
+        self._executor = ThreadPoolExecutor(max_workers=self.size + max(0, max_queued), thread_name_prefix="office")
+
+    def warm(self) -> int:
+        """Start every office process up front; returns how many are running."""
+        started = 0
+        for process in self.processes:
+            try:
+                if not process.alive():
+                    process.start()
+                started += 1
+            except Exception as e:
+                print(f"⚠️ [OFFICE-POOL] Could not start office process {process.slot}: {e}")
+        return started
+
+    def _checkout(self) -> OfficeProcess:
+        with self._lock:
+            if self._idle.empty() and self._waiting >= self.max_queued:
+                self._stats["rejected"] += 1
+                raise ConverterBusy("all converters are busy", self._retry_after())
+            self._waiting += 1
+        try:
+            return self._idle.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise ConverterBusy("timed out waiting for a converter", self._retry_after())
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def _retry_after(self) -> int:
+        return max(1, int(self._avg_duration * (self._waiting + 1) / self.size + 0.999))
+
+    def convert(self, content: bytes, suffix: str = ".docx", timeout: float = OFFICE_CONVERT_TIMEOUT) -> bytes:
+        """Convert a Word document's bytes to PDF bytes (blocking)."""
+        if not office_available():
+            raise ConverterUnavailable(f"LibreOffice ({OFFICE_BINARY}) is not installed")
+        process = self._checkout()
+        start = time.perf_counter()
+        try:
+            with tempfile.TemporaryDirectory(prefix="office-convert-") as work_dir:
+                source_path = os.path.join(work_dir, f"document{suffix}")
+                target_path = os.path.join(work_dir, "document.pdf")
+                with open(source_path, "wb") as f:
+                    f.write(content)
+                process.convert(source_path, target_path, timeout)
+                with open(target_path, "rb") as f:
+                    pdf_bytes = f.read()
+        except ConversionTimeout:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        finally:
+            self._idle.put(process)
+        with self._lock:
+            self._stats["converted"] += 1
+            self._avg_duration = 0.9 * self._avg_duration + 0.1 * (time.perf_counter() - start)
+        return pdf_bytes
+
+    async def convert_async(self, content: bytes, suffix: str = ".docx") -> bytes:
+        """convert() without blocking the event loop."""
+        import asyncio
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.convert, content, suffix)
+
+    def shutdown(self):
+        for process in self.processes:
+            process.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        shutil.rmtree(OFFICE_PROFILE_ROOT, ignore_errors=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            waiting = self._waiting
+        return {
+            "available": office_available(),
+            "backend": "uno" if self.use_uno else "cli",
+            "size": self.size,
+            "running": sum(1 for process in self.processes if process.alive()),
+            "busy": self.size - self._idle.qsize(),
+            "waiting": waiting,
+            "max_queued": self.max_queued,
+            "restarts": sum(process.restarts for process in self.processes),
+            "avg_duration_ms": round(self._avg_duration * 1000, 2),
+            **stats,
+        }
+
+
+_pool: Optional[OfficeConverterPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_office_pool() -> OfficeConverterPool:
+    """Return the process-wide office converter pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = OfficeConverterPool()
+                print(f"🔍 [OFFICE-POOL] Office converter pool with {_pool.size} process(es), backend: {'uno' if _pool.use_uno else 'cli'}")
+    return _pool
+
+
+def warm_office_pool() -> int:
+    """Start the office processes ahead of the first conversion (no-op without LibreOffice or UNO)."""
+    if not office_available() or not uno_available():
+        return 0
+    return get_office_pool().warm()
+
+
+def get_office_pool_stats() -> Dict:
+    if _pool is None:
+        return {"available": office_available(), "backend": "uno" if uno_available() else "cli",
+                "size": max(1, OFFICE_POOL_SIZE), "running": 0, "converted": 0}
+    return _pool.stats()
+
+
+def shutdown_office_pool():
+    """Stop the office processes."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
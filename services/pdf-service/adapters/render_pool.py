@@ -0,0 +1,242 @@
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from rise.save_profiles import collect_save_metrics, merge_save_metrics
+from rise.timings import collect_stage_timings, merge_stage_timings, record_stage
+
+# PyMuPDF is not thread-safe, so CPU-heavy PDF rendering runs in a pool of
+# worker processes. Each worker keeps module-level caches (e.g. the parsed
+# Final.pdf template) alive between jobs.
+RENDER_POOL_WORKERS = int(os.getenv("RENDER_POOL_WORKERS", str(os.cpu_count() or 1)))
+
+# "spawn" keeps workers independent of threads (OCR pool, uvicorn) in the parent
+RENDER_POOL_START_METHOD = os.getenv("RENDER_POOL_START_METHOD", "spawn")
+
+# Replace a worker after this many jobs so native memory a long-lived worker
+# accumulates (MuPDF stores, fragmented heaps) is handed back; 0 keeps workers
+# for the life of the pool. A replacement worker re-parses Final.pdf on its
+# first final render instead of at warm-up.
+RENDER_POOL_MAX_TASKS_PER_CHILD = int(os.getenv("RENDER_POOL_MAX_TASKS_PER_CHILD", "0"))
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _lane_setting(lane: str, name: str, default: int) -> int:
+    return max(1, int(os.getenv(f"RENDER_LANE_{lane.upper()}_{name}", str(default))))
+
+
+# Priority lanes sharing the pool. Jobs are handed to the pool only when a
+# worker is free, so a long bulk run cannot queue ahead of single renders:
+# - interactive: single certificates from the UIs (default lane)
+# - bulk: batch and job rows
+# - background: warm-ups and other work nobody waits for
+# weight is the lane's share of worker slots when several lanes are waiting;
+# max_in_flight caps the workers a lane may hold at once (bulk leaves one
+# worker free for interactive requests)
+_workers = max(1, RENDER_POOL_WORKERS)
+RENDER_LANES: Dict[str, Dict[str, int]] = {
+    "interactive": {"weight": _lane_setting("interactive", "WEIGHT", 8),
+                    "max_in_flight": _lane_setting("interactive", "MAX_IN_FLIGHT", _workers)},
+    "bulk": {"weight": _lane_setting("bulk", "WEIGHT", 2),
+             "max_in_flight": _lane_setting("bulk", "MAX_IN_FLIGHT", max(1, _workers - 1))},
+    "background": {"weight": _lane_setting("background", "WEIGHT", 1),
+                   "max_in_flight": _lane_setting("background", "MAX_IN_FLIGHT", 1)},
+}
+
+
+class LaneScheduler:
+    """
+    Weighted fair scheduling of render jobs across priority lanes.
+
+    Each lane keeps a virtual finish time that advances by 1/weight per job it
+    starts; the next free worker slot goes to the waiting lane (below its
+    max_in_flight) with the lowest one. A lane that was idle re-enters at the
+    current minimum, so it cannot bank credit while nothing was queued.
+    """
+
+    def __init__(self, capacity: int, lanes: Dict[str, Dict[str, int]]):
+        self.capacity = capacity
+        self.lanes = lanes
+        self.in_flight = {lane: 0 for lane in lanes}
+        self.waiting: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in lanes}
+        self.virtual_time = {lane: 0.0 for lane in lanes}
+        self.dispatched = {lane: 0 for lane in lanes}
+        self.wait_ms = {lane: 0.0 for lane in lanes}
+
+    def _busy(self) -> int:
+        return sum(self.in_flight.values())
+
+    def _eligible(self, lane: str) -> bool:
+        return self.in_flight[lane] < self.lanes[lane]["max_in_flight"]
+
+    def _start(self, lane: str):
+        self.in_flight[lane] += 1
+        self.dispatched[lane] += 1
+        self.virtual_time[lane] += 1.0 / self.lanes[lane]["weight"]
+
+    def _dispatch(self):
+        while self._busy() < self.capacity:
+            candidates = [lane for lane in self.lanes if self.waiting[lane] and self._eligible(lane)]
+            if not candidates:
+                return
+            lane = min(candidates, key=lambda name: self.virtual_time[name])
+            waiter = self.waiting[lane].popleft()
+            if waiter.cancelled():
+                continue
+            self._start(lane)
+            waiter.set_result(None)
+
+    async def acquire(self, lane: str):
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown render lane '{lane}' (expected one of: {', '.join(self.lanes)})")
+
+        active = [self.virtual_time[name] for name in self.lanes
+                  if name != lane and (self.waiting[name] or self.in_flight[name])]
+        if not self.waiting[lane] and not self.in_flight[lane] and active:
+            self.virtual_time[lane] = max(self.virtual_time[lane], min(active))
+
+        if self._busy() < self.capacity and self._eligible(lane) and not any(self.waiting.values()):
+            self._start(lane)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiting[lane].append(waiter)
+        # Other lanes' waiters may all be at their caps with a worker idle
+        self._dispatch()
+        start = time.perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as the caller gave up; hand it on
+                self.release(lane)
+            raise
+        finally:
+            self.wait_ms[lane] += (time.perf_counter() - start) * 1000
+
+    def release(self, lane: str):
+        self.in_flight[lane] -= 1
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            lane: {
+                **settings,
+                "in_flight": self.in_flight[lane],
+                "waiting": len(self.waiting[lane]),
+                "dispatched": self.dispatched[lane],
+                "avg_wait_ms": round(self.wait_ms[lane] / self.dispatched[lane], 2) if self.dispatched[lane] else 0.0,
+            }
+            for lane, settings in self.lanes.items()
+        }
+
+
+_scheduler: Optional[LaneScheduler] = None
+_scheduler_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_lane_scheduler() -> LaneScheduler:
+    """Return the lane scheduler of the running event loop."""
+    global _scheduler, _scheduler_loop
+    loop = asyncio.get_running_loop()
+    if _scheduler is None or _scheduler_loop is not loop:
+        _scheduler = LaneScheduler(_workers, RENDER_LANES)
+        _scheduler_loop = loop
+    return _scheduler
+
+
+def get_render_lane_stats() -> Dict[str, Dict]:
+    """Per-lane weights, caps, queue depth and average queueing delay."""
+    if _scheduler is None:
+        return {lane: {**settings, "in_flight": 0, "waiting": 0, "dispatched": 0, "avg_wait_ms": 0.0}
+                for lane, settings in RENDER_LANES.items()}
+    return _scheduler.stats()
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Return the process-wide render pool, creating it on first use."""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(
+            max_workers=max(1, RENDER_POOL_WORKERS),
+            mp_context=multiprocessing.get_context(RENDER_POOL_START_METHOD),
+            max_tasks_per_child=RENDER_POOL_MAX_TASKS_PER_CHILD or None,
+        )
+        recycle = f", recycled every {RENDER_POOL_MAX_TASKS_PER_CHILD} job(s)" if RENDER_POOL_MAX_TASKS_PER_CHILD else ""
+        print(f"🔍 [RENDER-POOL] Started render pool with {max(1, RENDER_POOL_WORKERS)} worker process(es){recycle}")
+    return _render_pool
+
+
+async def run_in_render_pool(fn: Callable, *args, lane: str = "interactive") -> Any:
+    """
+    Run a picklable top-level function in the render pool without blocking the
+    event loop. lane is "interactive", "bulk" or "background" (see RENDER_LANES).
+    """
+    global _render_pool
+    scheduler = get_lane_scheduler()
+    queued = time.perf_counter()
+    await scheduler.acquire(lane)
+    record_stage("render-queue", (time.perf_counter() - queued) * 1000, lane)
+    try:
+        pool = get_render_pool()
+        loop = asyncio.get_running_loop()
+        try:
+            # Saves and render stages happen in the worker; report them back to this process
+            start = time.perf_counter()
+            (result, saves), stages = await loop.run_in_executor(pool, collect_stage_timings, collect_save_metrics, fn, *args)
+            record_stage("render", (time.perf_counter() - start) * 1000)
+            merge_save_metrics(saves)
+            merge_stage_timings(stages)
+            return result
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); replace the pool for later requests
+            print("❌ [RENDER-POOL] Worker process died, restarting render pool")
+            if _render_pool is pool:
+                _render_pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    finally:
+        scheduler.release(lane)
+
+
+def warm_render_worker() -> bool:
+    """Import the generators, map the shared glyph metrics and parse Final.pdf so a worker's first real job is fast."""
+    from rise import generate_softCopy, generate_printable, reissue  # noqa: F401
+    from rise.generate_final_certificate import get_final_template
+    from rise.shared_cache import attach_metric_tables
+    attach_metric_tables()
+    try:
+        get_final_template()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+async def warm_render_pool():
+    """Warm every worker in the background lane; user requests always go first."""
+    from rise.shared_cache import publish_metric_tables
+    # One worker builds the shared glyph metric tables (if no earlier process did), the rest just map them
+    try:
+        await run_in_render_pool(publish_metric_tables, lane="background")
+    except Exception as e:
+        print(f"⚠️ [RENDER-POOL] Shared metric tables not published: {e}")
+    results = await asyncio.gather(
+        *[run_in_render_pool(warm_render_worker, lane="background") for _ in range(_workers)],
+        return_exceptions=True
+    )
+    warmed = sum(1 for result in results if result is True)
+    print(f"🔍 [RENDER-POOL] Warm-up finished ({warmed}/{len(results)} worker job(s) loaded the final template)")
+
+
+def shutdown_render_pool():
+    """Stop the render pool's worker processes."""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=True, cancel_futures=True)
+        _render_pool = None
@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import hashlib
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from rise.shared_cache import SHARED_CACHE_DIR, publish_file
+
+# Supabase templates are downloaded once into the shared cache and reused by
+# every API and render worker until the entry is this many seconds old
+SHARED_TEMPLATE_TTL = float(os.getenv("SHARED_TEMPLATE_TTL", "600"))
+
+# A template file no name points at is only removed once it has gone this
+# many seconds without being handed out, so a queued render holding its path
+# can still open it
+SHARED_TEMPLATE_PRUNE_GRACE = float(os.getenv("SHARED_TEMPLATE_PRUNE_GRACE", str(SHARED_TEMPLATE_TTL)))
+
+# Custom templates registered through POST /templates: uploads above this size
+# are refused, and past this many entries the least recently used are removed
+CUSTOM_TEMPLATE_MAX_BYTES = int(os.getenv("CUSTOM_TEMPLATE_MAX_BYTES", str(20 * 1024 * 1024)))
+CUSTOM_TEMPLATE_MAX_COUNT = int(os.getenv("CUSTOM_TEMPLATE_MAX_COUNT", "200"))
+
+_template_id_pattern = re.compile(r"^[0-9a-f]{64}$")
+
+
+class TemplateRejected(ValueError):
+    """An uploaded custom template that can't be used (not a PDF, encrypted, empty, too large)."""
+
+
+def build_template_master(content: bytes) -> Tuple[bytes, Dict]:
+    """
+    Parse an uploaded template once and return its master copy plus page info.
+
+    The master is rewritten with a single cross-reference table, unused
+    objects dropped and streams compressed, so incremental saves and broken
+    xrefs are repaired here instead of on every render that opens it.
+    """
+    if len(content) > CUSTOM_TEMPLATE_MAX_BYTES:
+        raise TemplateRejected(f"Template is larger than {CUSTOM_TEMPLATE_MAX_BYTES} bytes")
+    try:
+        doc = fitz.open(stream=content, filetype="pdf")
+    except Exception as e:
+        raise TemplateRejected(f"Template is not a readable PDF: {e}")
+    with doc:
+        if doc.needs_pass:
+            raise TemplateRejected("Template is password protected")
+        if doc.page_count < 1:
+            raise TemplateRejected("Template has no pages")
+        rect = doc[0].rect
+        info = {"pages": doc.page_count, "width": round(rect.width, 2), "height": round(rect.height, 2)}
+        master = doc.tobytes(garbage=3, deflate=True)
+    return master, info
+
+
+class SharedTemplateStore:
+    """
+    Content-addressed template files (<sha256>.pdf) plus a small per-name
+    index, both in the shared cache directory. Renders open the shared file
+    directly, so a template exists once no matter how many workers use it.
+
+    Custom templates registered by callers live under custom/: the master
+    copy <template_id>.pdf and its entry <template_id>.json.
+
+    When a name is republished with new bytes, template files no name points
+    at any more are removed, so the cache (in /dev/shm, see shared_cache)
+    holds about one file per template name instead of growing with every
+    edit made in Supabase. Every lookup and publish touches the file it hands
+    out, and only files untouched for prune_grace seconds are removed: a
+    render queued with an old path can still open it, and one that already
+    opened it keeps reading it.
+    """
+
+    def __init__(self, root: str = os.path.join(SHARED_CACHE_DIR, "templates"), ttl: float = SHARED_TEMPLATE_TTL,
+                 max_custom: int = CUSTOM_TEMPLATE_MAX_COUNT, prune_grace: float = SHARED_TEMPLATE_PRUNE_GRACE):
+        self.root = root
+        self.ttl = ttl
+        self.max_custom = max_custom
+        self.prune_grace = prune_grace
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "registered": 0, "custom_hits": 0, "pruned": 0}
+        # template_id -> registry entry, so resolving an id costs a stat() after the first time
+        self._custom: Dict[str, Dict] = {}
+        os.makedirs(self.root, exist_ok=True)
+        os.makedirs(os.path.join(self.root, "custom"), exist_ok=True)
+
+    def _index_path(self, name: str) -> str:
+        return os.path.join(self.root, f"{hashlib.sha256(name.encode()).hexdigest()[:32]}.json")
+
+    def template_path(self, digest: str) -> str:
+        return os.path.join(self.root, f"{digest}.pdf")
+
+    def _touch(self, path: str) -> bool:
+        """Mark a template file as just handed out; False if it is gone."""
+        try:
+            os.utime(path)
+        except OSError:
+            return False
+        return True
+
+    def _read_index(self, path: str) -> Optional[Dict]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def lookup(self, name: str) -> Optional[Tuple[str, str]]:
+        """(path, sha256) of a fresh cached template, or None."""
+        entry = self._read_index(self._index_path(name))
+        if entry and time.time() - entry["fetched_at"] <= self.ttl:
+            path = self.template_path(entry["sha256"])
+            if self._touch(path):
+                with self._lock:
+                    self._stats["hits"] += 1
+                return path, entry["sha256"]
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def publish(self, name: str, content: bytes) -> Tuple[str, str]:
+        """Store downloaded template bytes under their hash and point name at them."""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.template_path(digest)
+        previous = self._read_index(self._index_path(name))
+        if not self._touch(path):
+            publish_file(path, content)
+        publish_file(self._index_path(name), json.dumps({"name": name, "sha256": digest, "fetched_at": time.time()}).encode())
+        if previous and previous.get("sha256") != digest:
+            self._prune_unreferenced()
+        return path, digest
+
+    def _prune_unreferenced(self):
+        """Remove <sha256>.pdf files that no name's index entry points at and nobody was handed recently."""
+        referenced = set()
+        for entry_name in os.listdir(self.root):
+            if entry_name.endswith(".json"):
+                entry = self._read_index(os.path.join(self.root, entry_name))
+                if entry and "sha256" in entry:
+                    referenced.add(entry["sha256"])
+        cutoff = time.time() - self.prune_grace
+        for entry_name in os.listdir(self.root):
+            if entry_name.endswith(".pdf") and entry_name[:-4] not in referenced:
+                path = os.path.join(self.root, entry_name)
+                try:
+                    if os.path.getmtime(path) > cutoff:
+                        continue
+                    os.remove(path)
+                except OSError:
+                    continue
+                with self._lock:
+                    self._stats["pruned"] += 1
+
+    def custom_path(self, template_id: str) -> str:
+        return os.path.join(self.root, "custom", f"{template_id}.pdf")
+
+    def register(self, content: bytes) -> Tuple[Dict, bool]:
+        """
+        Register an uploaded custom template: (entry, created).
+
+        The id is the sha256 of the uploaded bytes, so registering the same
+        file again (from any worker) returns the existing entry without
+        parsing it. Raises TemplateRejected for unusable uploads.
+        """
+        template_id = hashlib.sha256(content).hexdigest()
+        entry = self.resolve(template_id)
+        if entry:
+            return entry, False
+        master, info = build_template_master(content)
+        entry = {"template_id": template_id, **info, "size": len(master), "registered_at": time.time()}
+        publish_file(self.custom_path(template_id), master)
+        # The entry is published last: a visible entry always has its master
+        publish_file(self.custom_path(template_id)[:-4] + ".json", json.dumps(entry).encode())
+        with self._lock:
+            self._custom[template_id] = entry
+            self._stats["registered"] += 1
+        self._prune_custom()
+        return {**entry, "path": self.custom_path(template_id)}, True
+
+    def resolve(self, template_id: str) -> Optional[Dict]:
+        """Registry entry (with its master "path") of a registered template, or None."""
+        if not _template_id_pattern.match(template_id or ""):
+            return None
+        path = self.custom_path(template_id)
+        entry = self._custom.get(template_id)
+        if entry is None:
+            try:
+                with open(path[:-4] + ".json") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+        try:
+            # Last use decides which templates are pruned first
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._custom.pop(template_id, None)
+            return None
+        with self._lock:
+            self._custom[template_id] = entry
+            self._stats["custom_hits"] += 1
+        return {**entry, "path": path}
+
+    def _prune_custom(self):
+        custom_dir = os.path.join(self.root, "custom")
+        masters = []
+        for name in os.listdir(custom_dir):
+            if name.endswith(".pdf"):
+                try:
+                    masters.append((os.path.getmtime(os.path.join(custom_dir, name)), name[:-4]))
+                except OSError:
+                    pass
+        masters.sort()
+        for _, template_id in masters[:max(0, len(masters) - self.max_custom)]:
+            # Entry first, so the id stops resolving before its master goes
+            for suffix in (".json", ".pdf"):
+                try:
+                    os.remove(os.path.join(custom_dir, template_id + suffix))
+                except OSError:
+                    pass
+            with self._lock:
+                self._custom.pop(template_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["files"] = sum(1 for entry in os.listdir(self.root) if entry.endswith(".pdf"))
+        stats["custom_files"] = sum(1 for entry in os.listdir(os.path.join(self.root, "custom")) if entry.endswith(".pdf"))
+        return stats
+
+
+_store: Optional[SharedTemplateStore] = None
+
+
+def get_template_store() -> SharedTemplateStore:
+    """Return the process-wide template store."""
+    global _store
+    if _store is None:
+        _store = SharedTemplateStore()
+    return _store
@@ -4,19 +4,14 @@ import pathlib
 from typing import Tuple
 from rise.generate_certificate import parse_word_form, generate_certificate
 
-async def draft_from_form_and_template(form_file, template_file) -> Tuple[bytes, str]:
-    """Generate draft certificate from Word form and PDF template."""
+async def draft_from_form_and_template(form_file, template_path: str) -> Tuple[bytes, str]:
+    """Generate draft certificate from Word form and a registered PDF template (its master path)."""
     with tempfile.TemporaryDirectory() as td:
         # Save uploaded form file
         form_path = os.path.join(td, form_file.filename)
         with open(form_path, "wb") as f:
             f.write(await form_file.read())
 
-        # Save uploaded template file
-        template_path = os.path.join(td, template_file.filename)
-        with open(template_path, "wb") as f:
-            f.write(await template_file.read())
-
         # Parse the Word form to extract values
         values = parse_word_form(form_path)
         
@@ -31,7 +26,13 @@ async def draft_from_form_and_template(form_file, template_file) -> Tuple[bytes,
         with open(out_path, "rb") as f:
             return f.read(), out_name
 
+async def convert_word_bytes(content: bytes, filename: str) -> Tuple[bytes, str]:
+    """Convert Word document bytes to PDF on the warm LibreOffice pool."""
+    from adapters.office_pool import get_office_pool
+    suffix = pathlib.Path(filename).suffix.lower() or ".docx"
+    pdf_bytes = await get_office_pool().convert_async(content, suffix)
+    return pdf_bytes, pathlib.Path(filename).with_suffix(".pdf").name
+
 async def convert_single_word(file) -> Tuple[bytes, str]:
-    """Convert a single Word file to PDF (placeholder for future implementation)."""
-    # This can be implemented later if you want generic Word→PDF conversion
-    raise NotImplementedError("Single-file convert not implemented. Use /draft with form + template.")
+    """Convert a single uploaded Word file to PDF."""
+    return await convert_word_bytes(await file.read(), file.filename)
@@ -41,12 +41,18 @@ TROUBLESHOOTING:
 
 import os
 import json
+import time
 import tempfile
 import requests
 from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from rise.generate_certificate import parse_word_form, generate_certificate
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from rise.generate_certificate import parse_word_form, parse_pdf_form
+from rise.resources import remove_file, temp_path
+from rise.timings import record_stage, stage, start_stage_timings
 from datetime import datetime, timedelta
+from typing import List, Optional
 
 # Load environment variables from .env.local
 def load_env_file():
@@ -152,10 +158,21 @@ app.add_middleware(
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "PDF Service", "port": 8000, "endpoints": ["/extract-fields", "/generate-certificate", "/generate-softcopy", "/draft", "/convert", "/generate-certificate-json"]}
+    return {"status": "healthy", "service": "PDF Service", "port": 8000, "endpoints": ["/extract-fields", "/extract-fields/bulk", "/resolve-iso-standards", "/generate-certificate", "/generate-softcopy", "/preview", "/validate-layout", "/draft", "/templates", "/generate-final", "/generate-final/batch", "/reissue", "/jobs", "/convert", "/convert/batch", "/metrics", "/generate-certificate-json"]}
 
 async def download_template_from_supabase(template_name: str) -> str:
-    """Download a PDF template from Supabase storage."""
+    """
+    Return the path of a Supabase PDF template in the shared template cache,
+    downloading it only when no worker has fetched it recently. The file is
+    shared by all workers: callers must not delete it.
+    """
+    from adapters.template_store import get_template_store
+    start = time.perf_counter()
+    store = get_template_store()
+    cached = store.lookup(template_name)
+    if cached:
+        record_stage("template-fetch", (time.perf_counter() - start) * 1000, "hit")
+        return cached[0]
     try:
         # Construct the download URL
         download_url = f"{SUPABASE_URL}/storage/v1/object/public/certificate-templates/{template_name}.pdf"
@@ -164,14 +181,61 @@ async def download_template_from_supabase(template_name: str) -> str:
         response = requests.get(download_url)
         response.raise_for_status()
         
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(response.content)
-            return tmp_file.name
+        # Publish to the shared cache for every worker
+        template_path, _ = store.publish(template_name, response.content)
+        record_stage("template-fetch", (time.perf_counter() - start) * 1000, "miss")
+        return template_path
             
     except Exception as e:
         raise Exception(f"Failed to download template {template_name}: {str(e)}")
 
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """
+    Per-caller rate and concurrency quotas for work-submitting (POST) requests.
+    Registered before verify_internal_token so it runs after it: unauthorized
+    requests never use a caller's quota. Health, metrics and job polling are
+    GET requests and always pass. The slot is held until the response body has
+    been sent, so streamed responses (/extract-fields/bulk) count in full; job
+    rows are counted against the submitter by the job runner.
+    """
+    from adapters.admission import ADMISSION_CONTROL, AdmissionRejected, client_key, get_admission_controller
+    if request.method != "POST" or not ADMISSION_CONTROL:
+        return await call_next(request)
+
+    controller = get_admission_controller()
+    client = client_key(request)
+    queued = time.perf_counter()
+    try:
+        await controller.acquire(client)
+        record_stage("admission", (time.perf_counter() - queued) * 1000)
+    except AdmissionRejected as e:
+        print(f"⚠️ [ADMISSION] Rejected {request.url.path} from '{client}': {e.reason} (retry after {e.retry_after}s)")
+        return JSONResponse(
+            status_code=429,
+            content={"detail": f"Too many requests: {e.reason}", "retry_after": e.retry_after},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    start = time.monotonic()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        controller.release(client, time.monotonic() - start)
+        raise
+
+    body = response.body_iterator
+
+    async def body_then_release():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            controller.release(client, time.monotonic() - start)
+
+    response.body_iterator = body_then_release()
+    return response
+
 @app.middleware("http")
 async def verify_internal_token(request: Request, call_next):
     # Skip token check for health endpoint
@@ -204,11 +268,81 @@ async def verify_internal_token(request: Request, call_next):
     
     return await call_next(request)
 
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """
+    Add a Server-Timing header with per-stage durations (parse, template
+    resolve/fetch, render stages, serialize, total) to every response.
+    Registered last, so it wraps auth and admission and total is the whole
+    request.
+    """
+    start = time.perf_counter()
+    timings = start_stage_timings()
+    response = await call_next(request)
+    response.headers["Server-Timing"] = timings.header((time.perf_counter() - start) * 1000)
+    # Lets browser devtools show the breakdown for cross-origin requests too
+    response.headers["Timing-Allow-Origin"] = "*"
+    return response
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "service": "PDF/Certificate Service"}
 
+@app.get("/metrics")
+async def metrics():
+    """Admission quotas, render lane queues, per-profile PDF output sizes and serialization times, office converters, cache statistics and process RSS/open files."""
+    from rise.save_profiles import get_save_metrics
+    from rise.layout_cache import get_layout_cache_stats
+    from rise.ocr_engine import get_cache_stats
+    from adapters.render_pool import get_render_lane_stats
+    from rise.preview import get_preview_cache_stats
+    from rise.shared_cache import get_shared_cache_stats
+    from adapters.template_store import get_template_store
+    from adapters.admission import get_admission_stats
+    from rise.resources import get_process_resources
+    from adapters.office_pool import get_office_pool_stats
+    return {
+        "admission": get_admission_stats(),
+        "render_lanes": get_render_lane_stats(),
+        "office_pool": get_office_pool_stats(),
+        "save_profiles": get_save_metrics(),
+        "layout_cache": get_layout_cache_stats(),
+        "preview_cache": get_preview_cache_stats(),
+        "ocr_cache": get_cache_stats(),
+        "shared_cache": {**get_shared_cache_stats(), "templates": get_template_store().stats()},
+        "process": get_process_resources()
+    }
+
+@app.on_event("startup")
+async def resume_unfinished_jobs():
+    """Pick up bulk jobs left unfinished by the last run and warm the render workers and office converters."""
+    import asyncio
+    from adapters.job_runner import resume_jobs
+    from adapters.render_pool import warm_render_pool
+    from adapters.office_pool import warm_office_pool
+    resume_jobs()
+    if os.getenv("RENDER_POOL_WARMUP", "true").lower() in ["true", "1", "yes"]:
+        app.state.render_warmup = asyncio.create_task(warm_render_pool())
+    if os.getenv("OFFICE_POOL_WARMUP", "true").lower() in ["true", "1", "yes"]:
+        # Starting LibreOffice takes seconds; do it off the event loop
+        app.state.office_warmup = asyncio.get_running_loop().run_in_executor(None, warm_office_pool)
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    """Release the PDF extraction lane, persistent OCR workers, render pool and office converter processes."""
+    from rise.ocr_engine import shutdown_ocr_pool
+    from adapters.render_pool import shutdown_render_pool
+    from adapters.office_pool import shutdown_office_pool
+    from adapters.job_runner import shutdown_jobs
+    from adapters.bulk_extract import shutdown_pdf_lane
+    # Stop job tasks first; their unfinished rows resume on the next start
+    await shutdown_jobs()
+    shutdown_pdf_lane()
+    shutdown_ocr_pool()
+    shutdown_render_pool()
+    shutdown_office_pool()
+
 @app.post("/extract-fields")
 async def extract_fields(form: UploadFile = File(...)):
     """Extract form fields from Word document, PDF, or image without generating PDF."""
@@ -221,42 +355,75 @@ async def extract_fields(form: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Form must be .docx, .pdf, .png, or .jpg format")
     
     try:
-        # Save uploaded file temporarily with appropriate extension
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as tmp_file:
-            content = await form.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-        
-        try:
-            # Extract fields based on file type
+        content = await form.read()
+        # Save uploaded file temporarily with appropriate extension (removed on every path)
+        with temp_path(f".{file_extension}", content) as tmp_file_path:
+            # Extract fields based on file type (off the event loop - OCR can take seconds)
             if file_extension == "docx":
-                extracted_fields = parse_word_form(tmp_file_path)
-            elif file_extension in ["pdf", "png", "jpg", "jpeg"]:
-                extracted_fields = parse_pdf_form(tmp_file_path)
+                extracted_fields = await run_in_threadpool(parse_word_form, tmp_file_path)
+            elif file_extension == "pdf":
+                # PyMuPDF is not thread-safe; PDF forms share the bulk extractor's single lane
+                from adapters.bulk_extract import run_in_pdf_lane
+                extracted_fields = await run_in_pdf_lane(parse_pdf_form, tmp_file_path)
+            elif file_extension in ["png", "jpg", "jpeg"]:
+                extracted_fields = await run_in_threadpool(parse_pdf_form, tmp_file_path)
             else:
                 raise HTTPException(status_code=400, detail=f"Unsupported file type: {file_extension}")
             
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
-            
             return extracted_fields
             
-        except Exception as e:
-            # Clean up temporary file on error
-            if os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
-            raise e
-            
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Field extraction failed: {str(e)}")
 
+@app.post("/extract-fields/bulk")
+async def extract_fields_bulk(files: List[UploadFile] = File(...)):
+    """
+    Extract form fields from many Word/PDF/image forms (or ZIP archives of them).
+    
+    Streams NDJSON: one line per file as it completes, then a summary line.
+    """
+    from adapters.bulk_extract import collect_form_files, stream_bulk_extraction
+    
+    try:
+        form_files = await collect_form_files(files)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bulk upload: {str(e)}")
+    
+    if not form_files:
+        raise HTTPException(status_code=400, detail="No supported form files found (.docx, .pdf, .png, .jpg)")
+    
+    print(f"🔍 [BULK-EXTRACT] Extracting fields from {len(form_files)} file(s)")
+    return StreamingResponse(stream_bulk_extraction(form_files), media_type="application/x-ndjson")
+
+@app.post("/resolve-iso-standards")
+async def resolve_iso_standards(request: Request):
+    """Resolve a batch of ISO standard values (e.g. an Excel column) to full names, codes and descriptions."""
+    from rise.iso_standards import resolve_many
+    
+    try:
+        body = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    
+    values = body.get("values") if isinstance(body, dict) else None
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Body must be {\"values\": [...]}")
+    
+    return {"results": resolve_many(values)}
+
 @app.post("/generate-certificate")
 async def generate_certificate_endpoint(
     request: Request,
     form: UploadFile = File(...),
-    fields: str = Form(...)
+    fields: str = Form(...),
+    save_profile: str = Form(""),
+    lane: str = Form("")
 ):
-    """Generate certificate from form and field data using Supabase template."""
+    """Generate certificate from form and field data using Supabase template (lane: form field or X-Render-Lane)."""
+    from adapters.render_pool import run_in_render_pool
+    from rise.render_rows import render_certificate_pdf
+    profile = parse_save_profile(save_profile)
+    render_lane = parse_render_lane(request, lane)
     # Validate file types
     file_extension = form.filename.lower().split('.')[-1] if '.' in form.filename else ""
     supported_extensions = ['docx', 'pdf', 'png', 'jpg', 'jpeg']
@@ -276,7 +443,8 @@ async def generate_certificate_endpoint(
         
         try:
             print(f"🔍 [CERTIFICATE] Attempting to parse JSON...")
-            field_data = json.loads(fields)
+            with stage("parse"):
+                field_data = json.loads(fields)
             print(f"🔍 [CERTIFICATE] JSON parsed successfully: {field_data}")
             if field_data is None:
                 print("❌ [CERTIFICATE] Field data is null after parsing")
@@ -320,16 +488,15 @@ async def generate_certificate_endpoint(
             logo_lookup = {}
         
         # Save uploaded file temporarily with appropriate extension
+        content = await form.read()
         with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as tmp_file:
-            content = await form.read()
             tmp_file.write(content)
             tmp_file_path = tmp_file.name
         
         try:
-            # Create output file path
             output_filename = f"generated_certificate_{os.getpid()}.pdf"
-            output_path = os.path.join(tempfile.gettempdir(), output_filename)
             
+            resolve_start = time.perf_counter()
             # ✅ NEW: Check for Extra Line presence FIRST (highest priority)
             extra_line = field_data.get("Extra Line", "").strip()
             
@@ -467,12 +634,14 @@ async def generate_certificate_endpoint(
                             template_name = "templateDraftLargeEco"
                             template_type = "large_eco"
             
+            record_stage("template-resolve", (time.perf_counter() - resolve_start) * 1000)
+            
             # Download template from Supabase storage
             template_path = await download_template_from_supabase(template_name)
             
-            # ✅ ADDED: Add logo lookup to field_data for the generation function
-            field_data["logo_lookup"] = logo_lookup
-            print(f"🔍 [CERTIFICATE] Added logo lookup to field data: {len(logo_lookup)} logo files")
+            # Logos go to the render pool as bytes; the worker rebuilds logo_lookup
+            logos = await read_logo_bytes(logo_lookup)
+            print(f"🔍 [CERTIFICATE] Passing {len(logos)} logo files to the renderer")
             
             # ✅ ADDED: Add new optional fields to field data
             field_data["Initial Registration Date"] = initial_registration_date
@@ -500,12 +669,12 @@ async def generate_certificate_endpoint(
             
             print(f"🔍 [CERTIFICATE] Calling generate_certificate with:")
             print(f"🔍 [CERTIFICATE] - template_path: {template_path}")
-            print(f"🔍 [CERTIFICATE] - output_path: {output_path}")
             print(f"🔍 [CERTIFICATE] - values keys: {list(values.keys()) if values else 'None'}")
             print(f"🔍 [CERTIFICATE] - template_type: {template_type}")
             
-            result = generate_certificate(template_path, output_path, values, template_type)
-            print(f"🔍 [CERTIFICATE] generate_certificate result: {result}")
+            result = await run_in_render_pool(render_certificate_pdf, template_path, values, template_type, profile, logos, lane=render_lane)
+            pdf_bytes = result["pdf"]
+            print(f"🔍 [CERTIFICATE] generate_certificate overflow warnings: {result['overflow_warnings']}")
             
             # Check for overflow warnings
             if result.get("overflow_warnings"):
@@ -514,17 +683,6 @@ async def generate_certificate_endpoint(
                     print(f"[CERTIFICATE] {warning['message']}")
                 print(f"[CERTIFICATE] ===== END OVERFLOW WARNINGS =====")
             
-            # Read the generated PDF
-            with open(output_path, "rb") as f:
-                pdf_bytes = f.read()
-            
-            # Clean up temporary files
-            os.unlink(tmp_file_path)
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-            if os.path.exists(template_path):
-                os.unlink(template_path)
-            
             # Check if we have overflow warnings to include in response headers
             warning_headers = {}
             if 'result' in locals() and result.get("overflow_warnings"):
@@ -541,57 +699,912 @@ async def generate_certificate_endpoint(
                 }
             )
             
-        except Exception as e:
-            # Clean up temporary file on error
-            if os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
-            raise e
+        finally:
+            # Temp files go on every path, errors and cancelled requests included
+            remove_file(tmp_file_path)
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Certificate generation failed: {str(e)}")
 
+async def resolve_custom_template(template: Optional[UploadFile], template_id: str = "") -> Optional[dict]:
+    """
+    Registry entry (with the master "path") of a request's custom template,
+    or None when the request uses the Supabase templates. template_id picks a
+    template registered with POST /templates; an uploaded template is
+    registered on the way in, so uploading the same file again reuses its
+    master. Callers must not delete the path.
+    """
+    from adapters.template_store import TemplateRejected, get_template_store
+    store = get_template_store()
+    if template_id and template_id.strip():
+        entry = store.resolve(template_id.strip())
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Template not found (it may have been pruned; register it again with POST /templates)")
+        return entry
+    if not template or not template.filename:
+        return None
+    if not template.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Template must be .pdf format")
+    content = await template.read()
+    try:
+        with stage("template-register"):
+            entry, _ = await run_in_threadpool(store.register, content)
+    except TemplateRejected as e:
+        raise HTTPException(status_code=400, detail=f"Invalid template: {e}")
+    return entry
+
+@app.post("/templates", status_code=201)
+async def register_template(response: Response, template: UploadFile = File(...)):
+    """
+    Register a custom PDF template once and return its template_id.
+
+    The template is validated and rewritten into a compact master copy in the
+    shared cache, keyed by the sha256 of the upload. Pass template_id to
+    /generate-softcopy, /generate-printable, /preview or /draft instead of
+    uploading the file with every request. Registering the same file again
+    returns the same id (200 instead of 201).
+    """
+    from adapters.template_store import TemplateRejected, get_template_store
+    if not template.filename or not template.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Template must be .pdf format")
+    content = await template.read()
+    try:
+        with stage("template-register"):
+            entry, created = await run_in_threadpool(get_template_store().register, content)
+    except TemplateRejected as e:
+        raise HTTPException(status_code=400, detail=f"Invalid template: {e}")
+    if not created:
+        response.status_code = 200
+    return {key: value for key, value in entry.items() if key != "path"}
+
+@app.get("/templates/{template_id}")
+async def get_registered_template(template_id: str):
+    """Page count, page size and master size of a registered template."""
+    from adapters.template_store import get_template_store
+    entry = get_template_store().resolve(template_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Template not found (it may have been pruned; register it again with POST /templates)")
+    return {key: value for key, value in entry.items() if key != "path"}
+
 @app.post("/draft")
-async def draft(form: UploadFile = File(...), template: UploadFile = File(...)):
-    """Generate draft certificate from Word form and PDF template."""
+async def draft(form: UploadFile = File(...), template: UploadFile = File(None), template_id: str = Form("")):
+    """Generate draft certificate from Word form and an uploaded or registered PDF template."""
+    from adapters.word_adapter import draft_from_form_and_template
     # Validate file types
     if not form.filename.lower().endswith(".docx"):
         raise HTTPException(status_code=400, detail="Form must be .docx format")
-    if not template.filename.lower().endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Template must be .pdf format")
+    custom_template = await resolve_custom_template(template, template_id)
+    if custom_template is None:
+        raise HTTPException(status_code=400, detail="Upload a template or pass a template_id")
     
     try:
-        pdf_bytes, out_name = await draft_from_form_and_template(form, template)
+        with stage("render"):
+            pdf_bytes, out_name = await draft_from_form_and_template(form, custom_template["path"])
         return Response(
             pdf_bytes, 
             media_type="application/pdf",
-            headers={"Content-Disposition": f'attachment; filename="{out_name}"'}
+            headers={"Content-Disposition": f'attachment; filename="{out_name}"', "X-Template-Id": custom_template["template_id"]}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Certificate generation failed: {str(e)}")
 
+def parse_save_profile(save_profile: str) -> str:
+    """Validate the save_profile form value ("fast", "compact" or "archival"; empty = default)."""
+    from rise.save_profiles import resolve_save_profile
+    try:
+        return resolve_save_profile(save_profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def parse_render_lane(request: Request, lane: str = "") -> str:
+    """
+    Render pool lane of a single-certificate request: the lane form field,
+    else the X-Render-Lane header, else "interactive". Callers generating a
+    sheet row by row pass "bulk" so the editors' renders go first.
+    """
+    lane = (lane or request.headers.get("x-render-lane") or "interactive").lower().strip()
+    if lane not in ("interactive", "bulk"):
+        raise HTTPException(status_code=400, detail="lane must be 'interactive' or 'bulk'")
+    return lane
+
+async def read_logo_bytes(logo_lookup: dict) -> dict:
+    """Logo uploads as {filename: bytes}, the picklable form the render pool takes."""
+    logos = {}
+    for filename, logo_file in logo_lookup.items():
+        await logo_file.seek(0)
+        logos[filename] = await logo_file.read()
+    return logos
+
+def parse_date_fields(date_fields: str):
+    """Parse the date_fields form value (JSON object, or list of objects for batches)."""
+    if not date_fields or date_fields.strip() == "":
+        return {}
+    try:
+        with stage("parse"):
+            return json.loads(date_fields)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid date_fields format")
+
+@app.post("/generate-final")
+async def generate_final_endpoint(
+    draft: UploadFile = File(...),
+    date_fields: str = Form("{}"),
+    save_profile: str = Form("")
+):
+    """Convert a draft certificate PDF into a final certificate using the in-memory Final.pdf template."""
+    from adapters.render_pool import run_in_render_pool
+    from rise.generate_final_certificate import convert_draft_to_final
+    
+    if not draft.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Draft must be a .pdf file")
+    
+    profile = parse_save_profile(save_profile)
+    fields = parse_date_fields(date_fields)
+    if not isinstance(fields, dict):
+        raise HTTPException(status_code=400, detail="date_fields must be a JSON object")
+    
+    try:
+        draft_bytes = await draft.read()
+        pdf_bytes = await run_in_render_pool(convert_draft_to_final, draft_bytes, fields, profile)
+        out_name = f"final_{os.path.splitext(os.path.basename(draft.filename))[0]}.pdf"
+        return Response(
+            pdf_bytes,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="{out_name}"'}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Final certificate generation failed: {str(e)}")
+
+def unique_archive_name(out_name: str, index: int, used_names: set) -> str:
+    """ZIP entry name for a batch row; two uploads named alike must not overwrite each other."""
+    base, ext = os.path.splitext(out_name)
+    suffix = index + 1
+    while out_name in used_names:
+        out_name = f"{base}_{suffix}{ext}"
+        suffix += 1
+    used_names.add(out_name)
+    return out_name
+
+@app.post("/generate-final/batch")
+async def generate_final_batch_endpoint(
+    drafts: List[UploadFile] = File(...),
+    date_fields: str = Form("{}"),
+    save_profile: str = Form("")
+):
+    """
+    Convert many draft PDFs into final certificates in the render pool.
+    
+    date_fields is either one JSON object applied to every draft, a list aligned
+    with the uploaded drafts, or an object keyed by draft filename. save_profile
+    applies to every final in the batch. Returns a ZIP of finals plus
+    manifest.json with each draft's status and per-stage timings (timings_ms).
+    """
+    import io
+    import asyncio
+    import zipfile
+    from adapters.render_pool import run_in_render_pool
+    from rise.generate_final_certificate import convert_draft_to_final
+    
+    profile = parse_save_profile(save_profile)
+    fields = parse_date_fields(date_fields)
+    if isinstance(fields, list) and len(fields) != len(drafts):
+        raise HTTPException(status_code=400, detail="date_fields list must have one entry per draft")
+    
+    def fields_for(index: int, filename: str):
+        if isinstance(fields, list):
+            return fields[index] or {}
+        if filename in fields and isinstance(fields[filename], dict):
+            return fields[filename]
+        return fields
+    
+    async def render_row(index: int, name: str, content: bytes):
+        # Each row runs in its own task, so it collects its own stage timings for the manifest
+        row_timings = start_stage_timings()
+        start = time.perf_counter()
+        try:
+            return await run_in_render_pool(convert_draft_to_final, content, fields_for(index, name), profile, lane="bulk")
+        finally:
+            row_timings.add("total", (time.perf_counter() - start) * 1000)
+            timings_by_row[index] = row_timings.as_dict()
+    
+    timings_by_row = {}
+    draft_payloads = [(draft.filename, await draft.read()) for draft in drafts]
+    with stage("render"):
+        results = await asyncio.gather(
+            *[render_row(i, name, content) for i, (name, content) in enumerate(draft_payloads)],
+            return_exceptions=True
+        )
+    
+    manifest = []
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_STORED) as archive:
+        used_names = set()
+        for index, ((name, _), result) in enumerate(zip(draft_payloads, results)):
+            if isinstance(result, Exception):
+                print(f"❌ [FINAL-BATCH] {name}: {result}")
+                manifest.append({"index": index, "draft": name, "status": "error", "error": str(result), "timings_ms": timings_by_row.get(index, {})})
+            else:
+                out_name = unique_archive_name(f"final_{os.path.splitext(os.path.basename(name))[0]}.pdf", index, used_names)
+                archive.writestr(out_name, result)
+                manifest.append({"index": index, "draft": name, "status": "ok", "final": out_name, "timings_ms": timings_by_row.get(index, {})})
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    
+    succeeded = sum(1 for row in manifest if row["status"] == "ok")
+    print(f"✅ [FINAL-BATCH] {succeeded}/{len(manifest)} final certificate(s) generated")
+    return Response(
+        zip_buffer.getvalue(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": 'attachment; filename="final_certificates.zip"',
+            "X-Batch-Succeeded": str(succeeded),
+            "X-Batch-Failed": str(len(manifest) - succeeded)
+        }
+    )
+
+@app.post("/reissue")
+async def reissue_endpoint(
+    certificate: UploadFile = File(...),
+    data: str = Form(...),
+    template_type: str = Form("")
+):
+    """
+    Reissue a soft copy or printable with new dates/revision as an incremental update.
+
+    data is a JSON object with only the changed fields (Issue Date, Surveillance/
+    Expiry Date, Recertification Date, Revision, ...). The original PDF bytes are
+    preserved as the prefix of the returned file.
+    """
+    from adapters.render_pool import run_in_render_pool
+    from rise.reissue import reissue_certificate
+
+    if not certificate.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Certificate must be a .pdf file")
+    try:
+        with stage("parse"):
+            changes = json.loads(data)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid data format")
+    if not isinstance(changes, dict) or not changes:
+        raise HTTPException(status_code=400, detail="data must be a non-empty JSON object")
+
+    original = await certificate.read()
+    try:
+        pdf_bytes = await run_in_render_pool(reissue_certificate, original, changes, template_type or None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reissue failed: {str(e)}")
+
+    out_name = f"reissued_{os.path.splitext(os.path.basename(certificate.filename))[0]}.pdf"
+    return Response(
+        pdf_bytes,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f'attachment; filename="{out_name}"',
+            "X-Reissue-Incremental": "true" if pdf_bytes.startswith(original) else "false"
+        }
+    )
+
+def job_status_response(job: dict) -> dict:
+    """Status and progress of a job, with one entry per row."""
+    from adapters.job_store import get_job_store
+    store = get_job_store()
+    rows = store.get_rows(job["id"])
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "save_profile": job["save_profile"],
+        "total": job["total"],
+        **store.progress(job["id"]),
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+        "rows": [
+            {"index": row["idx"], "name": row["name"], "status": row["status"], "output": row["output_name"],
+             "error": row["error"], "attempts": row["attempts"], "elapsed_ms": row["elapsed_ms"]}
+            for row in rows
+        ]
+    }
+
+def get_job_or_404(job_id: str) -> dict:
+    from adapters.job_store import get_job_store
+    job = get_job_store().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found (it may have expired)")
+    return job
+
+async def prepare_field_job_rows(kind: str, rows: list, logos: dict, custom_template: Optional[dict]) -> tuple:
+    """
+    Rows and assets of a softcopy/printable/draft job: each row's values and
+    template are resolved now, with the same rules as the single-certificate
+    endpoints, and the templates and logos are stored with the job so a
+    resumed job renders exactly what was submitted.
+    """
+    import re
+    import hashlib
+
+    assets, template_assets, job_rows = {}, {}, []
+    logo_assets = {}
+    for i, (filename, content) in enumerate(logos.items()):
+        logo_assets[filename] = f"logo_{i}{os.path.splitext(filename)[1].lower()}"
+        assets[logo_assets[filename]] = content
+
+    async def template_asset(template_path: str) -> str:
+        if template_path not in template_assets:
+            content = await run_in_threadpool(read_file_bytes, template_path)
+            name = f"template_{hashlib.sha256(content).hexdigest()[:16]}.pdf"
+            assets[name] = content
+            template_assets[template_path] = name
+        return template_assets[template_path]
+
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise HTTPException(status_code=400, detail=f"rows[{index}] must be a JSON object")
+        if kind == "draft":
+            values = {key: str(value) for key, value in row.items() if value is not None}
+        else:
+            if not row.get("Company Name"):
+                raise HTTPException(status_code=400, detail=f"rows[{index}]: Company name is required")
+            # Same placeholders as /generate-softcopy and /generate-printable
+            values = {"Company Name": "Company Name", "Address": "Address", "ISO Standard": "ISO Standard", "Scope": "Scope"}
+            values.update({key: str(value) for key, value in row.items() if value not in (None, "")})
+
+        if custom_template:
+            template_path, template_type = custom_template["path"], "standard"
+        else:
+            try:
+                if kind == "draft":
+                    template_name, template_type = select_draft_template(values, logos)
+                elif kind == "softcopy":
+                    template_name, template_type = select_softcopy_template(values, values["Scope"], logos)
+                else:
+                    template_name, template_type = select_printable_template(values, values["Scope"], logos)
+            except Exception as e:
+                # The selection rules have no fallback for a Logo whose file was not uploaded
+                reason = f"Logo '{values['Logo']}' is not in logo_files" if values.get("Logo") else str(e)
+                raise HTTPException(status_code=400, detail=f"rows[{index}]: No template matches this row: {reason}")
+            try:
+                template_path = await download_template_from_supabase(template_name)
+            except Exception as template_error:
+                raise HTTPException(status_code=500, detail=f"Template download failed: {str(template_error)}")
+
+        row_logo = values.get("Logo", "")
+        params = {
+            "values": values,
+            "template": await template_asset(template_path),
+            "template_type": template_type,
+            "logos": {row_logo: logo_assets[row_logo]} if row_logo in logo_assets else {}
+        }
+        company = re.sub(r'_+', '_', re.sub(r'[<>:"|?*\\/\r\n\t]', '_', values.get("Company Name", ""))).strip('_')
+        job_rows.append({"name": f"{company or f'row_{index + 1}'}.pdf", "content": None, "params": params})
+    return job_rows, assets
+
+def read_file_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    request: Request,
+    files: List[UploadFile] = File(None),
+    kind: str = Form("final"),
+    params: str = Form("{}"),
+    rows: str = Form(""),
+    template: UploadFile = File(None),
+    template_id: str = Form(""),
+    save_profile: str = Form("")
+):
+    """
+    Submit a long-running bulk job and return immediately with its job_id.
+
+    kind "final" (drafts -> final certificates) and "reissue" (soft copies/
+    printables with new dates) take PDF files; params follows the date_fields
+    rules of /generate-final/batch: one JSON object for every file, a list
+    aligned with the files, or an object keyed by filename.
+
+    kind "softcopy", "printable" and "draft" take rows: a JSON list of field
+    objects keyed like /generate-softcopy data or /generate-certificate-json
+    fields, with logo_files matched by filename. Templates are picked per row
+    as those endpoints do, or a custom template (upload or template_id) is
+    used for every row.
+
+    Rows are checkpointed as they finish, so the job keeps running if the
+    client disconnects and resumes where it stopped after a restart. Poll
+    GET /jobs/{job_id} and download GET /jobs/{job_id}/results.
+    """
+    from adapters.admission import client_key
+    from adapters.job_store import get_job_store
+    from adapters.job_runner import JOB_KINDS, FIELD_KINDS, start_job, schedule_purge
+
+    if kind not in JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind '{kind}' (expected one of: {', '.join(JOB_KINDS)})")
+    profile = parse_save_profile(save_profile)
+    assets = None
+
+    if kind in FIELD_KINDS:
+        try:
+            field_rows = json.loads(rows) if rows and rows.strip() else None
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Invalid rows format")
+        if not isinstance(field_rows, list) or not field_rows:
+            raise HTTPException(status_code=400, detail=f"{kind} jobs take rows: a non-empty JSON list of field objects")
+        form_data = await request.form()
+        logos = {}
+        for logo_file in form_data.getlist("logo_files"):
+            if hasattr(logo_file, "filename") and logo_file.filename:
+                logos[logo_file.filename] = await logo_file.read()
+        custom_template = await resolve_custom_template(template, template_id)
+        job_rows, assets = await prepare_field_job_rows(kind, field_rows, logos, custom_template)
+    else:
+        if not files:
+            raise HTTPException(status_code=400, detail=f"{kind} jobs take PDF files")
+        row_params = parse_date_fields(params)
+        if not isinstance(row_params, (dict, list)):
+            raise HTTPException(status_code=400, detail="params must be a JSON object or list")
+        if isinstance(row_params, list) and len(row_params) != len(files):
+            raise HTTPException(status_code=400, detail="params list must have one entry per file")
+        for upload in files:
+            if not upload.filename.lower().endswith(".pdf"):
+                raise HTTPException(status_code=400, detail=f"{upload.filename}: jobs accept .pdf files only")
+
+        def params_for(index: int, filename: str):
+            if isinstance(row_params, list):
+                return row_params[index] or {}
+            if filename in row_params and isinstance(row_params[filename], dict):
+                return row_params[filename]
+            return row_params
+
+        job_rows = [{"name": upload.filename, "content": await upload.read(), "params": params_for(i, upload.filename)}
+                    for i, upload in enumerate(files)]
+
+    # Inputs and the SQLite rows are written in the threadpool, off the event loop;
+    # the rows are later rendered under the submitter's admission quota
+    client = client_key(request)
+    job_id = await run_in_threadpool(lambda: get_job_store().create_job(kind, job_rows, profile, assets, client))
+    start_job(job_id)
+    schedule_purge()
+    return {"job_id": job_id, "status": "queued", "total": len(job_rows)}
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Job status and per-row progress."""
+    return await run_in_threadpool(lambda: job_status_response(get_job_or_404(job_id)))
+
+@app.get("/jobs/{job_id}/results")
+async def get_job_results(job_id: str):
+    """
+    ZIP of every row rendered so far plus manifest.json. Available while the
+    job is still running (X-Job-Status tells whether the set is complete).
+    The archive is streamed one row at a time, so large jobs are never held
+    in memory.
+    """
+    import zipfile
+    from adapters.job_store import get_job_store
+
+    job = await run_in_threadpool(get_job_or_404, job_id)
+    store = get_job_store()
+    rows = await run_in_threadpool(store.get_rows, job_id)
+
+    class ZipChunks:
+        """Write-only buffer for ZipFile; it is not seekable, so entries use data descriptors."""
+
+        def __init__(self):
+            self.chunks = []
+
+        def write(self, data) -> int:
+            self.chunks.append(bytes(data))
+            return len(data)
+
+        def flush(self):
+            pass
+
+        def take(self) -> bytes:
+            data = b"".join(self.chunks)
+            self.chunks.clear()
+            return data
+
+    def stream_archive():
+        # A sync generator: Starlette iterates it in the threadpool, so the file reads stay off the loop
+        buffer = ZipChunks()
+        manifest = []
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+            used_names = set()
+            for row in rows:
+                entry = {"index": row["idx"], "file": row["name"], "status": row["status"]}
+                if row["status"] == "done":
+                    out_name = unique_archive_name(row["output_name"], row["idx"], used_names)
+                    archive.write(store.output_path(job_id, row["idx"]), out_name)
+                    entry["output"] = out_name
+                elif row["error"]:
+                    entry["error"] = row["error"]
+                manifest.append(entry)
+                yield buffer.take()
+            archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+        yield buffer.take()
+
+    return StreamingResponse(
+        stream_archive(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="job_{job_id}.zip"',
+            "X-Job-Status": job["status"]
+        }
+    )
+
+@app.get("/jobs/{job_id}/rows/{index}")
+async def get_job_row(job_id: str, index: int):
+    """Download a single rendered row of a job."""
+    from fastapi.responses import FileResponse
+    from adapters.job_store import get_job_store
+
+    await run_in_threadpool(get_job_or_404, job_id)
+    store = get_job_store()
+    rows = await run_in_threadpool(store.get_rows, job_id)
+    row = next((row for row in rows if row["idx"] == index), None)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Row not found")
+    if row["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Row is {row['status']}" + (f": {row['error']}" if row["error"] else ""))
+    return FileResponse(store.output_path(job_id, index), media_type="application/pdf", filename=row["output_name"])
+
+def conversion_http_error(error: Exception) -> HTTPException:
+    """Map an office conversion failure to its HTTP status."""
+    from adapters.office_pool import ConverterBusy, ConverterUnavailable, ConversionTimeout
+    if isinstance(error, ConverterBusy):
+        return HTTPException(status_code=503, detail=f"Conversion failed: {error}",
+                             headers={"Retry-After": str(error.retry_after)})
+    if isinstance(error, ConverterUnavailable):
+        return HTTPException(status_code=503, detail=f"Conversion failed: {error}")
+    if isinstance(error, ConversionTimeout):
+        return HTTPException(status_code=504, detail=f"Conversion failed: {error}")
+    return HTTPException(status_code=500, detail=f"Conversion failed: {str(error)}")
+
 @app.post("/convert")
 async def convert(file: UploadFile = File(...)):
-    """Convert single Word document to PDF."""
+    """Convert single Word document to PDF on the warm LibreOffice pool."""
+    from adapters.word_adapter import convert_single_word
     if not file.filename.lower().endswith((".doc", ".docx")):
         raise HTTPException(status_code=400, detail="File must be .doc or .docx format")
     
     try:
-        pdf_bytes, out_name = await convert_single_word(file)
+        with stage("convert"):
+            pdf_bytes, out_name = await convert_single_word(file)
         return Response(
             pdf_bytes,
             media_type="application/pdf", 
             headers={"Content-Disposition": f'attachment; filename="{out_name}"'}
         )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Conversion failed: {str(e)}")
+        raise conversion_http_error(e)
+
+@app.post("/convert/batch")
+async def convert_batch(files: List[UploadFile] = File(...)):
+    """
+    Convert many Word documents to PDF in one call.
+    
+    Documents run through the LibreOffice pool at most one per converter at a
+    time, so a batch never fills the pool's wait queue. Returns a ZIP of PDFs
+    plus manifest.json with each document's status and timings (timings_ms).
+    """
+    import io
+    import asyncio
+    import zipfile
+    from adapters.office_pool import OFFICE_MAX_BATCH_FILES, get_office_pool
+    from adapters.word_adapter import convert_word_bytes
+    
+    if len(files) > OFFICE_MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {OFFICE_MAX_BATCH_FILES} documents per batch")
+    for file in files:
+        if not file.filename.lower().endswith((".doc", ".docx")):
+            raise HTTPException(status_code=400, detail=f"{file.filename}: file must be .doc or .docx format")
+    
+    slots = asyncio.Semaphore(get_office_pool().size)
+    
+    async def convert_row(index: int, name: str, content: bytes):
+        # Each row runs in its own task, so it collects its own stage timings for the manifest
+        row_timings = start_stage_timings()
+        start = time.perf_counter()
+        try:
+            async with slots:
+                with stage("convert"):
+                    return await convert_word_bytes(content, name)
+        finally:
+            row_timings.add("total", (time.perf_counter() - start) * 1000)
+            timings_by_row[index] = row_timings.as_dict()
+    
+    timings_by_row = {}
+    payloads = [(file.filename, await file.read()) for file in files]
+    with stage("convert"):
+        results = await asyncio.gather(
+            *[convert_row(i, name, content) for i, (name, content) in enumerate(payloads)],
+            return_exceptions=True
+        )
+    
+    manifest = []
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_STORED) as archive:
+        used_names = set()
+        for index, ((name, _), result) in enumerate(zip(payloads, results)):
+            if isinstance(result, Exception):
+                print(f"❌ [CONVERT-BATCH] {name}: {result}")
+                manifest.append({"document": name, "status": "error", "error": str(result), "timings_ms": timings_by_row.get(index, {})})
+                continue
+            pdf_bytes, out_name = result
+            out_name = unique_archive_name(out_name, index, used_names)
+            archive.writestr(out_name, pdf_bytes)
+            manifest.append({"document": name, "status": "ok", "pdf": out_name, "timings_ms": timings_by_row.get(index, {})})
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    
+    succeeded = sum(1 for row in manifest if row["status"] == "ok")
+    print(f"✅ [CONVERT-BATCH] {succeeded}/{len(manifest)} document(s) converted")
+    return Response(
+        zip_buffer.getvalue(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": 'attachment; filename="converted_documents.zip"',
+            "X-Batch-Succeeded": str(succeeded),
+            "X-Batch-Failed": str(len(manifest) - succeeded)
+        }
+    )
+
+def select_softcopy_template(values: dict, scope: str, logo_lookup: dict):
+    """Pick the Supabase soft copy template (template_name, template_type) for the field values."""
+    # Determine which Supabase template to use based on content length and Size/Accreditation
+    # Use the SAME LOGIC as certificate generation
+    scope_words = len(scope.split()) if scope else 0
+    estimated_lines = max(1, (scope_words * 8) // 60)  # 8 chars per word, 60 chars per line
+    
+    # Get Size, Accreditation, Logo, and Country from the form data
+    size = values.get("Size", "").lower().strip()
+    accreditation = values.get("Accreditation", "").lower().strip()
+    logo = values.get("Logo", "").lower().strip()
+    country = values.get("Country", "").strip()  # ✅ ADDED: Country parameter
+    
+    # ✅ NEW: Check for Extra Line presence FIRST (highest priority)
+    extra_line = values.get("Extra Line", "").strip()
+    
+    # ✅ NEW: Template Override Logic - Extra Line forces large template
+    if extra_line:
+        print(f"🔍 [SOFTCOPY] Extra Line present - forcing large template selection")
+        
+        # Force large template based on other parameters
+        if country.lower() == "other":
+            if logo and logo.strip() and logo in logo_lookup:
+                # Logo templates for Other country
+                if accreditation == "no":
+                    template_name = "templateSoftCopyLogoOtherNonAcc"
+                    template_type = "logo_other_nonaccredited"
+                else:
+                    template_name = "templateSoftCopyLogoOther"
+                    template_type = "logo_other"
+            elif accreditation == "no":
+                template_name = "templateSoftCopyLargeNonAccOther"
+                template_type = "large_nonaccredited_other"
+            elif size == "high":
+                template_name = "template_softCopy_large_other"
+                template_type = "large_other"
+            else:
+                template_name = "template_softCopy_large_other_eco"
+                template_type = "large_other_eco"
+        else:  # Default country
+            if logo and logo.strip() and logo in logo_lookup:
+                # Logo templates for Default country
+                if accreditation == "no":
+                    template_name = "templateSoftCopyLogoNonAcc"
+                    template_type = "logo_nonaccredited"
+                else:
+                    template_name = "templateSoftCopyLogo"
+                    template_type = "logo"
+            elif accreditation == "no":
+                template_name = "templateSoftCopyLargeNonAcc"
+                template_type = "large_nonaccredited"
+            elif size == "high":
+                template_name = "template_SoftCopy_large"
+                template_type = "large"
+            else:
+                template_name = "templateSoftCopyLargeEco"
+                template_type = "large_eco"
+        
+        print(f"🔍 [SOFTCOPY] Extra Line override: {template_name} ({template_type})")
+        
+    else:
+        # ✅ EXISTING: Normal template selection logic
+        # ✅ UPDATED: Template selection logic with Country parameter (simplified - no separate logo templates)
+        if country.lower() == "other":
+            # Country = "Other" template logic
+            if logo and logo.strip() and logo in logo_lookup:
+                # Logo templates for Other country
+                if accreditation == "no":
+                    template_name = "templateSoftCopyLogoOtherNonAcc"
+                    template_type = "logo_other_nonaccredited"
+                else:
+                    template_name = "templateSoftCopyLogoOther"
+                    template_type = "logo_other"
+            elif accreditation == "no":
+                # Non-accredited templates for Other country
+                if estimated_lines <= 11:
+                    template_name = "templateSoftCopyStandardNonAccOther"
+                    template_type = "standard_nonaccredited_other"
+                else:
+                    template_name = "templateSoftCopyLargeNonAccOther"
+                    template_type = "large_nonaccredited_other"
+            elif size == "high" and accreditation != "no":
+                # High size with accreditation for Other country
+                if estimated_lines <= 11:
+                    template_name = "template_softCopy_other"
+                    template_type = "standard_other"
+                else:
+                    template_name = "template_softCopy_large_other"
+                    template_type = "large_other"
+            else:
+                # Size is blank/low and accreditation != no for Other country - use eco templates
+                if estimated_lines <= 11:
+                    template_name = "template_softCopy_other_eco"
+                    template_type = "standard_other_eco"
+                else:
+                    template_name = "template_softCopy_large_other_eco"
+                    template_type = "large_other_eco"
+        else:
+            # ✅ ADDED: Logo handling logic (applies to both blank and Other country)
+            if logo and logo.strip() and logo in logo_lookup:
+                # Logo templates take priority - single template regardless of content length
+                if accreditation == "no":
+                    template_name = "templateSoftCopyLogoNonAcc"
+                    template_type = "logo_nonaccredited"
+                else:
+                    template_name = "templateSoftCopyLogo"
+                    template_type = "logo"
+                print(f"🔍 [SOFTCOPY] Logo file found: {logo} - using logo template")
+            elif logo and logo.strip() and logo not in logo_lookup:
+                print(f"⚠️ [SOFTCOPY] Logo specified but file not found: {logo} - using regular template")
+            elif accreditation == "no":
+                # Non-accredited templates
+                if estimated_lines <= 11:  # Standard template for ≤11 lines
+                    template_name = "templateSoftCopyStandardNonAcc"
+                    template_type = "standard_nonaccredited"
+                else:  # Large template for >11 lines
+                    template_name = "templateSoftCopyLargeNonAcc"
+                    template_type = "large_nonaccredited"
+            elif size == "high" and accreditation != "no":
+                # High size with accreditation - use current templates
+                if estimated_lines <= 11:  # Standard template for ≤11 lines
+                    template_name = "template_softCopy"
+                    template_type = "standard"
+                else:  # Large template for >11 lines
+                    template_name = "template_SoftCopy_large"
+                    template_type = "large"
+            else:
+                # Size is blank/low and accreditation != no - use eco templates
+                if estimated_lines <= 11:  # Standard template for ≤11 lines
+                    template_name = "templateSoftCopyStandardEco"
+                    template_type = "standard_eco"
+                else:  # Large template for >11 lines
+                    template_name = "templateSoftCopyLargeEco"
+                    template_type = "large_eco"
+    
+    return template_name, template_type
+
+async def get_preview_template(template_name: str) -> tuple:
+    """Supabase template for previews: (shared cache path, sha256 of the bytes)."""
+    template_path = await download_template_from_supabase(template_name)
+    # Shared templates are content-addressed, so the file name is the hash
+    return template_path, os.path.splitext(os.path.basename(template_path))[0]
+
+@app.post("/preview")
+async def preview_endpoint(
+    request: Request,
+    data: str = Form(...),
+    width: int = Form(600),
+    format: str = Form("png"),
+    template: UploadFile = File(None),
+    template_type: str = Form(""),
+    template_id: str = Form(""),
+    generator: str = Form("softcopy")
+):
+    """
+    Return page 1 of a certificate as a PNG/WebP image for live previews.
+
+    generator is "softcopy" (default) or "draft". data is a JSON object keyed
+    like the fields of /generate-softcopy or /generate-certificate-json
+    ("Company Name", "Address", "Scope", "Size", "Accreditation", "Country",
+    ...); logo_files are matched by filename as in those endpoints. The
+    template is picked with the same rules, the layout is identical and only
+    the raster is produced (no PDF save; soft copies use a low-resolution
+    QR/logo). Results are cached by content hash; X-Preview-Cache tells whether
+    the image was reused. A custom template is uploaded as template or
+    referenced by template_id (POST /templates).
+    """
+    from adapters.render_pool import run_in_render_pool
+    from rise.preview import (
+        PREVIEW_FORMATS, PREVIEW_GENERATORS, PREVIEW_MIN_WIDTH, PREVIEW_MAX_WIDTH,
+        preview_cache_key, get_cached_preview, store_preview, render_softcopy_preview, render_draft_preview
+    )
+
+    image_format = (format or "png").lower().strip()
+    if image_format not in PREVIEW_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(PREVIEW_FORMATS)}")
+    generator = (generator or "softcopy").lower().strip()
+    if generator not in PREVIEW_GENERATORS:
+        raise HTTPException(status_code=400, detail=f"generator must be one of: {', '.join(PREVIEW_GENERATORS)}")
+    if not PREVIEW_MIN_WIDTH <= width <= PREVIEW_MAX_WIDTH:
+        raise HTTPException(status_code=400, detail=f"width must be between {PREVIEW_MIN_WIDTH} and {PREVIEW_MAX_WIDTH}")
+    try:
+        with stage("parse"):
+            field_data = json.loads(data)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid data format")
+    if not isinstance(field_data, dict):
+        raise HTTPException(status_code=400, detail="data must be a JSON object")
+
+    # Same placeholders as /generate-softcopy for fields not typed yet (drafts too)
+    values = {"Company Name": "Company Name", "Address": "Address", "ISO Standard": "ISO Standard", "Scope": "Scope"}
+    values.update({key: str(value) for key, value in field_data.items() if value not in (None, "")})
+
+    form_data = await request.form()
+    logos = {}
+    for logo_file in form_data.getlist("logo_files"):
+        if hasattr(logo_file, "filename") and logo_file.filename:
+            logos[logo_file.filename] = await logo_file.read()
+
+    custom_template = await resolve_custom_template(template, template_id)
+    try:
+        if custom_template:
+            # The template id is the upload's sha256, so cached previews survive re-registering
+            template_path, template_hash = custom_template["path"], custom_template["template_id"]
+            layout_type = template_type or "standard"
+        else:
+            with stage("template-resolve"):
+                if generator == "draft":
+                    template_name, layout_type = select_draft_template(values, logos)
+                else:
+                    template_name, layout_type = select_softcopy_template(values, values.get("Scope", ""), logos)
+            template_path, template_hash = await get_preview_template(template_name)
+            layout_type = template_type or layout_type
+    except Exception as template_error:
+        raise HTTPException(status_code=500, detail=f"Template download failed: {str(template_error)}")
+
+    key = preview_cache_key(template_hash, values, layout_type, width, image_format, logos, generator)
+    image = get_cached_preview(key)
+    cache_status = "hit" if image is not None else "miss"
+    if image is None:
+        render_preview = render_draft_preview if generator == "draft" else render_softcopy_preview
+        try:
+            image = await run_in_render_pool(render_preview, template_path, values, layout_type, width, image_format, logos)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Preview failed: {str(e)}")
+        store_preview(key, image)
+
+    return Response(
+        image,
+        media_type=PREVIEW_FORMATS[image_format],
+        headers={
+            "Cache-Control": "private, max-age=300",
+            "ETag": f'"{key}"',
+            "X-Preview-Cache": cache_status,
+            "X-Template-Type": layout_type
+        }
+    )
 
 @app.post("/generate-softcopy")
 async def generate_softcopy_endpoint(
     request: Request,
     data: str = Form(...),
-    template: UploadFile = File(None)
+    template: UploadFile = File(None),
+    save_profile: str = Form(""),
+    template_id: str = Form(""),
+    lane: str = Form("")
 ):
-    """Generate soft copy PDF from form data using Supabase template."""
+    """
+    Generate soft copy PDF from form data using Supabase template (or a custom
+    template: upload or template_id). lane (form field or X-Render-Lane) is
+    the render pool lane.
+    """
+    from adapters.render_pool import run_in_render_pool
+    from rise.render_rows import render_softcopy_pdf
+    profile = parse_save_profile(save_profile)
+    render_lane = parse_render_lane(request, lane)
+    custom_template = await resolve_custom_template(template, template_id)
+    template_path = None
     try:
         # ENHANCED LOGGING: Log raw data received
       
@@ -601,7 +1614,8 @@ async def generate_softcopy_endpoint(
         
         # Parse the JSON data
         try:
-            soft_copy_data = json.loads(data)
+            with stage("parse"):
+                soft_copy_data = json.loads(data)
             if soft_copy_data is None:
                 raise HTTPException(status_code=400, detail="Data is null")
         except json.JSONDecodeError:
@@ -718,148 +1732,14 @@ async def generate_softcopy_endpoint(
         
         
         # Determine template path and type
-        if template:
-            # Use uploaded custom template
-            import tempfile
-            template_path = os.path.join(tempfile.gettempdir(), f"uploaded_template_{template.filename}")
-            with open(template_path, "wb") as buffer:
-                content = await template.read()
-                buffer.write(content)
+        if custom_template:
+            # Registered custom template: its master lives in the shared template cache
+            template_path = custom_template["path"]
             template_type = "standard"
-            template_name = f"custom_{template.filename}"
+            template_name = f"custom_{custom_template['template_id'][:12]}"
         else:
-            # Determine which Supabase template to use based on content length and Size/Accreditation
-            # Use the SAME LOGIC as certificate generation
-            scope_words = len(scope.split()) if scope else 0
-            estimated_lines = max(1, (scope_words * 8) // 60)  # 8 chars per word, 60 chars per line
-            
-            # Get Size, Accreditation, Logo, and Country from the form data
-            size = values.get("Size", "").lower().strip()
-            accreditation = values.get("Accreditation", "").lower().strip()
-            logo = values.get("Logo", "").lower().strip()
-            country = values.get("Country", "").strip()  # ✅ ADDED: Country parameter
-            
-            # ✅ NEW: Check for Extra Line presence FIRST (highest priority)
-            extra_line = values.get("Extra Line", "").strip()
-            
-            # ✅ NEW: Template Override Logic - Extra Line forces large template
-            if extra_line:
-                print(f"🔍 [SOFTCOPY] Extra Line present - forcing large template selection")
-                
-                # Force large template based on other parameters
-                if country.lower() == "other":
-                    if logo and logo.strip() and logo in logo_lookup:
-                        # Logo templates for Other country
-                        if accreditation == "no":
-                            template_name = "templateSoftCopyLogoOtherNonAcc"
-                            template_type = "logo_other_nonaccredited"
-                        else:
-                            template_name = "templateSoftCopyLogoOther"
-                            template_type = "logo_other"
-                    elif accreditation == "no":
-                        template_name = "templateSoftCopyLargeNonAccOther"
-                        template_type = "large_nonaccredited_other"
-                    elif size == "high":
-                        template_name = "template_softCopy_large_other"
-                        template_type = "large_other"
-                    else:
-                        template_name = "template_softCopy_large_other_eco"
-                        template_type = "large_other_eco"
-                else:  # Default country
-                    if logo and logo.strip() and logo in logo_lookup:
-                        # Logo templates for Default country
-                        if accreditation == "no":
-                            template_name = "templateSoftCopyLogoNonAcc"
-                            template_type = "logo_nonaccredited"
-                        else:
-                            template_name = "templateSoftCopyLogo"
-                            template_type = "logo"
-                    elif accreditation == "no":
-                        template_name = "templateSoftCopyLargeNonAcc"
-                        template_type = "large_nonaccredited"
-                    elif size == "high":
-                        template_name = "template_SoftCopy_large"
-                        template_type = "large"
-                    else:
-                        template_name = "templateSoftCopyLargeEco"
-                        template_type = "large_eco"
-                
-                print(f"🔍 [SOFTCOPY] Extra Line override: {template_name} ({template_type})")
-                
-            else:
-                # ✅ EXISTING: Normal template selection logic
-                # ✅ UPDATED: Template selection logic with Country parameter (simplified - no separate logo templates)
-                if country.lower() == "other":
-                    # Country = "Other" template logic
-                    if logo and logo.strip() and logo in logo_lookup:
-                        # Logo templates for Other country
-                        if accreditation == "no":
-                            template_name = "templateSoftCopyLogoOtherNonAcc"
-                            template_type = "logo_other_nonaccredited"
-                        else:
-                            template_name = "templateSoftCopyLogoOther"
-                            template_type = "logo_other"
-                    elif accreditation == "no":
-                        # Non-accredited templates for Other country
-                        if estimated_lines <= 11:
-                            template_name = "templateSoftCopyStandardNonAccOther"
-                            template_type = "standard_nonaccredited_other"
-                        else:
-                            template_name = "templateSoftCopyLargeNonAccOther"
-                            template_type = "large_nonaccredited_other"
-                    elif size == "high" and accreditation != "no":
-                        # High size with accreditation for Other country
-                        if estimated_lines <= 11:
-                            template_name = "template_softCopy_other"
-                            template_type = "standard_other"
-                        else:
-                            template_name = "template_softCopy_large_other"
-                            template_type = "large_other"
-                    else:
-                        # Size is blank/low and accreditation != no for Other country - use eco templates
-                        if estimated_lines <= 11:
-                            template_name = "template_softCopy_other_eco"
-                            template_type = "standard_other_eco"
-                        else:
-                            template_name = "template_softCopy_large_other_eco"
-                            template_type = "large_other_eco"
-                else:
-                    # ✅ ADDED: Logo handling logic (applies to both blank and Other country)
-                    if logo and logo.strip() and logo in logo_lookup:
-                        # Logo templates take priority - single template regardless of content length
-                        if accreditation == "no":
-                            template_name = "templateSoftCopyLogoNonAcc"
-                            template_type = "logo_nonaccredited"
-                        else:
-                            template_name = "templateSoftCopyLogo"
-                            template_type = "logo"
-                        print(f"🔍 [SOFTCOPY] Logo file found: {logo} - using logo template")
-                    elif logo and logo.strip() and logo not in logo_lookup:
-                        print(f"⚠️ [SOFTCOPY] Logo specified but file not found: {logo} - using regular template")
-                    elif accreditation == "no":
-                        # Non-accredited templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templateSoftCopyStandardNonAcc"
-                            template_type = "standard_nonaccredited"
-                        else:  # Large template for >11 lines
-                            template_name = "templateSoftCopyLargeNonAcc"
-                            template_type = "large_nonaccredited"
-                    elif size == "high" and accreditation != "no":
-                        # High size with accreditation - use current templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "template_softCopy"
-                            template_type = "standard"
-                        else:  # Large template for >11 lines
-                            template_name = "template_SoftCopy_large"
-                            template_type = "large"
-                    else:
-                        # Size is blank/low and accreditation != no - use eco templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templateSoftCopyStandardEco"
-                            template_type = "standard_eco"
-                        else:  # Large template for >11 lines
-                            template_name = "templateSoftCopyLargeEco"
-                            template_type = "large_eco"
+            with stage("template-resolve"):
+                template_name, template_type = select_softcopy_template(values, scope, logo_lookup)
             
             # Download template from Supabase storage
             try:
@@ -887,43 +1767,16 @@ async def generate_softcopy_endpoint(
         
         clean_company_name = sanitize_filename(company_name)
         output_filename = f"{clean_company_name}_softcopy.pdf"
-        # Use Windows-compatible temporary directory
-        import tempfile
-        output_path = os.path.join(tempfile.gettempdir(), output_filename)
 
-        # Generate the soft copy using the dedicated soft copy generation function
-        
-        # Use the dedicated soft copy generation function
+        # Render in the pool; each render writes its own temp file, so requests for the same company never collide
         try:
-            from rise.generate_softCopy import generate_softcopy
-            
-            # Call the generate_softcopy function and capture return value
-            result = generate_softcopy(template_path, output_path, field_data, template_type)
-            
-            # Check for overflow warnings
-            if result.get("overflow_warnings"):
-                pass  # Overflow warnings are handled in response headers
-            
+            field_data.pop("logo_lookup", None)
+            logos = await read_logo_bytes(logo_lookup)
+            result = await run_in_render_pool(render_softcopy_pdf, template_path, field_data, template_type, profile, logos, lane=render_lane)
+            pdf_content = result["pdf"]
         except Exception as gen_error:
             raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(gen_error)}")
 
-        # Read the generated PDF
-        try:
-            with open(output_path, "rb") as pdf_file:
-                pdf_content = pdf_file.read()
-        except Exception as read_error:
-            raise HTTPException(status_code=500, detail=f"PDF read failed: {str(read_error)}")
-
-        # Clean up temporary files AFTER reading the content
-        if template and os.path.exists(template_path):
-            os.unlink(template_path)
-        elif not template and os.path.exists(template_path):
-            os.unlink(template_path)
-        
-        # Clean up output file after reading
-        if os.path.exists(output_path):
-            os.unlink(output_path)
-
         # Check if we have overflow warnings to include in response headers
         warning_headers = {}
         if 'result' in locals() and result.get("overflow_warnings"):
@@ -936,6 +1789,7 @@ async def generate_softcopy_endpoint(
             media_type="application/pdf",
             headers={
                 "Content-Disposition": f"attachment; filename={output_filename}",
+                **({"X-Template-Id": custom_template["template_id"]} if custom_template else {}),
                 **warning_headers
             }
         )
@@ -969,9 +1823,21 @@ async def generate_printable(
     # ✅ ADDED: Extract Address alignment field
     address_alignment: str = Form(""),
     logo: str = Form(""),
-    template: UploadFile = File(None)
+    template: UploadFile = File(None),
+    save_profile: str = Form(""),
+    template_id: str = Form(""),
+    lane: str = Form("")
 ):
-    """Generate printable certificate from form data."""
+    """
+    Generate printable certificate from form data (custom template: upload or
+    template_id). lane (form field or X-Render-Lane) is the render pool lane.
+    """
+    from adapters.render_pool import run_in_render_pool
+    from rise.render_rows import render_printable_pdf
+    profile = parse_save_profile(save_profile)
+    render_lane = parse_render_lane(request, lane)
+    custom_template = await resolve_custom_template(template, template_id)
+    template_path = None
     try:
        
 
@@ -1052,151 +1918,17 @@ async def generate_printable(
         print(f"🔍 [PRINTABLE] Added optional fields to field data")
         
         # Determine template path and type
-        if template:
-            # Use uploaded custom template
-            import tempfile
-            template_path = os.path.join(tempfile.gettempdir(), f"uploaded_template_{template.filename}")
-            with open(template_path, "wb") as buffer:
-                content = await template.read()
-                buffer.write(content)
+        if custom_template:
+            # Registered custom template: its master lives in the shared template cache
+            template_path = custom_template["path"]
             template_type = "standard"
-            template_name = f"custom_{template.filename}"
-            print(f"🔍 [PRINTABLE] Using uploaded custom template: {template.filename}")
+            template_name = f"custom_{custom_template['template_id'][:12]}"
+            print(f"🔍 [PRINTABLE] Using custom template: {custom_template['template_id']}")
         else:
-            # Determine which Supabase template to use based on content length and Size/Accreditation
-            # Use the SAME LOGIC as certificate generation and soft copy
-            scope_words = len(scope.split()) if scope else 0
-            estimated_lines = max(1, (scope_words * 8) // 60)  # 8 chars per word, 60 chars per line
+            resolve_start = time.perf_counter()
+            template_name, template_type = select_printable_template({**values, "Logo": logo}, scope, logo_lookup)
             
-            # Get Size, Accreditation, Logo, and Country from the form data
-            size_lower = size.lower().strip() if size else ""
-            accreditation_lower = accreditation.lower().strip() if accreditation else ""
-            logo_lower = logo.lower().strip() if logo else ""
-            country_lower = country.lower().strip() if country else ""  # ✅ ADDED: Country parameter
-            
-            # ✅ NEW: Check for Extra Line presence FIRST (highest priority)
-            extra_line = values.get("Extra Line", "").strip()
-            
-            # ✅ NEW: Template Override Logic - Extra Line forces large template
-            if extra_line:
-                print(f"🔍 [PRINTABLE] Extra Line present - forcing large template selection")
-                
-                # Force large template based on other parameters
-                if country_lower == "other":
-                    if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
-                        # Logo templates for Other country
-                        if accreditation_lower == "no":
-                            template_name = "templatePrintableLogoOtherNonAcc"
-                            template_type = "logo_other_nonaccredited"
-                        else:
-                            template_name = "templatePrintableLogoOther"
-                            template_type = "logo_other"
-                    elif accreditation_lower == "no":
-                        template_name = "templateprintableLargeOtherNonAcc"
-                        template_type = "large_other_nonaccredited"
-                    elif size_lower == "high":
-                        template_name = "templateprintableLargeOther"
-                        template_type = "large_other"
-                    else:
-                        template_name = "templateprintableLargeOtherEco"
-                        template_type = "large_other_eco"
-                else:  # Default country
-                    if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
-                        # Logo templates for Default country
-                        if accreditation_lower == "no":
-                            template_name = "templatePrintableLogoNonAcc"
-                            template_type = "logo_nonaccredited"
-                        else:
-                            template_name = "templatePrintableLogo"
-                            template_type = "logo"
-                    elif accreditation_lower == "no":
-                        template_name = "templateprintableLargeNonAcc"
-                        template_type = "large_nonaccredited"
-                    elif size_lower == "high":
-                        template_name = "templateprintableLarge"
-                        template_type = "large"
-                    else:
-                        template_name = "templateprintableLargeEco"
-                        template_type = "large_eco"
-                
-                print(f"🔍 [PRINTABLE] Extra Line override: {template_name} ({template_type})")
-                
-            else:
-                # ✅ EXISTING: Normal template selection logic
-                # ✅ UPDATED: Template selection logic with correct template names
-                if country_lower == "other":
-                    # Country = "Other" template logic
-                    if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
-                        # Logo templates for Other country
-                        if accreditation_lower == "no":
-                            template_name = "templatePrintableLogoOtherNonAcc"
-                            template_type = "logo_other_nonaccredited"
-                        else:
-                            template_name = "templatePrintableLogoOther"
-                            template_type = "logo_other"
-                    elif accreditation_lower == "no":
-                        # Non-accredited templates for Other country
-                        if estimated_lines <= 11:
-                            template_name = "templatePrintableOtherNonAcc"
-                            template_type = "standard_other_nonaccredited"
-                        else:
-                            template_name = "templateprintableLargeOtherNonAcc"
-                            template_type = "large_other_nonaccredited"
-                    elif size_lower == "high" and accreditation_lower != "no":
-                        # High size with accreditation for Other country
-                        if estimated_lines <= 11:
-                            template_name = "templatePrintableStandardOther"
-                            template_type = "standard_other"
-                        else:
-                            template_name = "templateprintableLargeOther"
-                            template_type = "large_other"
-                    else:
-                        # Size is blank/low and accreditation != no for Other country - use eco templates
-                        if estimated_lines <= 11:
-                            template_name = "templatePrintableStandardOtherEco"
-                            template_type = "standard_other_eco"
-                        else:
-                            template_name = "templateprintableLargeOtherEco"
-                            template_type = "large_other_eco"
-                else:
-                    # Original template logic for blank country
-                    if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
-                        # Logo templates take priority - single template regardless of content length
-                        if accreditation_lower == "no":
-                            template_name = "templatePrintableLogoNonAcc"
-                            template_type = "logo_nonaccredited"
-                        else:
-                            template_name = "templatePrintableLogo"
-                            template_type = "logo"
-                    elif logo_lower and logo_lower.strip() and logo_lower not in logo_lookup:
-                        print(f"⚠️ [PRINTABLE] Logo specified but file not found: {logo_lower} - using regular template")
-                        # Continue with regular template selection logic
-                    elif accreditation_lower == "no":
-                        # Non-accredited templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templatePrintableStandardNonAcc"
-                            template_type = "standard_nonaccredited"
-                        else:  # Large template for >11 lines
-                            template_name = "templateprintableLargeNonAcc"
-                            template_type = "large_nonaccredited"
-                    elif size_lower == "high" and accreditation_lower != "no":
-                        # High size with accreditation - use current templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templatePrintableStandard"
-                            template_type = "standard"
-                        else:  # Large template for >11 lines
-                            template_name = "templateprintableLarge"
-                            template_type = "large"
-                    else:
-                        # Size is blank/low and accreditation != no - use eco templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templatePrintableStandardEco"
-                            template_type = "standard_eco"
-                        else:  # Large template for >11 lines
-                            template_name = "templateprintableLargeEco"
-                            template_type = "large_eco"
-            
-            print(f"🔍 [PRINTABLE] Scope: {scope_words} words, ~{estimated_lines} lines, Size: '{size_lower}', Accreditation: '{accreditation_lower}', Logo: '{logo_lower}', Country: '{country_lower}', using {template_type} template: {template_name}.pdf")
+            record_stage("template-resolve", (time.perf_counter() - resolve_start) * 1000)
             
             # Download template from Supabase storage
             print(f"🔍 [PRINTABLE] Downloading {template_name}.pdf from Supabase...")
@@ -1227,62 +1959,19 @@ async def generate_printable(
         
         clean_company_name = sanitize_filename(company_name)
         output_filename = f"{clean_company_name}_printable.pdf"
-        # Use Windows-compatible temporary directory
-        import tempfile
-        output_path = os.path.join(tempfile.gettempdir(), output_filename)
 
-        # Generate the printable using the dedicated printable generation function
-        print(f"🔍 [PRINTABLE] Starting printable generation with {template_type} template...")
-        
-        # Use the dedicated printable generation function
+        # Render in the pool; each render writes its own temp file, so requests for the same company never collide
+        print(f"🔍 [PRINTABLE] Starting printable generation with {template_type} template in the {render_lane} lane...")
         try:
-            from rise.generate_printable import generate_printable_cert
-            print(f"🔍 [PRINTABLE] Calling generate_printable_cert with template: {template_path}")
-            print(f"🔍 [PRINTABLE] Output path: {output_path}")
-            generate_printable_cert(template_path, output_path, field_data, template_type)
-            print(f"🔍 [PRINTABLE] PDF generation completed successfully")
+            field_data.pop("logo_lookup", None)
+            logos = await read_logo_bytes(logo_lookup)
+            result = await run_in_render_pool(render_printable_pdf, template_path, field_data, template_type, profile, logos, lane=render_lane)
+            pdf_content = result["pdf"]
+            print(f"🔍 [PRINTABLE] PDF generation completed successfully, size: {len(pdf_content)} bytes")
         except Exception as gen_error:
             print(f"❌ [PRINTABLE] PDF generation failed: {gen_error}")
             raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(gen_error)}")
 
-        # Read the generated PDF
-        try:
-            print(f"🔍 [PRINTABLE] Reading generated PDF from: {output_path}")
-            with open(output_path, "rb") as pdf_file:
-                pdf_content = pdf_file.read()
-            print(f"🔍 [PRINTABLE] PDF read successfully, size: {len(pdf_content)} bytes")
-            
-            # Validate PDF content
-            if len(pdf_content) == 0:
-                raise ValueError("Generated PDF is empty (0 bytes)")
-            
-            # Check if content starts with PDF header
-            if not pdf_content.startswith(b'%PDF'):
-                raise ValueError("Generated file does not appear to be a valid PDF")
-                
-        except Exception as read_error:
-            print(f"❌ [PRINTABLE] PDF read failed: {read_error}")
-            raise HTTPException(status_code=500, detail=f"PDF read failed: {str(read_error)}")
-
-        # Clean up temporary files AFTER reading the content
-        try:
-            if template and os.path.exists(template_path):
-                os.unlink(template_path)
-                print(f"🔍 [PRINTABLE] Template file cleaned up: {template_path}")
-            elif not template and os.path.exists(template_path):
-                os.unlink(template_path)
-                print(f"🔍 [PRINTABLE] Template file cleaned up: {template_path}")
-        except Exception as cleanup_error:
-            print(f"⚠️ [PRINTABLE] Template cleanup warning: {cleanup_error}")
-        
-        # Clean up output file after reading (but before response)
-        try:
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-                print(f"🔍 [PRINTABLE] Output file cleaned up: {output_path}")
-        except Exception as cleanup_error:
-            print(f"⚠️ [PRINTABLE] Output file cleanup warning: {cleanup_error}")
-
         # Set proper response headers for PDF download
         response_headers = {
             "Content-Disposition": f"attachment; filename={output_filename}",
@@ -1292,6 +1981,8 @@ async def generate_printable(
             "Pragma": "no-cache",
             "Expires": "0"
         }
+        if custom_template:
+            response_headers["X-Template-Id"] = custom_template["template_id"]
         
         print(f"🔍 [PRINTABLE] Returning PDF response: {len(pdf_content)} bytes, filename: {output_filename}")
         
@@ -1304,20 +1995,351 @@ async def generate_printable(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate printable: {str(e)}")
 
+def select_printable_template(values: dict, scope: str, logo_lookup: dict):
+    """Pick the Supabase printable template (template_name, template_type) for the field values."""
+    # Determine which Supabase template to use based on content length and Size/Accreditation
+    # Use the SAME LOGIC as certificate generation and soft copy
+    scope_words = len(scope.split()) if scope else 0
+    estimated_lines = max(1, (scope_words * 8) // 60)  # 8 chars per word, 60 chars per line
+    
+    # Get Size, Accreditation, Logo, and Country from the form data
+    size_lower = values.get("Size", "").lower().strip()
+    accreditation_lower = values.get("Accreditation", "").lower().strip()
+    logo_lower = values.get("Logo", "").lower().strip()
+    country_lower = values.get("Country", "").lower().strip()  # ✅ ADDED: Country parameter
+    
+    # ✅ NEW: Check for Extra Line presence FIRST (highest priority)
+    extra_line = values.get("Extra Line", "").strip()
+    
+    # ✅ NEW: Template Override Logic - Extra Line forces large template
+    if extra_line:
+        print(f"🔍 [PRINTABLE] Extra Line present - forcing large template selection")
+        
+        # Force large template based on other parameters
+        if country_lower == "other":
+            if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
+                # Logo templates for Other country
+                if accreditation_lower == "no":
+                    template_name = "templatePrintableLogoOtherNonAcc"
+                    template_type = "logo_other_nonaccredited"
+                else:
+                    template_name = "templatePrintableLogoOther"
+                    template_type = "logo_other"
+            elif accreditation_lower == "no":
+                template_name = "templateprintableLargeOtherNonAcc"
+                template_type = "large_other_nonaccredited"
+            elif size_lower == "high":
+                template_name = "templateprintableLargeOther"
+                template_type = "large_other"
+            else:
+                template_name = "templateprintableLargeOtherEco"
+                template_type = "large_other_eco"
+        else:  # Default country
+            if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
+                # Logo templates for Default country
+                if accreditation_lower == "no":
+                    template_name = "templatePrintableLogoNonAcc"
+                    template_type = "logo_nonaccredited"
+                else:
+                    template_name = "templatePrintableLogo"
+                    template_type = "logo"
+            elif accreditation_lower == "no":
+                template_name = "templateprintableLargeNonAcc"
+                template_type = "large_nonaccredited"
+            elif size_lower == "high":
+                template_name = "templateprintableLarge"
+                template_type = "large"
+            else:
+                template_name = "templateprintableLargeEco"
+                template_type = "large_eco"
+        
+        print(f"🔍 [PRINTABLE] Extra Line override: {template_name} ({template_type})")
+        
+    else:
+        # ✅ EXISTING: Normal template selection logic
+        # ✅ UPDATED: Template selection logic with correct template names
+        if country_lower == "other":
+            # Country = "Other" template logic
+            if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
+                # Logo templates for Other country
+                if accreditation_lower == "no":
+                    template_name = "templatePrintableLogoOtherNonAcc"
+                    template_type = "logo_other_nonaccredited"
+                else:
+                    template_name = "templatePrintableLogoOther"
+                    template_type = "logo_other"
+            elif accreditation_lower == "no":
+                # Non-accredited templates for Other country
+                if estimated_lines <= 11:
+                    template_name = "templatePrintableOtherNonAcc"
+                    template_type = "standard_other_nonaccredited"
+                else:
+                    template_name = "templateprintableLargeOtherNonAcc"
+                    template_type = "large_other_nonaccredited"
+            elif size_lower == "high" and accreditation_lower != "no":
+                # High size with accreditation for Other country
+                if estimated_lines <= 11:
+                    template_name = "templatePrintableStandardOther"
+                    template_type = "standard_other"
+                else:
+                    template_name = "templateprintableLargeOther"
+                    template_type = "large_other"
+            else:
+                # Size is blank/low and accreditation != no for Other country - use eco templates
+                if estimated_lines <= 11:
+                    template_name = "templatePrintableStandardOtherEco"
+                    template_type = "standard_other_eco"
+                else:
+                    template_name = "templateprintableLargeOtherEco"
+                    template_type = "large_other_eco"
+        else:
+            # Original template logic for blank country
+            if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
+                # Logo templates take priority - single template regardless of content length
+                if accreditation_lower == "no":
+                    template_name = "templatePrintableLogoNonAcc"
+                    template_type = "logo_nonaccredited"
+                else:
+                    template_name = "templatePrintableLogo"
+                    template_type = "logo"
+            elif logo_lower and logo_lower.strip() and logo_lower not in logo_lookup:
+                print(f"⚠️ [PRINTABLE] Logo specified but file not found: {logo_lower} - using regular template")
+                # Continue with regular template selection logic
+            elif accreditation_lower == "no":
+                # Non-accredited templates
+                if estimated_lines <= 11:  # Standard template for ≤11 lines
+                    template_name = "templatePrintableStandardNonAcc"
+                    template_type = "standard_nonaccredited"
+                else:  # Large template for >11 lines
+                    template_name = "templateprintableLargeNonAcc"
+                    template_type = "large_nonaccredited"
+            elif size_lower == "high" and accreditation_lower != "no":
+                # High size with accreditation - use current templates
+                if estimated_lines <= 11:  # Standard template for ≤11 lines
+                    template_name = "templatePrintableStandard"
+                    template_type = "standard"
+                else:  # Large template for >11 lines
+                    template_name = "templateprintableLarge"
+                    template_type = "large"
+            else:
+                # Size is blank/low and accreditation != no - use eco templates
+                if estimated_lines <= 11:  # Standard template for ≤11 lines
+                    template_name = "templatePrintableStandardEco"
+                    template_type = "standard_eco"
+                else:  # Large template for >11 lines
+                    template_name = "templateprintableLargeEco"
+                    template_type = "large_eco"
+    
+    print(f"🔍 [PRINTABLE] Scope: {scope_words} words, ~{estimated_lines} lines, Size: '{size_lower}', Accreditation: '{accreditation_lower}', Logo: '{logo_lower}', Country: '{country_lower}', using {template_type} template: {template_name}.pdf")
+    
+    return template_name, template_type
+
+def select_draft_template(field_data: dict, logo_lookup: dict):
+    """Pick the Supabase draft template (template_name, template_type) for the field values."""
+    extra_line = field_data.get("Extra Line", "")
+    
+    # Use the same template selection logic as the original endpoint
+    scope_text = field_data.get("Scope", "")
+    scope_words = len(scope_text.split())
+    raw_size = field_data.get("Size", "")
+    size = raw_size.lower().strip()
+    accreditation = field_data.get("Accreditation", "").lower().strip()
+    logo = field_data.get("Logo", "").lower().strip()
+    country = field_data.get("Country", "").strip()
+    estimated_lines = max(1, (scope_words * 8) // 60)
+    logo_filename = field_data.get("Logo", "").strip()
+    
+    # Template selection logic (same as original endpoint)
+    if extra_line:
+        print(f"🔍 [CERTIFICATE-JSON] Extra Line present - forcing large template selection")
+        
+        # Force large template based on other parameters
+        if country.lower() == "other":
+            if accreditation == "no":
+                template_name = "templateDraftLargeNonAccOther"
+                template_type = "large_nonaccredited_other"
+            elif size == "high":
+                template_name = "template_draft_large_other"
+                template_type = "large_other"
+            else:
+                template_name = "template_draft_large_other_eco"
+                template_type = "large_other_eco"
+        else:  # Default country
+            if logo_filename and logo_filename in logo_lookup:
+                template_name = "templateDraftLogo"
+                template_type = "logo"
+            elif accreditation == "no":
+                template_name = "templateDraftLargeNonAcc"
+                template_type = "large_nonaccredited"
+            elif size == "high":
+                template_name = "template_draft_large"
+                template_type = "large"
+            else:
+                template_name = "templateDraftLargeEco"
+                template_type = "large_eco"
+        
+        print(f"🔍 [CERTIFICATE-JSON] Extra Line override: {template_name} ({template_type})")
+    else:
+        # Regular template selection logic (same as main endpoint)
+        if country.lower() == "other":
+            if accreditation == "no":
+                # Non-accredited templates for Other country
+                if estimated_lines <= 11:
+                    template_name = "templateDraftStandardNonAccOther"
+                    template_type = "standard_nonaccredited_other"
+                else:
+                    template_name = "templateDraftLargeNonAccOther"
+                    template_type = "large_nonaccredited_other"
+            elif size == "high" and accreditation != "no":
+                # High size with accreditation for Other country
+                if estimated_lines <= 11:
+                    template_name = "template_draft_other"
+                    template_type = "standard_other"
+                else:
+                    template_name = "template_draft_large_other"
+                    template_type = "large_other"
+            else:
+                # Size is blank/low and accreditation != no for Other country - use eco templates
+                if estimated_lines <= 11:
+                    template_name = "template_draft_other_eco"
+                    template_type = "standard_other_eco"
+                else:
+                    template_name = "template_draft_large_other_eco"
+                    template_type = "large_other_eco"
+        else:
+            # Logo handling logic (applies to both blank and Other country)
+            if logo_filename and logo_filename in logo_lookup:
+                # Logo templates take priority - single template regardless of content length
+                template_name = "templateDraftLogo"
+                template_type = "logo"
+            elif logo_filename and logo_filename not in logo_lookup:
+                print(f"⚠️ [CERTIFICATE-JSON] Logo specified but file not found: {logo_filename} - using regular template")
+                # Continue with regular template selection logic
+            elif accreditation == "no":
+                # Non-accredited templates
+                if estimated_lines <= 11:  # Standard template for ≤11 lines
+                    template_name = "templateDraftStandardNonAcc"
+                    template_type = "standard_nonaccredited"
+                else:  # Large template for >11 lines
+                    template_name = "templateDraftLargeNonAcc"
+                    template_type = "large_nonaccredited"
+            elif size == "high" and accreditation != "no":
+                # High size with accreditation - use current templates
+                if estimated_lines <= 11:  # Standard template for ≤11 lines
+                    template_name = "template_draft"
+                    template_type = "standard"
+                else:  # Large template for >11 lines
+                    template_name = "template_draft_large"
+                    template_type = "large"
+            else:
+                # Size is blank/low and accreditation != no - use eco templates
+                if estimated_lines <= 11:  # Standard template for ≤11 lines
+                    template_name = "templateDraftStandardEco"
+                    template_type = "standard_eco"
+                else:  # Large template for >11 lines
+                    template_name = "templateDraftLargeEco"
+                    template_type = "large_eco"
+    
+    return template_name, template_type
+
+# Rows fitted per render pool call by /validate-layout, and the most rows one request may send
+VALIDATE_LAYOUT_CHUNK = int(os.getenv("VALIDATE_LAYOUT_CHUNK", "50"))
+VALIDATE_LAYOUT_MAX_ROWS = int(os.getenv("VALIDATE_LAYOUT_MAX_ROWS", "5000"))
+
+@app.post("/validate-layout")
+async def validate_layout(request: Request):
+    """
+    Check a batch of rows (e.g. an uploaded Excel sheet) for overflow without rendering PDFs.
+
+    Body: {"rows": [{field: value, ...}], "generator": "draft" | "softcopy",
+    "logo_files": ["logo.png", ...]}. Each row goes through the same template
+    selection as /generate-certificate-json (draft) or /generate-softcopy and
+    the same fitting code, on a blank page: no template download, no QR code,
+    no PDF. Returns per row the chosen template, the fitted font sizes and
+    line counts per field and the scope overflow percentage.
+    """
+    import asyncio
+    from adapters.render_pool import run_in_render_pool
+    from rise.layout_validation import LAYOUT_GENERATORS, validate_layout_rows
+
+    try:
+        body = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    rows = body.get("rows") if isinstance(body, dict) else None
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise HTTPException(status_code=400, detail="Body must be {\"rows\": [{...}, ...]}")
+    if len(rows) > VALIDATE_LAYOUT_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {VALIDATE_LAYOUT_MAX_ROWS} rows per request")
+    generator = body.get("generator") or "draft"
+    if generator not in LAYOUT_GENERATORS:
+        raise HTTPException(status_code=400, detail=f"generator must be one of: {', '.join(LAYOUT_GENERATORS)}")
+    # Only membership matters for template selection
+    logo_lookup = {name: None for name in body.get("logo_files") or []}
+
+    results = [None] * len(rows)
+    pending = []
+    for index, row in enumerate(rows):
+        values = {key: str(value) for key, value in row.items() if value is not None}
+        try:
+            if generator == "draft":
+                template_name, template_type = select_draft_template(values, logo_lookup)
+            else:
+                template_name, template_type = select_softcopy_template(values, values.get("Scope", ""), logo_lookup)
+        except Exception as e:
+            # The selection rules have no fallback for a Logo whose file was not uploaded
+            reason = f"Logo '{values['Logo']}' is not in logo_files" if values.get("Logo") else str(e)
+            results[index] = {"index": index, "error": f"No template matches this row: {reason}"}
+            continue
+        results[index] = {"index": index, "template_name": template_name, "template_type": template_type}
+        pending.append((index, {"values": values, "template_type": template_type}))
+
+    chunks = [pending[i:i + VALIDATE_LAYOUT_CHUNK] for i in range(0, len(pending), max(1, VALIDATE_LAYOUT_CHUNK))]
+    # A single sheet row is an interactive check; whole sheets yield to live renders
+    lane = "interactive" if len(chunks) <= 1 else "bulk"
+    try:
+        chunk_results = await asyncio.gather(
+            *[run_in_render_pool(validate_layout_rows, [row for _, row in chunk], generator, lane=lane) for chunk in chunks]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Layout validation failed: {str(e)}")
+    for chunk, layouts in zip(chunks, chunk_results):
+        for (index, _), layout in zip(chunk, layouts):
+            results[index].update(layout)
+
+    overflow_rows = [row["index"] for row in results if row.get("overflow")]
+    error_rows = [row["index"] for row in results if row.get("error")]
+    print(f"✅ [VALIDATE-LAYOUT] {len(rows)} row(s) checked: {len(overflow_rows)} overflow, {len(error_rows)} error(s)")
+    return {
+        "generator": generator,
+        "summary": {"rows": len(rows), "overflow_rows": overflow_rows, "error_rows": error_rows},
+        "rows": results
+    }
+
 # New endpoint: Generate certificate from JSON data (no Word file required)
 @app.post("/generate-certificate-json")
 async def generate_certificate_json_endpoint(
     request: Request,
-    fields: str = Form(...)
+    fields: str = Form(...),
+    save_profile: str = Form(""),
+    lane: str = Form("")
 ):
-    """Generate certificate from JSON field data using Supabase template (no Word file required)."""
+    """
+    Generate certificate from JSON field data using Supabase template (no Word
+    file required). lane (form field or X-Render-Lane) is the render pool lane.
+    """
+    from adapters.render_pool import run_in_render_pool
+    from rise.render_rows import render_certificate_pdf
+    profile = parse_save_profile(save_profile)
+    render_lane = parse_render_lane(request, lane)
     try:
         # Parse field data
         if not fields or fields.strip() == "":
             raise HTTPException(status_code=400, detail="Field data is empty or missing")
         
         try:
-            field_data = json.loads(fields)
+            with stage("parse"):
+                field_data = json.loads(fields)
             if field_data is None:
                 raise HTTPException(status_code=400, detail="Field data is null")
         except json.JSONDecodeError:
@@ -1350,121 +2372,16 @@ async def generate_certificate_json_endpoint(
         # ✅ ADDED: Extract Address alignment field
         address_alignment = field_data.get("Address alignment", "")
         
-        # Create output file path
-        output_filename = f"generated_certificate_{os.getpid()}.pdf"
-        output_path = os.path.join(tempfile.gettempdir(), output_filename)
-        
-        # Use the same template selection logic as the original endpoint
-        scope_text = field_data.get("Scope", "")
-        scope_words = len(scope_text.split())
-        raw_size = field_data.get("Size", "")
-        size = raw_size.lower().strip()
-        accreditation = field_data.get("Accreditation", "").lower().strip()
-        logo = field_data.get("Logo", "").lower().strip()
-        country = field_data.get("Country", "").strip()
-        estimated_lines = max(1, (scope_words * 8) // 60)
-        logo_filename = field_data.get("Logo", "").strip()
-        
-        # Template selection logic (same as original endpoint)
-        if extra_line:
-            print(f"🔍 [CERTIFICATE-JSON] Extra Line present - forcing large template selection")
-            
-            # Force large template based on other parameters
-            if country.lower() == "other":
-                if accreditation == "no":
-                    template_name = "templateDraftLargeNonAccOther"
-                    template_type = "large_nonaccredited_other"
-                elif size == "high":
-                    template_name = "template_draft_large_other"
-                    template_type = "large_other"
-                else:
-                    template_name = "template_draft_large_other_eco"
-                    template_type = "large_other_eco"
-            else:  # Default country
-                if logo_filename and logo_filename in logo_lookup:
-                    template_name = "templateDraftLogo"
-                    template_type = "logo"
-                elif accreditation == "no":
-                    template_name = "templateDraftLargeNonAcc"
-                    template_type = "large_nonaccredited"
-                elif size == "high":
-                    template_name = "template_draft_large"
-                    template_type = "large"
-                else:
-                    template_name = "templateDraftLargeEco"
-                    template_type = "large_eco"
-            
-            print(f"🔍 [CERTIFICATE-JSON] Extra Line override: {template_name} ({template_type})")
-        else:
-            # Regular template selection logic (same as main endpoint)
-            if country.lower() == "other":
-                if accreditation == "no":
-                    # Non-accredited templates for Other country
-                    if estimated_lines <= 11:
-                        template_name = "templateDraftStandardNonAccOther"
-                        template_type = "standard_nonaccredited_other"
-                    else:
-                        template_name = "templateDraftLargeNonAccOther"
-                        template_type = "large_nonaccredited_other"
-                elif size == "high" and accreditation != "no":
-                    # High size with accreditation for Other country
-                    if estimated_lines <= 11:
-                        template_name = "template_draft_other"
-                        template_type = "standard_other"
-                    else:
-                        template_name = "template_draft_large_other"
-                        template_type = "large_other"
-                else:
-                    # Size is blank/low and accreditation != no for Other country - use eco templates
-                    if estimated_lines <= 11:
-                        template_name = "template_draft_other_eco"
-                        template_type = "standard_other_eco"
-                    else:
-                        template_name = "template_draft_large_other_eco"
-                        template_type = "large_other_eco"
-            else:
-                # Logo handling logic (applies to both blank and Other country)
-                if logo_filename and logo_filename in logo_lookup:
-                    # Logo templates take priority - single template regardless of content length
-                    template_name = "templateDraftLogo"
-                    template_type = "logo"
-                elif logo_filename and logo_filename not in logo_lookup:
-                    print(f"⚠️ [CERTIFICATE-JSON] Logo specified but file not found: {logo_filename} - using regular template")
-                    # Continue with regular template selection logic
-                elif accreditation == "no":
-                    # Non-accredited templates
-                    if estimated_lines <= 11:  # Standard template for ≤11 lines
-                        template_name = "templateDraftStandardNonAcc"
-                        template_type = "standard_nonaccredited"
-                    else:  # Large template for >11 lines
-                        template_name = "templateDraftLargeNonAcc"
-                        template_type = "large_nonaccredited"
-                elif size == "high" and accreditation != "no":
-                    # High size with accreditation - use current templates
-                    if estimated_lines <= 11:  # Standard template for ≤11 lines
-                        template_name = "template_draft"
-                        template_type = "standard"
-                    else:  # Large template for >11 lines
-                        template_name = "template_draft_large"
-                        template_type = "large"
-                else:
-                    # Size is blank/low and accreditation != no - use eco templates
-                    if estimated_lines <= 11:  # Standard template for ≤11 lines
-                        template_name = "templateDraftStandardEco"
-                        template_type = "standard_eco"
-                    else:  # Large template for >11 lines
-                        template_name = "templateDraftLargeEco"
-                        template_type = "large_eco"
+        with stage("template-resolve"):
+            template_name, template_type = select_draft_template(field_data, logo_lookup)
         
         # Download template from Supabase
         template_path = await download_template_from_supabase(template_name)
         
-        # Prepare values for certificate generation
-        values = field_data.copy()
-        values["logo_lookup"] = logo_lookup
-        
-        # Generate certificate using the same function
-        result = generate_certificate(template_path, output_path, values, template_type)
+        # Generate certificate using the same function, in the render pool (logos go as bytes)
+        logos = await read_logo_bytes(logo_lookup)
+        result = await run_in_render_pool(render_certificate_pdf, template_path, field_data.copy(), template_type, profile, logos, lane=render_lane)
+        pdf_bytes = result["pdf"]
         
         # Check for overflow warnings
         if result.get("overflow_warnings"):
@@ -1473,16 +2390,6 @@ async def generate_certificate_json_endpoint(
                 print(f"[CERTIFICATE-JSON] {warning['message']}")
             print(f"[CERTIFICATE-JSON] ===== END OVERFLOW WARNINGS =====")
         
-        # Read the generated PDF
-        with open(output_path, "rb") as f:
-            pdf_bytes = f.read()
-        
-        # Clean up temporary files
-        if os.path.exists(output_path):
-            os.unlink(output_path)
-        if os.path.exists(template_path):
-            os.unlink(template_path)
-        
         # Return PDF response
         return Response(
             content=pdf_bytes,
@@ -1493,15 +2400,12 @@ async def generate_certificate_json_endpoint(
         )
         
     except Exception as e:
-        # Clean up temporary files on error
-        if 'output_path' in locals() and os.path.exists(output_path):
-            os.unlink(output_path)
-        if 'template_path' in locals() and os.path.exists(template_path):
-            os.unlink(template_path)
         raise HTTPException(status_code=500, detail=f"Certificate generation failed: {str(e)}")
 
 # Soft copy generation endpoint now integrated into main.py
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Optional recycle: exit after this many requests so pm2 restarts a fresh process
+    max_requests = int(os.getenv("MAX_REQUESTS_PER_WORKER", "0")) or None
+    uvicorn.run(app, host="0.0.0.0", port=8000, limit_max_requests=max_requests)
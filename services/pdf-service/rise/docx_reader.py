@@ -0,0 +1,121 @@
+"""
+Lightweight reader for the first table of a .docx form.
+
+Opens the .docx zip and streams word/document.xml with iterparse, stopping as
+soon as the first body-level table has been read. This avoids building the
+full python-docx object model (styles, headers, numbering, every paragraph)
+when all /extract-fields needs is the form's key/value table.
+"""
+
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+W_BODY = W_NS + "body"
+W_TBL = W_NS + "tbl"
+W_TR = W_NS + "tr"
+W_TC = W_NS + "tc"
+W_P = W_NS + "p"
+W_T = W_NS + "t"
+W_TAB = W_NS + "tab"
+W_BR = W_NS + "br"
+W_CR = W_NS + "cr"
+W_TCPR = W_NS + "tcPr"
+W_GRIDSPAN = W_NS + "gridSpan"
+W_VAL = W_NS + "val"
+
+# Elements whose text is not part of the visible paragraph text
+_SKIPPED_TEXT_PARENTS = {W_NS + "del", W_NS + "instrText"}
+
+
+def _paragraph_text(paragraph) -> str:
+    """Return a paragraph's text the way python-docx's Paragraph.text does."""
+    parts = []
+
+    def walk(element):
+        for child in element:
+            tag = child.tag
+            if tag in _SKIPPED_TEXT_PARENTS:
+                continue
+            if tag == W_T:
+                parts.append(child.text or "")
+            elif tag == W_TAB:
+                parts.append("\t")
+            elif tag in (W_BR, W_CR):
+                parts.append("\n")
+            else:
+                walk(child)
+
+    walk(paragraph)
+    return "".join(parts)
+
+
+def _cell_text(cell) -> str:
+    """Return a cell's text: its direct paragraphs joined by newlines (nested tables ignored)."""
+    return "\n".join(_paragraph_text(p) for p in cell.findall(W_P))
+
+
+def _cell_span(cell) -> int:
+    """Return how many grid columns a cell spans."""
+    grid_span = cell.find(f"{W_TCPR}/{W_GRIDSPAN}")
+    if grid_span is None:
+        return 1
+    try:
+        return max(1, int(grid_span.get(W_VAL, "1")))
+    except ValueError:
+        return 1
+
+
+def _table_rows(table) -> List[List[str]]:
+    """Return a table's rows as lists of cell text, one entry per grid column."""
+    rows = []
+    for row in table.findall(W_TR):
+        cells = []
+        for cell in row.findall(W_TC):
+            # Like python-docx, a merged cell appears once per grid column it covers
+            cells.extend([_cell_text(cell)] * _cell_span(cell))
+        rows.append(cells)
+    return rows
+
+
+def read_first_table_rows(docx_path: str) -> Optional[List[List[str]]]:
+    """
+    Return the rows of the first body-level table in a .docx file, or None if
+    the document has no table. Parsing stops at the end of that table.
+    """
+    with zipfile.ZipFile(docx_path) as archive:
+        with archive.open("word/document.xml") as xml_file:
+            stack = []
+            target = None
+
+            for event, element in ET.iterparse(xml_file, events=("start", "end")):
+                if event == "start":
+                    if target is None and element.tag == W_TBL and stack and stack[-1] == W_BODY:
+                        target = element
+                    stack.append(element.tag)
+                    continue
+
+                stack.pop()
+                if element is target:
+                    return _table_rows(element)
+
+                # Drop finished body-level paragraphs/sections before the table
+                if target is None and stack and stack[-1] == W_BODY:
+                    element.clear()
+
+    return None
+
+
+def read_first_table(docx_path: str) -> Dict[str, str]:
+    """Read the first table's two-column rows into a key/value dict."""
+    rows = read_first_table_rows(docx_path)
+    if rows is None:
+        raise Exception("No tables found in document")
+
+    data = {}
+    for row in rows:
+        if len(row) == 2:
+            data[row[0].strip()] = row[1].strip()
+    return data
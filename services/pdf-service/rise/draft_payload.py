@@ -0,0 +1,144 @@
+"""
+Machine-readable field payload embedded in generated drafts.
+
+generate_certificate stores the exact input values and the chosen
+template_type in the draft as a compressed, HMAC-signed embedded file.
+The final step reads it back directly instead of clipping text from
+hard-coded rectangles (and OCR-ing them), and only falls back to extraction
+for legacy drafts that have no payload or whose signature does not verify.
+Soft copies and printables carry the same payload so reissues (rise/reissue.py)
+only need the changed fields.
+
+Signing needs DRAFT_PAYLOAD_SECRET. A signed payload flows straight into
+final certificates, so without a secret (there is no fallback key) nothing is
+embedded or trusted and every draft is read the legacy way.
+"""
+
+import os
+import hmac
+import json
+import zlib
+import hashlib
+import fitz  # PyMuPDF
+from typing import Dict, Optional
+
+from .iso_standards import expand_iso_standard, ISO_STANDARDS_DESCRIPTIONS
+
+DRAFT_PAYLOAD_NAME = "nexus-draft-payload"
+DRAFT_PAYLOAD_VERSION = b"v1"
+
+
+_warned_no_secret = False
+
+
+def _signing_key() -> Optional[bytes]:
+    """DRAFT_PAYLOAD_SECRET as bytes, or None (with a one-time warning) when it is not set."""
+    global _warned_no_secret
+    secret = os.getenv("DRAFT_PAYLOAD_SECRET", "")
+    if secret:
+        return secret.encode("utf-8")
+    if not _warned_no_secret:
+        print("⚠️ [DRAFT-PAYLOAD] DRAFT_PAYLOAD_SECRET is not set; field payloads are neither embedded nor read")
+        _warned_no_secret = True
+    return None
+
+
+def _sign(data: bytes, key: bytes) -> bytes:
+    return hmac.new(key, data, hashlib.sha256).hexdigest().encode("ascii")
+
+
+def encode_draft_payload(values: Dict, template_type: str) -> Optional[bytes]:
+    """Serialize values + template_type as b'v1.<hmac-sha256 hex>.<zlib(json)>' (None without a secret)."""
+    key = _signing_key()
+    if key is None:
+        return None
+    # Only plain values are kept - e.g. the logo_lookup of uploaded files is dropped
+    plain_values = {
+        key: value for key, value in values.items()
+        if isinstance(value, (str, int, float, bool)) or value is None
+    }
+    body = zlib.compress(
+        json.dumps({"template_type": template_type, "values": plain_values}, ensure_ascii=False).encode("utf-8"),
+        9,
+    )
+    return DRAFT_PAYLOAD_VERSION + b"." + _sign(body, key) + b"." + body
+
+
+def decode_draft_payload(blob: bytes) -> Optional[Dict]:
+    """Verify and decode a payload blob, returning None if it is malformed, not ours, or no secret is set."""
+    key = _signing_key()
+    if key is None:
+        return None
+    try:
+        version, signature, body = blob.split(b".", 2)
+    except ValueError:
+        return None
+
+    if version != DRAFT_PAYLOAD_VERSION or not hmac.compare_digest(signature, _sign(body, key)):
+        print("⚠️ [DRAFT-PAYLOAD] Payload signature mismatch, ignoring embedded data")
+        return None
+
+    try:
+        return json.loads(zlib.decompress(body).decode("utf-8"))
+    except (zlib.error, ValueError):
+        return None
+
+
+def embed_draft_payload(doc: fitz.Document, values: Dict, template_type: str):
+    """Attach the signed field payload to an open draft document (before saving); skipped without a secret."""
+    blob = encode_draft_payload(values, template_type)
+    if blob is None:
+        return
+    if DRAFT_PAYLOAD_NAME in doc.embfile_names():
+        doc.embfile_del(DRAFT_PAYLOAD_NAME)
+    doc.embfile_add(
+        DRAFT_PAYLOAD_NAME,
+        blob,
+        filename=f"{DRAFT_PAYLOAD_NAME}.bin",
+        desc="Certificate draft field values",
+    )
+    print(f"🔍 [DRAFT-PAYLOAD] Embedded {len(blob)} byte field payload ({template_type})")
+
+
+def read_draft_payload(draft) -> Optional[Dict]:
+    """
+    Return {"template_type": ..., "values": {...}} from a draft PDF path, bytes
+    or open document, or None for legacy drafts without a valid payload.
+    """
+    if _signing_key() is None:
+        return None
+    if isinstance(draft, fitz.Document):
+        doc, owned = draft, False
+    elif isinstance(draft, (bytes, bytearray)):
+        doc, owned = fitz.open(stream=draft, filetype="pdf"), True
+    else:
+        doc, owned = fitz.open(draft), True
+
+    try:
+        if DRAFT_PAYLOAD_NAME not in doc.embfile_names():
+            return None
+        return decode_draft_payload(doc.embfile_get(DRAFT_PAYLOAD_NAME))
+    finally:
+        if owned:
+            doc.close()
+
+
+def payload_to_extracted_data(payload: Dict) -> Dict[str, str]:
+    """Map a draft payload onto the keys generate_final_certificate renders."""
+    values = payload.get("values", {})
+    iso_standard = expand_iso_standard(values.get("ISO Standard", "") or "")
+
+    # Same management line generate_certificate draws above the company name
+    system_name = ISO_STANDARDS_DESCRIPTIONS.get(iso_standard, "Management System")
+    system_name_caps = ' '.join(word.capitalize() for word in system_name.split())
+
+    extracted_data = {key: value for key, value in values.items() if isinstance(value, str)}
+    extracted_data.update({
+        "Company Name": values.get("Company Name", "") or "",
+        "Address": values.get("Address", "") or "",
+        "ISO Standard": iso_standard,
+        "Scope": values.get("Scope", "") or "",
+        "management_system": f"This is to certify that the {system_name_caps} of",
+        "template_type": payload.get("template_type", ""),
+    })
+    return extracted_data
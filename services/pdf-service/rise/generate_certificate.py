@@ -1,187 +1,43 @@
 from docx import Document
 import fitz  # PyMuPDF
+import os
+import zipfile
+import xml.etree.ElementTree as ET
 from typing import Dict
-
-# ISO Standards Mapping - Convert short names to full versions with years
-ISO_STANDARDS_MAPPING = {
-    # Quality & Management
-    "ISO 9001": "ISO 9001:2015",
-    "9001": "ISO 9001:2015",
-    "ISO 14001": "ISO 14001:2015", 
-    "14001": "ISO 14001:2015",
-    "ISO 45001": "ISO 45001:2018",
-    "45001": "ISO 45001:2018",
-    "ISO 50001": "ISO 50001:2018",
-    "50001": "ISO 50001:2018",
-    "ISO 31000": "ISO 31000:2018",
-    "31000": "ISO 31000:2018",
-    
-    # Food Safety
-    "ISO 22000": "ISO 22000:2018",
-    "22000": "ISO 22000:2018",
-    "ISO/TS 22002-1": "ISO/TS 22002-1:2009",
-    "22002-1": "ISO/TS 22002-1:2009",
-    "ISO 22005": "ISO 22005:2007",
-    "22005": "ISO 22005:2007",
-    
-    # Laboratory & Testing
-    "ISO/IEC 17025": "ISO/IEC 17025:2017",
-    "17025": "ISO/IEC 17025:2017",
-    "ISO 15189": "ISO 15189:2022",
-    "15189": "ISO 15189:2022",
-    
-    # Information Security & IT
-    "ISO/IEC 27001": "ISO/IEC 27001:2022",
-    "27001": "ISO/IEC 27001:2022",
-    "ISO/IEC 27002": "ISO/IEC 27002:2022",
-    "27002": "ISO/IEC 27002:2022",
-    "ISO/IEC 20000-1": "ISO/IEC 20000-1:2018",
-    "20000-1": "ISO/IEC 20000-1:2018",
-    "ISO/IEC 22301": "ISO/IEC 22301:2019",
-    "22301": "ISO/IEC 22301:2019",
-    
-    # Manufacturing & Industrial
-    "ISO 13485": "ISO 13485:2016",
-    "13485": "ISO 13485:2016",
-    "IATF 16949": "IATF 16949:2016",
-    "16949": "IATF 16949:2016",
-    "ISO 3834-2": "ISO 3834-2:2021",
-    "3834-2": "ISO 3834-2:2021",
-    
-    # Environment & Sustainability
-    "ISO 14064-1": "ISO 14064-1:2018",
-    "14064-1": "ISO 14064-1:2018",
-    "ISO 14046": "ISO 14046:2014",
-    "14046": "ISO 14046:2014",
-    "ISO 20121": "ISO 20121:2012",
-    "20121": "ISO 20121:2012",
-    
-    # Asset, Facility, and Supply Chain
-    "ISO 55001": "ISO 55001:2014",
-    "55001": "ISO 55001:2014",
-    "ISO 28000": "ISO 28000:2022",
-    "28000": "ISO 28000:2022",
-    
-    # Aerospace
-    "AS 9100D": "AS 9100D:2016",
-    "9100D": "AS 9100D:2016",
-    
-    # Other Notable Standards
-    "ISO 37001": "ISO 37001:2016",
-    "37001": "ISO 37001:2016",
-    "ISO 19600": "ISO 19600:2014",
-    "19600": "ISO 19600:2014",
-    "ISO 29993": "ISO 29993:2017",
-    "29993": "ISO 29993:2017",
-}
-
-# ISO Standards Code Mapping - For certification codes
-ISO_STANDARDS_CODES = {
-    "ISO 9001:2015": "CM-MS-7842",
-    "ISO 14001:2015": "CM-MS-7836", 
-    "ISO 45001:2018": "CM-MS-7832",
-    "ISO 22000:2018": "CM-MS-7822",
-    "ISO/IEC 27001:2022": "CM-MS-7820",
-    "ISO 37001:2016": "CM-MS-7804",
-    "ISO/IEC 22301:2019": "CM-MS-7807",
-    "ISO 50001:2018": "CM-MS-7814",
-    "ISO 20001:2018": "CM-MS-7811",
-}
-
-# ISO Standards Descriptions Mapping - For separate use
-ISO_STANDARDS_DESCRIPTIONS = {
-    "ISO 9001:2015": "Quality Management System",
-    "ISO 14001:2015": "Environmental Management System",
-    "ISO 45001:2018": "Occupational Health & Safety",
-    "ISO 50001:2018": "Energy Management System",
-    "ISO 31000:2018": "Risk Management Guidelines",
-    "ISO 22000:2018": "Food Safety Management System",
-    "ISO/TS 22002-1:2009": "Prerequisite programs on food safety",
-    "ISO 22005:2007": "Traceability in the feed and food chain",
-    "ISO/IEC 17025:2017": "Testing and Calibration Laboratories",
-    "ISO 15189:2022": "Medical Laboratories – Quality and Competence",
-    "ISO/IEC 27001:2022": "Information Security Management System",
-    "ISO/IEC 27002:2022": "Information Security Controls",
-    "ISO/IEC 20000-1:2018": "IT Service Management System",
-    "ISO/IEC 22301:2019": "Business Continuity Management System",
-    "ISO 13485:2016": "Medical Devices – Quality Management System",
-    "IATF 16949:2016": "Automotive Quality Management System",
-    "ISO 3834-2:2021": "Quality requirements for fusion welding",
-    "ISO 14064-1:2018": "Greenhouse Gases",
-    "ISO 14046:2014": "Water Footprint",
-    "ISO 20121:2012": "Event Sustainability Management System",
-    "ISO 55001:2014": "Asset Management System",
-    "ISO 28000:2022": "Security Management Systems for Supply Chain",
-    "AS 9100D:2016": "Aerospace Quality (based on ISO 9001:2015)",
-    "ISO 37001:2016": "Anti-bribery Management System",
-    "ISO 19600:2014": "Compliance Management System",
-    "ISO 29993:2017": "Learning Services",
-}
-
-def expand_iso_standard(iso_text: str) -> str:
-    """Expand ISO standard name to full version with year if available."""
-    if not iso_text:
-        return iso_text
-    
-    # Clean the input text
-    cleaned_text = iso_text.strip()
-    
-    # First, try exact match
-    if cleaned_text in ISO_STANDARDS_MAPPING:
-        return ISO_STANDARDS_MAPPING[cleaned_text]
-    
-    # If no exact match, try to find partial matches
-    # This handles cases where users might enter variations
-    for short_name, full_name in ISO_STANDARDS_MAPPING.items():
-        # Check if the input contains the standard number
-        if short_name.lower() in cleaned_text.lower():
-            return full_name
-    
-    # If still no match, try to extract just the number and match
-    # This handles cases like "37001" when we have "37001" in mapping
-    import re
-    number_match = re.search(r'(\d+(?:-\d+)?)', cleaned_text)
-    if number_match:
-        number = number_match.group(1)
-        if number in ISO_STANDARDS_MAPPING:
-            return ISO_STANDARDS_MAPPING[number]
-    
-    # If no match found, return original text
-    return iso_text
-
-def get_iso_standard_code(iso_standard: str) -> str:
-    """
-    Get the certification code for a given ISO standard.
-    Example: "ISO 9001:2015" -> "CM-MS-7842"
-    Returns empty string if no code mapping exists.
-    """
-    if not iso_standard:
-        return ""
-    
-    # First expand the ISO standard if it's a short name
-    expanded_iso = expand_iso_standard(iso_standard)
-    
-    # Look up the code in the mapping
-    return ISO_STANDARDS_CODES.get(expanded_iso, "")
+from .docx_reader import read_first_table
+from .label_scanner import extract_labeled_fields, canonical_label
+from .iso_standards import ISO_STANDARDS_DESCRIPTIONS, expand_iso_standard, get_iso_standard_code
+from .layout_cache import get_cached_layout
+from .text_fit import fit_font_size, scope_line_count, text_line_count, wrap_paragraphs, wrap_scope_lines
+from .timings import stage, timed_stage
+from .draft_payload import embed_draft_payload
+from .save_profiles import save_pdf
+from .resources import close_on_error, close_quietly
+
+# Form fields read from uploaded application forms (.docx / .pdf / images)
+FORM_FIELD_NAMES = ['Company Name', 'Address', 'ISO Standard Required', 'Scope']
+
+# Maximum number of PDF pages inspected by /extract-fields (0 = no limit).
+# Intake forms keep their field table on page 1, so large uploads stop early.
+PDF_EXTRACT_PAGE_BUDGET = int(os.getenv("PDF_EXTRACT_PAGE_BUDGET", "3"))
+
+# Pages with fewer text characters than this have no usable text layer (scans)
+# and are OCRed, rasterized at up to PDF_OCR_DPI
+SCANNED_PAGE_MIN_CHARS = int(os.getenv("SCANNED_PAGE_MIN_CHARS", "20"))
+PDF_OCR_DPI = int(os.getenv("PDF_OCR_DPI", "300"))
 
 def parse_word_form(docx_path: str) -> Dict[str, str]:
     """Parse the first table in a Word document and extract required fields."""
     
-    doc = Document(docx_path)
-    
-    if len(doc.tables) == 0:
-        raise Exception("No tables found in document")
+    try:
+        # Fast path: stream word/document.xml and stop after the first table
+        data = read_first_table(docx_path)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        print(f"⚠️ [DOCX-DEBUG] Fast table reader failed ({e}), falling back to python-docx")
+        data = parse_word_form_table(docx_path)
     
-    table = doc.tables[0]
-    
-    data = {}
-    for i, row in enumerate(table.rows):
-        if len(row.cells) == 2:
-            key = row.cells[0].text.strip()
-            value = row.cells[1].text.strip()
-            data[key] = value
-        else:
-            continue
+    # Map label variants ('Company Name:', 'ISO Standard', ...) to the canonical keys
+    data = {canonical_label(key) or key: value for key, value in data.items()}
     
     # Get ISO Standard and expand it to full version with year
     iso_standard = data.get("ISO Standard Required", "").splitlines()[-1]
@@ -196,125 +52,62 @@ def parse_word_form(docx_path: str) -> Dict[str, str]:
     
     return result
 
-def preprocess_image_for_ocr(image):
-    """Preprocess image to improve OCR accuracy."""
-    import cv2
-    import numpy as np
+def parse_word_form_table(docx_path: str) -> Dict[str, str]:
+    """Read the first table's two-column rows using the full python-docx object model."""
     
-    # Convert to grayscale
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    doc = Document(docx_path)
     
-    # Apply noise reduction
-    denoised = cv2.medianBlur(gray, 3)
+    if len(doc.tables) == 0:
+        raise Exception("No tables found in document")
     
-    # Apply thresholding
-    _, thresh = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    table = doc.tables[0]
     
-    # Apply morphological operations
-    kernel = np.ones((1, 1), np.uint8)
-    processed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+    data = {}
+    for i, row in enumerate(table.rows):
+        if len(row.cells) == 2:
+            key = row.cells[0].text.strip()
+            value = row.cells[1].text.strip()
+            data[key] = value
+        else:
+            continue
     
-    return processed
+    return data
 
-def parse_ocr_text_as_table(text):
-    """Parse OCR text to detect table structure."""
-    lines = text.split('\n')
-    table_data = []
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Look for field:value patterns
-        if ':' in line:
-            parts = line.split(':', 1)
-            if len(parts) == 2:
-                key = parts[0].strip()
-                value = parts[1].strip()
-                table_data.append([key, value])
-        else:
-            # This might be a continuation line
-            table_data.append(['', line])
+def preprocess_image_for_ocr(image):
+    """Preprocess image to improve OCR accuracy (downscale, deskew, threshold, table crop)."""
+    from .ocr_engine import preprocess_for_ocr
     
-    return table_data
+    return preprocess_for_ocr(image)
 
 def extract_fields_from_ocr_text(text):
-    """Extract fields from OCR text using pattern matching."""
-    import re
-    
-    data = {}
-    
-    # Define patterns for field extraction
-    patterns = {
-        "Company Name": [
-            r"Company Name[:\s]+(.+?)(?=\n\s*(?:Address|ISO Standard Required|Scope)|$)",
-            r"Company[:\s]+(.+?)(?=\n\s*(?:Address|ISO Standard Required|Scope)|$)"
-        ],
-        "Address": [
-            r"Address[:\s]+(.+?)(?=\n\s*(?:ISO Standard Required|Scope)|$)",
-            r"Location[:\s]+(.+?)(?=\n\s*(?:ISO Standard Required|Scope)|$)"
-        ],
-        "ISO Standard Required": [
-            r"ISO Standard Required[:\s]+(.+?)(?=\n\s*(?:Scope)|$)",
-            r"ISO Standard[:\s]+(.+?)(?=\n\s*(?:Scope)|$)"
-        ],
-        "Scope": [
-            r"Scope[:\s]+(.+?)(?=\n\s*(?:Company Name|Address|ISO Standard Required)|$)"
-        ]
-    }
-    
-    for field_name, field_patterns in patterns.items():
-        for pattern in field_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-            if match:
-                value = match.group(1).strip()
-                if value:
-                    data[field_name] = value
-                    break
-    
-    return data
+    """Extract fields from OCR text with the shared single-pass label scanner."""
+    return extract_labeled_fields(text, strict=False)
 
 def extract_from_images(image_path: str) -> Dict[str, str]:
     """Extract fields from image using OCR with table detection."""
-    import pytesseract
-    import cv2
-    import numpy as np
-    from PIL import Image
+    from .ocr_engine import ocr_image_file
     
     print(f"🔍 [IMAGE-DEBUG] Starting OCR extraction from: {image_path}")
     
     try:
-        # Load and preprocess image
-        image = cv2.imread(image_path)
-        if image is None:
-            raise Exception(f"Could not load image: {image_path}")
-            
-        processed_image = preprocess_image_for_ocr(image)
-        
-        # OCR with table detection
-        custom_config = r'--oem 3 --psm 6'  # Table detection mode
-        text = pytesseract.image_to_string(processed_image, config=custom_config)
+        # Downscale, deskew and crop to the table region, then OCR on the
+        # persistent worker pool (results cached by image hash)
+        text = ocr_image_file(image_path)
         
         print(f"🔍 [IMAGE-DEBUG] OCR extracted text:")
         print(f"🔍 [IMAGE-DEBUG] {text[:1000]}{'...' if len(text) > 1000 else ''}")
         
-        # Try to detect table structure
-        table_data = parse_ocr_text_as_table(text)
-        if table_data:
-            print(f"🔍 [IMAGE-DEBUG] Table structure detected: {len(table_data)} rows")
-            return process_table_data(table_data)
-        
-        # Fallback to text pattern matching
-        print(f"🔍 [IMAGE-DEBUG] No table structure found, using pattern matching")
-        return extract_fields_from_ocr_text(text)
+        # Labels may be followed by ':' or just whitespace in OCR output
+        data = extract_fields_from_ocr_text(text)
+        print(f"🔍 [IMAGE-DEBUG] Label scan found {len(data)} field(s): {list(data.keys())}")
+        return data
         
     except Exception as e:
         print(f"🔍 [IMAGE-DEBUG] Error in OCR extraction: {e}")
         raise Exception(f"Failed to extract text from image: {str(e)}")
 
-def process_table_data(table_data):
-    """Process table data to extract fields, similar to PDF table processing."""
+def process_table_data(table_data, debug_tag: str = "IMAGE-DEBUG"):
+    """Process key/value table rows into fields, appending empty-key continuation rows."""
     data = {}
     last_recognized_field = None
     
@@ -323,24 +116,25 @@ def process_table_data(table_data):
             key = str(row[0]).strip() if row[0] else ""
             value = str(row[1]).strip() if row[1] else ""
             
-            print(f"🔍 [IMAGE-DEBUG] Row {i+1}: '{key}' -> '{value[:50]}{'...' if len(value) > 50 else ''}'")
+            print(f"🔍 [{debug_tag}] Row {i+1}: '{key}' -> '{value[:50]}{'...' if len(value) > 50 else ''}'")
             
-            # Check if this is a recognized field
-            if key in ['Company Name', 'Address', 'ISO Standard Required', 'Scope']:
-                data[key] = value
-                last_recognized_field = key
-                print(f"🔍 [IMAGE-DEBUG] ✅ Found recognized field '{key}': '{value[:100]}{'...' if len(value) > 100 else ''}'")
+            # Check if this is a recognized field (tolerates 'Company Name:', case and spacing)
+            field_name = canonical_label(key)
+            if field_name:
+                data[field_name] = value
+                last_recognized_field = field_name
+                print(f"🔍 [{debug_tag}] ✅ Found recognized field '{field_name}': '{value[:100]}{'...' if len(value) > 100 else ''}'")
             elif key == "" and value and last_recognized_field:
                 # This is a continuation line (empty key, has value)
                 data[last_recognized_field] += " " + value
-                print(f"🔍 [IMAGE-DEBUG] 🔗 Appended continuation to '{last_recognized_field}': '{value[:50]}{'...' if len(value) > 50 else ''}'")
+                print(f"🔍 [{debug_tag}] 🔗 Appended continuation to '{last_recognized_field}': '{value[:50]}{'...' if len(value) > 50 else ''}'")
             else:
-                print(f"🔍 [IMAGE-DEBUG] ⏭️ Skipping unrecognized field '{key}'")
+                print(f"🔍 [{debug_tag}] ⏭️ Skipping unrecognized field '{key}'")
     
     return data
 
-def parse_pdf_form(pdf_path: str) -> Dict[str, str]:
-    """Parse a PDF document or image using hybrid table + text + OCR extraction approach."""
+def parse_pdf_form(pdf_path: str, page_budget: int = None) -> Dict[str, str]:
+    """Parse a PDF document or image using hybrid text + table + OCR extraction approach."""
     
     try:
         # Determine file type
@@ -351,13 +145,8 @@ def parse_pdf_form(pdf_path: str) -> Dict[str, str]:
             print(f"🔍 [PDF-DEBUG] Detected image file, using OCR extraction")
             data = extract_from_images(pdf_path)
         else:
-            # Phase 2: Try table extraction first
-            data = extract_from_tables(pdf_path)
-        
-        # Phase 2: If table extraction fails or is incomplete, use text extraction
-        if not data or len(data) < 4:
-            print(f"🔍 [PDF-DEBUG] Table extraction incomplete ({len(data) if data else 0}/4 fields), trying text extraction...")
-            data = extract_from_text(pdf_path)
+            # Phase 2: Single-open pipeline (text labels first, then tables)
+            data = extract_from_pdf_document(pdf_path, page_budget)
         
         # If still no data found, raise exception
         if not data:
@@ -383,6 +172,152 @@ def parse_pdf_form(pdf_path: str) -> Dict[str, str]:
     except Exception as e:
         raise Exception(f"Failed to parse PDF: {str(e)}")
 
+def extract_from_pdf_document(pdf_path: str, page_budget: int = None) -> Dict[str, str]:
+    """
+    Extract form fields from a PDF with a single open of the document.
+    
+    Strategies run in cost order: text labels first (one get_text() per page),
+    then table detection (page.find_tables()) on pages with ruled lines - or
+    on every page if fields are still missing - then OCR of scanned pages (no
+    text layer) as a last resort. Table cells win over text labels, whose last
+    value would otherwise run on into the rows below it. Each stops as soon
+    as all four form fields are found, and none looks past the first
+    `page_budget` pages (PDF_EXTRACT_PAGE_BUDGET by default).
+    """
+    if page_budget is None:
+        page_budget = PDF_EXTRACT_PAGE_BUDGET
+    
+    doc = fitz.open(pdf_path)
+    
+    try:
+        page_count = min(len(doc), page_budget) if page_budget > 0 else len(doc)
+        print(f"🔍 [PDF-DEBUG] Scanning {page_count}/{len(doc)} page(s) (page budget: {page_budget})")
+        
+        # Strategy 1: Text labels - extract each page's text once, stop when complete
+        text = ""
+        data = {}
+        scanned_pages = []
+        ruled_pages = []
+        for page_num in range(page_count):
+            page = doc[page_num]
+            page_text = page.get_text()
+            if is_scanned_text(page_text):
+                scanned_pages.append(page_num)
+                continue
+            if has_ruling_lines(page):
+                ruled_pages.append(page_num)
+            text += page_text + "\n"
+            data = extract_fields_from_lines(text)
+            if _has_all_form_fields(data):
+                print(f"🔍 [PDF-DEBUG] Text extraction complete after page {page_num + 1}")
+                break
+        
+        if _has_all_form_fields(data):
+            # Complete, but a form table still gives cleaner cells than the label scan
+            table_pages = ruled_pages
+            if not table_pages:
+                return data
+            print(f"🔍 [PDF-DEBUG] Ruled page(s) {[n + 1 for n in table_pages]}, reading form table cells...")
+        else:
+            table_pages = [n for n in range(page_count) if n not in scanned_pages]
+            print(f"🔍 [PDF-DEBUG] Text extraction incomplete ({sum(1 for f in FORM_FIELD_NAMES if data.get(f))}/{len(FORM_FIELD_NAMES)} fields), trying table extraction...")
+        
+        # Strategy 2: Tables - structured cells win over text labels for the fields they contain
+        # (scanned pages have no text for find_tables to read)
+        for page_num in table_pages:
+            table_data = extract_fields_from_page_tables(doc[page_num], page_num)
+            if table_data:
+                data = {**data, **table_data}
+                print(f"🔍 [PDF-DEBUG] Table extraction successful: {len(table_data)} fields found")
+                if _has_all_form_fields(data):
+                    break
+        
+        # Strategy 3: OCR the scanned pages - fields read from a real text layer win
+        if scanned_pages and not _has_all_form_fields(data):
+            print(f"🔍 [PDF-DEBUG] {len(scanned_pages)} scanned page(s) without a text layer, running OCR...")
+            try:
+                ocr_data = extract_fields_from_ocr_text(ocr_scanned_pages(doc, scanned_pages, pdf_path))
+                print(f"🔍 [PDF-DEBUG] OCR label scan found {len(ocr_data)} field(s): {list(ocr_data.keys())}")
+                data = {**ocr_data, **{key: value for key, value in data.items() if value}}
+            except Exception as ocr_error:
+                print(f"⚠️ [PDF-DEBUG] OCR of scanned pages failed: {ocr_error}")
+    
+    finally:
+        doc.close()
+    
+    return data
+
+def is_scanned_text(page_text: str) -> bool:
+    """True for a page whose text layer is empty or near-empty (an image-only scan)."""
+    return len(page_text.strip()) < SCANNED_PAGE_MIN_CHARS
+
+def rasterize_page_for_ocr(page, dpi: int = None):
+    """
+    Render a page straight to a grayscale NumPy array for OCR - no image
+    encoding and no temp file. The resolution is capped so the longest side
+    fits OCR_MAX_DIMENSION, the size OCR preprocessing would shrink it to.
+    """
+    import numpy as np
+    from .ocr_engine import OCR_MAX_DIMENSION
+    
+    dpi = dpi or PDF_OCR_DPI
+    zoom = min(dpi / 72.0, OCR_MAX_DIMENSION / max(page.rect.width, page.rect.height))
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    try:
+        return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+    finally:
+        del pix
+
+def ocr_scanned_pages(doc, page_numbers, pdf_path: str) -> str:
+    """OCR the given pages in parallel on the OCR pool and return their text in page order."""
+    from .ocr_engine import image_hash, ocr_pages
+    
+    with open(pdf_path, "rb") as f:
+        doc_hash = image_hash(f.read())
+    # Each page is rasterized only on a cache miss, and submitted before the next one is rendered
+    pages = [
+        (f"scan:{doc_hash}:{page_num}:{PDF_OCR_DPI}", lambda page_num=page_num: rasterize_page_for_ocr(doc[page_num]))
+        for page_num in page_numbers
+    ]
+    with stage("ocr", f"{len(pages)} page(s)"):
+        texts = ocr_pages(pages)
+    for page_num, page_text in zip(page_numbers, texts):
+        print(f"🔍 [PDF-DEBUG] OCR page {page_num + 1}: {page_text[:200]}{'...' if len(page_text) > 200 else ''}")
+    return "\n".join(texts)
+
+def has_ruling_lines(page) -> bool:
+    """True when the page has vector line art (table borders) - a cheap check before find_tables()."""
+    return bool(page.get_cdrawings())
+
+def _has_all_form_fields(data: Dict[str, str]) -> bool:
+    """Return True when every form field has a non-empty value."""
+    return all(data.get(field_name) for field_name in FORM_FIELD_NAMES)
+
+def extract_fields_from_page_tables(page, page_num: int = 0) -> Dict[str, str]:
+    """Extract form fields from the first table found on a single PDF page."""
+    data = {}
+    
+    # Try to extract tables from the page
+    tables = page.find_tables()
+    
+    # Convert TableFinder to list
+    tables_list = list(tables)
+    
+    if not tables_list:
+        print(f"🔍 [PDF-DEBUG] No tables found on page {page_num + 1}")
+        return data
+    
+    print(f"🔍 [PDF-DEBUG] Found {len(tables_list)} table(s) on page {page_num + 1}")
+    
+    # Use the first table found
+    table = tables_list[0]
+    table_data = table.extract()
+    
+    print(f"🔍 [PDF-DEBUG] Table data extracted: {len(table_data)} rows")
+    
+    # Process each row as key-value pairs
+    return process_table_data(table_data, debug_tag="PDF-DEBUG")
+
 def extract_from_tables(pdf_path: str) -> Dict[str, str]:
     """Extract fields from PDF using table extraction - fixes contamination issue."""
     
@@ -391,52 +326,12 @@ def extract_from_tables(pdf_path: str) -> Dict[str, str]:
     
     try:
         for page_num in range(len(doc)):
-            page = doc[page_num]
-            
-            # Try to extract tables from the page
-            tables = page.find_tables()
-            
-            # Convert TableFinder to list
-            tables_list = list(tables)
+            data = extract_fields_from_page_tables(doc[page_num], page_num)
             
-            if tables_list:
-                print(f"🔍 [PDF-DEBUG] Found {len(tables_list)} table(s) on page {page_num + 1}")
-                
-                # Use the first table found
-                table = tables_list[0]
-                table_data = table.extract()
-                
-                print(f"🔍 [PDF-DEBUG] Table data extracted: {len(table_data)} rows")
-                
-                # Process each row as key-value pairs
-                last_recognized_field = None  # Track the last recognized field
-                
-                for i, row in enumerate(table_data):
-                    if len(row) >= 2:
-                        key = str(row[0]).strip() if row[0] else ""
-                        value = str(row[1]).strip() if row[1] else ""
-                        
-                        print(f"🔍 [PDF-DEBUG] Row {i+1}: '{key}' -> '{value[:50]}{'...' if len(value) > 50 else ''}'")
-                        
-                        # Check if this is a recognized field
-                        if key in ['Company Name', 'Address', 'ISO Standard Required', 'Scope']:
-                            data[key] = value
-                            last_recognized_field = key  # Track the last recognized field
-                            print(f"🔍 [PDF-DEBUG] ✅ Found recognized field '{key}': '{value[:100]}{'...' if len(value) > 100 else ''}'")
-                        elif key == "" and value and last_recognized_field:
-                            # This is a continuation line (empty key, has value)
-                            # Append to the last recognized field
-                            data[last_recognized_field] += " " + value
-                            print(f"🔍 [PDF-DEBUG] 🔗 Appended continuation to '{last_recognized_field}': '{value[:50]}{'...' if len(value) > 50 else ''}'")
-                        else:
-                            print(f"🔍 [PDF-DEBUG] ⏭️ Skipping unrecognized field '{key}'")
-                
-                # If we found data in tables, use it
-                if data:
-                    print(f"🔍 [PDF-DEBUG] Table extraction successful: {len(data)} fields found")
-                    break
-            else:
-                print(f"🔍 [PDF-DEBUG] No tables found on page {page_num + 1}")
+            # If we found data in tables, use it
+            if data:
+                print(f"🔍 [PDF-DEBUG] Table extraction successful: {len(data)} fields found")
+                break
     
     finally:
         doc.close()
@@ -453,124 +348,47 @@ def extract_from_text(pdf_path: str) -> Dict[str, str]:
         # Extract all text from PDF
         for page in doc:
             text += page.get_text() + "\n"
-        
-        print(f"🔍 [PDF-DEBUG] Extracted text from PDF:")
-        print(f"🔍 [PDF-DEBUG] {text[:1000]}{'...' if len(text) > 1000 else ''}")
-        print(f"🔍 [PDF-DEBUG] ===== END EXTRACTED TEXT =====")
-        
-        # Simple field extraction without regex - handle multi-line content properly
-        lines = text.split('\n')
-        data = {}
-        current_field = None
-        current_value = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Check if this line starts a new field (look for field names followed by colon or at start of line)
-            field_names = ['Company Name', 'Address', 'ISO Standard Required', 'Scope']
-            is_field_start = False
-            detected_field = None
-            
-            for field_name in field_names:
-                if line.startswith(field_name + ':') or line == field_name:
-                    is_field_start = True
-                    detected_field = field_name
-                    break
-            
-            if is_field_start:
-                # Save previous field
-                if current_field and current_value:
-                    data[current_field] = '\n'.join(current_value).strip()
-                    print(f"🔍 [PDF-DEBUG] Saved field '{current_field}': '{data[current_field][:100]}{'...' if len(data[current_field]) > 100 else ''}'")
-                
-                # Start new field
-                current_field = detected_field
-                current_value = []
-                
-                # Extract value from the same line if it exists after the colon
-                if ':' in line:
-                    value_part = line.split(':', 1)[1].strip()
-                    if value_part:
-                        current_value.append(value_part)
-            elif current_field:
-                # This is a continuation of the current field
-                current_value.append(line)
-        
-        # Save last field
-        if current_field and current_value:
-            data[current_field] = '\n'.join(current_value).strip()
-            print(f"🔍 [PDF-DEBUG] Saved final field '{current_field}': '{data[current_field][:100]}{'...' if len(data[current_field]) > 100 else ''}'")
     
     finally:
         doc.close()
     
+    print(f"🔍 [PDF-DEBUG] Extracted text from PDF:")
+    print(f"🔍 [PDF-DEBUG] {text[:1000]}{'...' if len(text) > 1000 else ''}")
+    print(f"🔍 [PDF-DEBUG] ===== END EXTRACTED TEXT =====")
+    
+    return extract_fields_from_lines(text)
+
+def extract_fields_from_lines(text: str) -> Dict[str, str]:
+    """Extract form fields from text where each field label starts its own line."""
+    
+    # Labels must stand alone on their line or be followed by a colon
+    data = extract_labeled_fields(text, strict=True)
+    
+    for field_name, value in data.items():
+        print(f"🔍 [PDF-DEBUG] Saved field '{field_name}': '{value[:100]}{'...' if len(value) > 100 else ''}'")
+    
     return data
 
 def extract_fields_from_text(text: str) -> Dict[str, str]:
     """Extract fields from text using pattern matching as fallback."""
     
-    data = {}
-    
     # Debug: Print the extracted text to understand the structure
     print(f"🔍 [PDF-DEBUG] Extracted text from PDF:")
     print(f"🔍 [PDF-DEBUG] {text[:500]}{'...' if len(text) > 500 else ''}")
     print(f"🔍 [PDF-DEBUG] ===== END EXTRACTED TEXT =====")
     
-    # Define patterns for field extraction - capture until next field or end
-    patterns = {
-        "Company Name": [
-            r"Company Name[:\s]+(.+?)(?=\n\s*(?:Address|ISO Standard Required|Scope|Certificate Number|Original Issue Date|Issue Date|Surveillance/Expiry Date|Recertification Date|Initial Registration Date|Surveillance Due Date|Expiry Date|Extra Line)|$)",
-            r"Company[:\s]+(.+?)(?=\n\s*(?:Address|ISO Standard Required|Scope|Certificate Number|Original Issue Date|Issue Date|Surveillance/Expiry Date|Recertification Date|Initial Registration Date|Surveillance Due Date|Expiry Date|Extra Line)|$)",
-            r"Organization[:\s]+(.+?)(?=\n\s*(?:Address|ISO Standard Required|Scope|Certificate Number|Original Issue Date|Issue Date|Surveillance/Expiry Date|Recertification Date|Initial Registration Date|Surveillance Due Date|Expiry Date|Extra Line)|$)"
-        ],
-        "Address": [
-            r"Address[:\s]+(.+?)(?=\n\s*(?:ISO Standard Required|Scope|Certificate Number|Original Issue Date|Issue Date|Surveillance/Expiry Date|Recertification Date|Initial Registration Date|Surveillance Due Date|Expiry Date|Extra Line)|$)",
-            r"Location[:\s]+(.+?)(?=\n\s*(?:ISO Standard Required|Scope|Certificate Number|Original Issue Date|Issue Date|Surveillance/Expiry Date|Recertification Date|Initial Registration Date|Surveillance Due Date|Expiry Date|Extra Line)|$)"
-        ],
-        "ISO Standard Required": [
-            r"ISO Standard Required[:\s]+(.+?)(?=\n\s*(?:Scope|Certificate Number|Original Issue Date|Issue Date|Surveillance/Expiry Date|Recertification Date|Initial Registration Date|Surveillance Due Date|Expiry Date|Extra Line)|$)",
-            r"ISO Standard[:\s]+(.+?)(?=\n\s*(?:Scope|Certificate Number|Original Issue Date|Issue Date|Surveillance/Expiry Date|Recertification Date|Initial Registration Date|Surveillance Due Date|Expiry Date|Extra Line)|$)",
-            r"Standard[:\s]+(.+?)(?=\n\s*(?:Scope|Certificate Number|Original Issue Date|Issue Date|Surveillance/Expiry Date|Recertification Date|Initial Registration Date|Surveillance Due Date|Expiry Date|Extra Line)|$)"
-        ],
-        "Scope": [
-            r"Scope[:\s]+(.+?)(?=\n\s*(?:Certificate Number|Original Issue Date|Issue Date|Surveillance/Expiry Date|Recertification Date|Initial Registration Date|Surveillance Due Date|Expiry Date|Extra Line)|$)",
-            r"Scope of Work[:\s]+(.+?)(?=\n\s*(?:Certificate Number|Original Issue Date|Issue Date|Surveillance/Expiry Date|Recertification Date|Initial Registration Date|Surveillance Due Date|Expiry Date|Extra Line)|$)"
-        ]
-    }
-    
-    import re
+    # Single pass over the text - every known label bounds the previous value
+    data = extract_labeled_fields(text, strict=False)
     
-    for field_name, field_patterns in patterns.items():
-        for pattern in field_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-            if match:
-                value = match.group(1).strip()
-                if value:
-                    data[field_name] = value
-                    print(f"🔍 [PDF-DEBUG] Found {field_name}: '{value[:100]}{'...' if len(value) > 100 else ''}'")
-                    break
+    for field_name, value in data.items():
+        print(f"🔍 [PDF-DEBUG] Found {field_name}: '{value[:100]}{'...' if len(value) > 100 else ''}'")
     
     return data
 
 def get_text_height(text: str, fontsize: float, fontname: str, max_width: float) -> float:
     """Estimate the height of a text block when wrapped to fit max_width."""
-    font = fitz.Font(fontname=fontname)
-    words = text.split()
-    lines = []
-    current_line = ""
-    for word in words:
-        test_line = current_line + (" " if current_line else "") + word
-        if font.text_length(test_line, fontsize) <= max_width:
-            current_line = test_line
-        else:
-            lines.append(current_line)
-            current_line = word
-    if current_line:
-        lines.append(current_line)
-    return len(lines) * fontsize * 1.2  # Approximate line height with spacing
+    line_count = text_line_count(text, fontname, fontsize, max_width)
+    return line_count * fontsize * 1.2  # Approximate line height with spacing
 
 def insert_centered_textbox(
     page: fitz.Page,
@@ -595,17 +413,22 @@ def insert_centered_textbox(
         align=1  # Centered
     )
 
-def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[str, str], template_type: str = "standard") -> Dict[str, any]:
-    """Generate a certificate PDF by overlaying extracted values onto a template.
+def build_certificate_document(base_pdf_path: str, values: Dict[str, str], template_type: str = "standard"):
+    """Overlay the values onto an open copy of the template without saving it.
     
     Returns:
-        Dict containing success status and overflow warnings
+        (fitz.Document, overflow_warnings) - the caller saves and closes the document
     """
+    doc = fitz.open(base_pdf_path)
+    # A failure while drawing closes the document instead of leaking it
+    with close_on_error(doc):
+        return _draw_certificate(doc, values, template_type)
 
-    
+
+def _draw_certificate(doc, values: Dict[str, str], template_type: str):
+    """Draw the certificate fields onto doc; returns (doc, overflow_warnings)."""
     # Initialize tracking for overflow warnings
     overflow_warnings = []
-    doc = fitz.open(base_pdf_path)
     page = doc[0]
 
     # --- Configuration ---
@@ -1001,15 +824,16 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             print(f"❌ [LOGO] Error inserting logo: {e}")
 
     # ✅ ADDED: Shared logo functions for better logo handling
+    @timed_stage("logo")
     def insert_logo_into_pdf(page, logo_file, logo_rect):
         """
         Insert logo into PDF with smart positioning
         """
         try:
             # Convert logo file to image
-            logo_image = convert_file_to_image(logo_file)
-            # Use smart positioning logic
-            insert_logo_with_smart_positioning(page, logo_image, logo_rect)
+            with convert_file_to_image(logo_file) as logo_image:
+                # Use smart positioning logic
+                insert_logo_with_smart_positioning(page, logo_image, logo_rect)
             print(f"✅ [LOGO] Logo inserted successfully: {logo_file.name if hasattr(logo_file, 'name') else 'unknown'}")
         except Exception as e:
             print(f"❌ [LOGO] Failed to insert logo: {e}")
@@ -1364,147 +1188,125 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             
 
             
-            # ✅ UPDATED: Dynamic Company Name font sizing based on line count
-            # First, determine if Company Name will be single line or multi-line
-            company_lines_count = len([line for line in company_processed_lines if line.strip()])
+            # Fit Company Name and Address once per text/box/font/template; later
+            # renders of the same client reuse the wrapped lines and font sizes
+            def fit_company_address():
+                # ✅ UPDATED: Dynamic Company Name font sizing based on line count
+                # First, determine if Company Name will be single line or multi-line
+                company_lines_count = len([line for line in company_processed_lines if line.strip()])
             
-            # Set initial font size based on line count
-            if company_lines_count <= 1:
-                company_font_size = 35  # Single line - start with 35pt
-                print(f"🔍 [CERTIFICATE] Company Name: Single line detected, starting with {company_font_size}pt")
-            else:
-                company_font_size = 30  # Multiple lines - start with 30pt
-                print(f"🔍 [CERTIFICATE] Company Name: {company_lines_count} lines detected, starting with {company_font_size}pt")
+                # Set initial font size based on line count
+                if company_lines_count <= 1:
+                    company_font_size = 35  # Single line - start with 35pt
+                    print(f"🔍 [CERTIFICATE] Company Name: Single line detected, starting with {company_font_size}pt")
+                else:
+                    company_font_size = 30  # Multiple lines - start with 30pt
+                    print(f"🔍 [CERTIFICATE] Company Name: {company_lines_count} lines detected, starting with {company_font_size}pt")
             
-            address_font_size = 13.6
+                address_font_size = 13.6
             
-            # Variables to store the final wrapped lines and font sizes
-            final_company_lines = []
-            final_address_lines = []
+                # Variables to store the final wrapped lines and font sizes
+                final_company_lines = []
+                final_address_lines = []
             
-            # ✅ IMPROVED: Different logic for single line vs multi-line company names
-            if company_lines_count <= 1:
-                # NO cmd+enter in Excel: Force single line, use font reduction only
-                print(f"🔍 [CERTIFICATE] No cmd+enter detected - forcing single line with font reduction")
+                # ✅ IMPROVED: Different logic for single line vs multi-line company names
+                if company_lines_count <= 1:
+                    # NO cmd+enter in Excel: Force single line, use font reduction only
+                    print(f"🔍 [CERTIFICATE] No cmd+enter detected - forcing single line with font reduction")
                 
-                while company_font_size >= 8:  # Minimum font size
-                    # Check if entire company name fits in one line at current font size
-                    font_obj = fitz.Font(fontname=fontname)
-                    text_width = font_obj.text_length(company_text, company_font_size)
+                    while company_font_size >= 8:  # Minimum font size
+                        # Check if entire company name fits in one line at current font size
+                        font_obj = fitz.Font(fontname=fontname)
+                        text_width = font_obj.text_length(company_text, company_font_size)
                     
-                    if text_width <= rect.width - 10:  # Leave margin
-                        # Text fits in one line - use this font size
-                        final_company_lines = [company_text]  # Single line
-                        print(f"✅ [CERTIFICATE] Company name fits in one line at {company_font_size}pt (width: {text_width:.1f}pt)")
-                        break
-                    else:
-                        # Text too wide - reduce font size and try again
-                        print(f"🔍 [CERTIFICATE] Company name too wide at {company_font_size}pt (width: {text_width:.1f}pt > {rect.width - 10:.1f}pt), reducing to {company_font_size - 1}pt")
-                        company_font_size -= 1
-                
-                # If we reached minimum font size and still doesn't fit, use the minimum
-                if company_font_size < 8:
-                    company_font_size = 8
-                    final_company_lines = [company_text]
-                    print(f"⚠️ [CERTIFICATE] Company name forced to minimum font size 8pt")
+                        if text_width <= rect.width - 10:  # Leave margin
+                            # Text fits in one line - use this font size
+                            final_company_lines = [company_text]  # Single line
+                            print(f"✅ [CERTIFICATE] Company name fits in one line at {company_font_size}pt (width: {text_width:.1f}pt)")
+                            break
+                        else:
+                            # Text too wide - reduce font size and try again
+                            print(f"🔍 [CERTIFICATE] Company name too wide at {company_font_size}pt (width: {text_width:.1f}pt > {rect.width - 10:.1f}pt), reducing to {company_font_size - 1}pt")
+                            company_font_size -= 1
                 
-            else:
-                # cmd+enter present in Excel: Allow word wrapping up to 2 lines
-                print(f"🔍 [CERTIFICATE] cmd+enter detected - allowing word wrapping up to 2 lines")
+                    # If we reached minimum font size and still doesn't fit, use the minimum
+                    if company_font_size < 8:
+                        company_font_size = 8
+                        final_company_lines = [company_text]
+                        print(f"⚠️ [CERTIFICATE] Company name forced to minimum font size 8pt")
                 
-            while company_font_size >= 8:  # Minimum font size
-                company_lines = []
+                else:
+                    # cmd+enter present in Excel: Allow word wrapping up to 2 lines
+                    print(f"🔍 [CERTIFICATE] cmd+enter detected - allowing word wrapping up to 2 lines")
                 
-                # Process each pre-processed line with word wrapping
-                for processed_line in company_processed_lines:
-                    if not processed_line.strip():  # Empty line - preserve it
-                        company_lines.append("")  # Add empty line to maintain spacing
-                        continue
-                    
-                    # Non-empty line - apply word wrapping
-                    words = processed_line.split()
-                    current_line = ""
-                    
-                    for word in words:
-                        test_line = current_line + (" " if current_line else "") + word
-                        font_obj = fitz.Font(fontname=fontname)
-                        if font_obj.text_length(test_line, company_font_size) <= rect.width - 10:  # Leave margin
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                company_lines.append(current_line)
-                            current_line = word
-                    
-                    if current_line:
-                        company_lines.append(current_line)
+                while company_font_size >= 8:  # Minimum font size
+                    # Word-wrap each pre-processed line; empty lines are preserved to maintain spacing
+                    company_lines = wrap_paragraphs(company_processed_lines, fontname, company_font_size, rect.width - 10)  # Leave margin
                 
-                # ✅ UPDATED: Allow Company Name to use up to 2 lines (after line breaks + word wrapping)
-                if len(company_lines) <= 2:
-                    final_company_lines = company_lines.copy()
-                    break
+                    # ✅ UPDATED: Allow Company Name to use up to 2 lines (after line breaks + word wrapping)
+                    if len(company_lines) <= 2:
+                        final_company_lines = company_lines.copy()
+                        break
                 
-                # Reduce Company Name font size
-                company_font_size -= 1
+                    # Reduce Company Name font size
+                    company_font_size -= 1
             
-            # Calculate Company Name height
-            # Consistent line spacing: 1.05 for all templates
-            company_height = len(final_company_lines) * company_font_size * 1.05  # Consistent spacing for all templates
+                # Calculate Company Name height
+                # Consistent line spacing: 1.05 for all templates
+                company_height = len(final_company_lines) * company_font_size * 1.05  # Consistent spacing for all templates
             
-            # Now find font size for Address to fit in remaining space
-            remaining_height = rect.height - company_height - 2  # Leave margin
+                # Now find font size for Address to fit in remaining space
+                remaining_height = rect.height - company_height - 2  # Leave margin
 
             
-            address_font_size_attempts = 0
-            while address_font_size >= 6:  # Minimum font size
-                address_font_size_attempts += 1
+                address_font_size_attempts = 0
+                while address_font_size >= 6:  # Minimum font size
+                    address_font_size_attempts += 1
 
                 
-                # Process Address using pre-processed lines with word wrapping
-                address_lines = []
+                    # Process Address using pre-processed lines with word wrapping (empty lines preserved for spacing)
+                    address_lines = wrap_paragraphs(address_processed_lines, fontname, address_font_size, rect.width - 10)  # Leave margin
                 
-                # Process each pre-processed address line with word wrapping
-                for processed_line in address_processed_lines:
-                    if not processed_line.strip():  # Empty line - preserve it
-                        address_lines.append("")  # Add empty line to maintain spacing
-                        continue
-                    
-                    # Non-empty line - apply word wrapping
-                    words = processed_line.split()
-                    current_line = ""
-                    
-                    for word in words:
-                        test_line = current_line + (" " if current_line else "") + word
-                        font_obj = fitz.Font(fontname=fontname)
-                        test_width = font_obj.text_length(test_line, address_font_size)
-                        if test_width <= rect.width - 10:  # Leave margin
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                address_lines.append(current_line)
-                            current_line = word
-                    
-                    if current_line:
-                        address_lines.append(current_line)
-                
-                # Calculate Address height
-                # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
-                if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
-                    address_height = len(address_lines) * address_font_size * 1.1  # Tight spacing for large/logo templates
-                else:  # standard templates
-                    address_height = len(address_lines) * address_font_size * 1.2  # Loose spacing for standard templates
+                    # Calculate Address height
+                    # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
+                    if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+                        address_height = len(address_lines) * address_font_size * 1.1  # Tight spacing for large/logo templates
+                    else:  # standard templates
+                        address_height = len(address_lines) * address_font_size * 1.2  # Loose spacing for standard templates
 
                 
-                # Check if Address fits in remaining space
-                if address_height <= remaining_height:
-                    final_address_lines = address_lines.copy()
-                    print(f"[SUCCESS] [COMPANY ADDRESS] Address fits! Final font size: {address_font_size}pt")
-                    break
-                else:
-                    print(f"[ERROR] [COMPANY ADDRESS] Address too tall: {address_height:.1f}pt > {remaining_height:.1f}pt, reducing font size")
+                    # Check if Address fits in remaining space
+                    if address_height <= remaining_height:
+                        final_address_lines = address_lines.copy()
+                        print(f"[SUCCESS] [COMPANY ADDRESS] Address fits! Final font size: {address_font_size}pt")
+                        break
+                    else:
+                        print(f"[ERROR] [COMPANY ADDRESS] Address too tall: {address_height:.1f}pt > {remaining_height:.1f}pt, reducing font size")
                 
-                # Reduce Address font size
-                address_font_size -= 0.5
-            
+                    # Reduce Address font size
+                    address_font_size -= 0.5
+
+                return {
+                    "company_font_size": company_font_size,
+                    "address_font_size": address_font_size,
+                    "final_company_lines": final_company_lines,
+                    "final_address_lines": final_address_lines,
+                    "company_height": company_height,
+                    "address_height": address_height,
+                }
+
+            layout = get_cached_layout(
+                "draft", "Company Name and Address", (company_text, safe_address_text), rect, fontname,
+                start_size, address_alignment, template_type, fit_company_address,
+            )
+            company_font_size = layout["company_font_size"]
+            address_font_size = layout["address_font_size"]
+            final_company_lines = layout["final_company_lines"]
+            final_address_lines = layout["final_address_lines"]
+            company_height = layout["company_height"]
+            address_height = layout["address_height"]
+            font_obj = fitz.Font(fontname=fontname)
+
             # Now render Company Name and Address dynamically
             if final_company_lines or final_address_lines:
                 
@@ -1697,14 +1499,9 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         
 
         
-        # Reduce font size if it doesn't fit, but ensure minimum size
-        while font_size >= 12:  # Increased minimum from 10 to 12
-            text_height = get_text_height(text, font_size, fontname, rect.width)
-            limit = rect.height if field != "Company Name" else rect.height * 2
-
-            if text_height <= limit:
-                break
-            font_size -= 1
+        # Reduce font size if it doesn't fit, but ensure minimum size (12pt)
+        limit = rect.height if field != "Company Name" else rect.height * 2
+        font_size = fit_font_size(text, fontname, rect.width, limit, start_size)
         
 
         
@@ -1719,107 +1516,59 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             print(f"🔍 [CERTIFICATE DEBUG] Scope text length: {len(text)} characters")
             print(f"🔍 [CERTIFICATE DEBUG] Scope text preview: '{text[:100]}{'...' if len(text) > 100 else ''}'")
             
-            # Reduce font size until text fits within box boundaries
-            font_size = original_font_size
-            iteration_count = 0
+            # Shrink-to-fit and wrap once per text/box/font/template; later renders
+            # of the same scope reuse the fitted font size and lines
             min_font_size = 4  # Allow font size to go below 8pt if needed
+            def fit_scope():
+                # Reduce font size until text fits within box boundaries
+                font_size = original_font_size
+                iteration_count = 0
 
-            while font_size >= min_font_size:  # Changed from 8 to 4
-                iteration_count += 1
+                while font_size >= min_font_size:  # Changed from 8 to 4
+                    iteration_count += 1
                 
-                print(f"🔍 [CERTIFICATE DEBUG] Font size attempt {iteration_count}: {font_size}pt")
+                    print(f"🔍 [CERTIFICATE DEBUG] Font size attempt {iteration_count}: {font_size}pt")
                 
-                # Enhanced text processing with bullet point detection AND line break preservation
-                lines = []
+                    # Enhanced text processing with bullet point detection AND line break preservation
+                    line_count = scope_line_count(text, fontname, font_size, rect.width)
+
+                    # Calculate total height of all lines
+                    # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
+                    if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+                        line_height = font_size * 1.1  # Tight spacing for large/logo templates
+                    else:  # standard templates
+                        line_height = font_size * 1.2  # Loose spacing for standard templates
+                    total_height = line_count * line_height
                 
-                # Split text by actual line breaks first
-                if '\n' in text:
-                    # Handle line breaks properly
-                    text_lines = text.split('\n')
-                    for text_line in text_lines:
-                        if text_line.strip():  # Only process non-empty lines
-                            # Process each line for word wrapping and bullet points
-                            words = text_line.strip().split()
-                            current_line = ""
-                            
-                            for word in words:
-                                # Check if word starts with bullet point indicators
-                                is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                                
-                                # If it's a bullet point and we have content, start a new line
-                                if is_bullet_point and current_line:
-                                    lines.append(current_line)
-                                    # Replace * with • for display (in font size calculation)
-                                    if word.startswith('*'):
-                                        safe_word = str(word) if word is not None else ""
-                                        print(f"[BULLET] Will replace '{safe_word}' with '•{safe_word[1:]}' in final rendering")
-                                    current_line = word
-                                    continue
-                                
-                                test_line = current_line + (" " if current_line else "") + word
-                                font_obj = fitz.Font(fontname=fontname)
-                                
-                                if font_obj.text_length(test_line, font_size) <= rect.width:
-                                    current_line = test_line
-                                else:
-                                    if current_line:
-                                        lines.append(current_line)
-                                    current_line = word
-                            
-                            if current_line:
-                                lines.append(current_line)
-                else:
-                    # No line breaks, process as single block
-                    words = text.split()
-                    current_line = ""
-                    
-                    for word in words:
-                        # Check if word starts with bullet point indicators
-                        is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                        
-                        # If it's a bullet point and we have content, start a new line
-                        if is_bullet_point and current_line:
-                            lines.append(current_line)
-                            # Replace * with • for display (in font size calculation)
-                            if word.startswith('*'):
-                                safe_word = str(word) if word is not None else ""
-                                print(f"[BULLET] Will replace '{safe_word}' with '•{safe_word[1:]}' in final rendering")
-                            current_line = word
-                            continue
-                        
-                        test_line = current_line + (" " if current_line else "") + word
-                        font_obj = fitz.Font(fontname=fontname)
-                        
-                        if font_obj.text_length(test_line, font_size) <= rect.width:
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                lines.append(current_line)
-                            current_line = word
-                    
-                    if current_line:
-                        lines.append(current_line)
+                    print(f"🔍 [CERTIFICATE DEBUG] Calculated height: {total_height:.1f}pt (lines: {line_count}, line_height: {line_height:.1f}pt)")
+                    print(f"🔍 [CERTIFICATE DEBUG] Available height: {rect.height:.1f}pt")
+                    print(f"🔍 [CERTIFICATE DEBUG] Height utilization: {(total_height/rect.height)*100:.1f}%")
                 
-                # Calculate total height of all lines
-                # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
-                if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
-                    line_height = font_size * 1.1  # Tight spacing for large/logo templates
-                else:  # standard templates
-                    line_height = font_size * 1.2  # Loose spacing for standard templates
-                total_height = len(lines) * line_height
-                
-                print(f"🔍 [CERTIFICATE DEBUG] Calculated height: {total_height:.1f}pt (lines: {len(lines)}, line_height: {line_height:.1f}pt)")
-                print(f"🔍 [CERTIFICATE DEBUG] Available height: {rect.height:.1f}pt")
-                print(f"🔍 [CERTIFICATE DEBUG] Height utilization: {(total_height/rect.height)*100:.1f}%")
-                
-                # Check if text fits vertically within box boundaries
-                if total_height <= rect.height:  # No margin
-                    print(f"🔍 [CERTIFICATE DEBUG] ✅ Text fits! Using font size: {font_size}pt")
-                    break
-                else:
-                    print(f"🔍 [CERTIFICATE DEBUG] ❌ Text overflow: {total_height:.1f}pt > {rect.height:.1f}pt, reducing font size")
+                    # Check if text fits vertically within box boundaries
+                    if total_height <= rect.height:  # No margin
+                        print(f"🔍 [CERTIFICATE DEBUG] ✅ Text fits! Using font size: {font_size}pt")
+                        break
+                    else:
+                        print(f"🔍 [CERTIFICATE DEBUG] ❌ Text overflow: {total_height:.1f}pt > {rect.height:.1f}pt, reducing font size")
                 
-                font_size -= 1
+                    font_size -= 1
+
+                # Now draw the text with the fitting font size using enhanced processing
+                # Process text to handle line breaks and bullet points properly
+            
+                # Replace all asterisks with bullet points for display
+                display_text = text.replace('*', '•')
+            
+                lines = wrap_scope_lines(display_text, fontname, font_size, rect.width)
+
+                return {"font_size": font_size, "lines": lines, "fit_height": total_height}
+
+            layout = get_cached_layout(
+                "draft", "Scope", text, rect, fontname, original_font_size, "", template_type, fit_scope,
+            )
+            font_size = layout["font_size"]
+            lines = layout["lines"]
+            total_height = layout["fit_height"]
 
             # Check if we hit the minimum font size and still have overflow
             if font_size == min_font_size and total_height > rect.height:
@@ -1841,89 +1590,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                 })
                 
                 print(warning_msg)
-                print(f"[OVERFLOW] Text will be truncated to fit within coordinates")
-                
-                # Force text to fit by truncating if necessary
-                max_lines = int(rect.height / min_font_size)
-                if len(lines) > max_lines:
-                    lines = lines[:max_lines]
-                    print(f"[OVERFLOW] Truncated to {max_lines} lines to fit coordinates")
-
-            # Now draw the text with the fitting font size using enhanced processing
-            # Process text to handle line breaks and bullet points properly
-            
-            # Replace all asterisks with bullet points for display
-            text = text.replace('*', '•')
-            
-            lines = []
-            
-            # Split text by actual line breaks first
-            if '\n' in text:
-                # Handle line breaks properly
-                text_lines = text.split('\n')
-                for text_line in text_lines:
-                    if text_line.strip():  # Only process non-empty lines
-                        # Process each line for word wrapping and bullet points
-                        words = text_line.strip().split()
-                        current_line = ""
-                        
-                        for word in words:
-                            # Check if word starts with bullet point indicators
-                            is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                            
-                            # If it's a bullet point and we have content, start a new line
-                            if is_bullet_point and current_line:
-                                lines.append(current_line)
-                                # Replace * with • for display
-                                display_word = word.replace('*', '•')
-                                if word != display_word:
-                                    print(f"[BULLET] Replaced '{word}' with '{display_word}'")
-                                current_line = display_word
-                                continue
-                            
-                            test_line = current_line + (" " if current_line else "") + word
-                            font_obj = fitz.Font(fontname=fontname)
-                            if font_obj.text_length(test_line, font_size) <= rect.width:
-                                current_line = test_line
-                            else:
-                                if current_line:
-                                    lines.append(current_line)
-                                current_line = word
-                        
-                        if current_line:
-                            lines.append(current_line)
-            else:
-                # No line breaks, process as single block
-                words = text.split()
-                current_line = ""
-                
-                for word in words:
-                    # Check if word starts with bullet point indicators
-                    is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                    
-                    # If it's a bullet point and we have content, start a new line
-                    if is_bullet_point and current_line:
-                        lines.append(current_line)
-                        # Replace * with • for display
-                        display_word = word.replace('*', '•')
-                        current_line = display_word
-                        continue
-                    
-                    test_line = current_line + (" " if current_line else "") + word
-                    font_obj = fitz.Font(fontname=fontname)
-                    if font_obj.text_length(test_line, font_size) <= rect.width:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-                
-                if current_line:
-                    lines.append(current_line)
-            
-
 
-            
             # Calculate total height and position vertically based on template type
             # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
             if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
@@ -2250,11 +1917,35 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                     print("⚠️ [CERTIFICATE] Logo coordinates not found in logo_coords")
         except Exception as logo_insert_error:
             print(f"❌ [CERTIFICATE] Error inserting logo: {logo_insert_error}")
+    # The decoded logo is not needed past this point
+    close_quietly(logo_image)
+
+    # Embed the exact input values so the final step can skip text extraction
+    try:
+        embed_draft_payload(doc, values, template_type)
+    except Exception as payload_error:
+        print(f"⚠️ [CERTIFICATE] Could not embed draft payload: {payload_error}")
+
+    return doc, overflow_warnings
+
+
+def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[str, str], template_type: str = "standard", save_profile: str = None) -> Dict[str, any]:
+    """Generate a certificate PDF by overlaying extracted values onto a template.
+    
+    save_profile picks how the PDF is written ("fast", "compact" or "archival",
+    see rise/save_profiles.py); the PDF_SAVE_PROFILE default is used when omitted.
+    
+    Returns:
+        Dict containing success status and overflow warnings
+    """
+    doc, overflow_warnings = build_certificate_document(base_pdf_path, values, template_type)
 
     # ✅ ADDED: Robust return structure - always save and return
     try:
-        doc.save(output_pdf_path)
-        doc.close()
+        try:
+            save_pdf(doc, output_pdf_path, save_profile)
+        finally:
+            doc.close()
         
         print(f"[CERTIFICATE] Certificate PDF generated successfully: {output_pdf_path}")
         
@@ -1,66 +1,144 @@
 import fitz  # PyMuPDF
 import pypdf
+import io
 import os
+import hashlib
 from datetime import datetime
+from .draft_payload import read_draft_payload, payload_to_extracted_data
+from .save_profiles import pdf_to_bytes
+from .resources import close_on_error
+from .text_fit import text_line_count, wrap_words
+from .timings import stage
+
+# Resolution used when rasterizing a draft page for the OCR fallback
+FINAL_OCR_DPI = int(os.getenv("FINAL_OCR_DPI", "300"))
+
+# OCR the fields of legacy drafts (no embedded payload) whose text layer looks
+# garbled; off by default, and only effective with an OCR backend installed
+FINAL_OCR_FALLBACK = os.getenv("FINAL_OCR_FALLBACK", "false").lower() == "true"
+
+# Final certificate template (defaults to Final.pdf next to this script)
+FINAL_TEMPLATE_PATH = os.getenv("FINAL_TEMPLATE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "Final.pdf"))
+
+# Parsed once per process by get_final_template()
+_final_template_doc = None
 
 def extract_text_from_pdf(pdf_path, coords, use_ocr_fallback=False):
     """Extract text from specific coordinates using text blocks, with optional OCR fallback."""
     extracted_data = {}
 
     try:
-        doc = fitz.open(pdf_path)
-        page = doc[0]
+        if isinstance(pdf_path, (bytes, bytearray)):
+            pdf_bytes = bytes(pdf_path)
+        else:
+            with open(pdf_path, "rb") as f:
+                pdf_bytes = f.read()
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            page = doc[0]
+            ocr_fields = []
 
-        for field_name, rect in coords.items():
-            # First try block-based text extraction
-            blocks = page.get_text("blocks", clip=rect)
+            for field_name, rect in coords.items():
+                # First try block-based text extraction
+                blocks = page.get_text("blocks", clip=rect)
 
-            # Sort blocks top-down, then left-right
-            blocks = sorted(blocks, key=lambda b: (round(b[1]), round(b[0])))
+                # Sort blocks top-down, then left-right
+                blocks = sorted(blocks, key=lambda b: (round(b[1]), round(b[0])))
 
-            # Combine non-empty block texts
-            block_text = " ".join([b[4].strip() for b in blocks if b[4].strip()])
+                # Combine non-empty block texts
+                block_text = " ".join([b[4].strip() for b in blocks if b[4].strip()])
 
-            # Remove watermark words like 'DRAFT' (case-insensitive)
-            cleaned_text = block_text.replace('DRAFT', '').replace('draft', '').strip()
-            # Remove double spaces caused by removal
-            cleaned_text = ' '.join(cleaned_text.split())
-            if cleaned_text != block_text:
-                print(f"[INFO] Watermark removed for '{field_name}': '{cleaned_text}'")
+                # Remove watermark words like 'DRAFT' (case-insensitive)
+                cleaned_text = block_text.replace('DRAFT', '').replace('draft', '').strip()
+                # Remove double spaces caused by removal
+                cleaned_text = ' '.join(cleaned_text.split())
+                if cleaned_text != block_text:
+                    print(f"[INFO] Watermark removed for '{field_name}': '{cleaned_text}'")
 
-            # Fallback to OCR if the block text looks like junk (single letters or too short)
-            if use_ocr_fallback and (len(cleaned_text) < 10 or "\n" in cleaned_text or any(len(w) <= 2 for w in cleaned_text.split())):
+                extracted_data[field_name] = cleaned_text
+
+                # Queue OCR fallback if the block text looks like junk (single letters or too short)
+                if use_ocr_fallback and (len(cleaned_text) < 10 or "\n" in cleaned_text or any(len(w) <= 2 for w in cleaned_text.split())):
+                    ocr_fields.append(field_name)
+
+            if ocr_fields:
                 try:
-                    import pytesseract
-                    from PIL import Image
-                    
-                    pix = page.get_pixmap(clip=rect)
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    ocr_text = pytesseract.image_to_string(img).strip()
-                    print(f"🔁 OCR fallback used for '{field_name}'")
-                    extracted_data[field_name] = ocr_text
+                    draft_hash = hashlib.sha256(pdf_bytes).hexdigest()
+                    ocr_results = ocr_page_fields(page, {name: coords[name] for name in ocr_fields}, draft_hash)
+                    for field_name, ocr_text in ocr_results.items():
+                        print(f"🔁 OCR fallback used for '{field_name}'")
+                        extracted_data[field_name] = ocr_text
                 except (ImportError, Exception) as e:
-                    print(f"⚠️ OCR not available ({str(e)}), using block text for '{field_name}'")
-                    extracted_data[field_name] = cleaned_text
-            else:
-                extracted_data[field_name] = cleaned_text
-            
-            print(f"🔍 Extracted '{field_name}' from rect({rect.x0}, {rect.y0}, {rect.x1}, {rect.y1}): '{extracted_data[field_name]}'")
-            
-        doc.close()
+                    print(f"⚠️ OCR not available ({str(e)}), using block text for {ocr_fields}")
+
+            for field_name, rect in coords.items():
+                print(f"🔍 Extracted '{field_name}' from rect({rect.x0}, {rect.y0}, {rect.x1}, {rect.y1}): '{extracted_data[field_name]}'")
+
         return extracted_data
 
     except Exception as e:
         print(f"❌ Error extracting text: {str(e)}")
         return {}
 
+def ocr_page_fields(page, field_rects, draft_hash, dpi=None):
+    """
+    OCR several field rectangles of one page.
+
+    The page is rasterized once at FINAL_OCR_DPI, fields are cropped out of that
+    single buffer as views, and all crops are recognised in parallel on the
+    persistent OCR pool. Results are cached per (draft hash, field, dpi).
+    """
+    from .ocr_engine import ocr_regions, cached_ocr_text
+
+    dpi = dpi or FINAL_OCR_DPI
+    cache_keys = {name: f"final:{draft_hash}:{name}:{dpi}" for name in field_rects}
+
+    # Skip rasterizing entirely when every field is already cached
+    cached = {name: cached_ocr_text(key) for name, key in cache_keys.items()}
+    results = {name: text.strip() for name, text in cached.items() if text is not None}
+    if len(results) == len(field_rects):
+        return results
+
+    scale = dpi / 72.0
+    pix = page.get_pixmap(dpi=dpi, alpha=False)
+
+    try:
+        import numpy as np
+        # Zero-copy view over the pixmap's sample buffer
+        page_image = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        crop = lambda x0, y0, x1, y1: page_image[y0:y1, x0:x1]
+    except ImportError:
+        from PIL import Image
+        page_image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        crop = lambda x0, y0, x1, y1: page_image.crop((x0, y0, x1, y1))
+
+    regions = {}
+    for field_name, rect in field_rects.items():
+        if field_name in results:
+            continue
+        clip = (rect & page.rect) * fitz.Matrix(scale, scale)
+        x0, y0 = max(0, int(clip.x0)), max(0, int(clip.y0))
+        x1, y1 = min(pix.width, int(round(clip.x1))), min(pix.height, int(round(clip.y1)))
+        if x1 <= x0 or y1 <= y0:
+            continue
+        regions[field_name] = (crop(x0, y0, x1, y1), cache_keys[field_name])
+
+    print(f"🔍 OCR fallback: {len(regions)} field(s) from one {pix.width}x{pix.height} raster at {dpi} dpi")
+    try:
+        # The cache was checked above; don't count these misses twice
+        results.update({name: text.strip() for name, text in ocr_regions(regions, check_cache=False).items()})
+        return results
+    finally:
+        # The crops are views into the raster; release both now rather than at GC time
+        regions.clear()
+        del page_image, crop, pix
+
 def extract_text_from_pdf_pypdf(pdf_path, coords):
     """Extract text from specific coordinates using pypdf"""
     extracted_data = {}
 
     try:
         # Open PDF with pypdf
-        with open(pdf_path, 'rb') as file:
+        with (io.BytesIO(pdf_path) if isinstance(pdf_path, (bytes, bytearray)) else open(pdf_path, 'rb')) as file:
             pdf_reader = pypdf.PdfReader(file)
             page = pdf_reader.pages[0]  # First page
             
@@ -165,23 +243,7 @@ def extract_text_from_pdf_pypdf(pdf_path, coords):
 
 def get_text_height(text, fontsize, fontname, max_width):
     """Calculate text height for wrapping"""
-    font = fitz.Font(fontname=fontname)
-    words = text.split()
-    lines = []
-    current_line = ""
-    
-    for word in words:
-        test_line = current_line + (" " if current_line else "") + word
-        if font.text_length(test_line, fontsize) <= max_width:
-            current_line = test_line
-        else:
-            lines.append(current_line)
-            current_line = word
-    
-    if current_line:
-        lines.append(current_line)
-    
-    return len(lines) * fontsize * 1.0
+    return text_line_count(text, fontname, fontsize, max_width) * fontsize * 1.0
 
 def insert_centered_textbox(page, rect, text, fontname, fontsize, color):
     """Insert text centered in a rectangle with wrapping"""
@@ -200,16 +262,26 @@ def insert_centered_textbox(page, rect, text, fontname, fontsize, color):
         fontsize=fontsize, fontname=fontname, color=color
     )
 
-def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data, date_fields):
-    """It certificate from draft PDF and date fields"""
+def get_final_template():
+    """Return the parsed Final.pdf template, loading it once per process."""
+    global _final_template_doc
+    if _final_template_doc is None:
+        if not os.path.exists(FINAL_TEMPLATE_PATH):
+            raise FileNotFoundError(f"Final certificate template not found at {FINAL_TEMPLATE_PATH} (set FINAL_TEMPLATE_PATH)")
+        with open(FINAL_TEMPLATE_PATH, "rb") as f:
+            _final_template_doc = fitz.open(stream=f.read(), filetype="pdf")
+        print(f"[INFO] Final template loaded into memory from {FINAL_TEMPLATE_PATH}")
+    return _final_template_doc
+
+def render_final_certificate(extracted_data, date_fields, save_profile=None):
+    """Render a final certificate onto the in-memory Final.pdf template and return the PDF bytes."""
+    # Copy the parsed template into a fresh document instead of re-reading Final.pdf
+    doc = fitz.open()
+    with close_on_error(doc):
+        doc.insert_pdf(get_final_template())
+    page = doc[0]
+    
     try:
-        # Use Final.pdf from the same directory as the script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        final_template_path = os.path.join(script_dir, "Final.pdf")
-        
-        # Open the final template
-        doc = fitz.open(final_template_path)
-        page = doc[0]
         
         # Define coordinates for fields in Final.pdf template
         coords = {
@@ -353,19 +425,7 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
                 font_obj = fitz.Font(fontname=fontname)
                 print(f"[INFO] Fallback font for Scope: {fontname} (Bold)")
             # PowerPoint-style centering with automatic font size reduction
-            words = scope_text.split()
-            lines = []
-            current_line = ""
-            for word in words:
-                test_line = current_line + (" " if current_line else "") + word
-                if font_obj.text_length(test_line, font_size) <= rect.width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        lines.append(current_line)
-                    current_line = word
-            if current_line:
-                lines.append(current_line)
+            lines = wrap_words(scope_text.split(), fontname, font_size, rect.width)
             line_height = font_size * 1.0
             total_height = len(lines) * line_height
             start_y = rect.y0 + (rect.height - total_height) / 2 + font_size/3
@@ -406,9 +466,18 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
                 )
                 print(f"✅ {field}: {value} (Bodoni MT 14pt, left-aligned)")
         
-        # Save the final certificate
-        doc.save(output_pdf_path)
+        # Serialize the final certificate
+        return pdf_to_bytes(doc, save_profile)
+    
+    finally:
         doc.close()
+
+def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data, date_fields):
+    """It certificate from draft PDF and date fields"""
+    try:
+        pdf_bytes = render_final_certificate(extracted_data, date_fields)
+        with open(output_pdf_path, "wb") as f:
+            f.write(pdf_bytes)
         
         print(f"✅ Final certificate saved at: {output_pdf_path}")
         return True
@@ -417,8 +486,28 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
         print(f"❌ Error generating final certificate: {str(e)}")
         return False
 
-def extract_from_draft_pdf(draft_pdf_path):
-    """Extract data from draft PDF"""
+def convert_draft_to_final(draft_pdf_bytes, date_fields, save_profile=None):
+    """
+    Convert one draft PDF (bytes) into a final certificate (bytes).
+    Runs inside render pool workers, so arguments and result are plain bytes/dicts.
+    """
+    with stage("extract"):
+        extracted_data = extract_from_draft_pdf(draft_pdf_bytes)
+    if not extracted_data:
+        raise ValueError("Could not read certificate fields from draft")
+    return render_final_certificate(extracted_data, date_fields or {}, save_profile)
+
+def extract_from_draft_pdf(draft_pdf_path, use_ocr_fallback=None):
+    """Extract data from draft PDF (path or bytes); use_ocr_fallback defaults to FINAL_OCR_FALLBACK."""
+    if use_ocr_fallback is None:
+        use_ocr_fallback = FINAL_OCR_FALLBACK
+    # Drafts generated by generate_certificate carry their exact input values
+    payload = read_draft_payload(draft_pdf_path)
+    if payload:
+        print(f"[INFO] Using embedded draft payload ({payload.get('template_type', 'unknown')} template)")
+        return payload_to_extracted_data(payload)
+    
+    # Legacy drafts: fall back to text extraction from fixed rectangles
     # Define coordinates for extracting from draft PDF
     draft_coords = {
         "Company Name": fitz.Rect(179.2, 233.6, 476.0, 266.4),
@@ -430,7 +519,7 @@ def extract_from_draft_pdf(draft_pdf_path):
     # Try PyMuPDF rectangle-based extraction first, fallback to pypdf if needed
     try:
         print("[INFO] Trying PyMuPDF rectangle-based extraction for all fields...")
-        return extract_text_from_pdf(draft_pdf_path, draft_coords)
+        return extract_text_from_pdf(draft_pdf_path, draft_coords, use_ocr_fallback)
     except Exception as e:
         print(f"⚠️ PyMuPDF failed, trying pypdf keyword/phrase extraction: {str(e)}")
         return extract_text_from_pdf_pypdf(draft_pdf_path, draft_coords)
@@ -7,8 +7,16 @@ import requests
 import json
 from PIL import Image
 import qrcode
+from .iso_standards import ISO_STANDARDS_DESCRIPTIONS, expand_iso_standard, get_iso_standard_code
+from .layout_cache import get_cached_layout
+from .text_fit import fit_font_size, scope_line_count, text_line_count, wrap_paragraphs, wrap_scope_lines
+from .timings import timed_stage
+from .draft_payload import embed_draft_payload
+from .save_profiles import save_pdf
+from .resources import close_on_error, close_quietly
 # FastAPI imports removed since they're not needed anymore
 
+@timed_stage("qr")
 def generate_certification_qr_code(cert_data: dict, size: int = 300) -> Image.Image:
     """
     Generate a QR code containing certification information that opens a URL when scanned.
@@ -64,6 +72,7 @@ def generate_certification_qr_code(cert_data: dict, size: int = 300) -> Image.Im
     
     return qr_image
 
+@timed_stage("qr")
 def add_qr_code_to_pdf(pdf_document, qr_image: Image.Image, x: float, y: float, width: float, height: float):
     """
     Add QR code image to PDF at specified coordinates.
@@ -151,188 +160,16 @@ def _font_obj(resolved_font: Dict[str, str | None]):
         return fitz.Font(file=resolved_font["fontfile"])
     return fitz.Font(fontname=resolved_font["fontname"])
 
-# ISO Standards Mapping - Convert short names to full versions with years
-ISO_STANDARDS_MAPPING = {
-    # Quality & Management
-    "ISO 9001": "ISO 9001:2015",
-    "9001": "ISO 9001:2015",
-    "ISO 14001": "ISO 14001:2015",
-    "14001": "ISO 14001:2015",
-    "ISO 45001": "ISO 45001:2018",
-    "45001": "ISO 45001:2018",
-    "ISO 50001": "ISO 50001:2018",
-    "50001": "ISO 50001:2018",
-    "ISO 31000": "ISO 31000:2018",
-    "31000": "ISO 31000:2018",
-
-    # Food Safety
-    "ISO 22000": "ISO 22000:2018",
-    "22000": "ISO 22000:2018",
-    "ISO/TS 22002-1": "ISO/TS 22002-1:2009",
-    "22002-1": "ISO/TS 22002-1:2009",
-    "ISO 22005": "ISO 22005:2007",
-    "22005": "ISO 22005:2007",
-
-    # Laboratory & Testing
-    "ISO/IEC 17025": "ISO/IEC 17025:2017",
-    "17025": "ISO/IEC 17025:2017",
-    "ISO 15189": "ISO 15189:2022",
-    "15189": "ISO 15189:2022",
-
-    # Information Security & IT
-    "ISO/IEC 27001": "ISO/IEC 27001:2022",
-    "27001": "ISO/IEC 27001:2022",
-    "ISO/IEC 27002": "ISO/IEC 27002:2022",
-    "27002": "ISO/IEC 27002:2022",
-    "ISO/IEC 20000-1": "ISO/IEC 20000-1:2018",
-    "20000-1": "ISO/IEC 20000-1:2018",
-    "ISO/IEC 22301": "ISO/IEC 22301:2019",
-    "22301": "ISO/IEC 22301:2019",
-
-    # Manufacturing & Industrial
-    "ISO 13485": "ISO 13485:2016",
-    "13485": "ISO 13485:2016",
-    "IATF 16949": "IATF 16949:2016",
-    "16949": "IATF 16949:2016",
-    "ISO 3834-2": "ISO 3834-2:2021",
-    "3834-2": "ISO 3834-2:2021",
-
-    # Environment & Sustainability
-    "ISO 14064-1": "ISO 14064-1:2018",
-    "14064-1": "ISO 14064-1:2018",
-    "ISO 14046": "ISO 14046:2014",
-    "14046": "ISO 14046:2014",
-    "ISO 20121": "ISO 20121:2012",
-    "20121": "ISO 20121:2012",
-
-    # Asset, Facility, and Supply Chain
-    "ISO 55001": "ISO 55001:2014",
-    "55001": "ISO 55001:2014",
-    "ISO 28000": "ISO 28000:2022",
-    "28000": "ISO 28000:2022",
-
-    # Aerospace
-    "AS 9100D": "AS 9100D:2016",
-    "9100D": "AS 9100D:2016",
-
-    # Other Notable Standards
-    "ISO 37001": "ISO 37001:2016",
-    "37001": "ISO 37001:2016",
-    "ISO 19600": "ISO 19600:2014",
-    "19600": "ISO 19600:2014",
-    "ISO 29993": "ISO 29993:2017",
-    "29993": "ISO 29993:2017",
-}
-
-# ISO Standards Code Mapping - For certification codes
-ISO_STANDARDS_CODES = {
-    "ISO 9001:2015": "CM-MS-7842",
-    "ISO 14001:2015": "CM-MS-7836", 
-    "ISO 45001:2018": "CM-MS-7832",
-    "ISO 22000:2018": "CM-MS-7822",
-    "ISO/IEC 27001:2022": "CM-MS-7820",
-    "ISO 37001:2016": "CM-MS-7804",
-    "ISO/IEC 22301:2019": "CM-MS-7807",
-    "ISO 50001:2018": "CM-MS-7814",
-    "ISO 20001:2018": "CM-MS-7811",
-}
-
-# ISO Standards Descriptions Mapping - For separate use
-ISO_STANDARDS_DESCRIPTIONS = {
-    "ISO 9001:2015": "Quality Management System",
-    "ISO 14001:2015": "Environmental Management System",
-    "ISO 45001:2018": "Occupational Health & Safety",
-    "ISO 50001:2018": "Energy Management System",
-    "ISO 31000:2018": "Risk Management Guidelines",
-    "ISO 22000:2018": "Food Safety Management System",
-    "ISO/TS 22002-1:2009": "Prerequisite programs on food safety",
-    "ISO 22005:2007": "Traceability in the feed and food chain",
-    "ISO/IEC 17025:2017": "Testing and Calibration Laboratories",
-    "ISO 15189:2022": "Medical Laboratories – Quality and Competence",
-    "ISO/IEC 27001:2022": "Information Security Management System",
-    "ISO/IEC 27002:2022": "Information Security Controls",
-    "ISO/IEC 20000-1:2018": "IT Service Management System",
-    "ISO/IEC 22301:2019": "Business Continuity Management System",
-    "ISO 13485:2016": "Medical Devices – Quality Management System",
-    "IATF 16949:2016": "Automotive Quality Management System",
-    "ISO 3834-2:2021": "Quality requirements for fusion welding",
-    "ISO 14064-1:2018": "Greenhouse Gases",
-    "ISO 14046:2014": "Water Footprint",
-    "ISO 20121:2012": "Event Sustainability Management System",
-    "ISO 55001:2014": "Asset Management System",
-    "ISO 28000:2022": "Security Management Systems for Supply Chain",
-    "AS 9100D:2016": "Aerospace Quality (based on ISO 9001:2015)",
-    "ISO 37001:2016": "Anti-bribery Management System",
-    "ISO 19600:2014": "Compliance Management System",
-    "ISO 29993:2017": "Learning Services",
-}
-
-def expand_iso_standard(iso_text: str) -> str:
-    """Expand ISO standard name to full version with year if available."""
-    if not iso_text:
-        return iso_text
-
-    # Clean the input text
-    cleaned_text = iso_text.strip()
-
-    # First, try exact match
-    if cleaned_text in ISO_STANDARDS_MAPPING:
-        return ISO_STANDARDS_MAPPING[cleaned_text]
-
-    # If no exact match, try to find partial matches
-    # This handles cases where users might enter variations
-    for short_name, full_name in ISO_STANDARDS_MAPPING.items():
-        # Check if the input contains the standard number
-        if short_name.lower() in cleaned_text.lower():
-            return full_name
-
-    # If still no match, try to extract just the number and match
-    # This handles cases like "37001" when we have "37001" in mapping
-    import re
-    number_match = re.search(r'(\d+(?:-\d+)?)', cleaned_text)
-    if number_match:
-        number = number_match.group(1)
-        if number in ISO_STANDARDS_MAPPING:
-            return ISO_STANDARDS_MAPPING[number]
-
-    # If no match found, return original text
-    return iso_text
-
-def get_iso_standard_code(iso_standard: str) -> str:
-    """
-    Get the certification code for a given ISO standard.
-    Example: "ISO 9001:2015" -> "CM-MS-7842"
-    Returns empty string if no code mapping exists.
-    """
-    if not iso_standard:
-        return ""
-    
-    # First expand the ISO standard if it's a short name
-    expanded_iso = expand_iso_standard(iso_standard)
-    # Look up the code in the mapping
-    return ISO_STANDARDS_CODES.get(expanded_iso, "")
-
 def get_text_height(text: str, fontsize: float, fontname: str, max_width: float, template_type: str = "standard") -> float:
     """Estimate the height of a text block when wrapped to fit max_width."""
-    font = fitz.Font(fontname=fontname)
-    words = text.split()
-    lines = []
-    current_line = ""
-    for word in words:
-        test_line = current_line + (" " if current_line else "") + word
-        if font.text_length(test_line, fontsize) <= max_width:
-            current_line = test_line
-        else:
-            lines.append(current_line)
-            current_line = word
-    if current_line:
-        lines.append(current_line)
-    
-    # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
+    line_count = text_line_count(text, fontname, fontsize, max_width)
+    return line_count * fontsize * get_line_factor(template_type)
+
+def get_line_factor(template_type: str) -> float:
+    """Template-specific line spacing: 1.1 for large/logo, 1.2 for standard"""
     if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
-        return len(lines) * fontsize * 1.1  # Tight spacing for large/logo templates
-    else:
-        return len(lines) * fontsize * 1.2  # Loose spacing for standard templates
+        return 1.1  # Tight spacing for large/logo templates
+    return 1.2  # Loose spacing for standard templates
 
 def insert_centered_textbox(
     page: fitz.Page,
@@ -490,7 +327,7 @@ def render_optional_fields(page, values, key_coords, value_coords, font_settings
         "issue_date_coords": issue_date_coords
     }
 
-def generate_printable_cert(base_pdf_path: str, output_pdf_path: str, values: Dict[str, str], template_type: str = "standard") -> None:
+def generate_printable_cert(base_pdf_path: str, output_pdf_path: str, values: Dict[str, str], template_type: str = "standard", save_profile: str = None) -> None:
     """
     Generate printable certificate PDF with the SAME advanced logic as generate_certificate.
 
@@ -499,8 +336,18 @@ def generate_printable_cert(base_pdf_path: str, output_pdf_path: str, values: Di
         output_pdf_path: Path where the generated PDF will be saved
         values: Dictionary of field values
         template_type: "standard" or "large" template type
+        save_profile: "fast", "compact" or "archival" (see rise/save_profiles.py)
     """
     doc = fitz.open(base_pdf_path)
+    try:
+        _draw_printable(doc, values, template_type)
+        save_pdf(doc, output_pdf_path, save_profile)
+    finally:
+        doc.close()
+
+
+def _draw_printable(doc, values: Dict[str, str], template_type: str):
+    """Draw the printable certificate fields onto doc."""
     page = doc[0]
 
     # --- Register Bodoni (BOD_R.TTF) once and use a clean alias ---
@@ -1100,144 +947,122 @@ def generate_printable_cert(base_pdf_path: str, output_pdf_path: str, values: Di
             else:
                 print(f"✅ [SOFTCOPY] Address text is valid and non-empty")
 
-            # ✅ UPDATED: Dynamic Company Name font sizing based on line count
-            # First, determine if Company Name will be single line or multi-line
-            company_lines_count = len([line for line in company_processed_lines if line.strip()])
+            # Fit Company Name and Address once per text/box/font/template; later
+            # renders of the same client reuse the wrapped lines and font sizes
+            def fit_company_address():
+                # ✅ UPDATED: Dynamic Company Name font sizing based on line count
+                # First, determine if Company Name will be single line or multi-line
+                company_lines_count = len([line for line in company_processed_lines if line.strip()])
             
-            # Set initial font size based on line count
-            if company_lines_count <= 1:
-                company_font_size = 35  # Single line - start with 35pt
-                print(f"🔍 [PRINTABLE] Company Name: Single line detected, starting with {company_font_size}pt")
-            else:
-                company_font_size = 30  # Multiple lines - start with 30pt
-                print(f"🔍 [PRINTABLE] Company Name: {company_lines_count} lines detected, starting with {company_font_size}pt")
+                # Set initial font size based on line count
+                if company_lines_count <= 1:
+                    company_font_size = 35  # Single line - start with 35pt
+                    print(f"🔍 [PRINTABLE] Company Name: Single line detected, starting with {company_font_size}pt")
+                else:
+                    company_font_size = 30  # Multiple lines - start with 30pt
+                    print(f"🔍 [PRINTABLE] Company Name: {company_lines_count} lines detected, starting with {company_font_size}pt")
             
-            address_font_size = 13.6
+                address_font_size = 13.6
             
-            # Variables to store the final wrapped lines and font sizes
-            final_company_lines = []
-            final_address_lines = []
+                # Variables to store the final wrapped lines and font sizes
+                final_company_lines = []
+                final_address_lines = []
             
-            # ✅ IMPROVED: Different logic for single line vs multi-line company names
-            if company_lines_count <= 1:
-                # NO cmd+enter in Excel: Force single line, use font reduction only
-                print(f"🔍 [PRINTABLE] No cmd+enter detected - forcing single line with font reduction")
+                # ✅ IMPROVED: Different logic for single line vs multi-line company names
+                if company_lines_count <= 1:
+                    # NO cmd+enter in Excel: Force single line, use font reduction only
+                    print(f"🔍 [PRINTABLE] No cmd+enter detected - forcing single line with font reduction")
                 
-                while company_font_size >= 8:  # Minimum font size
-                    # Check if entire company name fits in one line at current font size
-                    font_obj = fitz.Font(fontname=fontname)
-                    text_width = font_obj.text_length(company_text, company_font_size)
+                    while company_font_size >= 8:  # Minimum font size
+                        # Check if entire company name fits in one line at current font size
+                        font_obj = fitz.Font(fontname=fontname)
+                        text_width = font_obj.text_length(company_text, company_font_size)
                     
-                    if text_width <= rect.width - 10:  # Leave margin
-                        # Text fits in one line - use this font size
-                        final_company_lines = [company_text]  # Single line
-                        print(f"✅ [PRINTABLE] Company name fits in one line at {company_font_size}pt (width: {text_width:.1f}pt)")
-                        break
-                    else:
-                        # Text too wide - reduce font size and try again
-                        print(f"🔍 [PRINTABLE] Company name too wide at {company_font_size}pt (width: {text_width:.1f}pt > {rect.width - 10:.1f}pt), reducing to {company_font_size - 1}pt")
-                        company_font_size -= 1
+                        if text_width <= rect.width - 10:  # Leave margin
+                            # Text fits in one line - use this font size
+                            final_company_lines = [company_text]  # Single line
+                            print(f"✅ [PRINTABLE] Company name fits in one line at {company_font_size}pt (width: {text_width:.1f}pt)")
+                            break
+                        else:
+                            # Text too wide - reduce font size and try again
+                            print(f"🔍 [PRINTABLE] Company name too wide at {company_font_size}pt (width: {text_width:.1f}pt > {rect.width - 10:.1f}pt), reducing to {company_font_size - 1}pt")
+                            company_font_size -= 1
                 
-                # If we reached minimum font size and still doesn't fit, use the minimum
-                if company_font_size < 8:
-                    company_font_size = 8
-                    final_company_lines = [company_text]
-                    print(f"⚠️ [PRINTABLE] Company name forced to minimum font size 8pt")
+                    # If we reached minimum font size and still doesn't fit, use the minimum
+                    if company_font_size < 8:
+                        company_font_size = 8
+                        final_company_lines = [company_text]
+                        print(f"⚠️ [PRINTABLE] Company name forced to minimum font size 8pt")
                 
-            else:
-                # cmd+enter present in Excel: Allow word wrapping up to 2 lines
-                print(f"🔍 [PRINTABLE] cmd+enter detected - allowing word wrapping up to 2 lines")
+                else:
+                    # cmd+enter present in Excel: Allow word wrapping up to 2 lines
+                    print(f"🔍 [PRINTABLE] cmd+enter detected - allowing word wrapping up to 2 lines")
                 
-                while company_font_size >= 8:  # Minimum font size
-                    company_lines = []
+                    while company_font_size >= 8:  # Minimum font size
+                        # Word-wrap each pre-processed line; empty lines are preserved to maintain spacing
+                        company_lines = wrap_paragraphs(company_processed_lines, fontname, company_font_size, rect.width - 10)  # Leave margin
                     
-                    # Process each pre-processed line with word wrapping
-                    for processed_line in company_processed_lines:
-                        if not processed_line.strip():  # Empty line - preserve it
-                            company_lines.append("")  # Add empty line to maintain spacing
-                            continue
-                        
-                        # Non-empty line - apply word wrapping
-                        words = processed_line.split()
-                        current_line = ""
-                        
-                        for word in words:
-                            test_line = current_line + (" " if current_line else "") + word
-                            font_obj = fitz.Font(fontname=fontname)
-                            if font_obj.text_length(test_line, company_font_size) <= rect.width - 10:  # Leave margin
-                                current_line = test_line
-                            else:
-                                if current_line:
-                                    company_lines.append(current_line)
-                                current_line = word
-                        
-                        if current_line:
-                            company_lines.append(current_line)
+                        # ✅ UPDATED: Allow Company Name to use up to 2 lines (after line breaks + word wrapping)
+                        if len(company_lines) <= 2:
+                            final_company_lines = company_lines.copy()
+                            break
                     
-                    # ✅ UPDATED: Allow Company Name to use up to 2 lines (after line breaks + word wrapping)
-                    if len(company_lines) <= 2:
-                        final_company_lines = company_lines.copy()
-                        break
-                    
-                    # Reduce Company Name font size
-                    company_font_size -= 1
+                        # Reduce Company Name font size
+                        company_font_size -= 1
 
-            # Calculate Company Name height
-            # Consistent line spacing: 1.05 for all templates
-            company_height = len(final_company_lines) * company_font_size * 1.05  # Consistent spacing for all templates
+                # Calculate Company Name height
+                # Consistent line spacing: 1.05 for all templates
+                company_height = len(final_company_lines) * company_font_size * 1.05  # Consistent spacing for all templates
 
-            # Now find font size for Address to fit in remaining space
-            remaining_height = rect.height - company_height - 2  # Leave margin
+                # Now find font size for Address to fit in remaining space
+                remaining_height = rect.height - company_height - 2  # Leave margin
            
 
-            address_font_size_attempts = 0
-            while address_font_size >= 6:  # Minimum font size
-                address_font_size_attempts += 1
-                print(f"🔍 [SOFTCOPY] Font size attempt {address_font_size_attempts}: {address_font_size}pt")
-
-                # Process Address using pre-processed lines with word wrapping
-                address_lines = []
-
-                # Process each pre-processed address line with word wrapping
-                for processed_line in address_processed_lines:
-                    if not processed_line.strip():  # Empty line - preserve it
-                        address_lines.append("")  # Add empty line to maintain spacing
-                        continue
-                    
-                    # Non-empty line - apply word wrapping
-                    words = processed_line.split()
-                    current_line = ""
-
-                    for word in words:
-                        test_line = current_line + (" " if current_line else "") + word
-                        font_obj = fitz.Font(fontname=fontname)
-                        test_width = font_obj.text_length(test_line, address_font_size)
-                        if test_width <= rect.width - 10:  # Leave margin
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                address_lines.append(current_line)
-                            current_line = word
-
-                    if current_line:
-                        address_lines.append(current_line)
+                address_font_size_attempts = 0
+                while address_font_size >= 6:  # Minimum font size
+                    address_font_size_attempts += 1
+                    print(f"🔍 [SOFTCOPY] Font size attempt {address_font_size_attempts}: {address_font_size}pt")
 
-                # Calculate Address height
-                # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
-                if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
-                    address_height = len(address_lines) * address_font_size * 1.1  # Tight spacing for large/logo templates
-                else:  # standard templates
-                    address_height = len(address_lines) * address_font_size * 1.2  # Loose spacing for standard templates
+                    # Process Address using pre-processed lines with word wrapping (empty lines preserved for spacing)
+                    address_lines = wrap_paragraphs(address_processed_lines, fontname, address_font_size, rect.width - 10)  # Leave margin
 
-                # Check if Address fits in remaining space
-                if address_height <= remaining_height:
-                    final_address_lines = address_lines.copy()
-                    break
-                else:
-                    print(f"❌ [SOFTCOPY] Address too tall: {address_height:.1f}pt > {remaining_height:.1f}pt, reducing font size")
+                    # Calculate Address height
+                    # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
+                    if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+                        address_height = len(address_lines) * address_font_size * 1.1  # Tight spacing for large/logo templates
+                    else:  # standard templates
+                        address_height = len(address_lines) * address_font_size * 1.2  # Loose spacing for standard templates
 
-                # Reduce Address font size
-                address_font_size -= 0.5
+                    # Check if Address fits in remaining space
+                    if address_height <= remaining_height:
+                        final_address_lines = address_lines.copy()
+                        break
+                    else:
+                        print(f"❌ [SOFTCOPY] Address too tall: {address_height:.1f}pt > {remaining_height:.1f}pt, reducing font size")
+
+                    # Reduce Address font size
+                    address_font_size -= 0.5
+
+                return {
+                    "company_font_size": company_font_size,
+                    "address_font_size": address_font_size,
+                    "final_company_lines": final_company_lines,
+                    "final_address_lines": final_address_lines,
+                    "company_height": company_height,
+                    "address_height": address_height,
+                }
+
+            layout = get_cached_layout(
+                "printable", "Company Name and Address", (company_text, address_text), rect, fontname,
+                font_starts.get("Company Name and Address", 30) if font_starts else 30, address_alignment, template_type, fit_company_address,
+            )
+            company_font_size = layout["company_font_size"]
+            address_font_size = layout["address_font_size"]
+            final_company_lines = layout["final_company_lines"]
+            final_address_lines = layout["final_address_lines"]
+            company_height = layout["company_height"]
+            address_height = layout["address_height"]
+            font_obj = fitz.Font(fontname=fontname)
 
             # Now render Company Name and Address dynamically
             if final_company_lines or final_address_lines:
@@ -1462,14 +1287,8 @@ def generate_printable_cert(base_pdf_path: str, output_pdf_path: str, values: Di
             start_size = font_starts.get("ISO Standard", 80)
             font_size = start_size
 
-            # Reduce font size if it doesn't fit, but ensure minimum size
-            while font_size >= 12:  # Increased minimum from 10 to 12
-                text_height = get_text_height(text, font_size, fontname, rect.width, template_type)
-                limit = rect.height
-
-                if text_height <= limit:
-                    break
-                font_size -= 1
+            # Reduce font size if it doesn't fit, but ensure minimum size (12pt)
+            font_size = fit_font_size(text, fontname, rect.width, rect.height, start_size, get_line_factor(template_type))
 
             # Perfect centering for ISO Standard - both horizontal and vertical
             center_x = (rect.x0 + rect.x1) / 2
@@ -1578,215 +1397,76 @@ def generate_printable_cert(base_pdf_path: str, output_pdf_path: str, values: Di
             print(f"🔍 [PRINTABLE DEBUG] Scope Text Length: {len(text)} characters")
             print(f"🔍 [PRINTABLE DEBUG] Starting font size: {font_size}pt")
 
-            # Reduce font size if it doesn't fit, but ensure minimum size
-            while font_size >= 12:  # Increased minimum from 10 to 12
-                text_height = get_text_height(text, font_size, fontname, rect.width, template_type)
-                limit = rect.height
-                
-                print(f"🔍 [PRINTABLE DEBUG] Font size {font_size}pt: Calculated height {text_height:.1f}pt, Available height {limit:.1f}pt, Difference {text_height - limit:.1f}pt")
-
-                if text_height <= limit:
-                    print(f"🔍 [PRINTABLE DEBUG] ✅ Text fits at font size {font_size}pt")
-                    break
-                print(f"🔍 [PRINTABLE DEBUG] ❌ Text too tall, reducing to {font_size - 1}pt")
-                font_size -= 1
+            # Reduce font size if it doesn't fit, but ensure minimum size (12pt)
+            font_size = fit_font_size(text, fontname, rect.width, rect.height, start_size, get_line_factor(template_type))
+            print(f"🔍 [PRINTABLE DEBUG] Font size after fit: {font_size}pt (available height {rect.height:.1f}pt)")
 
             # PowerPoint-style centering with automatic font size reduction
             original_font_size = font_size
 
            
 
-            # Reduce font size until text fits within box boundaries
-            font_size = original_font_size
-            iteration_count = 0
-
-            while font_size >= 8:  # Minimum font size
-                iteration_count += 1
-
-                # Enhanced text processing with bullet point detection AND line break preservation
-                lines = []
-                
-                # Split text by actual line breaks first
-                if '\n' in text:
-                    # Handle line breaks properly
-                    text_lines = text.split('\n')
-                    for text_line in text_lines:
-                        if text_line.strip():  # Only process non-empty lines
-                            # Process each line for word wrapping and bullet points
-                            words = text_line.strip().split()
-                            current_line = ""
-                            
-                            for word in words:
-                                # Check if word starts with bullet point indicators
-                                is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                                
-                                # If it's a bullet point and we have content, start a new line
-                                if is_bullet_point and current_line:
-                                    lines.append(current_line)
-                                    # Replace * with • for display (in font size calculation)
-                                    if word.startswith('*'):
-                                        # ✅ Safe string handling for bullet point slice
-                                        safe_word = str(word) if word is not None else ""
-                                        print(f"🔄 [SOFTCOPY BULLET] Will replace '{safe_word}' with '•{safe_word[1:]}' in final rendering")
-                                    current_line = word
-                                    continue
-                                
-                                test_line = current_line + (" " if current_line else "") + word
-                                font_obj = fitz.Font(fontname=fontname)
-                                
-                                if font_obj.text_length(test_line, font_size) <= rect.width:
-                                    current_line = test_line
-                                else:
-                                    if current_line:
-                                        lines.append(current_line)
-                                    current_line = word
-                            
-                            if current_line:
-                                lines.append(current_line)
-                else:
-                    # No line breaks, process as single block
-                    words = text.split()
-                    current_line = ""
-                    
-                    for word in words:
-                        # Check if word starts with bullet point indicators
-                        is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                        
-                        # If it's a bullet point and we have content, start a new line
-                        if is_bullet_point and current_line:
-                            lines.append(current_line)
-                            # Replace * with • for display (in font size calculation)
-                            if word.startswith('*'):
-                                # ✅ Safe string handling for bullet point slice
-                                safe_word = str(word) if word is not None else ""
-                                print(f"🔄 [SOFTCOPY BULLET] Will replace '{safe_word}' with '•{safe_word[1:]}' in final rendering")
-                            current_line = word
-                            continue
-                        
-                        test_line = current_line + (" " if current_line else "") + word
-                        font_obj = fitz.Font(fontname=fontname)
-                        
-                        if font_obj.text_length(test_line, font_size) <= rect.width:
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                lines.append(current_line)
-                            current_line = word
-                    
-                    if current_line:
-                        lines.append(current_line)
-
-                # Calculate total height of all lines
-                # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
-                if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
-                    line_height = font_size * 1.1  # Tight spacing for large/logo templates
-                else:  # standard templates
-                    line_height = font_size * 1.2  # Loose spacing for standard templates
-                total_height = len(lines) * line_height
-
-                # ✅ ADDED: Debug logging for detailed height calculations
-                print(f"🔍 [PRINTABLE DEBUG] ===== DETAILED HEIGHT CALCULATION =====")
-                print(f"🔍 [PRINTABLE DEBUG] Font size: {font_size}pt")
-                print(f"🔍 [PRINTABLE DEBUG] Line count: {len(lines)}")
-                print(f"🔍 [PRINTABLE DEBUG] Line height: {line_height:.1f}pt")
-                print(f"🔍 [PRINTABLE DEBUG] Total calculated height: {total_height:.1f}pt")
-                print(f"🔍 [PRINTABLE DEBUG] Available height: {rect.height:.1f}pt")
-                print(f"🔍 [PRINTABLE DEBUG] Height difference: {total_height - rect.height:.1f}pt")
-                print(f"🔍 [PRINTABLE DEBUG] Height utilization: {(total_height/rect.height)*100:.1f}%")
+            # Shrink-to-fit and wrap once per text/box/font/template; later renders
+            # of the same scope reuse the fitted font size and lines
+            def fit_scope():
+                # Reduce font size until text fits within box boundaries
+                font_size = original_font_size
+                iteration_count = 0
+
+                while font_size >= 8:  # Minimum font size
+                    iteration_count += 1
+
+                    # Enhanced text processing with bullet point detection AND line break preservation
+                    line_count = scope_line_count(text, fontname, font_size, rect.width)
+
+                    # Calculate total height of all lines
+                    # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
+                    if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+                        line_height = font_size * 1.1  # Tight spacing for large/logo templates
+                    else:  # standard templates
+                        line_height = font_size * 1.2  # Loose spacing for standard templates
+                    total_height = line_count * line_height
+
+                    # ✅ ADDED: Debug logging for detailed height calculations
+                    print(f"🔍 [PRINTABLE DEBUG] ===== DETAILED HEIGHT CALCULATION =====")
+                    print(f"🔍 [PRINTABLE DEBUG] Font size: {font_size}pt")
+                    print(f"🔍 [PRINTABLE DEBUG] Line count: {line_count}")
+                    print(f"🔍 [PRINTABLE DEBUG] Line height: {line_height:.1f}pt")
+                    print(f"🔍 [PRINTABLE DEBUG] Total calculated height: {total_height:.1f}pt")
+                    print(f"🔍 [PRINTABLE DEBUG] Available height: {rect.height:.1f}pt")
+                    print(f"🔍 [PRINTABLE DEBUG] Height difference: {total_height - rect.height:.1f}pt")
+                    print(f"🔍 [PRINTABLE DEBUG] Height utilization: {(total_height/rect.height)*100:.1f}%")
                
-                # Check if text fits vertically within box boundaries
-                if total_height <= rect.height:  # No margin
-                    print(f"✅ [SOFTCOPY] Font size {font_size}pt FITS! Stopping iteration.")
-                    break
+                    # Check if text fits vertically within box boundaries
+                    if total_height <= rect.height:  # No margin
+                        print(f"✅ [SOFTCOPY] Font size {font_size}pt FITS! Stopping iteration.")
+                        break
 
-                print(f"❌ [SOFTCOPY] Font size {font_size}pt too large, reducing...")
-                font_size -= 1
+                    print(f"❌ [SOFTCOPY] Font size {font_size}pt too large, reducing...")
+                    font_size -= 1
 
-            # DEBUG: Final results
-            print(f"\n🔍 [SOFTCOPY] ===== FINAL SCOPE RESULTS =====")
-            print(f"🔍 [SOFTCOPY] Final font size: {font_size}pt")
-            print(f"🔍 [SOFTCOPY] Font size reduction: {original_font_size - font_size}pt")
-            print(f"🔍 [SOFTCOPY] Total iterations: {iteration_count}")
+                # DEBUG: Final results
+                print(f"\n🔍 [SOFTCOPY] ===== FINAL SCOPE RESULTS =====")
+                print(f"🔍 [SOFTCOPY] Final font size: {font_size}pt")
+                print(f"🔍 [SOFTCOPY] Font size reduction: {original_font_size - font_size}pt")
+                print(f"🔍 [SOFTCOPY] Total iterations: {iteration_count}")
 
-            # Now draw the text with the fitting font size using enhanced processing
-            # Process text to handle line breaks and bullet points properly
+                # Now draw the text with the fitting font size using enhanced processing
+                # Process text to handle line breaks and bullet points properly
             
-            # Replace all asterisks with bullet points for display
-            text = text.replace('*', '•')
+                # Replace all asterisks with bullet points for display
+                display_text = text.replace('*', '•')
             
-            lines = []
-            
-            # Split text by actual line breaks first
-            if '\n' in text:
-                # Handle line breaks properly
-                text_lines = text.split('\n')
-                for text_line in text_lines:
-                    if text_line.strip():  # Only process non-empty lines
-                        # Process each line for word wrapping and bullet points
-                        words = text_line.strip().split()
-                        current_line = ""
-                        
-                        for word in words:
-                            # Check if word starts with bullet point indicators
-                            is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                            
-                            # If it's a bullet point and we have content, start a new line
-                            if is_bullet_point and current_line:
-                                lines.append(current_line)
-                                # Replace * with • for display
-                                display_word = word.replace('*', '•')
-                                if word != display_word:
-                                    print(f"🔄 [SOFTCOPY BULLET] Replaced '{word}' with '{display_word}'")
-                                current_line = display_word
-                                continue
-                            
-                            test_line = current_line + (" " if current_line else "") + word
-                            font_obj = fitz.Font(fontname=fontname)
-                            if font_obj.text_length(test_line, font_size) <= rect.width:
-                                current_line = test_line
-                            else:
-                                if current_line:
-                                    lines.append(current_line)
-                                current_line = word
-                        
-                        if current_line:
-                            lines.append(current_line)
-            else:
-                # No line breaks, process as single block
-                words = text.split()
-                current_line = ""
-                
-                for word in words:
-                    # Check if word starts with bullet point indicators
-                    is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                    
-                    # If it's a bullet point and we have content, start a new line
-                    if is_bullet_point and current_line:
-                        lines.append(current_line)
-                        # Replace * with • for display
-                        display_word = word.replace('*', '•')
-                        if word != display_word:
-                            print(f"🔄 [SOFTCOPY BULLET] Replaced '{word}' with '{display_word}'")
-                        current_line = display_word
-                        continue
-                    
-                    test_line = current_line + (" " if current_line else "") + word
-                    font_obj = fitz.Font(fontname=fontname)
-                    if font_obj.text_length(test_line, font_size) <= rect.width:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-                
-                if current_line:
-                    lines.append(current_line)
+                lines = wrap_scope_lines(display_text, fontname, font_size, rect.width)
 
-            # DEBUG: Line breakdown details
-            print(f"🔍 [SOFTCOPY] Final line breakdown:")
-            for i, line in enumerate(lines):
-                line_width = font_obj.text_length(line, font_size)
-                print(f"   📝 Line {i+1}: '{line}' (width: {line_width:.1f}pt)")
+                return {"font_size": font_size, "lines": lines, "fit_height": total_height}
+
+            layout = get_cached_layout(
+                "printable", "Scope", text, rect, fontname, original_font_size, "", template_type, fit_scope,
+            )
+            font_size = layout["font_size"]
+            lines = layout["lines"]
+            total_height = layout["fit_height"]
 
             # Calculate total height and position vertically based on template type
             # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
@@ -1991,16 +1671,16 @@ def generate_printable_cert(base_pdf_path: str, output_pdf_path: str, values: Di
         print(f"⚠️ [DYNAMIC] Issue Date coordinates not found - using fallback")
 
     # ✅ ADDED: Shared Logo Functions for Phase 5
+    @timed_stage("logo")
     def insert_logo_into_pdf(page, logo_file, logo_rect):
         """
         Insert logo into PDF with smart positioning
         """
         try:
             # Convert logo file to image
-            logo_image = convert_file_to_image(logo_file)
-            
-            # Use smart positioning logic
-            insert_logo_with_smart_positioning(page, logo_image, logo_rect)
+            with convert_file_to_image(logo_file) as logo_image:
+                # Use smart positioning logic
+                insert_logo_with_smart_positioning(page, logo_image, logo_rect)
             
             print(f"✅ [LOGO] Logo inserted successfully: {logo_file.filename if hasattr(logo_file, 'filename') else 'unknown'}")
         except Exception as e:
@@ -2056,6 +1736,8 @@ def generate_printable_cert(base_pdf_path: str, output_pdf_path: str, values: Di
                 print("⚠️ [PRINTABLE] Logo coordinates not found in logo_coords")
         except Exception as logo_insert_error:
             print(f"❌ [PRINTABLE] Error inserting logo: {logo_insert_error}")
+    # The decoded logo is not needed past this point
+    close_quietly(logo_image)
 
     # ✅ ADDED: Render Revision field with dynamic positioning
     if revision and revision.strip():
@@ -2254,7 +1936,11 @@ def generate_printable_cert(base_pdf_path: str, output_pdf_path: str, values: Di
         print(f"⚠️ [SOFTCOPY] Warning: Could not add QR code: {e}")
         print(f"⚠️ [SOFTCOPY] PDF will be generated without QR code")
 
-    doc.save(output_pdf_path)
+    # Embed the exact input values so a later reissue can redraw only the dates
+    try:
+        embed_draft_payload(doc, values, template_type)
+    except Exception as payload_error:
+        print(f"⚠️ [PRINTABLE] Could not embed field payload: {payload_error}")
 
 
 
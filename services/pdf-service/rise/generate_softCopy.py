@@ -7,8 +7,16 @@ import requests
 import json
 from PIL import Image
 import qrcode
+from .iso_standards import ISO_STANDARDS_DESCRIPTIONS, expand_iso_standard, get_iso_standard_code
+from .layout_cache import get_cached_layout
+from .text_fit import fit_font_size, scope_line_count, text_line_count, wrap_paragraphs, wrap_scope_lines
+from .timings import timed_stage
+from .draft_payload import embed_draft_payload
+from .save_profiles import save_pdf
+from .resources import close_on_error, close_quietly
 # FastAPI imports removed since they're not needed anymore
 
+@timed_stage("qr")
 def generate_certification_qr_code(cert_data: dict, size: int = 300) -> Image.Image:
     """
     Generate a QR code containing certification information that opens a URL when scanned.
@@ -64,6 +72,7 @@ def generate_certification_qr_code(cert_data: dict, size: int = 300) -> Image.Im
     
     return qr_image
 
+@timed_stage("qr")
 def add_qr_code_to_pdf(pdf_document, qr_image: Image.Image, x: float, y: float, width: float, height: float):
     """
     Add QR code image to PDF at specified coordinates.
@@ -145,190 +154,30 @@ def resolve_font(preferred_font: str, fallback_font: str = "Times-Roman") -> Dic
     # fallback
     return {"fontname": fallback_font if fallback_font in builtin else "Times-Roman", "fontfile": None}
 
+BODONI_ALIAS = "BodoniMT-Regular"     # no spaces, PostScript-like
+
+def register_bodoni_font(doc) -> bool:
+    """Make Bodoni (BOD_R.TTF) available under BODONI_ALIAS; False means use Times-Roman."""
+    bodoni_path = find_font_path("BOD_R.TTF")
+    try:
+        if bodoni_path:
+            # Make the font available by a no-space alias for the whole doc
+            doc.insert_font(fontname=BODONI_ALIAS, fontfile=bodoni_path)
+            return True
+        return False  # Will use Times-Roman as fallback
+    except Exception:
+        return False
+
 def _font_obj(resolved_font: Dict[str, str | None]):
     """Create font object from resolved font dict."""
     if resolved_font["fontfile"]:
         return fitz.Font(file=resolved_font["fontfile"])
     return fitz.Font(fontname=resolved_font["fontname"])
 
-# ISO Standards Mapping - Convert short names to full versions with years
-ISO_STANDARDS_MAPPING = {
-    # Quality & Management
-    "ISO 9001": "ISO 9001:2015",
-    "9001": "ISO 9001:2015",
-    "ISO 14001": "ISO 14001:2015",
-    "14001": "ISO 14001:2015",
-    "ISO 45001": "ISO 45001:2018",
-    "45001": "ISO 45001:2018",
-    "ISO 50001": "ISO 50001:2018",
-    "50001": "ISO 50001:2018",
-    "ISO 31000": "ISO 31000:2018",
-    "31000": "ISO 31000:2018",
-
-    # Food Safety
-    "ISO 22000": "ISO 22000:2018",
-    "22000": "ISO 22000:2018",
-    "ISO/TS 22002-1": "ISO/TS 22002-1:2009",
-    "22002-1": "ISO/TS 22002-1:2009",
-    "ISO 22005": "ISO 22005:2007",
-    "22005": "ISO 22005:2007",
-
-    # Laboratory & Testing
-    "ISO/IEC 17025": "ISO/IEC 17025:2017",
-    "17025": "ISO/IEC 17025:2017",
-    "ISO 15189": "ISO 15189:2022",
-    "15189": "ISO 15189:2022",
-
-    # Information Security & IT
-    "ISO/IEC 27001": "ISO/IEC 27001:2022",
-    "27001": "ISO/IEC 27001:2022",
-    "ISO/IEC 27002": "ISO/IEC 27002:2022",
-    "27002": "ISO/IEC 27002:2022",
-    "ISO/IEC 20000-1": "ISO/IEC 20000-1:2018",
-    "20000-1": "ISO/IEC 20000-1:2018",
-    "ISO/IEC 22301": "ISO/IEC 22301:2019",
-    "22301": "ISO/IEC 22301:2019",
-
-    # Manufacturing & Industrial
-    "ISO 13485": "ISO 13485:2016",
-    "13485": "ISO 13485:2016",
-    "IATF 16949": "IATF 16949:2016",
-    "16949": "IATF 16949:2016",
-    "ISO 3834-2": "ISO 3834-2:2021",
-    "3834-2": "ISO 3834-2:2021",
-
-    # Environment & Sustainability
-    "ISO 14064-1": "ISO 14064-1:2018",
-    "14064-1": "ISO 14064-1:2018",
-    "ISO 14046": "ISO 14046:2014",
-    "14046": "ISO 14046:2014",
-    "ISO 20121": "ISO 20121:2012",
-    "20121": "ISO 20121:2012",
-
-    # Asset, Facility, and Supply Chain
-    "ISO 55001": "ISO 55001:2014",
-    "55001": "ISO 55001:2014",
-    "ISO 28000": "ISO 28000:2022",
-    "28000": "ISO 28000:2022",
-
-    # Aerospace
-    "AS 9100D": "AS 9100D:2016",
-    "9100D": "AS 9100D:2016",
-
-    # Other Notable Standards
-    "ISO 37001": "ISO 37001:2016",
-    "37001": "ISO 37001:2016",
-    "ISO 19600": "ISO 19600:2014",
-    "19600": "ISO 19600:2014",
-    "ISO 29993": "ISO 29993:2017",
-    "29993": "ISO 29993:2017",
-}
-
-# ISO Standards Code Mapping - For certification codes
-ISO_STANDARDS_CODES = {
-    "ISO 9001:2015": "CM-MS-7842",
-    "ISO 14001:2015": "CM-MS-7836", 
-    "ISO 45001:2018": "CM-MS-7832",
-    "ISO 22000:2018": "CM-MS-7822",
-    "ISO/IEC 27001:2022": "CM-MS-7820",
-    "ISO 37001:2016": "CM-MS-7804",
-    "ISO/IEC 22301:2019": "CM-MS-7807",
-    "ISO 50001:2018": "CM-MS-7814",
-    "ISO 20001:2018": "CM-MS-7811",
-}
-
-# ISO Standards Descriptions Mapping - For separate use
-ISO_STANDARDS_DESCRIPTIONS = {
-    "ISO 9001:2015": "Quality Management System",
-    "ISO 14001:2015": "Environmental Management System",
-    "ISO 45001:2018": "Occupational Health & Safety",
-    "ISO 50001:2018": "Energy Management System",
-    "ISO 31000:2018": "Risk Management Guidelines",
-    "ISO 22000:2018": "Food Safety Management System",
-    "ISO/TS 22002-1:2009": "Prerequisite programs on food safety",
-    "ISO 22005:2007": "Traceability in the feed and food chain",
-    "ISO/IEC 17025:2017": "Testing and Calibration Laboratories",
-    "ISO 15189:2022": "Medical Laboratories – Quality and Competence",
-    "ISO/IEC 27001:2022": "Information Security Management System",
-    "ISO/IEC 27002:2022": "Information Security Controls",
-    "ISO/IEC 20000-1:2018": "IT Service Management System",
-    "ISO/IEC 22301:2019": "Business Continuity Management System",
-    "ISO 13485:2016": "Medical Devices – Quality Management System",
-    "IATF 16949:2016": "Automotive Quality Management System",
-    "ISO 3834-2:2021": "Quality requirements for fusion welding",
-    "ISO 14064-1:2018": "Greenhouse Gases",
-    "ISO 14046:2014": "Water Footprint",
-    "ISO 20121:2012": "Event Sustainability Management System",
-    "ISO 55001:2014": "Asset Management System",
-    "ISO 28000:2022": "Security Management Systems for Supply Chain",
-    "AS 9100D:2016": "Aerospace Quality (based on ISO 9001:2015)",
-    "ISO 37001:2016": "Anti-bribery Management System",
-    "ISO 19600:2014": "Compliance Management System",
-    "ISO 29993:2017": "Learning Services",
-}
-
-def expand_iso_standard(iso_text: str) -> str:
-    """Expand ISO standard name to full version with year if available."""
-    if not iso_text:
-        return iso_text
-
-    # Clean the input text
-    cleaned_text = iso_text.strip()
-
-    # First, try exact match
-    if cleaned_text in ISO_STANDARDS_MAPPING:
-        return ISO_STANDARDS_MAPPING[cleaned_text]
-
-    # If no exact match, try to find partial matches
-    # This handles cases where users might enter variations
-    for short_name, full_name in ISO_STANDARDS_MAPPING.items():
-        # Check if the input contains the standard number
-        if short_name.lower() in cleaned_text.lower():
-            return full_name
-
-    # If still no match, try to extract just the number and match
-    # This handles cases like "37001" when we have "37001" in mapping
-    import re
-    number_match = re.search(r'(\d+(?:-\d+)?)', cleaned_text)
-    if number_match:
-        number = number_match.group(1)
-        if number in ISO_STANDARDS_MAPPING:
-            return ISO_STANDARDS_MAPPING[number]
-
-    # If no match found, return original text
-    return iso_text
-
-def get_iso_standard_code(iso_standard: str) -> str:
-    """
-    Get the certification code for a given ISO standard.
-    Example: "ISO 9001:2015" -> "CM-MS-7842"
-    Returns empty string if no code mapping exists.
-    """
-    if not iso_standard:
-        return ""
-    
-    # First expand the ISO standard if it's a short name
-    expanded_iso = expand_iso_standard(iso_standard)
-    
-    # Look up the code in the mapping
-    return ISO_STANDARDS_CODES.get(expanded_iso, "")
-
 def get_text_height(text: str, fontsize: float, fontname: str, max_width: float) -> float:
     """Estimate the height of a text block when wrapped to fit max_width."""
-    font = fitz.Font(fontname=fontname)
-    words = text.split()
-    lines = []
-    current_line = ""
-    for word in words:
-        test_line = current_line + (" " if current_line else "") + word
-        if font.text_length(test_line, fontsize) <= max_width:
-            current_line = test_line
-        else:
-            lines.append(current_line)
-            current_line = word
-    if current_line:
-        lines.append(current_line)
-    return len(lines) * fontsize * 1.2  # Approximate line height with spacing
+    line_count = text_line_count(text, fontname, fontsize, max_width)
+    return line_count * fontsize * 1.2  # Approximate line height with spacing
 
 def insert_centered_textbox(
     page: fitz.Page,
@@ -353,6 +202,142 @@ def insert_centered_textbox(
         align=1  # Centered
     )
 
+# --- Optional Fields, Revision and QR Code Layout ---
+# Shared by generate_softcopy and the reissue mode (rise/reissue.py), which
+# redraws only these regions of an existing certificate.
+
+# Large template optional field coordinates (6 fields)
+LARGE_OPTIONAL_KEY_COORDINATES = [
+    fitz.Rect(175.5, 522, 343, 530),    # Row 1: Certificate Number
+    fitz.Rect(175.5, 538, 343, 548),    # Row 2: Initial Registration Date
+    fitz.Rect(175.5, 556, 343, 566),    # Row 3: Original Issue Date
+    fitz.Rect(175.5, 574, 343, 584),    # Row 4: Issue Date
+    fitz.Rect(175.5, 592, 343, 602),    # Row 5: Surveillance Group (only 1 field present)
+    fitz.Rect(175.5, 610, 343, 620)     # Row 6: Recertification Date
+]
+
+LARGE_OPTIONAL_VALUE_COORDINATES = [
+    fitz.Rect(362.1, 522, 446.4, 530),    # Row 1: Certificate Number value
+    fitz.Rect(362.1, 538, 446.4, 548),    # Row 2: Initial Registration Date value
+    fitz.Rect(362.1, 556, 446.4, 566),    # Row 3: Original Issue Date value
+    fitz.Rect(362.1, 574, 446.4, 584),    # Row 4: Issue Date value
+    fitz.Rect(362.1, 592, 446.4, 602),    # Row 5: Surveillance Group value (only 1 field present)
+    fitz.Rect(362.1, 610, 446.4, 620)     # Row 6: Recertification Date value
+]
+
+# Standard template optional field coordinates (6 fields for ≤11 lines)
+# Positioned higher up on the page for shorter content
+STANDARD_OPTIONAL_KEY_COORDINATES = [
+    fitz.Rect(175.5, 499.1, 343, 509.1),    # Row 1: Certificate Number
+    fitz.Rect(175.5, 516.9, 343, 526.9),    # Row 2: Initial Registration Date
+    fitz.Rect(175.5, 535.1, 343, 545.1),    # Row 3: Original Issue Date
+    fitz.Rect(175.5, 553.9, 343, 563.9),    # Row 4: Issue Date
+    fitz.Rect(175.5, 571.6, 343, 581.6),    # Row 5: Surveillance Group (only 1 field present)
+    fitz.Rect(175.5, 589.3, 343, 599.3)     # Row 6: Recertification Date
+]
+
+STANDARD_OPTIONAL_VALUE_COORDINATES = [
+    fitz.Rect(362.1, 499.1, 446.4, 509.1),    # Row 1: Value for Certificate Number
+    fitz.Rect(362.1, 516.9, 446.4, 526.9),    # Row 2: Value for Initial Registration Date
+    fitz.Rect(362.1, 535.1, 446.4, 545.1),    # Row 3: Value for Original Issue Date
+    fitz.Rect(362.1, 553.9, 446.4, 563.9),    # Row 4: Value for Issue Date
+    fitz.Rect(362.1, 571.6, 446.4, 581.6),    # Row 5: Value for Surveillance Group (only 1 field present)
+    fitz.Rect(362.1, 589.3, 446.4, 599.3)     # Row 6: Value for Recertification Date
+]
+
+
+# Revision field coordinates (matching Issue Date Y coordinates); the Revision
+# normally follows the Issue Date row and these are the fallbacks
+LARGE_REVISION_COORDINATES = fitz.Rect(446, 574, 456, 584)
+STANDARD_REVISION_COORDINATES = fitz.Rect(446, 553.9, 456, 563.9)
+
+
+def get_optional_field_coordinates(template_type: str):
+    """Return (key_coords, value_coords) for the six optional-field rows of a template."""
+    if template_type in ["large", "large_eco", "large_nonaccredited"]:
+        return LARGE_OPTIONAL_KEY_COORDINATES, LARGE_OPTIONAL_VALUE_COORDINATES
+    # Standard, logo and unknown templates use the standard rows
+    return STANDARD_OPTIONAL_KEY_COORDINATES, STANDARD_OPTIONAL_VALUE_COORDINATES
+
+
+def get_revision_coordinates(template_type: str) -> fitz.Rect:
+    """Return the fallback Revision field box for a template."""
+    if template_type == "standard":
+        return STANDARD_REVISION_COORDINATES
+    return LARGE_REVISION_COORDINATES
+
+
+def get_qr_code_box(template_type: str):
+    """Return the (x, y, width, height) the certification QR code is drawn at."""
+    # ✅ UPDATED: Large template QR code coordinates (using x=488.7)
+    if template_type in ["large", "large_eco", "large_nonaccredited"]:
+        qr_x = 488.7  # Use same X position as standard templates
+        qr_y = 541    # Keep same Y position
+        qr_width = 78.7   # Keep same width
+        qr_height = 74    # Keep same height
+    else:  # standard template
+        # ✅ UPDATED: Standard template QR code coordinates (expanded to remove white spaces)
+        qr_x = 488.7  # Move left by 10pt to expand width
+        qr_y = 514    # Updated Y position as requested
+        qr_width = 78.7   # Increase width by 10pt (68.7 + 10)
+        qr_height = 74    # Increase height by 10pt (64 + 10)
+
+    return qr_x, qr_y, qr_width, qr_height
+
+
+def format_date_for_qr(date_string):
+    """Format date string to ensure it's valid for QR code"""
+    if not date_string or date_string.strip() == '':
+        return ''
+
+    # If date is already in YYYY-MM-DD format, return as-is
+    if '-' in date_string and len(date_string.split('-')) == 3:
+        return date_string
+
+    # If date is in DD/MM/YYYY format, convert to YYYY-MM-DD
+    if '/' in date_string and len(date_string.split('/')) == 3:
+        try:
+            parts = date_string.split('/')
+            day, month, year = parts[0], parts[1], parts[2]
+            # Validate parts are numbers
+            if day.isdigit() and month.isdigit() and year.isdigit():
+                return f"{year}-{month}-{day}"
+        except (ValueError, IndexError):
+            pass
+
+    # If conversion fails, return original (will be handled by verification page)
+    return date_string
+
+
+# ✅ ADDED: Get expiry date from surveillance group (same logic as optional fields)
+def get_expiry_date_for_qr(values):
+    """Get expiry date from surveillance group fields for QR code"""
+    surveillance_group_fields = [
+        "Surveillance/ Expiry Date",
+        "Surveillance Due Date", 
+        "Expiry Date"
+    ]
+
+    for field in surveillance_group_fields:
+        if field in values and values[field]:
+            print(f"🔍 [SOFTCOPY] QR Code using surveillance field: '{field}' = '{values[field]}'")
+            return values[field]
+    return ""
+
+
+def build_certification_qr_data(values: Dict[str, str]) -> Dict[str, str]:
+    """Prepare certification data for the QR code with validated dates."""
+    return {
+        "certification_body": "Americo",  # Always Americo
+        "accreditation_body": "UAF",  # Always UAF
+        "certificate_number": values.get("Certificate Number", ""),
+        "company_name": values.get("Company Name", ""),
+        "certificate_standard": values.get("ISO Standard", ""),
+        "issue_date": format_date_for_qr(values.get("Issue Date", "")),
+        "expiry_date": format_date_for_qr(get_expiry_date_for_qr(values))  # ✅ FIXED: Use surveillance group logic
+    }
+
+
 def render_optional_fields(page, values, key_coords, value_coords, font_settings):
     """
     Render optional fields with dynamic positioning based on available data.
@@ -478,40 +463,39 @@ def render_optional_fields(page, values, key_coords, value_coords, font_settings
     }
 
 
-def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str, str], template_type: str = "standard") -> Dict[str, any]:
+# Previews are rasterized at screen size, so smaller QR/logo images are enough
+PREVIEW_QR_SIZE = 120
+PREVIEW_LOGO_MAX_PX = 300
+
+
+def build_softcopy_document(base_pdf_path: str, values: Dict[str, str], template_type: str = "standard", preview: bool = False, layout_only: bool = False):
     """
-    Generate soft copy PDF with the SAME advanced logic as generate_certificate.
+    Lay out a soft copy on an open copy of the template without saving it.
 
     Args:
         base_pdf_path: Path to the PDF template
-        output_pdf_path: Path where the generated PDF will be saved
         values: Dictionary of field values
         template_type: "standard" or "large" template type
-    
+        preview: Low-resolution QR code and no embedded field payload (for /preview)
+        layout_only: Stop before the QR code and payload (for /validate-layout)
+
     Returns:
-        Dict containing success status and overflow warnings
+        (fitz.Document, overflow_warnings) - the caller saves or rasterizes and closes it
     """
+    doc = fitz.open(base_pdf_path)
+    # A failure while laying out closes the document instead of leaking it
+    with close_on_error(doc):
+        return _draw_softcopy(doc, values, template_type, preview, layout_only)
 
-    
+
+def _draw_softcopy(doc, values: Dict[str, str], template_type: str, preview: bool, layout_only: bool):
+    """Lay the soft copy fields out on doc; returns (doc, overflow_warnings)."""
     # Initialize tracking for overflow warnings
     overflow_warnings = []
-    doc = fitz.open(base_pdf_path)
     page = doc[0]
 
     # --- Register Bodoni (BOD_R.TTF) once and use a clean alias ---
-    bodoni_alias = "BodoniMT-Regular"     # no spaces, PostScript-like
-    bodoni_path = find_font_path("BOD_R.TTF")
-    bodoni_registered = False
-
-    try:
-        if bodoni_path:
-            # Make the font available by a no-space alias for the whole doc
-            doc.insert_font(fontname=bodoni_alias, fontfile=bodoni_path)
-            bodoni_registered = True
-        else:
-            pass  # Will use Times-Roman as fallback
-    except Exception as e:
-        bodoni_registered = False
+    bodoni_registered = register_bodoni_font(doc)
 
     # --- Configuration ---
     color = (0, 0, 0)  # Black text
@@ -730,60 +714,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     # --- Optional Fields Configuration ---
     # ✅ ADDED: Template-specific optional field coordinates
     
-    # Large template optional field coordinates (6 fields)
-    large_optional_key_coordinates = [
-        fitz.Rect(175.5, 522, 343, 530),    # Row 1: Certificate Number
-        fitz.Rect(175.5, 538, 343, 548),    # Row 2: Initial Registration Date
-        fitz.Rect(175.5, 556, 343, 566),    # Row 3: Original Issue Date
-        fitz.Rect(175.5, 574, 343, 584),    # Row 4: Issue Date
-        fitz.Rect(175.5, 592, 343, 602),    # Row 5: Surveillance Group (only 1 field present)
-        fitz.Rect(175.5, 610, 343, 620)     # Row 6: Recertification Date
-    ]
-
-    large_optional_value_coordinates = [
-        fitz.Rect(362.1, 522, 446.4, 530),    # Row 1: Certificate Number value
-        fitz.Rect(362.1, 538, 446.4, 548),    # Row 2: Initial Registration Date value
-        fitz.Rect(362.1, 556, 446.4, 566),    # Row 3: Original Issue Date value
-        fitz.Rect(362.1, 574, 446.4, 584),    # Row 4: Issue Date value
-        fitz.Rect(362.1, 592, 446.4, 602),    # Row 5: Surveillance Group value (only 1 field present)
-        fitz.Rect(362.1, 610, 446.4, 620)     # Row 6: Recertification Date value
-    ]
-
-    # Standard template optional field coordinates (6 fields for ≤11 lines)
-    # Positioned higher up on the page for shorter content
-    standard_optional_key_coordinates = [
-        fitz.Rect(175.5, 499.1, 343, 509.1),    # Row 1: Certificate Number
-        fitz.Rect(175.5, 516.9, 343, 526.9),    # Row 2: Initial Registration Date
-        fitz.Rect(175.5, 535.1, 343, 545.1),    # Row 3: Original Issue Date
-        fitz.Rect(175.5, 553.9, 343, 563.9),    # Row 4: Issue Date
-        fitz.Rect(175.5, 571.6, 343, 581.6),    # Row 5: Surveillance Group (only 1 field present)
-        fitz.Rect(175.5, 589.3, 343, 599.3)     # Row 6: Recertification Date
-    ]
-
-    standard_optional_value_coordinates = [
-        fitz.Rect(362.1, 499.1, 446.4, 509.1),    # Row 1: Value for Certificate Number
-        fitz.Rect(362.1, 516.9, 446.4, 526.9),    # Row 2: Value for Initial Registration Date
-        fitz.Rect(362.1, 535.1, 446.4, 545.1),    # Row 3: Value for Original Issue Date
-        fitz.Rect(362.1, 553.9, 446.4, 563.9),    # Row 4: Value for Issue Date
-        fitz.Rect(362.1, 571.6, 446.4, 581.6),    # Row 5: Value for Surveillance Group (only 1 field present)
-        fitz.Rect(362.1, 589.3, 446.4, 599.3)     # Row 6: Value for Recertification Date
-    ]
-
-    # Select optional field coordinates based on template type
-    if template_type in ["standard", "standard_eco", "standard_nonaccredited"]:
-        optional_key_coordinates = standard_optional_key_coordinates
-        optional_value_coordinates = standard_optional_value_coordinates
-    elif template_type in ["large", "large_eco", "large_nonaccredited"]:
-        optional_key_coordinates = large_optional_key_coordinates
-        optional_value_coordinates = large_optional_value_coordinates
-    elif template_type == "logo":
-        # Logo template uses standard optional field coordinates
-        optional_key_coordinates = standard_optional_key_coordinates
-        optional_value_coordinates = standard_optional_value_coordinates
-    else:
-        # Fallback to standard coordinates for unknown template types
-        optional_key_coordinates = standard_optional_key_coordinates
-        optional_value_coordinates = standard_optional_value_coordinates
+    optional_key_coordinates, optional_value_coordinates = get_optional_field_coordinates(template_type)
 
     # ✅ ADDED: Adjust scope coordinates based on whether Initial Registration Date is present
     # This affects the available space for scope text
@@ -806,7 +737,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
 
     # Font settings for optional fields
     # Use Bodoni if registered, otherwise standard Times
-    resolved_optional_fontname = bodoni_alias if bodoni_registered else "Times-Roman"
+    resolved_optional_fontname = BODONI_ALIAS if bodoni_registered else "Times-Roman"
     
     optional_font_settings = {
         "fontname": resolved_optional_fontname,  # Clean alias, no file paths
@@ -828,18 +759,8 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
 
     # ✅ ADDED: Template-specific Revision field configuration
     
-    # Large template revision field coordinates (matching Issue Date Y coordinates)
-    large_revision_coordinates = fitz.Rect(446, 574, 456, 584)
-    
-    # Standard template revision field coordinates (matching Issue Date Y coordinates)
-    # Positioned to match Issue Date field positioning
-    standard_revision_coordinates = fitz.Rect(446, 553.9, 456, 563.9)
-    
     # Select revision field coordinates based on template type
-    if template_type == "standard":
-        revision_coordinates = standard_revision_coordinates
-    else:  # large template
-        revision_coordinates = large_revision_coordinates
+    revision_coordinates = get_revision_coordinates(template_type)
     
     # ✅ ADDED: Validate that coordinates are properly set
     if not optional_key_coordinates or not optional_value_coordinates:
@@ -1054,132 +975,110 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             # Check if address text is empty or None
             # Address validation logic (print statements removed)
 
-            # ✅ UPDATED: Dynamic Company Name font sizing based on line count
-            # First, determine if Company Name will be single line or multi-line
-            company_lines_count = len([line for line in company_processed_lines if line.strip()])
+            # Fit Company Name and Address once per text/box/font/template; later
+            # renders of the same client reuse the wrapped lines and font sizes
+            def fit_company_address():
+                # ✅ UPDATED: Dynamic Company Name font sizing based on line count
+                # First, determine if Company Name will be single line or multi-line
+                company_lines_count = len([line for line in company_processed_lines if line.strip()])
             
-            # Set initial font size based on line count
-            if company_lines_count <= 1:
-                company_font_size = 35  # Single line - start with 35pt
-            else:
-                company_font_size = 30  # Multiple lines - start with 30pt
+                # Set initial font size based on line count
+                if company_lines_count <= 1:
+                    company_font_size = 35  # Single line - start with 35pt
+                else:
+                    company_font_size = 30  # Multiple lines - start with 30pt
             
-            address_font_size = 13.6
+                address_font_size = 13.6
             
-            # Variables to store the final wrapped lines and font sizes
-            final_company_lines = []
-            final_address_lines = []
+                # Variables to store the final wrapped lines and font sizes
+                final_company_lines = []
+                final_address_lines = []
             
-            # ✅ IMPROVED: Different logic for single line vs multi-line company names
-            if company_lines_count <= 1:
-                # NO cmd+enter in Excel: Force single line, use font reduction only
+                # ✅ IMPROVED: Different logic for single line vs multi-line company names
+                if company_lines_count <= 1:
+                    # NO cmd+enter in Excel: Force single line, use font reduction only
                 
-                while company_font_size >= 8:  # Minimum font size
-                    # Check if entire company name fits in one line at current font size
-                    font_obj = fitz.Font(fontname=fontname)
-                    text_width = font_obj.text_length(company_text, company_font_size)
+                    while company_font_size >= 8:  # Minimum font size
+                        # Check if entire company name fits in one line at current font size
+                        font_obj = fitz.Font(fontname=fontname)
+                        text_width = font_obj.text_length(company_text, company_font_size)
                     
-                    if text_width <= rect.width - 10:  # Leave margin
-                        # Text fits in one line - use this font size
-                        final_company_lines = [company_text]  # Single line
-                        break
-                    else:
-                        # Text too wide - reduce font size and try again
-                        company_font_size -= 1
+                        if text_width <= rect.width - 10:  # Leave margin
+                            # Text fits in one line - use this font size
+                            final_company_lines = [company_text]  # Single line
+                            break
+                        else:
+                            # Text too wide - reduce font size and try again
+                            company_font_size -= 1
                 
-                # If we reached minimum font size and still doesn't fit, use the minimum
-                if company_font_size < 8:
-                    company_font_size = 8
-                    final_company_lines = [company_text]
+                    # If we reached minimum font size and still doesn't fit, use the minimum
+                    if company_font_size < 8:
+                        company_font_size = 8
+                        final_company_lines = [company_text]
                 
-            else:
-                # cmd+enter present in Excel: Allow word wrapping up to 2 lines
+                else:
+                    # cmd+enter present in Excel: Allow word wrapping up to 2 lines
                 
-                while company_font_size >= 8:  # Minimum font size
-                    company_lines = []
-                    
-                    # Process each pre-processed line with word wrapping
-                    for processed_line in company_processed_lines:
-                        if not processed_line.strip():  # Empty line - preserve it
-                            company_lines.append("")  # Add empty line to maintain spacing
-                            continue
-                        
-                        # Non-empty line - apply word wrapping
-                        words = processed_line.split()
-                        current_line = ""
-                        
-                        for word in words:
-                            test_line = current_line + (" " if current_line else "") + word
-                            font_obj = fitz.Font(fontname=fontname)
-                            if font_obj.text_length(test_line, company_font_size) <= rect.width - 10:  # Leave margin
-                                current_line = test_line
-                            else:
-                                if current_line:
-                                    company_lines.append(current_line)
-                                current_line = word
-                        
-                        if current_line:
-                            company_lines.append(current_line)
+                    while company_font_size >= 8:  # Minimum font size
+                        # Word-wrap each pre-processed line; empty lines are preserved to maintain spacing
+                        company_lines = wrap_paragraphs(company_processed_lines, fontname, company_font_size, rect.width - 10)  # Leave margin
                     
-                    # ✅ UPDATED: Allow Company Name to use up to 2 lines (after line breaks + word wrapping)
-                    if len(company_lines) <= 2:
-                        final_company_lines = company_lines.copy()
-                        break
+                        # ✅ UPDATED: Allow Company Name to use up to 2 lines (after line breaks + word wrapping)
+                        if len(company_lines) <= 2:
+                            final_company_lines = company_lines.copy()
+                            break
                     
-                    # Reduce Company Name font size
-                    company_font_size -= 1
+                        # Reduce Company Name font size
+                        company_font_size -= 1
 
-            # Calculate Company Name height
-            # Consistent line spacing: 1.05 for all templates
-            company_height = len(final_company_lines) * company_font_size * 1.05  # Consistent spacing for all templates
+                # Calculate Company Name height
+                # Consistent line spacing: 1.05 for all templates
+                company_height = len(final_company_lines) * company_font_size * 1.05  # Consistent spacing for all templates
 
-            # Now find font size for Address to fit in remaining space
-            remaining_height = rect.height - company_height - 2  # Leave margin
+                # Now find font size for Address to fit in remaining space
+                remaining_height = rect.height - company_height - 2  # Leave margin
            
 
-            address_font_size_attempts = 0
-            while address_font_size >= 6:  # Minimum font size
-                address_font_size_attempts += 1
-
-                # Process Address using pre-processed lines with word wrapping
-                address_lines = []
-
-                # Process each pre-processed address line with word wrapping
-                for processed_line in address_processed_lines:
-                    if not processed_line.strip():  # Empty line - preserve it
-                        address_lines.append("")  # Add empty line to maintain spacing
-                        continue
-                    
-                    # Non-empty line - apply word wrapping
-                    words = processed_line.split()
-                    current_line = ""
-
-                    for word in words:
-                        test_line = current_line + (" " if current_line else "") + word
-                        font_obj = fitz.Font(fontname=fontname)
-                        test_width = font_obj.text_length(test_line, address_font_size)
-                        if test_width <= rect.width - 10:  # Leave margin
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                address_lines.append(current_line)
-                            current_line = word
-
-                    if current_line:
-                        address_lines.append(current_line)
+                address_font_size_attempts = 0
+                while address_font_size >= 6:  # Minimum font size
+                    address_font_size_attempts += 1
 
-                # Calculate Address height
-                address_height = len(address_lines) * address_font_size * 1.0
+                    # Process Address using pre-processed lines with word wrapping (empty lines preserved for spacing)
+                    address_lines = wrap_paragraphs(address_processed_lines, fontname, address_font_size, rect.width - 10)  # Leave margin
 
-                # Check if Address fits in remaining space
-                if address_height <= remaining_height:
-                    final_address_lines = address_lines.copy()
-                    break
-                else:
-                    print(f"❌ [SOFTCOPY] Address too tall: {address_height:.1f}pt > {remaining_height:.1f}pt, reducing font size")
+                    # Calculate Address height
+                    address_height = len(address_lines) * address_font_size * 1.0
 
-                # Reduce Address font size
-                address_font_size -= 0.5
+                    # Check if Address fits in remaining space
+                    if address_height <= remaining_height:
+                        final_address_lines = address_lines.copy()
+                        break
+                    else:
+                        print(f"❌ [SOFTCOPY] Address too tall: {address_height:.1f}pt > {remaining_height:.1f}pt, reducing font size")
+
+                    # Reduce Address font size
+                    address_font_size -= 0.5
+
+                return {
+                    "company_font_size": company_font_size,
+                    "address_font_size": address_font_size,
+                    "final_company_lines": final_company_lines,
+                    "final_address_lines": final_address_lines,
+                    "company_height": company_height,
+                    "address_height": address_height,
+                }
+
+            layout = get_cached_layout(
+                "softcopy", "Company Name and Address", (company_text, address_text), rect, fontname,
+                font_starts.get("Company Name and Address", 30) if font_starts else 30, address_alignment, template_type, fit_company_address,
+            )
+            company_font_size = layout["company_font_size"]
+            address_font_size = layout["address_font_size"]
+            final_company_lines = layout["final_company_lines"]
+            final_address_lines = layout["final_address_lines"]
+            company_height = layout["company_height"]
+            address_height = layout["address_height"]
+            font_obj = fitz.Font(fontname=fontname)
 
             # Now render Company Name and Address dynamically
             if final_company_lines or final_address_lines:
@@ -1339,14 +1238,8 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             start_size = font_starts.get("ISO Standard", 80)
             font_size = start_size
 
-            # Reduce font size if it doesn't fit, but ensure minimum size
-            while font_size >= 12:  # Increased minimum from 10 to 12
-                text_height = get_text_height(text, font_size, fontname, rect.width)
-                limit = rect.height
-
-                if text_height <= limit:
-                    break
-                font_size -= 1
+            # Reduce font size if it doesn't fit, but ensure minimum size (12pt)
+            font_size = fit_font_size(text, fontname, rect.width, rect.height, start_size)
 
             # Perfect centering for ISO Standard - both horizontal and vertical
             center_x = (rect.x0 + rect.x1) / 2
@@ -1439,126 +1332,62 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             # Handle Scope with SAME ADVANCED LOGIC AS generate_certificate
             # Scope text now uses justification (left and right alignment) for professional appearance
             rect = coords["Scope"]
-            
-            
+
             # Template-specific starting font size for Scope
             if template_type == "standard" and scope_layout == "short":
                 start_size = 15  # Standard template short scope: max 15pt
             else:
                 start_size = font_starts.get("Scope", 20)  # Large template or standard long scope: max 20pt
-            
-            font_size = start_size
-            iteration_count = 0
-
-            # Reduce font size if it doesn't fit, but ensure minimum size
-            while font_size >= 12:  # Increased minimum from 10 to 12
-                iteration_count += 1
-                text_height = get_text_height(text, font_size, fontname, rect.width)
-                limit = rect.height
-                
 
-                if text_height <= limit:
-                    break
-                font_size -= 1
+            # Reduce font size if it doesn't fit, but ensure minimum size (12pt)
+            font_size = fit_font_size(text, fontname, rect.width, rect.height, start_size)
 
             # PowerPoint-style centering with automatic font size reduction
             original_font_size = font_size
-            
-            # Reduce font size until text fits within box boundaries
-            font_size = original_font_size
-            iteration_count = 0
+
+            # Shrink-to-fit and wrap once per text/box/font/template; later renders
+            # of the same scope reuse the fitted font size and lines
             min_font_size = 4  # Allow font size to go below 8pt if needed
+            def fit_scope():
+                # Reduce font size until text fits within box boundaries
+                font_size = original_font_size
+                iteration_count = 0
+
+                while font_size >= min_font_size:  # Changed from 8 to 4
+                    iteration_count += 1
+
+                    # Enhanced text processing with bullet point detection AND line break preservation
+                    line_count = scope_line_count(text, fontname, font_size, rect.width)
+
+                    # Calculate total height of all lines
+                    # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
+                    if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+                        line_height = font_size * 1.1  # Tight spacing for large/logo templates
+                    else:  # standard templates
+                        line_height = font_size * 1.2  # Loose spacing for standard templates
+                    total_height = line_count * line_height
+
+                    # Check if text fits vertically within box boundaries
+                    if total_height <= rect.height:  # No margin
+                        break
+                    font_size -= 1
 
-            while font_size >= min_font_size:  # Changed from 8 to 4
-                iteration_count += 1
+                # Now draw the text with the fitting font size using enhanced processing
+                # Process text to handle line breaks and bullet points properly
 
-                # Enhanced text processing with bullet point detection AND line break preservation
-                lines = []
-                
-                # Split text by actual line breaks first
-                if '\n' in text:
-                    # Handle line breaks properly
-                    text_lines = text.split('\n')
-                    for text_line in text_lines:
-                        if text_line.strip():  # Only process non-empty lines
-                            # Process each line for word wrapping and bullet points
-                            words = text_line.strip().split()
-                            current_line = ""
-                            
-                            for word in words:
-                                # Check if word starts with bullet point indicators
-                                is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                                
-                                # If it's a bullet point and we have content, start a new line
-                                if is_bullet_point and current_line:
-                                    lines.append(current_line)
-                                    # Replace * with • for display (in font size calculation)
-                                    if word.startswith('*'):
-                                        # ✅ Safe string handling for bullet point slice
-                                        safe_word = str(word) if word is not None else ""
-                                        print(f"🔄 [SOFTCOPY BULLET] Will replace '{safe_word}' with '•{safe_word[1:]}' in final rendering")
-                                    current_line = word
-                                    continue
-                                
-                                test_line = current_line + (" " if current_line else "") + word
-                                font_obj = fitz.Font(fontname=fontname)
-                                
-                                if font_obj.text_length(test_line, font_size) <= rect.width:
-                                    current_line = test_line
-                                else:
-                                    if current_line:
-                                        lines.append(current_line)
-                                    current_line = word
-                            
-                            if current_line:
-                                lines.append(current_line)
-                else:
-                    # No line breaks, process as single block
-                    words = text.split()
-                    current_line = ""
-                    
-                    for word in words:
-                        # Check if word starts with bullet point indicators
-                        is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                        
-                        # If it's a bullet point and we have content, start a new line
-                        if is_bullet_point and current_line:
-                            lines.append(current_line)
-                            # Replace * with • for display (in font size calculation)
-                            if word.startswith('*'):
-                                # ✅ Safe string handling for bullet point slice
-                                safe_word = str(word) if word is not None else ""
-                                print(f"[BULLET] Will replace '{safe_word}' with '•{safe_word[1:]}' in final rendering")
-                            current_line = word
-                            continue
-                        
-                        test_line = current_line + (" " if current_line else "") + word
-                        font_obj = fitz.Font(fontname=fontname)
-                        
-                        if font_obj.text_length(test_line, font_size) <= rect.width:
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                lines.append(current_line)
-                            current_line = word
-                    
-                    if current_line:
-                        lines.append(current_line)
+                # Replace all asterisks with bullet points for display
+                display_text = text.replace('*', '•')
 
-                # Calculate total height of all lines
-                # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
-                if template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
-                    line_height = font_size * 1.1  # Tight spacing for large/logo templates
-                else:  # standard templates
-                    line_height = font_size * 1.2  # Loose spacing for standard templates
-                total_height = len(lines) * line_height
-                
-                
+                lines = wrap_scope_lines(display_text, fontname, font_size, rect.width)
 
-                # Check if text fits vertically within box boundaries
-                if total_height <= rect.height:  # No margin
-                    break
-                font_size -= 1
+                return {"font_size": font_size, "lines": lines, "fit_height": total_height}
+
+            layout = get_cached_layout(
+                "softcopy", "Scope", text, rect, fontname, original_font_size, "", template_type, fit_scope,
+            )
+            font_size = layout["font_size"]
+            lines = layout["lines"]
+            total_height = layout["fit_height"]
 
             # Check if we hit the minimum font size and still have overflow
             if font_size == min_font_size and total_height > rect.height:
@@ -1578,86 +1407,6 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     "final_font_size": min_font_size,
                     "message": warning_msg
                 })
-                
-                # Force text to fit by truncating if necessary
-                max_lines = int(rect.height / min_font_size)
-                
-                if len(lines) > max_lines:
-                    lines = lines[:max_lines]
-
-
-            # Now draw the text with the fitting font size using enhanced processing
-            # Process text to handle line breaks and bullet points properly
-            
-            # Replace all asterisks with bullet points for display
-            text = text.replace('*', '•')
-            
-            lines = []
-            
-            # Split text by actual line breaks first
-            if '\n' in text:
-                # Handle line breaks properly
-                text_lines = text.split('\n')
-                for text_line in text_lines:
-                    if text_line.strip():  # Only process non-empty lines
-                        # Process each line for word wrapping and bullet points
-                        words = text_line.strip().split()
-                        current_line = ""
-                        
-                        for word in words:
-                            # Check if word starts with bullet point indicators
-                            is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                            
-                            # If it's a bullet point and we have content, start a new line
-                            if is_bullet_point and current_line:
-                                lines.append(current_line)
-                                # Replace * with • for display
-                                display_word = word.replace('*', '•')
-                                if word != display_word:
-                                    print(f"🔄 [SOFTCOPY BULLET] Replaced '{word}' with '{display_word}'")
-                                current_line = display_word
-                                continue
-                            
-                            test_line = current_line + (" " if current_line else "") + word
-                            font_obj = fitz.Font(fontname=fontname)
-                            if font_obj.text_length(test_line, font_size) <= rect.width:
-                                current_line = test_line
-                            else:
-                                if current_line:
-                                    lines.append(current_line)
-                                current_line = word
-                        
-                        if current_line:
-                            lines.append(current_line)
-            else:
-                # No line breaks, process as single block
-                words = text.split()
-                current_line = ""
-                
-                for word in words:
-                    # Check if word starts with bullet point indicators
-                    is_bullet_point = any(word.startswith(indicator) for indicator in ['-', '•', '>', '→', '▪', '▫', '*'])
-                    
-                    # If it's a bullet point and we have content, start a new line
-                    if is_bullet_point and current_line:
-                        lines.append(current_line)
-                        # Replace * with • for display
-                        display_word = word.replace('*', '•')
-                        current_line = display_word
-                        continue
-                    
-                    test_line = current_line + (" " if current_line else "") + word
-                    font_obj = fitz.Font(fontname=fontname)
-                    if font_obj.text_length(test_line, font_size) <= rect.width:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-                
-                if current_line:
-                    lines.append(current_line)
-
 
             # Calculate total height and position vertically based on template type
             # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
@@ -1786,16 +1535,16 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
         print(f"⚠️ [DYNAMIC] Issue Date coordinates not found - using fallback")
 
     # ✅ ADDED: Shared Logo Functions for Phase 5
+    @timed_stage("logo")
     def insert_logo_into_pdf(page, logo_file, logo_rect):
         """
         Insert logo into PDF with smart positioning
         """
         try:
             # Convert logo file to image
-            logo_image = convert_file_to_image(logo_file)
-            
-            # Use smart positioning logic
-            insert_logo_with_smart_positioning(page, logo_image, logo_rect)
+            with convert_file_to_image(logo_file) as logo_image:
+                # Use smart positioning logic
+                insert_logo_with_smart_positioning(page, logo_image, logo_rect)
             
             print(f"✅ [LOGO] Logo inserted successfully: {logo_file.filename if hasattr(logo_file, 'filename') else 'unknown'}")
         except Exception as e:
@@ -1839,6 +1588,11 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
         except Exception as e:
             print(f"❌ [SOFTCOPY] Error inserting logo: {e}")
 
+    if logo_image and preview:
+        source_image, logo_image = logo_image, logo_image.copy()
+        close_quietly(source_image)
+        logo_image.thumbnail((PREVIEW_LOGO_MAX_PX, PREVIEW_LOGO_MAX_PX))
+
     # ✅ UPDATED: Insert logo if available and using logo template
     if logo_image and template_type == "logo":
         try:
@@ -1851,6 +1605,8 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 print("⚠️ [SOFTCOPY] Logo coordinates not found in logo_coords")
         except Exception as logo_insert_error:
             print(f"❌ [SOFTCOPY] Error inserting logo: {logo_insert_error}")
+    # The decoded logo is not needed past this point
+    close_quietly(logo_image)
 
     # ✅ ADDED: Render Revision field with dynamic positioning
     if revision and revision.strip():
@@ -1949,64 +1705,21 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     else:
         print(f"🔍 [SOFTCOPY] No Extra Line - skipping")
     
+    # Layout validation only needs the fitted fields
+    if layout_only:
+        return doc, overflow_warnings
+
     # Generate and add QR code with certification information
     
-    # ✅ FIXED: Validate and format dates before QR code generation
-    def format_date_for_qr(date_string):
-        """Format date string to ensure it's valid for QR code"""
-        if not date_string or date_string.strip() == '':
-            return ''
-        
-        # If date is already in YYYY-MM-DD format, return as-is
-        if '-' in date_string and len(date_string.split('-')) == 3:
-            return date_string
-        
-        # If date is in DD/MM/YYYY format, convert to YYYY-MM-DD
-        if '/' in date_string and len(date_string.split('/')) == 3:
-            try:
-                parts = date_string.split('/')
-                day, month, year = parts[0], parts[1], parts[2]
-                # Validate parts are numbers
-                if day.isdigit() and month.isdigit() and year.isdigit():
-                    return f"{year}-{month}-{day}"
-            except (ValueError, IndexError):
-                pass
-        
-        # If conversion fails, return original (will be handled by verification page)
-        return date_string
-    
-    # ✅ ADDED: Get expiry date from surveillance group (same logic as optional fields)
-    def get_expiry_date_for_qr(values):
-        """Get expiry date from surveillance group fields for QR code"""
-        surveillance_group_fields = [
-            "Surveillance/ Expiry Date",
-            "Surveillance Due Date", 
-            "Expiry Date"
-        ]
-        
-        for field in surveillance_group_fields:
-            if field in values and values[field]:
-                print(f"🔍 [SOFTCOPY] QR Code using surveillance field: '{field}' = '{values[field]}'")
-                return values[field]
-        return ""
-    
     # Prepare certification data for QR code with validated dates
-    cert_data = {
-        "certification_body": "Americo",  # Always Americo
-        "accreditation_body": "UAF",  # Always UAF
-        "certificate_number": values.get("Certificate Number", ""),
-        "company_name": values.get("Company Name", ""),
-        "certificate_standard": values.get("ISO Standard", ""),
-        "issue_date": format_date_for_qr(values.get("Issue Date", "")),
-        "expiry_date": format_date_for_qr(get_expiry_date_for_qr(values))  # ✅ FIXED: Use surveillance group logic
-    }
+    cert_data = build_certification_qr_data(values)
     
     # ✅ ADDED: Log the formatted dates for debugging
     
     
     try:
         # Generate QR code with larger size for better space utilization
-        qr_image = generate_certification_qr_code(cert_data, size=400)
+        qr_image = generate_certification_qr_code(cert_data, size=PREVIEW_QR_SIZE if preview else 400)
         
         # Debug: Show what data is being encoded
         qr_text = "\n".join([f"{key}: {value}" for key, value in cert_data.items() if value])
@@ -2014,18 +1727,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
         
         # ✅ ADDED: Template-specific QR code coordinates
         
-        # ✅ UPDATED: Large template QR code coordinates (using x=488.7)
-        if template_type in ["large", "large_eco", "large_nonaccredited"]:
-            qr_x = 488.7  # Use same X position as standard templates
-            qr_y = 541    # Keep same Y position
-            qr_width = 78.7   # Keep same width
-            qr_height = 74    # Keep same height
-        else:  # standard template
-            # ✅ UPDATED: Standard template QR code coordinates (expanded to remove white spaces)
-            qr_x = 488.7  # Move left by 10pt to expand width
-            qr_y = 514    # Updated Y position as requested
-            qr_width = 78.7   # Increase width by 10pt (68.7 + 10)
-            qr_height = 74    # Increase height by 10pt (64 + 10)
+        qr_x, qr_y, qr_width, qr_height = get_qr_code_box(template_type)
         
         # Add QR code to PDF at template-specific coordinates
         add_qr_code_to_pdf(
@@ -2043,8 +1745,35 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
         print(f"⚠️ [SOFTCOPY] Warning: Could not add QR code: {e}")
         print(f"⚠️ [SOFTCOPY] PDF will be generated without QR code")
 
-    doc.save(output_pdf_path)
-    doc.close()
+    # Embed the exact input values so a later reissue can redraw only the dates
+    if not preview:
+        try:
+            embed_draft_payload(doc, values, template_type)
+        except Exception as payload_error:
+            print(f"⚠️ [SOFTCOPY] Could not embed field payload: {payload_error}")
+
+    return doc, overflow_warnings
+
+
+def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str, str], template_type: str = "standard", save_profile: str = None) -> Dict[str, any]:
+    """
+    Generate soft copy PDF with the SAME advanced logic as generate_certificate.
+
+    Args:
+        base_pdf_path: Path to the PDF template
+        output_pdf_path: Path where the generated PDF will be saved
+        values: Dictionary of field values
+        template_type: "standard" or "large" template type
+        save_profile: "fast", "compact" or "archival" (see rise/save_profiles.py)
+    
+    Returns:
+        Dict containing success status and overflow warnings
+    """
+    doc, overflow_warnings = build_softcopy_document(base_pdf_path, values, template_type)
+    try:
+        save_pdf(doc, output_pdf_path, save_profile)
+    finally:
+        doc.close()
     
     print(f"✅ [SOFTCOPY] Soft copy PDF generated successfully: {output_pdf_path}")
     
@@ -0,0 +1,230 @@
+"""
+ISO standard resolver shared by the draft, soft copy and printable generators.
+
+The standards tables live here once. Lookups go through a normalized index
+(short names, bare numbers, full names and year-less forms) built once per
+process, and results are memoized, so repeated values from forms and Excel
+imports cost a dictionary hit.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+# ISO Standards Mapping - Convert short names to full versions with years
+ISO_STANDARDS_MAPPING = {
+    # Quality & Management
+    "ISO 9001": "ISO 9001:2015",
+    "9001": "ISO 9001:2015",
+    "ISO 14001": "ISO 14001:2015", 
+    "14001": "ISO 14001:2015",
+    "ISO 45001": "ISO 45001:2018",
+    "45001": "ISO 45001:2018",
+    "ISO 50001": "ISO 50001:2018",
+    "50001": "ISO 50001:2018",
+    "ISO 31000": "ISO 31000:2018",
+    "31000": "ISO 31000:2018",
+    
+    # Food Safety
+    "ISO 22000": "ISO 22000:2018",
+    "22000": "ISO 22000:2018",
+    "ISO/TS 22002-1": "ISO/TS 22002-1:2009",
+    "22002-1": "ISO/TS 22002-1:2009",
+    "ISO 22005": "ISO 22005:2007",
+    "22005": "ISO 22005:2007",
+    
+    # Laboratory & Testing
+    "ISO/IEC 17025": "ISO/IEC 17025:2017",
+    "17025": "ISO/IEC 17025:2017",
+    "ISO 15189": "ISO 15189:2022",
+    "15189": "ISO 15189:2022",
+    
+    # Information Security & IT
+    "ISO/IEC 27001": "ISO/IEC 27001:2022",
+    "27001": "ISO/IEC 27001:2022",
+    "ISO/IEC 27002": "ISO/IEC 27002:2022",
+    "27002": "ISO/IEC 27002:2022",
+    "ISO/IEC 20000-1": "ISO/IEC 20000-1:2018",
+    "20000-1": "ISO/IEC 20000-1:2018",
+    "ISO/IEC 22301": "ISO/IEC 22301:2019",
+    "22301": "ISO/IEC 22301:2019",
+    
+    # Manufacturing & Industrial
+    "ISO 13485": "ISO 13485:2016",
+    "13485": "ISO 13485:2016",
+    "IATF 16949": "IATF 16949:2016",
+    "16949": "IATF 16949:2016",
+    "ISO 3834-2": "ISO 3834-2:2021",
+    "3834-2": "ISO 3834-2:2021",
+    
+    # Environment & Sustainability
+    "ISO 14064-1": "ISO 14064-1:2018",
+    "14064-1": "ISO 14064-1:2018",
+    "ISO 14046": "ISO 14046:2014",
+    "14046": "ISO 14046:2014",
+    "ISO 20121": "ISO 20121:2012",
+    "20121": "ISO 20121:2012",
+    
+    # Asset, Facility, and Supply Chain
+    "ISO 55001": "ISO 55001:2014",
+    "55001": "ISO 55001:2014",
+    "ISO 28000": "ISO 28000:2022",
+    "28000": "ISO 28000:2022",
+    
+    # Aerospace
+    "AS 9100D": "AS 9100D:2016",
+    "9100D": "AS 9100D:2016",
+    
+    # Other Notable Standards
+    "ISO 37001": "ISO 37001:2016",
+    "37001": "ISO 37001:2016",
+    "ISO 19600": "ISO 19600:2014",
+    "19600": "ISO 19600:2014",
+    "ISO 29993": "ISO 29993:2017",
+    "29993": "ISO 29993:2017",
+}
+
+# ISO Standards Code Mapping - For certification codes
+ISO_STANDARDS_CODES = {
+    "ISO 9001:2015": "CM-MS-7842",
+    "ISO 14001:2015": "CM-MS-7836", 
+    "ISO 45001:2018": "CM-MS-7832",
+    "ISO 22000:2018": "CM-MS-7822",
+    "ISO/IEC 27001:2022": "CM-MS-7820",
+    "ISO 37001:2016": "CM-MS-7804",
+    "ISO/IEC 22301:2019": "CM-MS-7807",
+    "ISO 50001:2018": "CM-MS-7814",
+    "ISO 20001:2018": "CM-MS-7811",
+}
+
+# ISO Standards Descriptions Mapping - For separate use
+ISO_STANDARDS_DESCRIPTIONS = {
+    "ISO 9001:2015": "Quality Management System",
+    "ISO 14001:2015": "Environmental Management System",
+    "ISO 45001:2018": "Occupational Health & Safety",
+    "ISO 50001:2018": "Energy Management System",
+    "ISO 31000:2018": "Risk Management Guidelines",
+    "ISO 22000:2018": "Food Safety Management System",
+    "ISO/TS 22002-1:2009": "Prerequisite programs on food safety",
+    "ISO 22005:2007": "Traceability in the feed and food chain",
+    "ISO/IEC 17025:2017": "Testing and Calibration Laboratories",
+    "ISO 15189:2022": "Medical Laboratories – Quality and Competence",
+    "ISO/IEC 27001:2022": "Information Security Management System",
+    "ISO/IEC 27002:2022": "Information Security Controls",
+    "ISO/IEC 20000-1:2018": "IT Service Management System",
+    "ISO/IEC 22301:2019": "Business Continuity Management System",
+    "ISO 13485:2016": "Medical Devices – Quality Management System",
+    "IATF 16949:2016": "Automotive Quality Management System",
+    "ISO 3834-2:2021": "Quality requirements for fusion welding",
+    "ISO 14064-1:2018": "Greenhouse Gases",
+    "ISO 14046:2014": "Water Footprint",
+    "ISO 20121:2012": "Event Sustainability Management System",
+    "ISO 55001:2014": "Asset Management System",
+    "ISO 28000:2022": "Security Management Systems for Supply Chain",
+    "AS 9100D:2016": "Aerospace Quality (based on ISO 9001:2015)",
+    "ISO 37001:2016": "Anti-bribery Management System",
+    "ISO 19600:2014": "Compliance Management System",
+    "ISO 29993:2017": "Learning Services",
+}
+
+# Normalized lookup index, built once per process
+def _normalize(iso_text: str) -> str:
+    """Lowercase, trim and collapse spacing ('iso/iec  27001' -> 'iso/iec 27001')."""
+    text = re.sub(r"\s*/\s*", "/", iso_text.strip().lower())
+    return re.sub(r"\s+", " ", text)
+
+_YEAR_SUFFIX = re.compile(r"\s*:\s*\d{4}$")
+_NUMBER = re.compile(r'(\d+(?:-\d+)?)')
+
+def _build_index() -> Dict[str, str]:
+    index = {}
+    for short_name, full_name in ISO_STANDARDS_MAPPING.items():
+        index.setdefault(_normalize(short_name), full_name)
+    for full_name in set(ISO_STANDARDS_MAPPING.values()):
+        index.setdefault(_normalize(full_name), full_name)
+        index.setdefault(_YEAR_SUFFIX.sub("", _normalize(full_name)), full_name)
+    return index
+
+_ISO_INDEX = _build_index()
+
+# Lowercased once for the substring fallback, in the mapping's priority order
+_ISO_SUBSTRINGS = [(short_name.lower(), full_name) for short_name, full_name in ISO_STANDARDS_MAPPING.items()]
+
+@lru_cache(maxsize=1024)
+def expand_iso_standard(iso_text: str) -> str:
+    """Expand ISO standard name to full version with year if available."""
+    if not iso_text:
+        return iso_text
+    
+    # Clean the input text
+    cleaned_text = iso_text.strip()
+    
+    # First, try exact match
+    if cleaned_text in ISO_STANDARDS_MAPPING:
+        return ISO_STANDARDS_MAPPING[cleaned_text]
+    
+    # Then the normalized index: case/spacing variants, full names, other years
+    normalized = _normalize(cleaned_text)
+    if normalized in _ISO_INDEX:
+        return _ISO_INDEX[normalized]
+    year_less = _YEAR_SUFFIX.sub("", normalized)
+    if year_less in _ISO_INDEX:
+        return _ISO_INDEX[year_less]
+    
+    # If no match, try to find partial matches
+    # This handles cases where users might enter variations
+    for short_name, full_name in _ISO_SUBSTRINGS:
+        # Check if the input contains the standard number
+        if short_name in normalized:
+            return full_name
+    
+    # If still no match, try to extract just the number and match
+    # This handles cases like "37001" when we have "37001" in mapping
+    number_match = _NUMBER.search(cleaned_text)
+    if number_match:
+        number = number_match.group(1)
+        if number in ISO_STANDARDS_MAPPING:
+            return ISO_STANDARDS_MAPPING[number]
+    
+    # If no match found, return original text
+    return iso_text
+
+@lru_cache(maxsize=1024)
+def resolve_iso_standard(iso_text: str) -> Dict[str, str]:
+    """
+    Resolve an ISO standard to its full name, certification code and description.
+    Example: "9001" -> {"standard": "ISO 9001:2015", "code": "CM-MS-7842",
+                        "description": "Quality Management System"}
+    """
+    standard = expand_iso_standard(iso_text) if iso_text else ""
+    return {
+        "standard": standard or "",
+        "code": ISO_STANDARDS_CODES.get(standard, ""),
+        "description": ISO_STANDARDS_DESCRIPTIONS.get(standard, ""),
+    }
+
+def resolve_many(values: Iterable[object]) -> List[Dict[str, str]]:
+    """Resolve a column of ISO standard values (e.g. an Excel import), in order."""
+    resolved = {}
+    results = []
+    for value in values:
+        # Excel cells arrive as numbers too: 9001 (or 9001.0) means "9001"
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        key = str(value).strip() if value is not None else ""
+        if key not in resolved:
+            resolved[key] = resolve_iso_standard(key)
+        # Copy so callers can annotate rows without touching the memoized result
+        results.append(dict(resolved[key]))
+    return results
+
+def get_iso_standard_code(iso_standard: str) -> str:
+    """
+    Get the certification code for a given ISO standard.
+    Example: "ISO 9001:2015" -> "CM-MS-7842"
+    Returns empty string if no code mapping exists.
+    """
+    if not iso_standard:
+        return ""
+    
+    return resolve_iso_standard(iso_standard)["code"]
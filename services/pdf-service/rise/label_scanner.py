@@ -0,0 +1,127 @@
+"""
+Single-pass label scanner shared by the text, table and OCR form extractors.
+
+All known field labels are compiled once into one multi-pattern regex anchored
+at line starts. A scan walks the text once, records where each label occurs,
+and slices each value from the end of its label to the start of the next one.
+There are no lazy DOTALL look-aheads, so scan time stays linear in the length
+of the text even for long scanned documents.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Canonical field name -> labels that introduce it. Labels are matched
+# case-insensitively and tolerate extra spaces between words.
+FIELD_LABELS = {
+    "Company Name": ["Company Name"],
+    "Address": ["Address"],
+    "ISO Standard Required": ["ISO Standard Required", "ISO Standard"],
+    "Scope": ["Scope of Work", "Scope"],
+    "Certificate Number": ["Certificate Number"],
+    "Original Issue Date": ["Original Issue Date"],
+    "Issue Date": ["Issue Date"],
+    "Surveillance/ Expiry Date": ["Surveillance/ Expiry Date", "Surveillance/Expiry Date"],
+    "Recertification Date": ["Recertification Date"],
+    "Initial Registration Date": ["Initial Registration Date"],
+    "Surveillance Due Date": ["Surveillance Due Date"],
+    "Expiry Date": ["Expiry Date"],
+    "Extra Line": ["Extra Line"],
+}
+
+# Generic single words that only count as labels when followed by a colon,
+# so ordinary scope/address lines starting with them are not split.
+WEAK_FIELD_LABELS = {
+    "Company Name": ["Company", "Organization", "Organisation"],
+    "Address": ["Location"],
+    "ISO Standard Required": ["Standard"],
+}
+
+
+def _normalize_label(label: str) -> str:
+    label = re.sub(r"\s*/\s*", "/", label.strip())
+    return re.sub(r"\s+", " ", label).lower()
+
+
+def _label_pattern(label: str) -> str:
+    words = [re.escape(word) for word in label.replace("/", " / ").split()]
+    return r"[ \t]+".join(words).replace(r"[ \t]+/[ \t]+", r"[ \t]*/[ \t]*")
+
+
+def _alternation(labels: Dict[str, List[str]]) -> str:
+    # Longest first, so "ISO Standard Required" wins over "ISO Standard"
+    aliases = sorted({alias for names in labels.values() for alias in names}, key=len, reverse=True)
+    return "|".join(_label_pattern(alias) for alias in aliases)
+
+
+_LABEL_LOOKUP = {
+    _normalize_label(alias): field
+    for labels in (FIELD_LABELS, WEAK_FIELD_LABELS)
+    for field, aliases in labels.items()
+    for alias in aliases
+}
+
+_STRONG = _alternation(FIELD_LABELS)
+_WEAK = _alternation(WEAK_FIELD_LABELS)
+
+# Strict: the label stands alone on its line or is followed by a colon
+# (text extracted from digital PDFs, one label per line).
+_STRICT_SCANNER = re.compile(
+    rf"^[ \t]*(?:(?P<strong>{_STRONG})[ \t]*(?::|$)|(?P<weak>{_WEAK})[ \t]*:)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Loose: the label may also be followed by whitespace and may sit behind
+# table rulings or bullets (OCR output and free-form text).
+_LOOSE_SCANNER = re.compile(
+    rf"^[^\w\n]*(?:(?P<strong>{_STRONG})(?:[ \t]*:|(?=[ \t]|$))|(?P<weak>{_WEAK})[ \t]*:)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+_EXACT_LABEL = re.compile(rf"^[^\w]*(?:{_STRONG}|{_WEAK})[ \t]*:?[^\w]*$", re.IGNORECASE)
+
+
+def canonical_label(key: str) -> Optional[str]:
+    """Return the canonical field name for a table key like 'Company Name:', or None."""
+    if not key or not _EXACT_LABEL.match(key.strip()):
+        return None
+    return _LABEL_LOOKUP.get(_normalize_label(re.sub(r"[^\w/ \t]", "", key)))
+
+
+def scan_labels(text: str, strict: bool = False) -> List[Tuple[str, int, int]]:
+    """Return (field, label_start, value_start) for every label in text, in order."""
+    scanner = _STRICT_SCANNER if strict else _LOOSE_SCANNER
+    found = []
+    for match in scanner.finditer(text):
+        label = match.group("strong") or match.group("weak")
+        found.append((_LABEL_LOOKUP[_normalize_label(label)], match.start(), match.end()))
+    return found
+
+
+def _clean_value(raw: str) -> str:
+    # A loose label may be followed by spaces then a colon ("Scope : ..."),
+    # and OCR'd tables leave '|' rulings around cell text
+    lines = [line.strip(" \t|") for line in raw.lstrip(" \t:|").split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+def extract_labeled_fields(text: str, strict: bool = False) -> Dict[str, str]:
+    """
+    Extract every known field from labelled text in one pass.
+
+    Each value runs from the end of its label to the start of the next label.
+    Lines are stripped and blank lines dropped. When a field appears more than
+    once, the first non-empty value wins.
+    """
+    data = {}
+    labels = scan_labels(text, strict)
+
+    for i, (field, _, value_start) in enumerate(labels):
+        if data.get(field):
+            continue
+        value_end = labels[i + 1][1] if i + 1 < len(labels) else len(text)
+        value = _clean_value(text[value_start:value_end])
+        if value:
+            data[field] = value
+
+    return data
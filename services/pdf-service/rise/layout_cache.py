@@ -0,0 +1,117 @@
+"""
+Per-field layout cache shared by the draft, soft copy and printable generators.
+
+Fitting (company/address wrapping with font-size search, scope shrink-to-fit)
+depends only on the text, the target rect, the font, the starting size, the
+alignment and the template_type - never on dates, QR codes or revisions. The
+generators compute a field's layout (lines, font sizes, heights) through
+get_cached_layout, so repeated renders of the same client, batch retries and
+date-only reissues reuse the fitted result instead of re-measuring every word.
+
+Entries are namespaced by generator, because each generator applies its own
+spacing rules to the same inputs.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from .timings import stage
+
+# Maximum number of field layouts kept per process (LRU eviction)
+LAYOUT_CACHE_SIZE = int(os.getenv("LAYOUT_CACHE_SIZE", "2048"))
+
+_layouts: "OrderedDict[Tuple, Dict]" = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+# Set while collect_layouts runs, so callers can see every layout a render used;
+# per context, so concurrent renders in threads never share a collector
+_collector: ContextVar[Optional[List[Tuple[str, Dict]]]] = ContextVar("layout_collector", default=None)
+
+
+def _freeze(value):
+    """Make a computed layout immutable so cached entries can't be altered by callers."""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _freeze(item) for key, item in value.items()}
+    return value
+
+
+def _thaw(layout: Dict) -> Dict:
+    """Return a caller-owned copy of a cached layout (tuples of lines become lists)."""
+    return {key: list(value) if isinstance(value, tuple) else value for key, value in layout.items()}
+
+
+def layout_key(generator: str, field: str, text: Union[str, Tuple[str, ...]], rect, fontname: str, start_size: float,
+               alignment: str, template_type: str) -> Tuple:
+    """
+    Build the cache key for one field's layout. Fields fitted together pass
+    their texts as a tuple: joined into one string, company "A\nB" + address
+    "C" would collide with company "A" + address "B\nC".
+    """
+    rect_key = tuple(round(float(v), 2) for v in (rect.x0, rect.y0, rect.x1, rect.y1))
+    return (generator, field, text, rect_key, fontname, float(start_size), alignment or "", template_type or "")
+
+
+def get_cached_layout(generator: str, field: str, text: Union[str, Tuple[str, ...]], rect, fontname: str, start_size: float,
+                      alignment: str, template_type: str, compute: Callable[[], Dict]) -> Dict:
+    """
+    Return the layout for a field, computing it with compute() on a cache miss.
+
+    compute() must return a dict of plain values (numbers, strings, lists of
+    lines) that depends only on the key's inputs.
+    """
+    key = layout_key(generator, field, text, rect, fontname, start_size, alignment, template_type)
+
+    with _lock:
+        cached = _layouts.get(key)
+        if cached is not None:
+            _layouts.move_to_end(key)
+            _stats["hits"] += 1
+    if cached is not None:
+        print(f"🔍 [LAYOUT-CACHE] Reusing {generator} layout for '{field}'")
+        collector = _collector.get()
+        if collector is not None:
+            collector.append((field, _thaw(cached)))
+        return _thaw(cached)
+
+    with stage("fit"):
+        layout = _freeze(compute())
+
+    with _lock:
+        _stats["misses"] += 1
+        _layouts[key] = layout
+        _layouts.move_to_end(key)
+        while len(_layouts) > LAYOUT_CACHE_SIZE:
+            _layouts.popitem(last=False)
+
+    collector = _collector.get()
+    if collector is not None:
+        collector.append((field, _thaw(layout)))
+    return _thaw(layout)
+
+
+def get_layout_cache_stats() -> Dict[str, int]:
+    """Return layout cache hit/miss counters and current size."""
+    with _lock:
+        return {**_stats, "size": len(_layouts)}
+
+
+def clear_layout_cache():
+    """Drop all cached layouts (e.g. after font files change) and reset the hit/miss counters."""
+    with _lock:
+        _layouts.clear()
+        _stats.update(hits=0, misses=0)
+
+
+def collect_layouts(fn, *args):
+    """Run fn and return (result, [(field, layout), ...] for every field layout it used)."""
+    collected = []
+    token = _collector.set(collected)
+    try:
+        return fn(*args), collected
+    finally:
+        _collector.reset(token)
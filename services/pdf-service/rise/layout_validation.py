@@ -0,0 +1,100 @@
+"""
+Layout-only validation of certificate rows (for /validate-layout).
+
+Runs the real draft or soft copy layout on a blank A4 page instead of the
+Supabase template: the fit computations only depend on the field rects of the
+template_type, never on the template artwork, so no template is downloaded,
+no QR code is generated and nothing is saved. The fitted font sizes and line
+counts are read back through the layout cache collector, and the overflow
+percentage is the same one generate_certificate reports in
+X-Overflow-Warnings.
+"""
+
+import io
+import os
+import tempfile
+import contextlib
+from typing import Dict, List
+
+import fitz  # PyMuPDF
+
+from .layout_cache import collect_layouts
+from .generate_certificate import build_certificate_document
+from .generate_softCopy import build_softcopy_document
+
+# All certificate templates are A4 portrait
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+_blank_template_path = None
+
+
+def _get_blank_template() -> str:
+    """Write a blank A4 page once per process and return its path."""
+    global _blank_template_path
+    if _blank_template_path is None or not os.path.exists(_blank_template_path):
+        path = os.path.join(tempfile.gettempdir(), f"layout_blank_a4_{os.getpid()}.pdf")
+        doc = fitz.open()
+        doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        doc.save(path)
+        doc.close()
+        _blank_template_path = path
+    return _blank_template_path
+
+
+def _build_draft(values: Dict, template_type: str):
+    return build_certificate_document(_get_blank_template(), values, template_type)
+
+
+def _build_softcopy(values: Dict, template_type: str):
+    return build_softcopy_document(_get_blank_template(), values, template_type, layout_only=True)
+
+
+LAYOUT_GENERATORS = {
+    "draft": _build_draft,
+    "softcopy": _build_softcopy,
+}
+
+
+def summarize_layout(layout: Dict) -> Dict:
+    """Numbers as they are (rounded); wrapped line lists become line counts."""
+    summary = {}
+    for key, value in layout.items():
+        if isinstance(value, list):
+            summary[key] = len(value)
+        elif isinstance(value, float):
+            summary[key] = round(value, 2)
+        else:
+            summary[key] = value
+    return summary
+
+
+def validate_row_layout(values: Dict, template_type: str, generator: str = "draft") -> Dict:
+    """Fit one row and return its per-field layout and overflow."""
+    # The generators log every fitting step; a 1,000-row sheet would flood the logs
+    with contextlib.redirect_stdout(io.StringIO()):
+        (doc, overflow_warnings), layouts = collect_layouts(LAYOUT_GENERATORS[generator], dict(values), template_type)
+    doc.close()
+
+    overflow_percentage = max((warning["overflow_percentage"] for warning in overflow_warnings), default=0.0)
+    return {
+        "fields": {field: summarize_layout(layout) for field, layout in layouts},
+        "overflow": bool(overflow_warnings),
+        "overflow_percentage": round(overflow_percentage, 1),
+        "warnings": [warning["message"] for warning in overflow_warnings],
+    }
+
+
+def validate_layout_rows(rows: List[Dict], generator: str = "draft") -> List[Dict]:
+    """
+    Validate a chunk of rows ({"values", "template_type"}) in one call, so a
+    render pool worker handles many rows per round trip. A row that fails to
+    lay out gets an "error" instead of aborting the chunk.
+    """
+    results = []
+    for row in rows:
+        try:
+            results.append(validate_row_layout(row["values"], row["template_type"], generator))
+        except Exception as e:
+            results.append({"error": str(e)})
+    return results
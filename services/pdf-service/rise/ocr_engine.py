@@ -0,0 +1,327 @@
+"""
+OCR subsystem shared by the form extractors.
+
+Keeps a pool of long-lived OCR workers so each recognition reuses an already
+initialised tesseract engine instead of spawning a new process per image.
+Images are downscaled and deskewed before recognition, recognition is limited
+to the detected table region, and results are cached by image hash.
+
+Backends (all optional, imported lazily):
+- tesserocr: persistent tesseract API per worker thread (preferred)
+- pytesseract: fallback when tesserocr is not installed (one process per call)
+- cv2 + numpy: preprocessing (downscale, deskew, threshold, table ROI)
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Number of long-lived OCR workers (one tesseract API each)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Longest image side fed to tesseract; larger scans are downscaled first
+OCR_MAX_DIMENSION = int(os.getenv("OCR_MAX_DIMENSION", "2000"))
+
+# Number of OCR results kept in the in-memory cache (keyed by image hash)
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "256"))
+
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+
+# Page segmentation mode 6 = assume a single uniform block of text (table rows)
+OCR_PAGE_SEG_MODE = 6
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_worker_state = threading.local()
+# Every worker's tesseract API, so shutdown can End() them once the workers have exited
+_engines: List[object] = []
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def get_ocr_executor() -> ThreadPoolExecutor:
+    """Return the process-wide OCR worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=max(1, OCR_WORKERS), thread_name_prefix="ocr-worker")
+                print(f"🔍 [OCR-DEBUG] Started OCR pool with {max(1, OCR_WORKERS)} worker(s)")
+    return _executor
+
+
+def shutdown_ocr_pool():
+    """Stop the OCR workers and release their tesseract engines."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+        # The worker threads are gone, so nothing can be using an engine any more
+        while _engines:
+            _engines.pop().End()
+
+
+def _get_worker_api():
+    """Return this worker's persistent tesseract API, or None if tesserocr is unavailable."""
+    if not hasattr(_worker_state, "api"):
+        try:
+            import tesserocr
+            _worker_state.api = tesserocr.PyTessBaseAPI(lang=OCR_LANGUAGE, psm=tesserocr.PSM.SINGLE_BLOCK)
+            with _executor_lock:
+                _engines.append(_worker_state.api)
+            print(f"🔍 [OCR-DEBUG] Initialised persistent tesseract API in {threading.current_thread().name}")
+        except ImportError:
+            _worker_state.api = None
+    return _worker_state.api
+
+
+def image_hash(image_bytes: bytes) -> str:
+    """Return the cache key for an image's raw bytes."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return OCR cache hit/miss counters and current size."""
+    with _cache_lock:
+        return {**_cache_stats, "size": len(_cache)}
+
+
+def _cache_get(key: str) -> Optional[str]:
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return _cache[key]
+        _cache_stats["misses"] += 1
+        return None
+
+
+def cached_ocr_text(key: str) -> Optional[str]:
+    """Return a cached OCR result without running recognition, or None."""
+    return _cache_get(key)
+
+
+def _cache_put(key: str, text: str):
+    with _cache_lock:
+        _cache[key] = text
+        _cache.move_to_end(key)
+        while len(_cache) > OCR_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def downscale_image(image, max_dimension: int = None):
+    """Shrink an image so its longest side is at most max_dimension pixels."""
+    import cv2
+
+    max_dimension = max_dimension or OCR_MAX_DIMENSION
+    height, width = image.shape[:2]
+    longest = max(height, width)
+    if longest <= max_dimension:
+        return image
+
+    scale = max_dimension / float(longest)
+    return cv2.resize(image, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+
+def deskew_image(gray):
+    """Rotate a grayscale image so its text lines are horizontal."""
+    import cv2
+    import numpy as np
+
+    # Text pixels are dark on a light background
+    inverted = cv2.bitwise_not(gray)
+    _, binary = cv2.threshold(inverted, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    coords = np.column_stack(np.where(binary > 0))
+    if len(coords) < 50:
+        return gray
+
+    angle = cv2.minAreaRect(coords.astype(np.float32))[-1]
+    # minAreaRect reports angles in [-90, 0) or (0, 90] depending on OpenCV version
+    if angle < -45:
+        angle = 90 + angle
+    elif angle > 45:
+        angle = angle - 90
+    angle = -angle
+
+    # Skip negligible rotations and anything that is clearly not skew
+    if abs(angle) < 0.3 or abs(angle) > 15:
+        return gray
+
+    height, width = gray.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width // 2, height // 2), angle, 1.0)
+    print(f"🔍 [OCR-DEBUG] Deskewing image by {angle:.2f} degrees")
+    return cv2.warpAffine(gray, matrix, (width, height), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+
+def detect_table_region(binary):
+    """
+    Return the (x, y, w, h) bounding box of the largest ruled table in a binary
+    image (text white on black), or None if no table grid is found.
+    """
+    import cv2
+
+    height, width = binary.shape[:2]
+    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(10, width // 30), 1))
+    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(10, height // 30)))
+
+    horizontal = cv2.morphologyEx(binary, cv2.MORPH_OPEN, horizontal_kernel)
+    vertical = cv2.morphologyEx(binary, cv2.MORPH_OPEN, vertical_kernel)
+    grid = cv2.add(horizontal, vertical)
+
+    contours, _ = cv2.findContours(grid, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+
+    x, y, w, h = cv2.boundingRect(max(contours, key=cv2.contourArea))
+    # Ignore stray rules; a form table covers a meaningful part of the page
+    if w * h < 0.1 * width * height:
+        return None
+    return x, y, w, h
+
+
+def preprocess_for_ocr(image):
+    """Downscale, deskew, threshold and crop an image (BGR or grayscale) to its table region."""
+    import cv2
+    import numpy as np
+
+    image = downscale_image(image)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    gray = deskew_image(gray)
+
+    denoised = cv2.medianBlur(gray, 3)
+    _, thresh = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    region = detect_table_region(cv2.bitwise_not(thresh))
+    if region:
+        x, y, w, h = region
+        print(f"🔍 [OCR-DEBUG] Table region detected at ({x}, {y}, {w}x{h}), limiting recognition to it")
+        thresh = thresh[y:y + h, x:x + w]
+
+    kernel = np.ones((1, 1), np.uint8)
+    return cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+
+
+def _recognize_array(processed) -> str:
+    """Run OCR on a preprocessed image in the current worker."""
+    api = _get_worker_api()
+    if api is not None:
+        from PIL import Image
+        api.SetImage(processed if isinstance(processed, Image.Image) else Image.fromarray(processed))
+        text = api.GetUTF8Text()
+        api.Clear()
+        return text
+
+    import pytesseract
+    return pytesseract.image_to_string(processed, lang=OCR_LANGUAGE, config=f"--oem 3 --psm {OCR_PAGE_SEG_MODE}")
+
+
+def _ocr_job(image_bytes: bytes, preprocess: bool) -> str:
+    import cv2
+    import numpy as np
+
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise Exception("Could not decode image")
+    processed = preprocess_for_ocr(image) if preprocess else image
+    return _recognize_array(processed)
+
+
+def _ocr_array_job(image, preprocess: bool) -> str:
+    processed = preprocess_for_ocr(image) if preprocess else image
+    return _recognize_array(processed)
+
+
+def ocr_image_bytes(image_bytes: bytes, preprocess: bool = True) -> str:
+    """Recognise text in an encoded image (PNG/JPEG bytes) on the OCR pool, using the cache."""
+    key = image_hash(image_bytes) + (":p" if preprocess else ":r")
+    cached = _cache_get(key)
+    if cached is not None:
+        print(f"🔍 [OCR-DEBUG] OCR cache hit for {key[:12]}")
+        return cached
+
+    text = get_ocr_executor().submit(_ocr_job, image_bytes, preprocess).result()
+    _cache_put(key, text)
+    return text
+
+
+def ocr_image_array(image, cache_key: str = None, preprocess: bool = True) -> str:
+    """Recognise text in an already decoded NumPy image on the OCR pool."""
+    if cache_key:
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+    text = get_ocr_executor().submit(_ocr_array_job, image, preprocess).result()
+    if cache_key:
+        _cache_put(cache_key, text)
+    return text
+
+
+def ocr_image_file(image_path: str, preprocess: bool = True) -> str:
+    """Recognise text in an image file on the OCR pool, using the cache."""
+    with open(image_path, "rb") as f:
+        return ocr_image_bytes(f.read(), preprocess)
+
+
+def ocr_regions(regions: Dict[str, Tuple[object, str]], preprocess: bool = False, check_cache: bool = True) -> Dict[str, str]:
+    """
+    Recognise several image regions in parallel on the OCR pool.
+
+    regions maps a name to (image array, cache key). Cached regions are served
+    from memory (check_cache=False when the caller already looked them up);
+    the rest are submitted together so each worker's persistent engine handles
+    one region at a time. Results are cached under their keys either way.
+    """
+    results = {}
+    pending = {}
+
+    for name, (image, cache_key) in regions.items():
+        cached = _cache_get(cache_key) if cache_key and check_cache else None
+        if cached is not None:
+            results[name] = cached
+        else:
+            pending[name] = get_ocr_executor().submit(_ocr_array_job, image, preprocess)
+
+    for name, future in pending.items():
+        text = future.result()
+        cache_key = regions[name][1]
+        if cache_key:
+            _cache_put(cache_key, text)
+        results[name] = text
+
+    return results
+
+
+def ocr_pages(pages: Iterable[Tuple[Optional[str], Callable[[], object]]], preprocess: bool = True) -> List[str]:
+    """
+    Recognise document pages in parallel on the OCR pool, returning text in page order.
+
+    pages yields (cache key, render) pairs; render() returns the page image and
+    is only called on a cache miss. Each page is submitted as soon as it is
+    rendered, so the caller renders the next page while earlier ones are being
+    recognised.
+    """
+    jobs = []
+    for cache_key, render in pages:
+        cached = _cache_get(cache_key) if cache_key else None
+        if cached is not None:
+            jobs.append((cached, cache_key))
+        else:
+            jobs.append((get_ocr_executor().submit(_ocr_array_job, render(), preprocess), cache_key))
+
+    texts = []
+    for job, cache_key in jobs:
+        if isinstance(job, str):
+            texts.append(job)
+            continue
+        text = job.result()
+        if cache_key:
+            _cache_put(cache_key, text)
+        texts.append(text)
+    return texts
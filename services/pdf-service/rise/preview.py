@@ -0,0 +1,113 @@
+"""
+Low-resolution certificate previews for the editors.
+
+render_softcopy_preview runs the same soft copy layout as /generate-softcopy
+but rasterizes page 1 straight from the open document with get_pixmap instead
+of serializing a PDF, and uses a small QR code and logo. render_draft_preview
+does the same for drafts with the /generate-certificate-json layout. Thumbnails
+are cached by a hash of everything that affects the pixels, so repeated
+keystroke batches with unchanged fields are served from memory without
+touching the render pool.
+"""
+
+import io
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import fitz  # PyMuPDF
+
+from .generate_softCopy import build_softcopy_document
+from .render_rows import with_logo_lookup
+
+PREVIEW_FORMATS = {"png": "image/png", "webp": "image/webp"}
+PREVIEW_GENERATORS = ("softcopy", "draft")
+PREVIEW_DEFAULT_WIDTH = 600
+PREVIEW_MIN_WIDTH = 64
+PREVIEW_MAX_WIDTH = 2000
+
+# Thumbnails kept in memory (LRU); previews are small, a few hundred KB at most
+PREVIEW_CACHE_SIZE = int(os.getenv("PREVIEW_CACHE_SIZE", "256"))
+
+_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def preview_cache_key(template_bytes_hash: str, values: Dict, template_type: str, width: int,
+                      image_format: str, logos: Optional[Dict[str, bytes]] = None,
+                      generator: str = "softcopy") -> str:
+    """Content hash of a preview: generator, template, field values, logos and output size/format."""
+    digest = hashlib.sha256()
+    digest.update(template_bytes_hash.encode())
+    digest.update(json.dumps(values, sort_keys=True, default=str).encode())
+    digest.update(f"|{generator}|{template_type}|{width}|{image_format}".encode())
+    for name in sorted(logos or {}):
+        digest.update(name.encode())
+        digest.update(hashlib.sha256(logos[name]).digest())
+    return digest.hexdigest()
+
+
+def get_cached_preview(key: str) -> Optional[bytes]:
+    with _cache_lock:
+        image = _cache.get(key)
+        if image is None:
+            _stats["misses"] += 1
+            return None
+        _cache.move_to_end(key)
+        _stats["hits"] += 1
+        return image
+
+
+def store_preview(key: str, image: bytes):
+    with _cache_lock:
+        _cache[key] = image
+        _cache.move_to_end(key)
+        while len(_cache) > PREVIEW_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def get_preview_cache_stats() -> Dict[str, int]:
+    with _cache_lock:
+        return {**_stats, "size": len(_cache), "max_size": PREVIEW_CACHE_SIZE}
+
+
+def rasterize_page(page: fitz.Page, width: int, image_format: str) -> bytes:
+    """Render a page to PNG/WebP at the given pixel width."""
+    zoom = width / page.rect.width
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    try:
+        if image_format == "png":
+            return pix.tobytes("png")
+        from PIL import Image
+        with Image.frombytes("RGB", (pix.width, pix.height), pix.samples) as image:
+            buffer = io.BytesIO()
+            image.save(buffer, format="WEBP", quality=80, method=4)
+            return buffer.getvalue()
+    finally:
+        # Drop the raster now rather than whenever the GC reaches it
+        del pix
+
+
+def render_softcopy_preview(template_path: str, values: Dict, template_type: str, width: int,
+                            image_format: str, logos: Optional[Dict[str, bytes]] = None) -> bytes:
+    """Lay out a soft copy and return page 1 as an image; nothing is saved."""
+    doc, _ = build_softcopy_document(template_path, with_logo_lookup(values, logos), template_type, preview=True)
+    try:
+        return rasterize_page(doc[0], width, image_format)
+    finally:
+        doc.close()
+
+
+def render_draft_preview(template_path: str, values: Dict, template_type: str, width: int,
+                         image_format: str, logos: Optional[Dict[str, bytes]] = None) -> bytes:
+    """Lay out a draft certificate and return page 1 as an image; nothing is saved."""
+    from .generate_certificate import build_certificate_document
+    doc, _ = build_certificate_document(template_path, with_logo_lookup(values, logos), template_type)
+    try:
+        return rasterize_page(doc[0], width, image_format)
+    finally:
+        doc.close()
@@ -0,0 +1,241 @@
+"""
+Incremental reissue of soft copy and printable certificates.
+
+Surveillance and recertification reissues usually change only the optional
+fields block (Certificate No. ... Recertification Date), the Revision and the
+QR code. Instead of re-rendering the whole certificate, reissue_certificate
+opens the previously generated PDF, removes only the text this service drew in
+those rows and the old QR image, writes the new values and saves the result as
+an incremental update. The original file is kept byte-for-byte as the prefix of
+the reissued one, so the previous issue stays recoverable for audit.
+"""
+
+import os
+import tempfile
+import fitz  # PyMuPDF
+from typing import Dict, List, Optional, Tuple
+
+from .draft_payload import read_draft_payload, embed_draft_payload
+from .generate_softCopy import (
+    get_optional_field_coordinates,
+    get_revision_coordinates,
+    get_qr_code_box,
+    build_certification_qr_data,
+    generate_certification_qr_code,
+    add_qr_code_to_pdf,
+    render_optional_fields,
+    register_bodoni_font,
+    BODONI_ALIAS,
+)
+from .timings import stage
+
+# Labels render_optional_fields draws, mapped back to their field names
+DISPLAY_LABEL_FIELDS = {
+    "Certificate No.": "Certificate Number",
+    "Initial Registration Date": "Initial Registration Date",
+    "Original Issue Date": "Original Issue Date",
+    "Issue Date": "Issue Date",
+    "Surveillance/ Expiry Date": "Surveillance/ Expiry Date",
+    "Surveillance Due Date": "Surveillance Due Date",
+    "Expiry Date": "Expiry Date",
+    "Recertification Date": "Recertification Date",
+}
+
+# Fields a reissue may change; everything else on the certificate is left as is
+REISSUE_FIELDS = list(DISPLAY_LABEL_FIELDS.values()) + ["Revision"]
+
+# Only used to rebuild the QR code of certificates that carry no field payload
+QR_ONLY_FIELDS = ["Company Name", "ISO Standard"]
+
+OPTIONAL_FONT_SIZE = 13
+REVISION_FONT_SIZE = 15
+REVISION_X = 446
+
+# Tolerance (pt) when matching drawn text and images to their layout anchors
+ANCHOR_TOLERANCE = 0.6
+
+
+def find_reissue_spans(page: fitz.Page, template_type: str) -> List[Dict]:
+    """
+    Return the text spans this service drew in the optional-field rows and the
+    Revision, each tagged with its row index and role ('key', 'value', 'revision').
+
+    Spans are matched by their exact origin (the insert_text point), so template
+    text and scope lines that merely overlap the block are never touched.
+    """
+    key_coords, value_coords = get_optional_field_coordinates(template_type)
+    baselines = [rect.y0 for rect in key_coords]
+    found = []
+
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", []):
+            for span in line["spans"]:
+                x, y = span["origin"]
+                row = next((i for i, baseline in enumerate(baselines) if abs(y - baseline) <= ANCHOR_TOLERANCE), None)
+                if row is None:
+                    continue
+                if abs(x - key_coords[row].x0) <= ANCHOR_TOLERANCE and abs(span["size"] - OPTIONAL_FONT_SIZE) < 0.5:
+                    role = "key"
+                elif abs(x - value_coords[row].x0) <= ANCHOR_TOLERANCE and abs(span["size"] - OPTIONAL_FONT_SIZE) < 0.5:
+                    role = "value"
+                elif abs(x - REVISION_X) <= ANCHOR_TOLERANCE and abs(span["size"] - REVISION_FONT_SIZE) < 0.5:
+                    role = "revision"
+                else:
+                    continue
+                found.append({"row": row, "role": role, "text": span["text"], "bbox": fitz.Rect(span["bbox"]),
+                              "origin": (x, y), "size": span["size"]})
+
+    return found
+
+
+def detect_template_type(page: fitz.Page) -> str:
+    """Guess 'standard' or 'large' from where the optional-field rows were drawn."""
+    large = len(find_reissue_spans(page, "large"))
+    standard = len(find_reissue_spans(page, "standard"))
+    return "large" if large > standard else "standard"
+
+
+def read_reissue_values(spans: List[Dict]) -> Dict[str, str]:
+    """Recover the optional-field values and Revision from the drawn spans (legacy certificates)."""
+    keys = {span["row"]: span["text"].strip() for span in spans if span["role"] == "key"}
+    values = {}
+    for span in spans:
+        text = span["text"].strip()
+        if span["role"] == "value" and keys.get(span["row"]) in DISPLAY_LABEL_FIELDS:
+            # Values are drawn as ":<value>"
+            values[DISPLAY_LABEL_FIELDS[keys[span["row"]]]] = text[1:] if text.startswith(":") else text
+        elif span["role"] == "revision":
+            values["Revision"] = text
+    return values
+
+
+def _redaction_rect(span: Dict) -> fitz.Rect:
+    # Only the band between baseline and x-height, so glyphs of neighbouring
+    # lines (e.g. a long scope above the block) never intersect it
+    _, y = span["origin"]
+    return fitz.Rect(span["bbox"].x0, y - span["size"] * 0.6, span["bbox"].x1, y - span["size"] * 0.1)
+
+
+def _find_qr_images(page: fitz.Page, qr_box: Tuple[float, float, float, float]) -> List[int]:
+    x, y, width, height = qr_box
+    target = fitz.Rect(x, y, x + width, y + height)
+    xrefs = []
+    for info in page.get_image_info(xrefs=True):
+        bbox = fitz.Rect(info["bbox"])
+        if info.get("xref") and all(abs(a - b) <= 1 for a, b in zip(bbox, target)):
+            xrefs.append(info["xref"])
+    return xrefs
+
+
+def _render_revision(page: fitz.Page, revision: str, issue_date_coords, template_type: str, fontname: str):
+    if not revision or not revision.strip():
+        return
+    # Same placement as generate_softcopy: on the Issue Date row, else the template fallback
+    revision_y = issue_date_coords.y0 if issue_date_coords else get_revision_coordinates(template_type).y0
+    page.insert_text((REVISION_X, revision_y), revision, fontsize=REVISION_FONT_SIZE, fontname=fontname, color=(0, 0, 0))
+
+
+def apply_reissue(doc: fitz.Document, values: Dict[str, str], template_type: Optional[str] = None) -> Dict[str, str]:
+    """
+    Redraw the optional fields, Revision and QR code of an open certificate.
+
+    values holds only the fields that change (send "" to clear one); the rest
+    come from the embedded field payload or, for older certificates, from the
+    text already drawn in the rows. Returns the full set of values now shown.
+    """
+    page = doc[0]
+    payload = read_draft_payload(doc)
+    template_type = template_type or (payload or {}).get("template_type") or detect_template_type(page)
+
+    spans = find_reissue_spans(page, template_type)
+    if not spans:
+        raise ValueError("No optional-field rows found - reissue needs a soft copy or printable generated by this service")
+
+    current = read_reissue_values(spans)
+    if payload:
+        current.update({key: value for key, value in payload.get("values", {}).items() if isinstance(value, str)})
+    unknown = [key for key in values if key not in REISSUE_FIELDS + QR_ONLY_FIELDS]
+    if unknown:
+        print(f"⚠️ [REISSUE] Ignoring fields a reissue cannot change: {unknown}")
+    merged = {**current, **{key: (value or "") for key, value in values.items() if key in REISSUE_FIELDS}}
+
+    if not merged.get("Certificate Number"):
+        raise ValueError("Certificate Number is mandatory for reissue")
+
+    # Remove only the text drawn in the rows; template artwork and lines stay
+    for span in spans:
+        page.add_redact_annot(_redaction_rect(span), fill=False)
+    page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE, graphics=fitz.PDF_REDACT_LINE_ART_NONE)
+
+    # The QR needs company and standard; legacy certificates without a payload
+    # keep their old QR unless the caller sends both
+    qr_values = {**(payload or {}).get("values", {}), **merged,
+                 **{key: values[key] for key in QR_ONLY_FIELDS if values.get(key)}}
+    redraw_qr = bool(qr_values.get("Company Name") and qr_values.get("ISO Standard"))
+    qr_box = get_qr_code_box(template_type)
+    if redraw_qr:
+        for xref in _find_qr_images(page, qr_box):
+            page.delete_image(xref)
+    else:
+        print("⚠️ [REISSUE] Company Name / ISO Standard unknown (no payload) - keeping the existing QR code")
+
+    fontname = BODONI_ALIAS if register_bodoni_font(doc) else "Times-Roman"
+    key_coords, value_coords = get_optional_field_coordinates(template_type)
+    result = render_optional_fields(
+        page=page,
+        values=merged,
+        key_coords=key_coords,
+        value_coords=value_coords,
+        font_settings={"fontname": fontname, "fontsize": OPTIONAL_FONT_SIZE, "color": (0, 0, 0)},
+    )
+    _render_revision(page, merged.get("Revision", ""), result.get("issue_date_coords"), template_type, fontname)
+
+    if redraw_qr:
+        qr_x, qr_y, qr_width, qr_height = qr_box
+        qr_image = generate_certification_qr_code(build_certification_qr_data(qr_values), size=400)
+        add_qr_code_to_pdf(pdf_document=doc, qr_image=qr_image, x=qr_x, y=qr_y, width=qr_width, height=qr_height)
+
+    if payload:
+        embed_draft_payload(doc, {**payload.get("values", {}), **merged}, template_type)
+
+    print(f"✅ [REISSUE] Redrew {len(spans)} span(s){' and the QR code' if redraw_qr else ''} ({template_type})")
+    return merged
+
+
+def reissue_certificate(pdf_bytes: bytes, values: Dict[str, str], template_type: Optional[str] = None) -> bytes:
+    """
+    Reissue a previously generated certificate with new dates/revision.
+
+    Saves as an incremental update, so the returned bytes start with the
+    original file unchanged. Encrypted or damaged PDFs that cannot be updated
+    incrementally are rewritten in full instead.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_file:
+        tmp_file.write(pdf_bytes)
+        tmp_path = tmp_file.name
+
+    try:
+        try:
+            doc = fitz.open(tmp_path)
+        except fitz.FileDataError:
+            raise ValueError("Certificate is not a readable PDF")
+        try:
+            # Checked before redacting: MuPDF refuses incremental saves after
+            # redactions because the removed text stays in the earlier revision,
+            # which is exactly the audit trail wanted here
+            incremental = doc.can_save_incrementally()
+            apply_reissue(doc, values, template_type)
+            with stage("serialize", "incremental" if incremental else "full"):
+                if incremental:
+                    doc.saveIncr()
+                else:
+                    print("⚠️ [REISSUE] PDF cannot be updated incrementally - writing a full copy")
+                    return doc.tobytes(garbage=3, deflate=True)
+        finally:
+            doc.close()
+
+        with open(tmp_path, "rb") as f:
+            return f.read()
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
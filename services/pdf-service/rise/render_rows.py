@@ -0,0 +1,61 @@
+"""
+Render pool entry points for whole certificates.
+
+The endpoints and bulk jobs hand these functions to run_in_render_pool, so
+everything they take is picklable: a template path, the field values, and
+the logos as {filename: bytes} instead of UploadFile objects. Each renders
+into its own temp file and returns the PDF bytes with the generator's
+overflow warnings, so concurrent renders never share an output path.
+"""
+
+import io
+from typing import Dict, Optional
+
+from .resources import temp_path
+
+
+class LogoUpload:
+    """Stand-in for an uploaded logo (UploadFile is not picklable for the render pool)."""
+
+    def __init__(self, filename: str, content: bytes):
+        self.filename = filename
+        self.file = io.BytesIO(content)
+
+
+def with_logo_lookup(values: Dict, logos: Optional[Dict[str, bytes]]) -> Dict:
+    """Copy of values with logo_lookup rebuilt from logo bytes, as the generators expect."""
+    values = dict(values)
+    values["logo_lookup"] = {name: LogoUpload(name, content) for name, content in (logos or {}).items()}
+    return values
+
+
+def _render(generate, template_path: str, values: Dict, template_type: str,
+            save_profile: Optional[str], logos: Optional[Dict[str, bytes]]) -> Dict:
+    with temp_path(".pdf") as output_path:
+        result = generate(template_path, output_path, with_logo_lookup(values, logos), template_type, save_profile)
+        with open(output_path, "rb") as f:
+            pdf = f.read()
+    if not pdf.startswith(b"%PDF"):
+        raise ValueError("Generated file does not appear to be a valid PDF")
+    return {"pdf": pdf, "overflow_warnings": (result or {}).get("overflow_warnings") or []}
+
+
+def render_certificate_pdf(template_path: str, values: Dict, template_type: str = "standard",
+                           save_profile: Optional[str] = None, logos: Optional[Dict[str, bytes]] = None) -> Dict:
+    """Draft certificate: {"pdf": bytes, "overflow_warnings": [...]}."""
+    from .generate_certificate import generate_certificate
+    return _render(generate_certificate, template_path, values, template_type, save_profile, logos)
+
+
+def render_softcopy_pdf(template_path: str, values: Dict, template_type: str = "standard",
+                        save_profile: Optional[str] = None, logos: Optional[Dict[str, bytes]] = None) -> Dict:
+    """Soft copy: {"pdf": bytes, "overflow_warnings": [...]}."""
+    from .generate_softCopy import generate_softcopy
+    return _render(generate_softcopy, template_path, values, template_type, save_profile, logos)
+
+
+def render_printable_pdf(template_path: str, values: Dict, template_type: str = "standard",
+                         save_profile: Optional[str] = None, logos: Optional[Dict[str, bytes]] = None) -> Dict:
+    """Printable: {"pdf": bytes, "overflow_warnings": []} (the printable generator reports none)."""
+    from .generate_printable import generate_printable_cert
+    return _render(generate_printable_cert, template_path, values, template_type, save_profile, logos)
@@ -0,0 +1,86 @@
+"""
+Deterministic cleanup for documents, images and temp files.
+
+MuPDF documents and pixmaps hold native memory that Python's GC only frees
+when it gets round to the wrapper, and a temp file left behind by an error
+path stays on disk for good. On long-lived workers both add up, so the
+generators and endpoints close what they open explicitly:
+
+- close_on_error: the build_* functions hand an open document to their
+  caller, so it is only closed here when building fails
+- close_quietly: close documents, PIL images or files without letting a
+  failing close hide the original error
+- temp_path / remove_file: temp files that are removed on every path
+
+get_process_resources reports this process's RSS and open file descriptors
+(for /metrics and soak_benchmark.py).
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+def close_quietly(*resources):
+    """Close each resource that is not None, ignoring errors from close()."""
+    for resource in resources:
+        if resource is None:
+            continue
+        try:
+            resource.close()
+        except Exception as e:
+            print(f"⚠️ [RESOURCES] Could not close {type(resource).__name__}: {e}")
+
+
+@contextmanager
+def close_on_error(resource):
+    """Close resource if the block raises; on success it stays open for the caller."""
+    try:
+        yield resource
+    except BaseException:
+        close_quietly(resource)
+        raise
+
+
+def remove_file(path: Optional[str]):
+    """Delete a file if it exists; a missing or undeletable file is only logged."""
+    if not path:
+        return
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"⚠️ [RESOURCES] Could not remove {path}: {e}")
+
+
+@contextmanager
+def temp_path(suffix: str = "", content: Optional[bytes] = None):
+    """A temp file path (optionally pre-filled with content) that is removed when the block exits."""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if content is not None:
+                f.write(content)
+        yield path
+    finally:
+        remove_file(path)
+
+
+def get_process_resources() -> Dict[str, Optional[int]]:
+    """This process's resident set size (KiB) and open file descriptor count (Linux; None elsewhere)."""
+    rss_kb = None
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss_kb = int(line.split()[1])
+                    break
+    except OSError:
+        pass
+    try:
+        open_fds = len(os.listdir("/proc/self/fd"))
+    except OSError:
+        open_fds = None
+    return {"rss_kb": rss_kb, "open_fds": open_fds}
@@ -0,0 +1,144 @@
+"""
+Named save profiles for generated PDFs.
+
+- fast: plain serialization, no compaction (previews)
+- compact: font subsetting, object deduplication (shared images/fonts are
+  stored once), stream deflation and object streams (bulk ZIPs, email)
+- archival: PDF/A-friendly - subset but fully embedded fonts, deflated
+  streams, no object streams and complete document metadata
+
+Every save records its output size and serialization time per profile so
+they can be reported from /metrics.
+"""
+
+import os
+import time
+import threading
+import fitz  # PyMuPDF
+from typing import Dict, List, Optional
+
+from .timings import record_stage
+
+SAVE_PROFILES = {
+    "fast": {
+        "save": {"garbage": 0, "deflate": False},
+        "subset_fonts": False,
+        "metadata": False,
+    },
+    "compact": {
+        # garbage=4 also merges identical objects, e.g. a logo inserted twice
+        "save": {"garbage": 4, "deflate": True, "deflate_images": True, "deflate_fonts": True, "use_objstms": 1},
+        "subset_fonts": True,
+        "metadata": False,
+    },
+    "archival": {
+        # PDF/A-1 predates object streams, so objects stay top-level
+        "save": {"garbage": 3, "deflate": True, "deflate_images": True, "deflate_fonts": True, "use_objstms": 0},
+        "subset_fonts": True,
+        "metadata": True,
+    },
+}
+
+# Profile used when a request does not pick one
+DEFAULT_SAVE_PROFILE = os.getenv("PDF_SAVE_PROFILE", "compact")
+
+_metrics: Dict[str, Dict[str, float]] = {}
+_metrics_lock = threading.Lock()
+# Set while a render pool worker runs a job, so its saves can be reported back
+_collector: Optional[List[Dict]] = None
+
+
+def resolve_save_profile(name: Optional[str] = None) -> str:
+    """Return a valid profile name, falling back to DEFAULT_SAVE_PROFILE when empty."""
+    name = (name or DEFAULT_SAVE_PROFILE or "compact").strip().lower()
+    if name not in SAVE_PROFILES:
+        raise ValueError(f"Unknown save profile '{name}' (expected one of: {', '.join(SAVE_PROFILES)})")
+    return name
+
+
+def _prepare(doc: fitz.Document, profile: str):
+    settings = SAVE_PROFILES[profile]
+    if settings["subset_fonts"]:
+        try:
+            doc.subset_fonts()
+        except Exception as e:
+            # Subsetting is an optimisation; keep the full fonts if it fails
+            print(f"⚠️ [SAVE-PROFILE] Font subsetting skipped: {e}")
+    if settings["metadata"]:
+        metadata = doc.metadata or {}
+        now = fitz.get_pdf_now()
+        doc.set_metadata({
+            **{key: value for key, value in metadata.items() if value},
+            "producer": metadata.get("producer") or "Nexus PDF Service",
+            "creationDate": metadata.get("creationDate") or now,
+            "modDate": now,
+        })
+
+
+def pdf_to_bytes(doc: fitz.Document, profile: Optional[str] = None) -> bytes:
+    """Serialize an open document with a save profile."""
+    profile = resolve_save_profile(profile)
+    start = time.perf_counter()
+    _prepare(doc, profile)
+    data = doc.tobytes(**SAVE_PROFILES[profile]["save"])
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    record_save(profile, len(data), elapsed_ms)
+    record_stage("serialize", elapsed_ms, profile)
+    return data
+
+
+def save_pdf(doc: fitz.Document, output_pdf_path: str, profile: Optional[str] = None) -> int:
+    """Save an open document to output_pdf_path with a save profile; returns the file size."""
+    profile = resolve_save_profile(profile)
+    start = time.perf_counter()
+    _prepare(doc, profile)
+    doc.save(output_pdf_path, **SAVE_PROFILES[profile]["save"])
+    size = os.path.getsize(output_pdf_path)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    record_save(profile, size, elapsed_ms)
+    record_stage("serialize", elapsed_ms, profile)
+    print(f"🔍 [SAVE-PROFILE] Saved {size} bytes with '{profile}' profile in {elapsed_ms:.1f}ms")
+    return size
+
+
+def record_save(profile: str, size: int, elapsed_ms: float):
+    """Add one save to the per-profile metrics."""
+    with _metrics_lock:
+        entry = _metrics.setdefault(profile, {"saves": 0, "bytes_total": 0, "ms_total": 0.0})
+        entry["saves"] += 1
+        entry["bytes_total"] += size
+        entry["ms_total"] += elapsed_ms
+        entry["bytes_last"] = size
+        entry["ms_last"] = round(elapsed_ms, 2)
+        if _collector is not None:
+            _collector.append({"profile": profile, "size": size, "elapsed_ms": elapsed_ms})
+
+
+def get_save_metrics() -> Dict[str, Dict[str, float]]:
+    """Return per-profile save counts, output sizes and serialization times."""
+    with _metrics_lock:
+        return {
+            profile: {
+                **entry,
+                "ms_total": round(entry["ms_total"], 2),
+                "bytes_avg": round(entry["bytes_total"] / entry["saves"]),
+                "ms_avg": round(entry["ms_total"] / entry["saves"], 2),
+            }
+            for profile, entry in _metrics.items()
+        }
+
+
+def collect_save_metrics(fn, *args):
+    """Run fn in a worker process and return (result, saves recorded during the call)."""
+    global _collector
+    _collector = []
+    try:
+        return fn(*args), _collector
+    finally:
+        _collector = None
+
+
+def merge_save_metrics(saves: List[Dict]):
+    """Fold saves reported by a render pool worker into this process's metrics."""
+    for save in saves:
+        record_save(save["profile"], save["size"], save["elapsed_ms"])
@@ -0,0 +1,135 @@
+"""
+Cross-process shared cache for templates and glyph metrics.
+
+The API process, its uvicorn workers and the render pool workers each used to
+download their own template copies and measure glyphs into their own caches.
+Shared entries are files in SHARED_CACHE_DIR (/dev/shm when available, so
+they live in shared memory): they are published once, atomically, by
+whichever process builds them first and then read by every process through
+mmap, so the pages are shared instead of copied per worker.
+
+Glyph metric tables hold the unit-size advance (the value text_length(char, 1)
+returns, fallback fonts included) of every codepoint below
+METRIC_TABLE_CODEPOINTS as float64. text_fit looks characters up there before
+asking MuPDF, so a fresh worker starts with the whole table warm.
+"""
+
+import os
+import re
+import mmap
+import tempfile
+import threading
+from array import array
+from typing import Dict, Iterable, Optional
+
+import fitz  # PyMuPDF
+
+# Docker gives a container only 64 MB of /dev/shm unless it runs with --shm-size
+# (compose: shm_size); templates, custom template masters and metric tables all
+# live here, so size it for them or point SHARED_CACHE_DIR at a disk directory
+_default_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+SHARED_CACHE_DIR = os.getenv("SHARED_CACHE_DIR", os.path.join(_default_dir, "pdf-service-cache"))
+
+# Codepoints covered by a metric table (Latin, Greek, Cyrillic, punctuation, arrows, bullets...)
+METRIC_TABLE_CODEPOINTS = int(os.getenv("METRIC_TABLE_CODEPOINTS", str(0x3000)))
+
+# Fonts the generators measure with; their tables are published at startup
+SHARED_METRIC_FONTS = [
+    name.strip() for name in
+    os.getenv("SHARED_METRIC_FONTS", "Times-Bold,Times-Roman,Times-Italic,Times-BoldItalic,Helvetica,Helvetica-Bold").split(",")
+    if name.strip()
+]
+
+# fontname -> (mmap, float64 view); the mmap must stay open while the view is used
+_tables: Dict[str, tuple] = {}
+_tables_lock = threading.Lock()
+_stats = {"table_hits": 0, "tables_published": 0}
+
+
+def publish_file(path: str, content: bytes) -> str:
+    """Write a shared file atomically; readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return path
+
+
+def metric_table_path(fontname: str) -> str:
+    # Versioned by PyMuPDF so an upgrade never reads metrics measured by another build
+    safe_name = re.sub(r"[^A-Za-z0-9_-]", "_", fontname)
+    return os.path.join(SHARED_CACHE_DIR, "metrics", f"{safe_name}-{fitz.VersionBind}-{METRIC_TABLE_CODEPOINTS}.f64")
+
+
+def build_metric_table(fontname: str) -> bytes:
+    """Unit-size advances of codepoints 0..METRIC_TABLE_CODEPOINTS-1 (NaN where MuPDF can't measure)."""
+    font = fitz.Font(fontname=fontname)
+    advances = array("d")
+    for codepoint in range(METRIC_TABLE_CODEPOINTS):
+        try:
+            advances.append(font.text_length(chr(codepoint), 1))
+        except Exception:
+            advances.append(float("nan"))
+    return advances.tobytes()
+
+
+def publish_metric_tables(fontnames: Optional[Iterable[str]] = None) -> int:
+    """Build and publish the metric tables that don't exist yet; returns how many were built."""
+    built = 0
+    for fontname in fontnames or SHARED_METRIC_FONTS:
+        path = metric_table_path(fontname)
+        if os.path.exists(path):
+            continue
+        try:
+            publish_file(path, build_metric_table(fontname))
+        except Exception as e:
+            print(f"⚠️ [SHARED-CACHE] Could not publish metrics for {fontname}: {e}")
+            continue
+        built += 1
+    _stats["tables_published"] += built
+    if built:
+        print(f"✅ [SHARED-CACHE] Published {built} glyph metric table(s) to {SHARED_CACHE_DIR}")
+    return built
+
+
+def get_metric_table(fontname: str) -> Optional[memoryview]:
+    """Map a font's published metric table, or None if it has not been published."""
+    with _tables_lock:
+        entry = _tables.get(fontname)
+        if entry is not None:
+            return entry[1]
+        path = metric_table_path(fontname)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped).cast("d")
+        _tables[fontname] = (mapped, view)
+        return view
+
+
+def lookup_advance(fontname: str, char: str) -> Optional[float]:
+    """A character's unit-size advance from the shared table, if covered."""
+    codepoint = ord(char) if len(char) == 1 else METRIC_TABLE_CODEPOINTS
+    if codepoint >= METRIC_TABLE_CODEPOINTS:
+        return None
+    table = get_metric_table(fontname)
+    if table is None:
+        return None
+    advance = table[codepoint]
+    if advance != advance:  # NaN: not measurable from the table
+        return None
+    _stats["table_hits"] += 1
+    return advance
+
+
+def attach_metric_tables(fontnames: Optional[Iterable[str]] = None) -> int:
+    """Map every published table up front (worker warm-up); returns how many are attached."""
+    return sum(1 for fontname in fontnames or SHARED_METRIC_FONTS if get_metric_table(fontname) is not None)
+
+
+def get_shared_cache_stats() -> Dict:
+    with _tables_lock:
+        attached = sorted(_tables)
+    return {"dir": SHARED_CACHE_DIR, "metric_tables_attached": attached, **_stats}
@@ -0,0 +1,234 @@
+"""
+Batch text-fitting kernel for the draft, soft copy and printable generators.
+
+The generators pick a field's font size by shrinking from a start size until
+the wrapped text fits its rect (the `while font_size >= 12` loops). Each step
+used to re-wrap the whole text with text_length on every growing test line.
+Here every word is measured once at unit size from cached glyph advances,
+and the greedy wrap is computed for all candidate sizes together: with the
+cumulative word+space widths, each size's next line break is one
+searchsorted, so the line counts of every size come out of a handful of
+vectorized steps (one per line of the tallest candidate).
+
+The kernel fits one text at a time; it is vectorized across candidate
+sizes, not across rows. A sheet's rows differ in rect and start size with
+their template_type, and /validate-layout runs each row through the real
+generator code, which calls fit_font_size per field.
+
+NumPy is optional; without it the same arithmetic runs in pure Python and
+gives identical results.
+
+The same cached widths drive the line breaker the generators draw with
+(break_lines / wrap_words / wrap_scope_lines / wrap_paragraphs): line widths
+are accumulated arithmetically and lines are emitted as word index ranges,
+so a line's text is only joined once it is final.
+"""
+
+import threading
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import fitz  # PyMuPDF
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from .shared_cache import lookup_advance
+from .timings import timed_stage
+
+# Mirrors the generators' loops: never shrink a field below 12pt
+FIT_MIN_FONT_SIZE = 12
+
+# Words starting with one of these begin a new scope line (bullet points)
+BULLET_INDICATORS = ('-', '•', '>', '→', '▪', '▫', '*')
+
+_fonts: Dict[str, fitz.Font] = {}
+_fonts_lock = threading.Lock()
+
+
+def _get_font(fontname: str) -> fitz.Font:
+    with _fonts_lock:
+        if fontname not in _fonts:
+            _fonts[fontname] = fitz.Font(fontname=fontname)
+        return _fonts[fontname]
+
+
+@lru_cache(maxsize=8192)
+def _char_advance(fontname: str, char: str) -> float:
+    # Same per-glyph measurement (including fallback fonts) text_length sums up;
+    # the shared metric table holds exactly these values for common codepoints
+    advance = lookup_advance(fontname, char)
+    if advance is not None:
+        return advance
+    return _get_font(fontname).text_length(char, 1)
+
+
+@lru_cache(maxsize=65536)
+def word_width(fontname: str, word: str) -> float:
+    """Width of a word at font size 1."""
+    return sum(_char_advance(fontname, char) for char in word)
+
+
+def measure_words(text: str, fontname: str) -> Tuple[List[float], float]:
+    """Unit-size widths of the whitespace-separated words of text, and of a space."""
+    return [word_width(fontname, word) for word in text.split()], _char_advance(fontname, " ")
+
+
+def _line_counts_numpy(widths: Sequence[float], space: float, sizes: Sequence[float], max_width: float) -> List[int]:
+    count = len(widths)
+    widths = np.asarray(widths, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.float64)
+    # cumulative[k] = width of words[:k], each followed by a space
+    cumulative = np.concatenate(([0.0], np.cumsum(widths + space)))
+    positions = np.zeros(len(sizes), dtype=np.int64)
+    lines = np.zeros(len(sizes), dtype=np.int64)
+
+    active = positions < count
+    while active.any():
+        start = positions[active]
+        # Words start..j-1 fit when size * (cumulative[j] - cumulative[start] - space) <= max_width
+        limit = cumulative[start] + max_width / sizes[active] + space
+        end = np.searchsorted(cumulative, limit, side="right") - 1
+        # A word wider than the line still takes a line of its own
+        positions[active] = np.minimum(np.maximum(end, start + 1), count)
+        lines[active] += 1
+        active = positions < count
+
+    if count:
+        # The generators' wrap loops emit an empty first line when the first word alone is too wide
+        lines += (widths[0] * sizes > max_width).astype(np.int64)
+    return lines.tolist()
+
+
+def _line_counts_python(widths: Sequence[float], space: float, sizes: Sequence[float], max_width: float) -> List[int]:
+    counts = []
+    for size in sizes:
+        lines = 0
+        line_width = None
+        for width in widths:
+            candidate = width if line_width is None else line_width + space + width
+            if size * candidate <= max_width:
+                line_width = candidate
+            else:
+                # Includes the empty first line emitted when the first word alone is too wide
+                lines += 1
+                line_width = width
+        if line_width is not None:
+            lines += 1
+        counts.append(lines)
+    return counts
+
+
+def wrapped_line_counts(widths: Sequence[float], space: float, sizes: Sequence[float], max_width: float) -> List[int]:
+    """Number of greedily wrapped lines of the words at each font size."""
+    if not sizes:
+        return []
+    if np is not None:
+        return _line_counts_numpy(widths, space, sizes, max_width)
+    return _line_counts_python(widths, space, sizes, max_width)
+
+
+def candidate_sizes(start_size: float, min_size: float = FIT_MIN_FONT_SIZE) -> List[float]:
+    """The sizes the shrink loop tries: start_size, start_size - 1, ... down to min_size."""
+    sizes = []
+    size = start_size
+    while size >= min_size:
+        sizes.append(size)
+        size -= 1
+    return sizes
+
+
+@timed_stage("fit")
+def fit_font_size(text: str, fontname: str, max_width: float, limit: float, start_size: float,
+                  line_factor: float = 1.2, min_size: float = FIT_MIN_FONT_SIZE) -> float:
+    """
+    Largest candidate size whose wrapped height (lines * size * line_factor)
+    fits within limit. Like the loops it replaces, returns one step below
+    min_size when nothing fits, and start_size unchanged when it is already
+    below min_size.
+    """
+    sizes = candidate_sizes(start_size, min_size)
+    if not sizes:
+        return start_size
+    widths, space = measure_words(text, fontname)
+    for size, lines in zip(sizes, wrapped_line_counts(widths, space, sizes, max_width)):
+        if lines * size * line_factor <= limit:
+            return size
+    return sizes[-1] - 1
+
+
+def break_lines(words: Sequence[str], fontname: str, fontsize: float, max_width: float,
+                bullet_breaks: bool = False) -> List[Tuple[int, int]]:
+    """
+    Greedy line breaks of words as (start, end) index ranges, matching the
+    generators' wrap loops: a word is added while the line stays within
+    max_width, a word too wide for any line gets a line of its own, and with
+    bullet_breaks a bullet word always starts a new line.
+    """
+    space = _char_advance(fontname, " ")
+    ranges = []
+    start = None
+    line_width = 0.0
+    for index, word in enumerate(words):
+        width = word_width(fontname, word)
+        if bullet_breaks and start is not None and word.startswith(BULLET_INDICATORS):
+            ranges.append((start, index))
+            start, line_width = index, width
+            continue
+        candidate = width if start is None else line_width + space + width
+        if candidate * fontsize <= max_width:
+            if start is None:
+                start = index
+            line_width = candidate
+        else:
+            if start is not None:
+                ranges.append((start, index))
+            start, line_width = index, width
+    if start is not None:
+        ranges.append((start, len(words)))
+    return ranges
+
+
+def wrap_words(words: Sequence[str], fontname: str, fontsize: float, max_width: float,
+               bullet_breaks: bool = False) -> List[str]:
+    """break_lines, joined into the line strings."""
+    return [" ".join(words[start:end]) for start, end in break_lines(words, fontname, fontsize, max_width, bullet_breaks)]
+
+
+def wrap_scope_lines(text: str, fontname: str, fontsize: float, max_width: float) -> List[str]:
+    """Scope wrapping: explicit line breaks are kept, blank lines dropped, bullets start new lines."""
+    lines = []
+    for segment in text.split("\n"):
+        lines.extend(wrap_words(segment.split(), fontname, fontsize, max_width, bullet_breaks=True))
+    return lines
+
+
+def scope_line_count(text: str, fontname: str, fontsize: float, max_width: float) -> int:
+    """Number of lines wrap_scope_lines produces, without building them."""
+    return sum(len(break_lines(segment.split(), fontname, fontsize, max_width, bullet_breaks=True))
+               for segment in text.split("\n"))
+
+
+def wrap_paragraphs(paragraphs: Sequence[str], fontname: str, fontsize: float, max_width: float) -> List[str]:
+    """Company Name/Address wrapping: each paragraph wrapped on its own, blank paragraphs kept as empty lines."""
+    lines = []
+    for paragraph in paragraphs:
+        if not paragraph.strip():
+            lines.append("")
+            continue
+        lines.extend(wrap_words(paragraph.split(), fontname, fontsize, max_width))
+    return lines
+
+
+def text_line_count(text: str, fontname: str, fontsize: float, max_width: float) -> int:
+    """
+    Line count of the generators' get_text_height wrap, which also counts an
+    empty first line when the first word alone is too wide.
+    """
+    words = text.split()
+    count = len(break_lines(words, fontname, fontsize, max_width))
+    if words and word_width(fontname, words[0]) * fontsize > max_width:
+        count += 1
+    return count
@@ -0,0 +1,134 @@
+"""
+Per-request stage timings, reported as Server-Timing headers.
+
+main.py opens a StageTimings for every request; code on the request path
+(and in the generators) adds named stages to it with stage() or
+record_stage(). Render pool jobs collect their stages in the worker with
+collect_stage_timings and the parent merges them into the request, so one
+header covers template fetch, fitting, QR, serialization and so on.
+
+Stages can nest (render includes fit, qr, logo and serialize); a stage
+re-entered further down the same call chain is only counted once. Stages
+of the same name running concurrently (batch rows in threads or tasks
+sharing the request's timings) each add their own duration, so a stage's
+dur is the summed time of its entries and can exceed the request's wall
+time. Without an active StageTimings every helper is a no-op.
+"""
+
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, FrozenSet, Optional
+
+
+class StageTimings:
+    """Accumulated milliseconds per stage name, in first-seen order."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.descriptions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, elapsed_ms: float, description: Optional[str] = None):
+        # Rows running in threadpool threads add to the same request's timings
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+            if description:
+                self.descriptions[name] = description
+
+    def merge(self, stages: Dict[str, float], descriptions: Optional[Dict[str, str]] = None):
+        for name, elapsed_ms in stages.items():
+            self.add(name, elapsed_ms, (descriptions or {}).get(name))
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: round(elapsed_ms, 2) for name, elapsed_ms in self.stages.items()}
+
+    def header(self, total_ms: Optional[float] = None) -> str:
+        """Server-Timing header value, e.g. 'template-fetch;desc="hit";dur=0.4, total;dur=52.1'."""
+        entries = []
+        stages = dict(self.stages)
+        if total_ms is not None:
+            stages["total"] = total_ms
+        for name, elapsed_ms in stages.items():
+            description = self.descriptions.get(name)
+            desc = f';desc="{description}"' if description else ""
+            entries.append(f"{name}{desc};dur={elapsed_ms:.1f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[StageTimings]] = ContextVar("stage_timings", default=None)
+
+# Stage names open in the current call chain. Threads and tasks start from a
+# copy of their parent's context, so a concurrent entry of the same name is
+# not mistaken for re-entry.
+_open_stages: ContextVar[FrozenSet[str]] = ContextVar("open_stages", default=frozenset())
+
+
+def start_stage_timings() -> StageTimings:
+    """Give the current context (request, batch row) its own StageTimings and return it."""
+    timings = StageTimings()
+    _current.set(timings)
+    # Stages the parent has open belong to the parent's timings
+    _open_stages.set(frozenset())
+    return timings
+
+
+def current_stage_timings() -> Optional[StageTimings]:
+    return _current.get()
+
+
+def record_stage(name: str, elapsed_ms: float, description: Optional[str] = None):
+    """Add a measured duration to the active timings, if any."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, elapsed_ms, description)
+
+
+@contextmanager
+def stage(name: str, description: Optional[str] = None):
+    """Time the enclosed block as stage name."""
+    timings = _current.get()
+    open_stages = _open_stages.get()
+    if timings is None or name in open_stages:
+        yield
+        return
+    token = _open_stages.set(open_stages | {name})
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _open_stages.reset(token)
+        timings.add(name, (time.perf_counter() - start) * 1000, description)
+
+
+def timed_stage(name: str):
+    """Decorator form of stage()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def collect_stage_timings(fn, *args):
+    """Run fn (e.g. in a render pool worker) and return (result, (stages, descriptions))."""
+    token = _current.set(StageTimings())
+    open_token = _open_stages.set(frozenset())
+    try:
+        result = fn(*args)
+        timings = _current.get()
+        return result, (timings.stages, timings.descriptions)
+    finally:
+        _open_stages.reset(open_token)
+        _current.reset(token)
+
+
+def merge_stage_timings(collected):
+    """Fold stages reported by collect_stage_timings into the active timings."""
+    timings = _current.get()
+    if timings is not None and collected:
+        timings.merge(*collected)
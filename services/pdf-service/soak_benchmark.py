@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Soak benchmark: tens of thousands of mixed renders and error cases in one
+process, tracking RSS, open file descriptors and leftover temp files.
+
+Runs the generators the way a long-lived worker does (drafts, soft copies,
+printables, previews, layout validation, reissues, finals) interleaved with
+failing requests (missing/corrupt templates, failures while drawing, garbage
+PDFs). A worker that leaks documents, pixmaps or temp files shows up as
+steady growth after the warm-up samples.
+
+    python soak_benchmark.py --iterations 20000 --sample-every 500
+
+Exits non-zero when open files, temp files or RSS grow past the limits after
+warm-up. The final render is skipped unless Final.pdf is available (see
+FINAL_TEMPLATE_PATH).
+"""
+
+import sys
+import os
+import io
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rise.generate_certificate import build_certificate_document, generate_certificate
+from rise.generate_softCopy import generate_softcopy
+from rise.generate_printable import generate_printable_cert
+from rise.generate_final_certificate import convert_draft_to_final, extract_text_from_pdf, get_final_template
+from rise.layout_validation import validate_row_layout
+from rise.preview import render_softcopy_preview
+from rise.reissue import reissue_certificate
+from rise.resources import get_process_resources, temp_path
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "default-draft.pdf")
+
+SCOPES = [
+    "Manufacture and supply of precision engineered widgets",
+    "Design, development and installation of industrial control panels\n- Wiring\n- Testing and commissioning",
+    " ".join(["Provision of calibration, inspection and maintenance services for laboratory equipment"] * 6),
+]
+
+DATES = {
+    "Original Issue Date": "01/01/2023",
+    "Issue Date": "01/01/2025",
+    "Surveillance/ Expiry Date": "01/01/2026",
+    "Recertification Date": "01/01/2028",
+}
+
+
+def make_values(index: int) -> dict:
+    """A row that varies with index, so fitting and caches see a realistic mix."""
+    return {
+        "Company Name": f"Acme Widgets {index % 97}",
+        "Address": f"Plot {index % 53}, MIDC Industrial Area\nPune, India",
+        "ISO Standard": "ISO 9001:2015",
+        "Scope": SCOPES[index % len(SCOPES)],
+        "Certificate Number": f"C-{index}",
+        "Revision": str(index % 5),
+        **DATES,
+    }
+
+
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class Soak:
+    """The mixed workload; each case renders or fails one request."""
+
+    def __init__(self):
+        with temp_path(".pdf") as path:
+            generate_softcopy(TEMPLATE, path, make_values(0), "standard", "fast")
+            self.softcopy = read_file(path)
+        with temp_path(".pdf") as path:
+            generate_certificate(TEMPLATE, path, make_values(0), "standard", "fast")
+            self.draft = read_file(path)
+        try:
+            get_final_template()
+            self.final_available = True
+        except FileNotFoundError:
+            self.final_available = False
+
+    # --- renders
+    def draft_render(self, index):
+        with temp_path(".pdf") as path:
+            generate_certificate(TEMPLATE, path, make_values(index), "standard", "fast")
+
+    def softcopy_render(self, index):
+        with temp_path(".pdf") as path:
+            generate_softcopy(TEMPLATE, path, make_values(index), "standard", "fast")
+
+    def printable_render(self, index):
+        with temp_path(".pdf") as path:
+            generate_printable_cert(TEMPLATE, path, make_values(index), "standard", "fast")
+
+    def preview_render(self, index):
+        render_softcopy_preview(TEMPLATE, make_values(index), "standard", 400, "webp" if index % 2 else "png")
+
+    def layout_check(self, index):
+        validate_row_layout(make_values(index), "standard", "softcopy")
+
+    def reissue_render(self, index):
+        reissue_certificate(self.softcopy, {"Issue Date": f"{index % 28 + 1:02d}/03/2026", "Revision": str(index % 9)})
+
+    def final_render(self, index):
+        if self.final_available:
+            convert_draft_to_final(self.draft, {"Issue Date": "15/03/2026"}, "fast")
+
+    # --- error cases (each must raise or fail cleanly)
+    def missing_template(self, index):
+        with temp_path(".pdf") as path:
+            generate_softcopy(f"/nonexistent/template_{index}.pdf", path, make_values(index), "standard", "fast")
+
+    def corrupt_template(self, index):
+        with temp_path(".pdf", b"%PDF-1.7 not really a pdf") as template, temp_path(".pdf") as path:
+            generate_certificate(template, path, make_values(index), "standard", "fast")
+
+    def draw_failure(self, index):
+        # Fails after the template is open; the document must still be closed
+        build_certificate_document(TEMPLATE, None, "standard")
+
+    def printable_failure(self, index):
+        with temp_path(".pdf") as path:
+            generate_printable_cert(TEMPLATE, path, None, "standard", "fast")
+
+    def garbage_reissue(self, index):
+        reissue_certificate(b"garbage" * (index % 7 + 1), {"Revision": "2"})
+
+    def garbage_extract(self, index):
+        extract_text_from_pdf(b"garbage", {})
+
+
+CASES = [
+    ("draft", Soak.draft_render, 3),
+    ("softcopy", Soak.softcopy_render, 3),
+    ("printable", Soak.printable_render, 2),
+    ("preview", Soak.preview_render, 2),
+    ("layout", Soak.layout_check, 2),
+    ("reissue", Soak.reissue_render, 1),
+    ("final", Soak.final_render, 1),
+    ("missing_template", Soak.missing_template, 1),
+    ("corrupt_template", Soak.corrupt_template, 1),
+    ("draw_failure", Soak.draw_failure, 1),
+    ("printable_failure", Soak.printable_failure, 1),
+    ("garbage_reissue", Soak.garbage_reissue, 1),
+    ("garbage_extract", Soak.garbage_extract, 1),
+]
+
+
+def count_temp_files() -> int:
+    return len(os.listdir(tempfile.gettempdir()))
+
+
+def sample(iteration: int) -> dict:
+    return {"iteration": iteration, **get_process_resources(), "temp_files": count_temp_files()}
+
+
+def run_soak(iterations: int, sample_every: int, quiet: bool = True) -> dict:
+    """Run the workload and return per-case counts/timings plus resource samples."""
+    # A private temp dir, so temp files counted are this run's alone
+    soak_dir = tempfile.tempdir = tempfile.mkdtemp(prefix="pdf-soak-")
+    try:
+        return _run_soak(iterations, sample_every, quiet)
+    finally:
+        tempfile.tempdir = None
+        shutil.rmtree(soak_dir, ignore_errors=True)
+
+
+def _run_soak(iterations: int, sample_every: int, quiet: bool) -> dict:
+    soak = Soak()
+    schedule = [(name, case) for name, case, weight in CASES for _ in range(weight)]
+    counts = {name: {"ok": 0, "failed": 0, "ms": 0.0} for name, _, _ in CASES}
+    samples = [sample(0)]
+
+    for iteration in range(1, iterations + 1):
+        name, case = schedule[iteration % len(schedule)]
+        start = time.perf_counter()
+        # The generators log every fitting step; keep the soak's own output readable
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            try:
+                case(soak, iteration)
+                counts[name]["ok"] += 1
+            except Exception:
+                counts[name]["failed"] += 1
+        counts[name]["ms"] += (time.perf_counter() - start) * 1000
+
+        if iteration % sample_every == 0:
+            samples.append(sample(iteration))
+            latest = samples[-1]
+            print(f"🔍 [SOAK] {iteration}/{iterations}: rss={latest['rss_kb']} KiB, "
+                  f"fds={latest['open_fds']}, temp_files={latest['temp_files']}")
+
+    return {"counts": counts, "samples": samples, "final_available": soak.final_available}
+
+
+def growth(samples: list, key: str, warmup: int):
+    """Growth of key from the first sample after warm-up to the last sample."""
+    values = [entry[key] for entry in samples[warmup:] if entry[key] is not None]
+    return values[-1] - values[0] if len(values) >= 2 else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--sample-every", type=int, default=500)
+    parser.add_argument("--warmup-samples", type=int, default=2, help="samples ignored while caches fill")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=64.0)
+    parser.add_argument("--max-fd-growth", type=int, default=4)
+    parser.add_argument("--max-temp-file-growth", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="keep the generators' logging")
+    args = parser.parse_args()
+
+    result = run_soak(args.iterations, max(1, args.sample_every), quiet=not args.verbose)
+
+    print("\n📊 [SOAK] Per-case results")
+    for name, stats in result["counts"].items():
+        runs = stats["ok"] + stats["failed"]
+        average = stats["ms"] / runs if runs else 0.0
+        print(f"   {name:<18} ok={stats['ok']:<7} failed={stats['failed']:<7} avg={average:.1f} ms")
+    if not result["final_available"]:
+        print("⚠️ [SOAK] Final.pdf not found - final renders were skipped (set FINAL_TEMPLATE_PATH)")
+
+    samples = result["samples"]
+    warmup = min(args.warmup_samples, len(samples) - 1)
+    rss_growth_mb = growth(samples, "rss_kb", warmup) / 1024
+    fd_growth = growth(samples, "open_fds", warmup)
+    temp_growth = growth(samples, "temp_files", warmup)
+    print(f"\n📊 [SOAK] After warm-up: RSS {rss_growth_mb:+.1f} MiB, open files {fd_growth:+d}, temp files {temp_growth:+d}")
+
+    failures = []
+    if rss_growth_mb > args.max_rss_growth_mb:
+        failures.append(f"RSS grew {rss_growth_mb:.1f} MiB (limit {args.max_rss_growth_mb})")
+    if fd_growth > args.max_fd_growth:
+        failures.append(f"open files grew by {fd_growth} (limit {args.max_fd_growth})")
+    if temp_growth > args.max_temp_file_growth:
+        failures.append(f"{temp_growth} temp file(s) left behind (limit {args.max_temp_file_growth})")
+    for failure in failures:
+        print(f"❌ [SOAK] {failure}")
+    if not failures:
+        print("✅ [SOAK] Resource usage stayed bounded")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
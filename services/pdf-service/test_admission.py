@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-client admission control (token bucket, in-flight quotas, fair queueing),
+that streamed responses hold their slot to the end and that job rows count against the submitter
+"""
+
+import sys
+import os
+import io
+import asyncio
+import tempfile
+import contextlib
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adapters.admission import AdmissionController, AdmissionRejected, TokenBucket
+
+
+def test_token_bucket():
+    """Bursts are allowed up to the bucket size, then the wait until the next token is reported"""
+    bucket = TokenBucket(rate=2, burst=3, now=0.0)
+    assert [bucket.take(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(0.0) == 0.5
+    assert bucket.take(0.5) == 0.0
+    print("✅ Token bucket OK")
+
+
+def test_rate_limit_rejects_with_retry_after():
+    """A caller over its rate is rejected at once with a Retry-After hint; others are unaffected"""
+    async def scenario():
+        controller = AdmissionController(rate=0.5, burst=2, max_in_flight=10, capacity=10)
+        await controller.acquire("tab-1")
+        await controller.acquire("tab-1")
+        try:
+            await controller.acquire("tab-1")
+            raise AssertionError("third request should be rate limited")
+        except AdmissionRejected as e:
+            assert e.reason == "rate limit exceeded" and e.retry_after == 2
+        await controller.acquire("tab-2")
+        assert controller.stats()["rejected"]["rate"] == 1
+    asyncio.run(scenario())
+    print("✅ Rate limit OK")
+
+
+def test_fair_share_between_callers():
+    """A freed slot goes to the caller with the fewest running requests, not the longest queue"""
+    async def scenario():
+        controller = AdmissionController(rate=100, burst=100, max_in_flight=2, capacity=2, max_queued=10)
+        await controller.acquire("busy")
+        await controller.acquire("busy")
+        order = []
+
+        async def request(client):
+            await controller.acquire(client)
+            order.append(client)
+
+        tasks = [asyncio.create_task(request("busy")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        tasks.append(asyncio.create_task(request("quiet")))
+        await asyncio.sleep(0.01)
+        assert order == []
+
+        controller.release("busy")
+        await asyncio.sleep(0.01)
+        assert order == ["quiet"]  # arrived last, but had nothing running
+        controller.release("busy")
+        await asyncio.sleep(0.01)
+        assert order == ["quiet", "busy"]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    asyncio.run(scenario())
+    print("✅ Fair share OK")
+
+
+def test_queue_limits():
+    """Full queues are rejected; a request that times out leaves the queue usable"""
+    async def scenario():
+        controller = AdmissionController(rate=100, burst=100, max_in_flight=1, capacity=4,
+                                         max_queued=1, queue_timeout=0.05)
+        await controller.acquire("tab")
+        waiting = asyncio.create_task(controller.acquire("tab"))
+        await asyncio.sleep(0.01)
+        try:
+            await controller.acquire("tab")
+            raise AssertionError("queue should be full")
+        except AdmissionRejected as e:
+            assert e.reason == "too many queued requests" and e.retry_after >= 1
+        try:
+            await waiting
+            raise AssertionError("queued request should time out")
+        except AdmissionRejected as e:
+            assert e.reason == "timed out waiting for a slot"
+
+        controller.release("tab")
+        await asyncio.wait_for(controller.acquire("tab"), 1)
+        assert controller.stats()["in_flight"] == 1 and controller.stats()["waiting"] == 0
+    asyncio.run(scenario())
+    print("✅ Queue limits OK")
+
+
+def test_background_work_waits_without_limits():
+    """Job rows take no rate token and are never rejected for a full queue or a timeout"""
+    async def scenario():
+        controller = AdmissionController(rate=0.001, burst=1, max_in_flight=1, capacity=4,
+                                         max_queued=0, queue_timeout=0.01)
+        await controller.acquire("tenant", background=True)
+        waiting = asyncio.create_task(controller.acquire("tenant", background=True))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        controller.release("tenant")
+        await asyncio.wait_for(waiting, 1)
+        # The request still has its rate token
+        controller.release("tenant")
+        await controller.acquire("tenant")
+    asyncio.run(scenario())
+    print("✅ Background admission OK")
+
+
+def _enable_admission(controller: AdmissionController):
+    from adapters import admission
+    admission.ADMISSION_CONTROL = True
+    admission._controller = controller
+    admission._controller_loop = asyncio.get_running_loop()
+
+
+def _disable_admission():
+    from adapters import admission
+    admission.ADMISSION_CONTROL = False
+    admission._controller = admission._controller_loop = None
+
+
+def test_streamed_response_holds_slot():
+    """/extract-fields/bulk keeps its slot while the NDJSON body streams and frees it at the end"""
+    os.environ.setdefault("RENDER_POOL_WARMUP", "false")
+    os.environ.setdefault("OFFICE_POOL_WARMUP", "false")
+    import httpx
+    import main
+
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "minimal_form.docx"), "rb") as f:
+        form = f.read()
+    request = httpx.Request(
+        "POST", "http://test/extract-fields/bulk",
+        files=[("files", (f"form_{i}.docx", form)) for i in range(2)],
+        headers={"x-internal-token": str(main.INTERNAL_TOKEN), "x-client-id": "tenant-a"},
+    )
+    body = request.read()
+
+    async def scenario():
+        controller = AdmissionController(rate=100, burst=100, max_in_flight=4, capacity=4)
+        _enable_admission(controller)
+        in_flight_while_streaming = []
+        received = False
+
+        async def receive():
+            nonlocal received
+            if received:
+                await asyncio.sleep(3600)
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("more_body"):
+                in_flight_while_streaming.append(controller.in_flight.get("tenant-a", 0))
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/extract-fields/bulk", "raw_path": b"/extract-fields/bulk",
+            "query_string": b"", "root_path": "", "client": ("127.0.0.1", 5000), "server": ("test", 80),
+            "headers": [(key.lower().encode(), value.encode()) for key, value in request.headers.items()],
+        }
+        try:
+            await main.app(scope, receive, send)
+        finally:
+            _disable_admission()
+        return in_flight_while_streaming, controller.in_flight.get("tenant-a", 0)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        streaming, after = asyncio.run(scenario())
+    # The outer middlewares relay chunks after the body produced them, so the
+    # last chunk may arrive once the slot is free again; the first may not
+    assert len(streaming) >= 2 and streaming[0] == 1, streaming
+    assert after == 0
+    print(f"✅ Streamed response held its slot while streaming ({streaming})")
+
+
+def test_job_rows_count_against_submitter():
+    """Rows of a job take the submitter's slots, never more than its in-flight limit at once"""
+    from adapters.job_store import JobStore
+    from adapters.job_runner import run_job
+
+    async def scenario(store):
+        controller = AdmissionController(rate=100, burst=100, max_in_flight=1, capacity=4)
+        _enable_admission(controller)
+        peak = 0
+
+        async def watch():
+            nonlocal peak
+            while True:
+                peak = max(peak, controller.in_flight.get("tenant-a", 0))
+                await asyncio.sleep(0.001)
+
+        # Not drafts, so every row fails fast in the worker; admission is taken all the same
+        rows = [{"name": f"row_{i}.pdf", "content": b"not a pdf", "params": {}} for i in range(4)]
+        job_id = store.create_job("final", rows, None, client="tenant-a")
+        watcher = asyncio.create_task(watch())
+        try:
+            await run_job(job_id, store)
+        finally:
+            watcher.cancel()
+            _disable_admission()
+        return controller, peak
+
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        store = JobStore(os.path.join(tmp_dir, "jobs.sqlite3"), tmp_dir)
+        controller, peak = asyncio.run(scenario(store))
+    assert controller.admitted == 4 and peak == 1
+    assert controller.in_flight.get("tenant-a", 0) == 0
+    print("✅ Job rows counted against the submitter")
+
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_rate_limit_rejects_with_retry_after()
+    test_fair_share_between_callers()
+    test_queue_limits()
+    test_background_work_waits_without_limits()
+    test_streamed_response_holds_slot()
+    test_job_rows_count_against_submitter()
+    print("\n🎉 All tests completed successfully!")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script to verify /generate-final/batch and /jobs results archives
+(uploads with the same basename must not collide) and jobs rendered from rows
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import zipfile
+import tempfile
+import contextlib
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE = os.path.join(HERE, "templates", "default-draft.pdf")
+
+# Final.pdf is not shipped with the repo; any one-page PDF stands in for it.
+# Set before the render pool spawns its workers, which read it at import.
+os.environ["FINAL_TEMPLATE_PATH"] = TEMPLATE
+os.environ["RENDER_POOL_WARMUP"] = "false"
+os.environ["OFFICE_POOL_WARMUP"] = "false"
+
+
+def _draft(company: str) -> bytes:
+    from rise.generate_certificate import generate_certificate
+    values = {"Company Name": company, "Address": "Pune", "ISO Standard": "ISO 9001:2015", "Scope": "Widgets"}
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        path = os.path.join(tmp_dir, "draft.pdf")
+        generate_certificate(TEMPLATE, path, values)
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def _client():
+    from fastapi.testclient import TestClient
+    from adapters.render_pool import shutdown_render_pool
+    import main
+    # Workers from an earlier pool may predate FINAL_TEMPLATE_PATH
+    shutdown_render_pool()
+    return TestClient(main.app), {"x-internal-token": str(main.INTERNAL_TOKEN)}
+
+
+def _archive(content: bytes):
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        names = archive.namelist()
+        return names, json.loads(archive.read("manifest.json"))
+
+
+def _wait_for_job(client, headers, job_id: str):
+    deadline = time.time() + 60
+    while client.get(f"/jobs/{job_id}", headers=headers).json()["status"] in ("queued", "running"):
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.2)
+
+
+def test_final_batch_same_basename():
+    """a/draft.pdf and b/draft.pdf both come back, under distinct names"""
+    drafts = [("a/draft.pdf", _draft("Alpha Ltd")), ("b/draft.pdf", _draft("Beta Ltd"))]
+    client, headers = _client()
+    with client, contextlib.redirect_stdout(io.StringIO()):
+        response = client.post(
+            "/generate-final/batch",
+            files=[("drafts", (name, content, "application/pdf")) for name, content in drafts],
+            data={"date_fields": json.dumps({"Issue Date": "01/01/2025"})},
+            headers=headers,
+        )
+    assert response.status_code == 200, response.text
+    names, manifest = _archive(response.content)
+    finals = [row["final"] for row in manifest]
+    assert [row["status"] for row in manifest] == ["ok", "ok"]
+    assert len(set(finals)) == 2 and set(finals) <= set(names)
+    assert len(names) == len(set(names)) == 3
+    print(f"✅ Final batch archive entries: {finals}")
+
+
+def test_job_results_same_basename():
+    """Job results name rows apart too, and the manifest points at the right entries"""
+    drafts = [("a/draft.pdf", _draft("Alpha Ltd")), ("b/draft.pdf", _draft("Beta Ltd"))]
+    client, headers = _client()
+    with client, contextlib.redirect_stdout(io.StringIO()):
+        response = client.post(
+            "/jobs",
+            files=[("files", (name, content, "application/pdf")) for name, content in drafts],
+            data={"kind": "final", "params": json.dumps({"Issue Date": "01/01/2025"})},
+            headers=headers,
+        )
+        assert response.status_code == 202, response.text
+        job_id = response.json()["job_id"]
+        _wait_for_job(client, headers, job_id)
+        results = client.get(f"/jobs/{job_id}/results", headers=headers)
+    names, manifest = _archive(results.content)
+    outputs = [row["output"] for row in manifest]
+    assert [row["status"] for row in manifest] == ["done", "done"]
+    assert len(set(outputs)) == 2 and set(outputs) <= set(names)
+    assert len(names) == len(set(names)) == 3
+    print(f"✅ Job results archive entries: {outputs}")
+
+
+def test_field_row_jobs():
+    """softcopy/printable/draft jobs render JSON rows onto a custom template; results are streamed"""
+    import fitz  # PyMuPDF
+
+    rows = [
+        {"Company Name": "Alpha Ltd", "Address": "Pune", "ISO Standard": "ISO 9001:2015", "Scope": "Widgets",
+         "Certificate Number": "A-1"},
+        {"Company Name": "Alpha Ltd", "Address": "Mumbai", "ISO Standard": 14001, "Scope": "Gadgets",
+         "Certificate Number": "A-2"},
+    ]
+    with open(TEMPLATE, "rb") as f:
+        template = f.read()
+    client, headers = _client()
+    with client, contextlib.redirect_stdout(io.StringIO()):
+        missing_company = client.post(
+            "/jobs", data={"kind": "softcopy", "rows": json.dumps([{"Address": "Pune"}])},
+            files={"template": ("custom.pdf", template, "application/pdf")}, headers=headers,
+        )
+        assert missing_company.status_code == 400, missing_company.text
+
+        for kind in ("softcopy", "printable", "draft"):
+            response = client.post(
+                "/jobs", data={"kind": kind, "rows": json.dumps(rows)},
+                files={"template": ("custom.pdf", template, "application/pdf")}, headers=headers,
+            )
+            assert response.status_code == 202, response.text
+            job_id = response.json()["job_id"]
+            _wait_for_job(client, headers, job_id)
+            results = client.get(f"/jobs/{job_id}/results", headers=headers)
+            assert results.headers["x-job-status"] == "completed", results.text
+            # Streamed: no Content-Length, the archive is written row by row
+            assert "content-length" not in results.headers
+
+            names, manifest = _archive(results.content)
+            outputs = [row["output"] for row in manifest]
+            assert [row["status"] for row in manifest] == ["done", "done"], manifest
+            assert len(set(outputs)) == 2 and all(name.startswith(f"{kind}_Alpha Ltd") for name in outputs)
+            with zipfile.ZipFile(io.BytesIO(results.content)) as archive:
+                with fitz.open(stream=archive.read(outputs[1]), filetype="pdf") as doc:
+                    assert "Gadgets" in doc[0].get_text()
+            print(f"✅ {kind} job rendered {outputs}")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing batch archives...")
+    test_final_batch_same_basename()
+    test_job_results_same_basename()
+    test_field_row_jobs()
+    print("🎉 All batch archive tests passed!")
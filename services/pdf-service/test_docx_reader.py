@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the fast .docx first-table reader matches python-docx
+"""
+
+import sys
+import os
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from docx import Document
+
+
+def build_form(path):
+    """Create a form with text before the table, a merged row, tabs, breaks and a nested table."""
+    doc = Document()
+    doc.add_heading("Application Form", level=1)
+    doc.add_paragraph("Please complete the table below.")
+
+    table = doc.add_table(rows=0, cols=2)
+    rows = [
+        ("Company Name", "Acme Widgets Pvt Ltd"),
+        ("Address", "Plot 12, Industrial Area\nPhase 2\nPune"),
+        ("ISO Standard Required", "Quality\n9001"),
+        ("Scope", "Design and manufacture\tof widgets"),
+    ]
+    for key, value in rows:
+        cells = table.add_row().cells
+        cells[0].text = key
+        lines = value.split("\n")
+        cells[1].text = lines[0]
+        for line in lines[1:]:
+            cells[1].add_paragraph(line)
+
+    merged = table.add_row().cells
+    merged[0].merge(merged[1])
+    merged[0].text = "Office use only"
+
+    table.rows[0].cells[1].add_table(rows=1, cols=1).cell(0, 0).text = "nested"
+
+    doc.add_paragraph("Second table follows")
+    second = doc.add_table(rows=1, cols=2)
+    second.cell(0, 0).text = "Company Name"
+    second.cell(0, 1).text = "Wrong Company"
+
+    doc.save(path)
+
+
+def test_fast_reader_matches_python_docx():
+    """The streaming reader returns the same key/value dict as python-docx"""
+    from rise.docx_reader import read_first_table
+    from rise.generate_certificate import parse_word_form_table, parse_word_form
+
+    print("🧪 Testing fast docx table reader...")
+
+    with tempfile.TemporaryDirectory() as td:
+        form_path = os.path.join(td, "form.docx")
+        build_form(form_path)
+
+        fast = read_first_table(form_path)
+        reference = parse_word_form_table(form_path)
+
+        print(f"🔍 Fast reader:   {fast}")
+        print(f"🔍 python-docx:   {reference}")
+        assert fast == reference
+        assert fast["Company Name"] == "Acme Widgets Pvt Ltd"
+
+        fields = parse_word_form(form_path)
+        assert fields["ISO Standard"] == "ISO 9001:2015"
+        print("✅ Fast reader matches python-docx")
+
+
+def test_fast_reader_no_table():
+    """Documents without a table raise the same error as before"""
+    from rise.docx_reader import read_first_table
+
+    with tempfile.TemporaryDirectory() as td:
+        form_path = os.path.join(td, "empty.docx")
+        doc = Document()
+        doc.add_paragraph("No table here")
+        doc.save(form_path)
+
+        try:
+            read_first_table(form_path)
+        except Exception as e:
+            assert "No tables found" in str(e)
+            print("✅ Missing table reported")
+        else:
+            raise AssertionError("Expected an exception for a document without tables")
+
+
+if __name__ == "__main__":
+    test_fast_reader_matches_python_docx()
+    test_fast_reader_no_table()
+    print("\n🎉 All tests completed successfully!")
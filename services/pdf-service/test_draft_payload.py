@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the signed field payload embedded in drafts: round
+trip, tampered or foreign payloads ignored, and no secret means no payload
+"""
+
+import sys
+import os
+import io
+import zlib
+import contextlib
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+from rise.draft_payload import DRAFT_PAYLOAD_NAME, embed_draft_payload, read_draft_payload
+from rise.generate_final_certificate import extract_from_draft_pdf
+
+VALUES = {"Company Name": "Acme Widgets Pvt Ltd", "Address": "Plot 12, MIDC, Pune",
+          "ISO Standard": "ISO 9001:2015", "Scope": "Manufacture of widgets"}
+
+
+@contextlib.contextmanager
+def _secret(value):
+    previous = os.environ.pop("DRAFT_PAYLOAD_SECRET", None)
+    if value is not None:
+        os.environ["DRAFT_PAYLOAD_SECRET"] = value
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        os.environ.pop("DRAFT_PAYLOAD_SECRET", None)
+        if previous is not None:
+            os.environ["DRAFT_PAYLOAD_SECRET"] = previous
+
+
+def _draft(values=None) -> bytes:
+    """A one-page draft whose page text says "Acme"; values are embedded as its payload."""
+    with fitz.open() as doc:
+        page = doc.new_page()
+        page.insert_text((181, 262), "Acme", fontsize=9)
+        page.insert_text((196, 361), "ISO 9001:2015", fontsize=9)
+        if values is not None:
+            embed_draft_payload(doc, values, "standard")
+        return doc.tobytes()
+
+
+def _with_blob(draft: bytes, blob: bytes) -> bytes:
+    with fitz.open(stream=draft, filetype="pdf") as doc:
+        doc.embfile_del(DRAFT_PAYLOAD_NAME)
+        doc.embfile_add(DRAFT_PAYLOAD_NAME, blob)
+        return doc.tobytes()
+
+
+def _blob(draft: bytes) -> bytes:
+    with fitz.open(stream=draft, filetype="pdf") as doc:
+        return doc.embfile_get(DRAFT_PAYLOAD_NAME)
+
+
+def test_round_trip():
+    """Embedded values are read back exactly and win over the page text"""
+    with _secret("s3cret"):
+        draft = _draft(VALUES)
+        payload = read_draft_payload(draft)
+        data = extract_from_draft_pdf(draft, use_ocr_fallback=False)
+    assert payload == {"template_type": "standard", "values": VALUES}
+    assert data["Company Name"] == "Acme Widgets Pvt Ltd" and data["Scope"] == "Manufacture of widgets"
+    print("✅ Payload round trip OK")
+
+
+def test_tampered_payload_rejected():
+    """A body changed after signing is ignored and the page is parsed instead"""
+    with _secret("s3cret"):
+        draft = _draft(VALUES)
+        version, signature, _ = _blob(draft).split(b".", 2)
+        forged = zlib.compress(b'{"template_type": "standard", "values": {"Company Name": "Mallory Ltd"}}')
+        tampered = _with_blob(draft, version + b"." + signature + b"." + forged)
+        assert read_draft_payload(tampered) is None
+        data = extract_from_draft_pdf(tampered, use_ocr_fallback=False)
+    assert data["Company Name"] == "Acme"
+    print("✅ Tampered payload rejected")
+
+
+def test_wrong_key_rejected():
+    """A payload signed with another key is not trusted"""
+    with _secret("other-deployment"):
+        draft = _draft(VALUES)
+    with _secret("s3cret"):
+        assert read_draft_payload(draft) is None
+        assert extract_from_draft_pdf(draft, use_ocr_fallback=False)["Company Name"] == "Acme"
+    print("✅ Payload signed with the wrong key rejected")
+
+
+def test_no_payload_falls_back_to_parsing():
+    """Drafts without a payload are read from the page"""
+    with _secret("s3cret"):
+        draft = _draft()
+        assert read_draft_payload(draft) is None
+        data = extract_from_draft_pdf(draft, use_ocr_fallback=False)
+    assert data["Company Name"] == "Acme" and data["ISO Standard"] == "ISO 9001:2015"
+    print("✅ Draft without payload parsed from the page")
+
+
+def test_no_secret_no_payload():
+    """Without DRAFT_PAYLOAD_SECRET nothing is embedded, and existing payloads are not trusted"""
+    with _secret(None):
+        draft = _draft(VALUES)
+        with fitz.open(stream=draft, filetype="pdf") as doc:
+            assert DRAFT_PAYLOAD_NAME not in doc.embfile_names()
+    with _secret("s3cret"):
+        signed = _draft(VALUES)
+    with _secret(""):
+        assert read_draft_payload(signed) is None
+        assert extract_from_draft_pdf(signed, use_ocr_fallback=False)["Company Name"] == "Acme"
+    print("✅ No secret: payload neither embedded nor read")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_tampered_payload_rejected()
+    test_wrong_key_rejected()
+    test_no_payload_falls_back_to_parsing()
+    test_no_secret_no_payload()
+    print("\n🎉 All tests completed successfully!")
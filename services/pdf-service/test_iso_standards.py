@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the shared ISO standard resolver
+"""
+
+import sys
+import os
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rise.iso_standards import expand_iso_standard, get_iso_standard_code, resolve_many
+
+
+def test_expand_variants():
+    """Short names, numbers, case/spacing variants and other years expand to the current version"""
+    print("🧪 Testing ISO expansion...")
+    assert expand_iso_standard("9001") == "ISO 9001:2015"
+    assert expand_iso_standard("ISO 9001") == "ISO 9001:2015"
+    assert expand_iso_standard("iso  9001") == "ISO 9001:2015"
+    assert expand_iso_standard("ISO 9001:2008") == "ISO 9001:2015"
+    assert expand_iso_standard("ISO/IEC 27001:2022") == "ISO/IEC 27001:2022"
+    assert expand_iso_standard("iso / iec 27001") == "ISO/IEC 27001:2022"
+    assert expand_iso_standard("AS9100D") == "AS 9100D:2016"
+    assert expand_iso_standard("Unknown Standard") == "Unknown Standard"
+    assert expand_iso_standard("") == ""
+    print("✅ Expansion OK")
+
+
+def test_codes_and_batch():
+    """Certification codes and the batch resolver used by Excel imports"""
+    assert get_iso_standard_code("14001") == "CM-MS-7836"
+    assert get_iso_standard_code("ISO 31000") == ""
+
+    rows = resolve_many(["9001", " 9001 ", "ISO 45001", "", None])
+    assert [row["standard"] for row in rows] == ["ISO 9001:2015", "ISO 9001:2015", "ISO 45001:2018", "", ""]
+    assert rows[0]["code"] == "CM-MS-7842"
+    assert rows[2]["description"] == "Occupational Health & Safety"
+
+    # Numeric Excel cells resolve like their text
+    rows = resolve_many([9001, 14001.0, "9001"])
+    assert [row["standard"] for row in rows] == ["ISO 9001:2015", "ISO 14001:2015", "ISO 9001:2015"]
+
+    # Rows are independent copies of the memoized result
+    rows[0]["code"] = "changed"
+    assert resolve_many(["9001"])[0]["code"] == "CM-MS-7842"
+    print("✅ Codes and batch resolve OK")
+
+
+if __name__ == "__main__":
+    test_expand_variants()
+    test_codes_and_batch()
+    print("\n🎉 All tests completed successfully!")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the single-pass label scanner used by all extraction paths
+"""
+
+import sys
+import os
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rise.label_scanner import extract_labeled_fields, canonical_label
+
+
+def test_strict_text_labels():
+    """Digital PDF text: one label per line, multi-line values, date labels bound values"""
+    print("🧪 Testing strict label scan...")
+    text = (
+        "Application Form\n"
+        "Company Name: Acme Widgets\n"
+        "Address:\n  Plot 12\n\n  Pune\n"
+        "ISO Standard Required\n9001\n"
+        "Scope: Manufacture of widgets\n"
+        "Address management services for clients\n"
+        "Issue Date: 01/01/2025\n"
+    )
+    data = extract_labeled_fields(text, strict=True)
+    assert data["Company Name"] == "Acme Widgets"
+    assert data["Address"] == "Plot 12\nPune"
+    assert data["ISO Standard Required"] == "9001"
+    # 'Address management ...' has no colon, so it stays part of the scope in strict mode
+    assert data["Scope"] == "Manufacture of widgets\nAddress management services for clients"
+    assert data["Issue Date"] == "01/01/2025"
+    print("✅ Strict scan OK")
+
+
+def test_loose_ocr_labels():
+    """OCR text: labels followed by spaces, table rulings, weak aliases need a colon"""
+    print("🧪 Testing loose label scan...")
+    text = (
+        "| Company Name | Acme Widgets\n"
+        "| Address  Plot 12, Pune\n"
+        "ISO Standard Required : 14001\n"
+        "SCOPE OF WORK  Recycling of\nplastic\n"
+        "Standard operating procedures apply\n"
+        "Surveillance/Expiry Date 01/01/2026\n"
+        "Extra Line: Multi-site\n"
+    )
+    data = extract_labeled_fields(text)
+    assert data["Company Name"] == "Acme Widgets"
+    assert data["Address"] == "Plot 12, Pune"
+    assert data["ISO Standard Required"] == "14001"
+    assert data["Scope"] == "Recycling of\nplastic\nStandard operating procedures apply"
+    assert data["Surveillance/ Expiry Date"] == "01/01/2026"
+    assert data["Extra Line"] == "Multi-site"
+    print("✅ Loose scan OK")
+
+
+def test_canonical_label():
+    """Table keys map to canonical field names"""
+    assert canonical_label("Company Name") == "Company Name"
+    assert canonical_label("company name:") == "Company Name"
+    assert canonical_label("ISO Standard") == "ISO Standard Required"
+    assert canonical_label("Surveillance / Expiry Date") == "Surveillance/ Expiry Date"
+    assert canonical_label("Organization") == "Company Name"
+    assert canonical_label("Company Name and Address") is None
+    assert canonical_label("") is None
+    print("✅ Canonical labels OK")
+
+
+def test_linear_time_on_long_text():
+    """Long unlabelled scans do not trigger regex backtracking"""
+    text = ("Company Name: Acme\n" + "lorem ipsum dolor sit amet " * 20000 + "\n") * 3
+    started = time.perf_counter()
+    data = extract_labeled_fields(text)
+    elapsed = time.perf_counter() - started
+    print(f"🔍 Scanned {len(text)} chars in {elapsed * 1000:.1f}ms")
+    assert data["Company Name"].startswith("Acme")
+    assert elapsed < 1.0
+
+
+if __name__ == "__main__":
+    test_strict_text_labels()
+    test_loose_ocr_labels()
+    test_canonical_label()
+    test_linear_time_on_long_text()
+    print("\n🎉 All tests completed successfully!")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the per-field layout cache
+"""
+
+import sys
+import os
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import threading
+
+import fitz  # PyMuPDF
+
+from rise.layout_cache import get_cached_layout, get_layout_cache_stats, clear_layout_cache, collect_layouts
+
+
+def test_reuses_layout():
+    """Same inputs reuse the layout; rect, template or generator changes recompute it"""
+    print("🧪 Testing layout cache reuse...")
+    clear_layout_cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"font_size": 12, "lines": ["first line", "second line"]}
+
+    rect = fitz.Rect(10, 10, 200, 80)
+    args = ("Scope", "Widgets", rect, "Times-Roman", 15, "", "standard")
+
+    first = get_cached_layout("draft", *args, compute)
+    second = get_cached_layout("draft", *args, compute)
+    assert first == second == {"font_size": 12, "lines": ["first line", "second line"]}
+    assert len(calls) == 1
+
+    get_cached_layout("softcopy", *args, compute)
+    get_cached_layout("draft", "Scope", "Widgets", fitz.Rect(10, 10, 220, 80), "Times-Roman", 15, "", "standard", compute)
+    get_cached_layout("draft", "Scope", "Widgets", rect, "Times-Roman", 15, "", "large", compute)
+    assert len(calls) == 4
+
+    stats = get_layout_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 4 and stats["size"] == 4
+    print("✅ Layout cache reuse OK")
+
+
+def test_returns_copies():
+    """Callers may modify the returned lines without corrupting the cached entry"""
+    clear_layout_cache()
+    rect = fitz.Rect(0, 0, 100, 50)
+    args = ("draft", "Scope", "Widgets", rect, "Times-Roman", 15, "", "standard")
+
+    layout = get_cached_layout(*args, lambda: {"font_size": 10, "lines": ["a", "b", "c"]})
+    layout["lines"] = layout["lines"][:1]
+    layout["lines"].append("changed")
+
+    assert get_cached_layout(*args, lambda: {})["lines"] == ["a", "b", "c"]
+    print("✅ Layout cache copies OK")
+
+
+def test_company_address_split_is_part_of_the_key():
+    """Company "A\\nB" + address "C" doesn't reuse the layout of company "A" + address "B\\nC"."""
+    from rise.layout_validation import validate_row_layout
+
+    base = {"ISO Standard": "ISO 9001:2015", "Scope": "Manufacture of widgets"}
+    first = {**base, "Company Name": "Acme\nWidgets", "Address": "Pune"}
+    second = {**base, "Company Name": "Acme", "Address": "Widgets\nPune"}
+
+    clear_layout_cache()
+    fresh = validate_row_layout(second, "standard")["fields"]["Company Name and Address"]
+    clear_layout_cache()
+    validate_row_layout(first, "standard")
+    after_first = validate_row_layout(second, "standard")["fields"]["Company Name and Address"]
+    assert after_first == fresh, f"{after_first} != {fresh}"
+    print("✅ Company/address split keyed apart")
+
+
+def test_collectors_are_per_thread():
+    """Concurrent collect_layouts calls only see their own render's layouts"""
+    clear_layout_cache()
+    rect = fitz.Rect(0, 0, 100, 50)
+    barrier = threading.Barrier(2)
+    collected = {}
+
+    def render(name):
+        barrier.wait()
+        for index in range(50):
+            get_cached_layout("draft", name, f"{name} {index}", rect, "Times-Roman", 15, "", "standard", lambda: {"font_size": 10})
+        return name
+
+    def run(name):
+        _, layouts = collect_layouts(render, name)
+        collected[name] = layouts
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("Scope", "Address")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [field for field, _ in collected["Scope"]] == ["Scope"] * 50
+    assert [field for field, _ in collected["Address"]] == ["Address"] * 50
+    print("✅ Layout collectors are per thread")
+
+
+if __name__ == "__main__":
+    test_reuses_layout()
+    test_returns_copies()
+    test_company_address_split_is_part_of_the_key()
+    test_collectors_are_per_thread()
+    print("\n🎉 All tests completed successfully!")
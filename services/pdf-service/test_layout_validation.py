@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script to verify layout-only validation of certificate rows
+"""
+
+import sys
+import os
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rise.layout_validation import validate_row_layout, validate_layout_rows
+
+ROW = {
+    "Company Name": "Acme Widgets",
+    "Address": "Pune, India",
+    "ISO Standard": "ISO 9001:2015",
+    "Scope": "Manufacture and supply of precision engineered widgets",
+    "Certificate Number": "C-100",
+}
+
+
+def test_row_layout_reports_fitted_fields():
+    """Both generators report font sizes and line counts for the fitted fields"""
+    print("🧪 Testing layout validation...")
+    for generator in ["draft", "softcopy"]:
+        result = validate_row_layout(ROW, "standard", generator)
+        assert set(result["fields"]) == {"Company Name and Address", "Scope"}
+        scope = result["fields"]["Scope"]
+        assert scope["lines"] == 1 and scope["font_size"] > 0
+        assert result["overflow"] is False and result["overflow_percentage"] == 0.0
+    print("✅ Row layouts OK")
+
+
+def test_failing_row_does_not_abort_chunk():
+    """A row the generator rejects gets an error; the rest of the chunk is still fitted"""
+    rows = [
+        {"values": {**ROW, "Certificate Number": ""}, "template_type": "standard"},
+        {"values": ROW, "template_type": "large"},
+    ]
+    results = validate_layout_rows(rows, "softcopy")
+    assert "Certificate Number" in results[0]["error"]
+    assert "fields" in results[1]
+    print("✅ Chunk errors OK")
+
+
+if __name__ == "__main__":
+    test_row_layout_reports_fitted_fields()
+    test_failing_row_does_not_abort_chunk()
+    print("\n🎉 All tests completed successfully!")
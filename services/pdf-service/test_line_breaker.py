@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the shared line breaker wraps exactly like the generators' string-building loops
+"""
+
+import sys
+import os
+import random
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz
+
+from rise.text_fit import BULLET_INDICATORS, break_lines, wrap_paragraphs, wrap_scope_lines, text_line_count
+from rise.generate_certificate import get_text_height
+
+FONT = "Times-Bold"
+
+SCOPES = [
+    "",
+    "Manufacture and supply of precision engineered widgets",
+    "Services:\n* Design of valves\n* Installation and servicing\n\n- Training > on site → remote",
+    "Extraordinarilylongwordwithoutanyspaces at the start ▪ bullet ▫ bullet • bullet",
+    "*leading bullet\n\n\n  trailing spaces   \n*another",
+]
+
+
+def _reference_wrap(words, fontsize, max_width, bullet_breaks=False):
+    # The generators' original wrap loop
+    font = fitz.Font(fontname=FONT)
+    lines = []
+    current_line = ""
+    for word in words:
+        if bullet_breaks and any(word.startswith(indicator) for indicator in BULLET_INDICATORS) and current_line:
+            lines.append(current_line)
+            current_line = word
+            continue
+        test_line = current_line + (" " if current_line else "") + word
+        if font.text_length(test_line, fontsize) <= max_width:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = word
+    if current_line:
+        lines.append(current_line)
+    return lines
+
+
+def _reference_scope(text, fontsize, max_width):
+    if '\n' in text:
+        lines = []
+        for text_line in text.split('\n'):
+            if text_line.strip():
+                lines.extend(_reference_wrap(text_line.strip().split(), fontsize, max_width, bullet_breaks=True))
+        return lines
+    return _reference_wrap(text.split(), fontsize, max_width, bullet_breaks=True)
+
+
+def _random_text(rng):
+    vocabulary = ["and", "of", "the", "manufacture", "supply", "ISO", "9001:2015", "*", "-", "•item",
+                  "*bullet", "→next", "Extraordinarilylongwordwithoutanyspaces", "\n", "\n\n"]
+    return " ".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 80)))
+
+
+def test_scope_wrapping_matches_reference():
+    """Bullet points, explicit line breaks and blank lines wrap as before"""
+    print("🧪 Testing scope line breaking...")
+    rng = random.Random(43)
+    texts = SCOPES + [_random_text(rng) for _ in range(200)]
+    for text in texts:
+        for fontsize in [4, 9.5, 12, 20]:
+            for max_width in [60, 266, 492]:
+                for variant in [text, text.replace('*', '•')]:
+                    assert wrap_scope_lines(variant, FONT, fontsize, max_width) == \
+                        _reference_scope(variant, fontsize, max_width), (variant[:40], fontsize, max_width)
+    print(f"✅ Scope wrapping OK ({len(texts)} texts)")
+
+
+def test_paragraph_wrapping_matches_reference():
+    """Company Name/Address paragraphs keep empty lines and wrap without bullet breaks"""
+    paragraphs = ["ACME Industrial Valves and Fittings Private Limited", "", "- not a bullet here -", "Unit 4"]
+    for fontsize in [6, 8.5, 14]:
+        expected = []
+        for paragraph in paragraphs:
+            expected.extend(_reference_wrap(paragraph.split(), fontsize, 140) if paragraph.strip() else [""])
+        assert wrap_paragraphs(paragraphs, FONT, fontsize, 140) == expected
+    print("✅ Paragraph wrapping OK")
+
+
+def test_line_ranges_and_height():
+    """Lines come out as word index ranges; get_text_height keeps its empty-first-line count"""
+    words = "one two three four five".split()
+    ranges = break_lines(words, FONT, 12, 60)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(words)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+
+    # A first word wider than the line counts an extra (empty) line, as the original loop did
+    assert text_line_count("Extraordinarilylongwordwithoutanyspaces short", FONT, 12, 50) == 3
+    assert get_text_height("Extraordinarilylongwordwithoutanyspaces short", 12, FONT, 50) == 3 * 12 * 1.2
+    assert text_line_count("", FONT, 12, 50) == 0
+    print("✅ Line ranges OK")
+
+
+if __name__ == "__main__":
+    test_scope_wrapping_matches_reference()
+    test_paragraph_wrapping_matches_reference()
+    test_line_ranges_and_height()
+    print("\n🎉 All tests completed successfully!")
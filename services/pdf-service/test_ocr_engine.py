@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the persistent OCR pool, table ROI detection and OCR result cache
+"""
+
+import sys
+import os
+import importlib.util
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rise import ocr_engine
+
+
+def test_pool_is_persistent():
+    """Every call shares one worker pool until shutdown, and shutdown ends the engines"""
+    pool = ocr_engine.get_ocr_executor()
+    assert ocr_engine.get_ocr_executor() is pool
+    threads = set(pool.submit(lambda: __import__("threading").current_thread().name).result() for _ in range(8))
+    assert len(threads) <= max(1, ocr_engine.OCR_WORKERS)
+
+    if importlib.util.find_spec("tesserocr"):
+        api = pool.submit(ocr_engine._get_worker_api).result()
+        assert api in ocr_engine._engines
+    ocr_engine.shutdown_ocr_pool()
+    assert ocr_engine._engines == []
+    assert ocr_engine.get_ocr_executor() is not pool
+    ocr_engine.shutdown_ocr_pool()
+    print(f"✅ Persistent OCR pool OK ({len(threads)} worker thread(s) used)")
+
+
+def test_cache_serves_regions_and_pages():
+    """Cached regions/pages are returned without rendering or recognising them again"""
+    ocr_engine._cache_put("test:region:a", "Acme Widgets")
+    ocr_engine._cache_put("test:page:0", "Company Name: Acme")
+    before = ocr_engine.get_cache_stats()
+
+    # None as the image: a cache miss would fail inside the OCR worker
+    assert ocr_engine.ocr_regions({"company": (None, "test:region:a")}) == {"company": "Acme Widgets"}
+
+    def render():
+        raise AssertionError("cached page must not be rendered")
+
+    assert ocr_engine.ocr_pages([("test:page:0", render)]) == ["Company Name: Acme"]
+    after = ocr_engine.get_cache_stats()
+    assert after["hits"] - before["hits"] == 2 and after["misses"] == before["misses"]
+    print("✅ OCR cache hits skip rendering and recognition")
+
+
+def test_cache_is_bounded():
+    """The cache keeps at most OCR_CACHE_SIZE results, dropping the least recently used"""
+    for index in range(ocr_engine.OCR_CACHE_SIZE + 5):
+        ocr_engine._cache_put(f"test:bounded:{index}", str(index))
+    assert ocr_engine.get_cache_stats()["size"] == ocr_engine.OCR_CACHE_SIZE
+    assert ocr_engine.cached_ocr_text("test:bounded:0") is None
+    assert ocr_engine.cached_ocr_text(f"test:bounded:{ocr_engine.OCR_CACHE_SIZE + 4}") is not None
+    print("✅ OCR cache bounded")
+
+
+def test_table_region():
+    """The ruled table is found and recognition is limited to it"""
+    if not importlib.util.find_spec("cv2"):
+        print("⚠️ opencv not installed - skipping table ROI detection")
+        return
+    import numpy as np
+
+    binary = np.zeros((1000, 800), dtype=np.uint8)
+    # A 3-row, 2-column grid drawn white on black, with a stray rule above it
+    for y in (300, 400, 500, 600):
+        binary[y:y + 3, 100:700] = 255
+    for x in (100, 350, 697):
+        binary[300:603, x:x + 3] = 255
+    binary[50:53, 100:300] = 255
+    x, y, w, h = ocr_engine.detect_table_region(binary)
+    assert (x, y) == (100, 300) and 595 <= w <= 601 and 300 <= h <= 304
+    assert ocr_engine.detect_table_region(np.zeros((1000, 800), dtype=np.uint8)) is None
+    print(f"✅ Table region detected at ({x}, {y}, {w}x{h})")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing OCR engine...")
+    test_pool_is_persistent()
+    test_cache_serves_regions_and_pages()
+    test_cache_is_bounded()
+    test_table_region()
+    print("🎉 All OCR engine tests passed!")
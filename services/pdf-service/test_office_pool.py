@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the LibreOffice converter pool behind /convert
+"""
+
+import sys
+import os
+import time
+import threading
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adapters.office_pool import (
+    ConverterBusy, ConverterUnavailable, OfficeConverterPool, office_available
+)
+
+DOCX = os.path.join(os.path.dirname(os.path.abspath(__file__)), "minimal_form.docx")
+
+
+def test_bounded_queue():
+    """One caller waits for the busy converter; the next is turned away at once"""
+    pool = OfficeConverterPool(size=1, max_queued=1, queue_timeout=0.3)
+    try:
+        held = pool._checkout()
+        outcome = {}
+
+        def wait_for_converter():
+            try:
+                outcome["process"] = pool._checkout()
+            except ConverterBusy as e:
+                outcome["error"] = e
+
+        waiter = threading.Thread(target=wait_for_converter)
+        waiter.start()
+        time.sleep(0.05)
+        try:
+            pool._checkout()
+            assert False, "queue should be full"
+        except ConverterBusy as e:
+            assert e.retry_after >= 1
+
+        # Freeing the converter hands it to the waiting caller
+        pool._idle.put(held)
+        waiter.join()
+        assert outcome.get("process") is held
+        assert pool.stats()["rejected"] == 1
+    finally:
+        pool.shutdown()
+    print("✅ Bounded queue OK")
+
+
+def test_queue_timeout():
+    """A caller that waits longer than queue_timeout gets ConverterBusy"""
+    pool = OfficeConverterPool(size=1, max_queued=4, queue_timeout=0.1)
+    try:
+        pool._checkout()
+        try:
+            pool._checkout()
+            assert False, "should time out"
+        except ConverterBusy as e:
+            assert "timed out" in str(e)
+    finally:
+        pool.shutdown()
+    print("✅ Queue timeout OK")
+
+
+def test_convert_docx():
+    """A .docx becomes a PDF (or fails clearly when LibreOffice is missing)"""
+    pool = OfficeConverterPool(size=1)
+    with open(DOCX, "rb") as f:
+        content = f.read()
+    try:
+        if not office_available():
+            try:
+                pool.convert(content, ".docx")
+                assert False, "should report LibreOffice as unavailable"
+            except ConverterUnavailable:
+                print("⚠️ LibreOffice not installed - checked the unavailable error only")
+            return
+        pdf_bytes = pool.convert(content, ".docx")
+        assert pdf_bytes.startswith(b"%PDF")
+        assert pool.stats()["converted"] == 1
+    finally:
+        pool.shutdown()
+    print(f"✅ Converted .docx to PDF ({len(pdf_bytes)} bytes)")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing office converter pool...")
+    test_bounded_queue()
+    test_queue_timeout()
+    test_convert_docx()
+    print("🎉 All office pool tests passed!")
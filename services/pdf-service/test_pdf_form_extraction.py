@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script to verify field extraction from PDF intake forms (text labels vs form tables)
+"""
+
+import sys
+import os
+import io
+import tempfile
+import contextlib
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+from rise.generate_certificate import extract_from_pdf_document
+
+FORM_ROWS = [
+    ("Company Name", "Acme Widgets Pvt Ltd"),
+    ("Address", "Plot 12, MIDC, Pune"),
+    ("ISO Standard Required", "ISO 9001"),
+    ("Scope", "Manufacture of widgets"),
+    # Rows after Scope that a label scan would run on into
+    ("Contact Person", "John Smith"),
+    ("Number of Employees", "45"),
+]
+
+
+def _extract(ruled: bool) -> dict:
+    """Extract from a one-page form drawn as a ruled two-column table, or as plain label lines."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "form.pdf")
+        with fitz.open() as doc:
+            page = doc.new_page()
+            for index, (label, value) in enumerate(FORM_ROWS):
+                top = 72 + index * 30
+                if ruled:
+                    page.draw_rect(fitz.Rect(72, top, 250, top + 30))
+                    page.draw_rect(fitz.Rect(250, top, 520, top + 30))
+                    page.insert_text((76, top + 18), label, fontsize=10)
+                    page.insert_text((254, top + 18), value, fontsize=10)
+                else:
+                    page.insert_text((76, top + 18), f"{label}: {value}", fontsize=10)
+            doc.save(path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return extract_from_pdf_document(path)
+
+
+def test_table_form_with_trailing_rows():
+    """Form table cells win, so Scope doesn't swallow the rows below it"""
+    data = _extract(ruled=True)
+    assert data["Company Name"] == "Acme Widgets Pvt Ltd"
+    assert data["Scope"] == "Manufacture of widgets", repr(data["Scope"])
+    print(f"✅ Table form Scope: {data['Scope']!r}")
+
+
+def test_text_form():
+    """Forms without a table are still read from their text labels"""
+    data = _extract(ruled=False)
+    assert data["Company Name"] == "Acme Widgets Pvt Ltd"
+    assert data["Scope"].startswith("Manufacture of widgets")
+    print(f"✅ Text form fields: {list(data.keys())}")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing PDF form extraction...")
+    test_table_form_with_trailing_rows()
+    test_text_form()
+    print("🎉 All PDF form extraction tests passed!")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script to verify low-resolution certificate previews
+"""
+
+import sys
+import os
+import io
+import contextlib
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image
+
+from rise.preview import render_softcopy_preview, render_draft_preview, preview_cache_key
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "default-draft.pdf")
+
+VALUES = {
+    "Company Name": "Acme Widgets",
+    "Address": "Pune, India",
+    "ISO Standard": "ISO 9001:2015",
+    "Scope": "Manufacture of widgets",
+    "Certificate Number": "C-100",
+    "Issue Date": "01/01/2025",
+}
+
+
+def test_preview_image_sizes():
+    """Previews come back as PNG/WebP at the requested width"""
+    print("🧪 Testing previews...")
+    for image_format, pil_format in [("png", "PNG"), ("webp", "WEBP")]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = render_softcopy_preview(TEMPLATE, VALUES, "standard", 300, image_format)
+        image = Image.open(io.BytesIO(data))
+        assert image.format == pil_format
+        assert image.width == 300 and image.height > image.width
+    print("✅ Preview images OK")
+
+
+def test_draft_preview():
+    """Draft previews use the draft layout, so they differ from the soft copy of the same fields"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        draft = render_draft_preview(TEMPLATE, VALUES, "standard", 300, "png")
+        softcopy = render_softcopy_preview(TEMPLATE, VALUES, "standard", 300, "png")
+    image = Image.open(io.BytesIO(draft))
+    assert image.format == "PNG" and image.width == 300
+    assert draft != softcopy
+    print("✅ Draft preview OK")
+
+
+def test_cache_key_tracks_content():
+    """Any change to fields, logos, size or format gives a new cache key"""
+    base = preview_cache_key("abc", VALUES, "standard", 300, "png")
+    assert base == preview_cache_key("abc", dict(reversed(list(VALUES.items()))), "standard", 300, "png")
+    assert base != preview_cache_key("abc", {**VALUES, "Issue Date": "02/01/2025"}, "standard", 300, "png")
+    assert base != preview_cache_key("abd", VALUES, "standard", 300, "png")
+    assert base != preview_cache_key("abc", VALUES, "standard", 301, "png")
+    assert base != preview_cache_key("abc", VALUES, "standard", 300, "png", {"logo.png": b"x"})
+    assert base != preview_cache_key("abc", VALUES, "standard", 300, "png", generator="draft")
+    print("✅ Cache keys OK")
+
+
+if __name__ == "__main__":
+    test_preview_image_sizes()
+    test_draft_preview()
+    test_cache_key_tracks_content()
+    print("\n🎉 All tests completed successfully!")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script to verify incremental reissue of soft copies
+"""
+
+import sys
+import os
+import io
+import tempfile
+import contextlib
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+from rise.generate_softCopy import generate_softcopy
+from rise.reissue import reissue_certificate
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "default-draft.pdf")
+
+VALUES = {
+    "Company Name": "Acme Widgets",
+    "Address": "Pune, India",
+    "ISO Standard": "ISO 9001:2015",
+    "Scope": "Manufacture of widgets",
+    "Certificate Number": "C-100",
+    "Original Issue Date": "01/01/2023",
+    "Issue Date": "01/01/2025",
+    "Surveillance/ Expiry Date": "01/01/2026",
+    "Recertification Date": "01/01/2028",
+    "Revision": "1",
+}
+
+CHANGES = {"Issue Date": "15/03/2026", "Surveillance/ Expiry Date": "14/03/2027", "Revision": "2"}
+
+
+def _render(values, template_type):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "softcopy.pdf")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_softcopy(TEMPLATE, path, dict(values), template_type)
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def _words(pdf_bytes):
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return sorted((round(w[0], 1), round(w[1], 1), w[4]) for w in doc[0].get_text("words"))
+
+
+def test_reissue_matches_full_render():
+    """A reissue shows the same text as a full render with the new dates and keeps the original bytes"""
+    print("🧪 Testing incremental reissue...")
+    for template_type in ["standard", "large"]:
+        original = _render(VALUES, template_type)
+        with contextlib.redirect_stdout(io.StringIO()):
+            reissued = reissue_certificate(original, CHANGES)
+
+        assert reissued.startswith(original), "original revision must be preserved"
+        assert _words(reissued) == _words(_render({**VALUES, **CHANGES}, template_type))
+    print("✅ Reissue OK")
+
+
+if __name__ == "__main__":
+    test_reissue_matches_full_render()
+    print("\n🎉 All tests completed successfully!")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script to verify weighted fair scheduling across render lanes, and that
+single-certificate endpoints render in the interactive lane
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import asyncio
+import contextlib
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adapters.render_pool import LaneScheduler
+
+LANES = {
+    "interactive": {"weight": 8, "max_in_flight": 4},
+    "bulk": {"weight": 2, "max_in_flight": 3},
+    "background": {"weight": 1, "max_in_flight": 1},
+}
+
+
+async def _simulate(order, peak):
+    scheduler = LaneScheduler(4, LANES)
+
+    async def job(lane, seconds=0.01):
+        await scheduler.acquire(lane)
+        try:
+            order.append(lane)
+            peak[lane] = max(peak.get(lane, 0), scheduler.in_flight[lane])
+            await asyncio.sleep(seconds)
+        finally:
+            scheduler.release(lane)
+
+    # A large bulk run and a warm-up are queued before the UI requests arrive
+    tasks = [asyncio.create_task(job("bulk")) for _ in range(40)]
+    tasks += [asyncio.create_task(job("background")) for _ in range(4)]
+    await asyncio.sleep(0.005)
+    tasks += [asyncio.create_task(job("interactive")) for _ in range(5)]
+    await asyncio.gather(*tasks)
+    return scheduler
+
+
+def test_interactive_jumps_bulk_queue():
+    """Interactive renders start within a few slots even behind a long bulk run; caps hold"""
+    print("🧪 Testing render lanes...")
+    order, peak = [], {}
+    scheduler = asyncio.run(_simulate(order, peak))
+
+    last_interactive = max(i for i, lane in enumerate(order) if lane == "interactive")
+    assert last_interactive < 15, order
+    assert peak["bulk"] <= 3 and peak["background"] <= 1
+    assert "background" in order[:30], "background work must still make progress"
+    assert scheduler.stats()["bulk"]["dispatched"] == 40
+    print(f"✅ Render lanes OK (last interactive start at slot {last_interactive})")
+
+
+def test_interactive_takes_idle_worker_behind_capped_bulk():
+    """With bulk at its cap and bulk rows queued, an interactive render starts on the idle worker at once"""
+    print("🧪 Testing interactive start beside a capped bulk lane...")
+
+    async def scenario():
+        scheduler = LaneScheduler(4, LANES)
+        for _ in range(LANES["bulk"]["max_in_flight"]):
+            await scheduler.acquire("bulk")
+        queued = [asyncio.create_task(scheduler.acquire("bulk")) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["bulk"]["waiting"] == 3
+
+        # No bulk row is released; the fourth worker is idle
+        await asyncio.wait_for(scheduler.acquire("interactive"), timeout=0.5)
+        started = scheduler.in_flight["interactive"]
+        for task in queued:
+            task.cancel()
+        await asyncio.gather(*queued, return_exceptions=True)
+        return started
+
+    assert asyncio.run(scenario()) == 1
+    print("✅ Interactive render took the idle worker")
+
+
+def hold_worker(seconds: float) -> float:
+    """Stand-in for a bulk row: keeps a render worker busy."""
+    time.sleep(seconds)
+    return seconds
+
+
+def test_softcopy_endpoint_overtakes_bulk_rows():
+    """A /generate-softcopy request finishes while most of a queued bulk run is still waiting"""
+    print("🧪 Testing interactive endpoint renders against a bulk run...")
+    os.environ.setdefault("RENDER_POOL_WARMUP", "false")
+    os.environ.setdefault("OFFICE_POOL_WARMUP", "false")
+    import httpx
+    import main
+    from adapters.render_pool import RENDER_LANES, get_lane_scheduler, run_in_render_pool
+
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "default-draft.pdf"), "rb") as f:
+        template = f.read()
+    data = {"Company Name": "Alpha Ltd", "Address": "Pune", "ISO Standard": "ISO 9001:2015",
+            "Scope": "Widgets", "Certificate Number": "A-1"}
+    headers = {"x-internal-token": str(main.INTERNAL_TOKEN)}
+    bulk_rows = 4 * RENDER_LANES["bulk"]["max_in_flight"] + 4
+
+    async def scenario():
+        bulk = [asyncio.create_task(run_in_render_pool(hold_worker, 0.3, lane="bulk")) for _ in range(bulk_rows)]
+        await asyncio.sleep(0.05)
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+            bad_lane = await client.post("/generate-softcopy", data={"data": json.dumps(data), "lane": "urgent"},
+                                         files={"template": ("custom.pdf", template, "application/pdf")}, headers=headers)
+            response = await client.post("/generate-softcopy", data={"data": json.dumps(data)},
+                                         files={"template": ("custom.pdf", template, "application/pdf")}, headers=headers)
+        unfinished = sum(1 for task in bulk if not task.done())
+        interactive = get_lane_scheduler().stats()["interactive"]["dispatched"]
+        await asyncio.gather(*bulk)
+        return bad_lane, response, unfinished, interactive
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        bad_lane, response, unfinished, interactive = asyncio.run(scenario())
+    assert bad_lane.status_code == 400, bad_lane.text
+    assert response.status_code == 200, response.text
+    assert response.content.startswith(b"%PDF")
+    assert interactive == 1, "the soft copy must render in the interactive lane"
+    assert unfinished >= bulk_rows // 2, f"only {unfinished}/{bulk_rows} bulk rows were still queued"
+    print(f"✅ Soft copy rendered with {unfinished}/{bulk_rows} bulk rows still queued")
+
+
+if __name__ == "__main__":
+    test_interactive_jumps_bulk_queue()
+    test_interactive_takes_idle_worker_behind_capped_bulk()
+    test_softcopy_endpoint_overtakes_bulk_rows()
+    print("\n🎉 All tests completed successfully!")
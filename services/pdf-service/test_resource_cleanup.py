@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script to verify documents and temp files are released on error paths
+"""
+
+import sys
+import os
+import io
+import contextlib
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+from rise.resources import close_on_error, get_process_resources, temp_path
+from rise.generate_certificate import build_certificate_document
+from rise.generate_printable import generate_printable_cert
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "default-draft.pdf")
+
+
+def test_close_on_error():
+    """The document is closed when the block raises and left open when it succeeds"""
+    doc = fitz.open(TEMPLATE)
+    with close_on_error(doc):
+        pass
+    assert not doc.is_closed
+    try:
+        with close_on_error(doc):
+            raise RuntimeError("draw failed")
+    except RuntimeError:
+        pass
+    assert doc.is_closed
+    print("✅ close_on_error OK")
+
+
+def test_temp_path_removed_on_error():
+    """Temp files are removed whether the block succeeds or raises"""
+    with temp_path(".pdf", b"%PDF") as path:
+        assert open(path, "rb").read() == b"%PDF"
+    assert not os.path.exists(path)
+    try:
+        with temp_path(".pdf") as path:
+            raise ValueError("render failed")
+    except ValueError:
+        pass
+    assert not os.path.exists(path)
+    print("✅ temp_path cleanup OK")
+
+
+def test_failing_renders_release_files():
+    """Renders that fail after the template is open don't accumulate open files"""
+    if get_process_resources()["open_fds"] is None:
+        print("⚠️ /proc not available - skipping")
+        return
+
+    def fail_twice():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for render in (lambda: build_certificate_document(TEMPLATE, None),
+                           lambda: generate_printable_cert(TEMPLATE, os.devnull, None)):
+                try:
+                    render()
+                except Exception:
+                    pass
+
+    fail_twice()
+    before = get_process_resources()["open_fds"]
+    for _ in range(50):
+        fail_twice()
+    after = get_process_resources()["open_fds"]
+    assert after <= before, f"open files grew from {before} to {after}"
+    print(f"✅ Failing renders release files ({before} -> {after} open)")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing resource cleanup...")
+    test_close_on_error()
+    test_temp_path_removed_on_error()
+    test_failing_renders_release_files()
+    print("🎉 All resource cleanup tests passed!")
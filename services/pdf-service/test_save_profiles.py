@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the PDF save profiles
+"""
+
+import sys
+import os
+import io
+import tempfile
+import contextlib
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+from rise.generate_softCopy import generate_softcopy
+from rise.save_profiles import resolve_save_profile, get_save_metrics, SAVE_PROFILES
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "default-draft.pdf")
+
+VALUES = {
+    "Company Name": "Acme Widgets",
+    "Address": "Pune, India",
+    "ISO Standard": "ISO 9001:2015",
+    "Scope": "Manufacture of widgets",
+    "Certificate Number": "C-100",
+    "Issue Date": "01/01/2025",
+}
+
+
+def test_profiles_render_same_certificate():
+    """Every profile writes a valid PDF with the same text; compact is smallest"""
+    print("🧪 Testing save profiles...")
+    sizes = {}
+    texts = set()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for profile in SAVE_PROFILES:
+            path = os.path.join(tmp_dir, f"{profile}.pdf")
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_softcopy(TEMPLATE, path, dict(VALUES), "standard", profile)
+            sizes[profile] = os.path.getsize(path)
+            with fitz.open(path) as doc:
+                texts.add(doc[0].get_text())
+
+    assert len(texts) == 1
+    assert sizes["compact"] < sizes["fast"]
+    metrics = get_save_metrics()
+    assert all(metrics[profile]["saves"] >= 1 for profile in SAVE_PROFILES)
+    print(f"✅ Save profiles OK: {sizes}")
+
+
+def test_resolve_profile():
+    """Empty names use the default; unknown names are rejected"""
+    assert resolve_save_profile(" Fast ") == "fast"
+    assert resolve_save_profile("") in SAVE_PROFILES
+    try:
+        resolve_save_profile("tiny")
+        assert False, "unknown profile must raise"
+    except ValueError:
+        pass
+    print("✅ Profile names OK")
+
+
+if __name__ == "__main__":
+    test_profiles_render_same_certificate()
+    test_resolve_profile()
+    print("\n🎉 All tests completed successfully!")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script to verify scanned PDF detection and the OCR path of /extract-fields
+"""
+
+import sys
+import os
+import io
+import tempfile
+import contextlib
+import importlib.util
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+from rise.generate_certificate import extract_from_pdf_document, is_scanned_text, rasterize_page_for_ocr
+from rise.ocr_engine import OCR_MAX_DIMENSION
+
+FORM_TEXT = (
+    "Company Name: Acme Widgets Pvt Ltd\n"
+    "Address: Plot 12, MIDC, Pune\n"
+    "ISO Standard Required: ISO 9001\n"
+    "Scope: Manufacture of precision widgets"
+)
+
+
+def _make_form(scanned: bool) -> fitz.Document:
+    """A one-page intake form, either with a text layer or as an image-only scan."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 100), FORM_TEXT, fontsize=12)
+    if not scanned:
+        return doc
+    scan = fitz.open()
+    scan_page = scan.new_page()
+    scan_page.insert_image(scan_page.rect, stream=page.get_pixmap(dpi=200).tobytes("png"))
+    doc.close()
+    return scan
+
+
+def _ocr_available() -> bool:
+    backend = importlib.util.find_spec("tesserocr") or importlib.util.find_spec("pytesseract")
+    return bool(backend and importlib.util.find_spec("cv2"))
+
+
+def test_scanned_detection():
+    """Only pages without a text layer count as scanned"""
+    with _make_form(scanned=False) as text_doc, _make_form(scanned=True) as scan_doc:
+        assert not is_scanned_text(text_doc[0].get_text())
+        assert is_scanned_text(scan_doc[0].get_text())
+    print("✅ Scanned page detection OK")
+
+
+def test_rasterize_to_array():
+    """Pages render straight to a grayscale array capped at OCR_MAX_DIMENSION"""
+    with _make_form(scanned=True) as doc:
+        image = rasterize_page_for_ocr(doc[0], dpi=600)
+        assert image.ndim == 2 and image.dtype.name == "uint8"
+        assert max(image.shape) <= OCR_MAX_DIMENSION
+        # Dark text on a light page survived the render
+        assert image.min() < 128 < image.max()
+        small = rasterize_page_for_ocr(doc[0], dpi=72)
+        assert small.shape == (842, 595)
+    print(f"✅ Rasterized to {image.shape[1]}x{image.shape[0]} grayscale array")
+
+
+def test_scanned_pdf_extraction():
+    """Scanned forms go through OCR; without an OCR backend extraction returns nothing instead of failing"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "scanned_form.pdf")
+        with _make_form(scanned=True) as doc:
+            doc.save(path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = extract_from_pdf_document(path)
+
+    if not _ocr_available():
+        assert data == {}
+        print("⚠️ OCR backend not installed - checked the graceful fallback only")
+        return
+    assert "Acme Widgets" in data.get("Company Name", "")
+    assert "9001" in data.get("ISO Standard Required", "")
+    print(f"✅ Scanned PDF extracted via OCR: {list(data.keys())}")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing scanned PDF extraction...")
+    test_scanned_detection()
+    test_rasterize_to_array()
+    test_scanned_pdf_extraction()
+    print("🎉 All scanned PDF tests passed!")
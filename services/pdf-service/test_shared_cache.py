@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the cross-process template and glyph-metric cache
+"""
+
+import sys
+import os
+import io
+import time
+import tempfile
+import contextlib
+import multiprocessing
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz
+
+import rise.shared_cache as shared_cache
+from adapters.template_store import SharedTemplateStore
+
+SAMPLE = "Aé Ω ж–“”•→▪▫ 9001:2015"
+
+
+def _child_advances(cache_dir):
+    # Runs in a freshly spawned process: only the published file is shared
+    shared_cache.SHARED_CACHE_DIR = cache_dir
+    return [shared_cache.lookup_advance("Times-Bold", char) for char in SAMPLE]
+
+
+def test_metric_tables_shared_across_processes():
+    """A table published by one process is mapped by another and matches text_length exactly"""
+    print("🧪 Testing shared glyph metric tables...")
+    original_dir = shared_cache.SHARED_CACHE_DIR
+    font = fitz.Font(fontname="Times-Bold")
+    expected = [font.text_length(char, 1) for char in SAMPLE]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        shared_cache.SHARED_CACHE_DIR = tmp_dir
+        shared_cache._tables.clear()
+        try:
+            assert shared_cache.lookup_advance("Times-Bold", "A") is None  # nothing published yet
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert shared_cache.publish_metric_tables(["Times-Bold"]) == 1
+                assert shared_cache.publish_metric_tables(["Times-Bold"]) == 0  # already published
+            assert [shared_cache.lookup_advance("Times-Bold", char) for char in SAMPLE] == expected
+            assert shared_cache.lookup_advance("Times-Bold", "\U0001F600") is None  # beyond the table
+
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(1) as pool:
+                assert pool.apply(_child_advances, (tmp_dir,)) == expected
+        finally:
+            for mapped, view in shared_cache._tables.values():
+                view.release()
+                mapped.close()
+            shared_cache._tables.clear()
+            shared_cache.SHARED_CACHE_DIR = original_dir
+    print("✅ Metric tables OK")
+
+
+def test_template_store():
+    """Templates are content-addressed, reused while fresh and re-fetched once stale"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = SharedTemplateStore(tmp_dir, ttl=600)
+        assert store.lookup("templateDraftStandard") is None
+        path, digest = store.publish("templateDraftStandard", b"%PDF-1.7 template")
+        assert os.path.basename(path) == f"{digest}.pdf"
+
+        # Another worker process sees the same entry
+        assert SharedTemplateStore(tmp_dir, ttl=600).lookup("templateDraftStandard") == (path, digest)
+        assert SharedTemplateStore(tmp_dir, ttl=-1).lookup("templateDraftStandard") is None
+
+        # Same bytes under another name share one file
+        assert store.publish("templateSoftCopyStandard", b"%PDF-1.7 template")[0] == path
+        assert store.stats()["files"] == 1
+
+        # Republishing a name with new bytes drops the old file once nothing points at it
+        # and the grace period since it was last handed out has passed
+        edited, _ = store.publish("templateDraftStandard", b"%PDF-1.7 edited template")
+        assert os.path.exists(path), "templateSoftCopyStandard still uses the old file"
+        _age(path, store.prune_grace + 1)
+        store.publish("templateSoftCopyStandard", b"%PDF-1.7 edited template")
+        assert not os.path.exists(path) and os.path.exists(edited)
+        assert store.stats()["files"] == 1 and store.stats()["pruned"] == 1
+    print("✅ Template store OK")
+
+
+def _age(path: str, seconds: float):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_republish_keeps_held_path():
+    """A caller holding the old path can still open it after the name is republished"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = SharedTemplateStore(tmp_dir, ttl=600, prune_grace=60)
+        store.publish("templateDraftStandard", b"%PDF-1.7 template")
+        # Another worker looks the template up and queues a render with the path
+        held, _ = SharedTemplateStore(tmp_dir, ttl=600).lookup("templateDraftStandard")
+
+        edited, _ = store.publish("templateDraftStandard", b"%PDF-1.7 edited template")
+        with open(held, "rb") as f:
+            assert f.read() == b"%PDF-1.7 template"
+        assert store.stats()["pruned"] == 0
+
+        # Once nobody has been handed the old file for the grace period, the next republish removes it
+        _age(held, 61)
+        store.publish("templateDraftStandard", b"%PDF-1.7 second edit")
+        assert not os.path.exists(held) and os.path.exists(edited)
+        assert store.stats()["pruned"] == 1
+    print("✅ Held template path survives a republish")
+
+
+if __name__ == "__main__":
+    test_metric_tables_shared_across_processes()
+    test_template_store()
+    test_republish_keeps_held_path()
+    print("\n🎉 All tests completed successfully!")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the custom template registry behind POST /templates
+"""
+
+import sys
+import os
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+from adapters.template_store import SharedTemplateStore, TemplateRejected
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "default-draft.pdf")
+
+
+def _read_template() -> bytes:
+    with open(TEMPLATE, "rb") as f:
+        return f.read()
+
+
+def _edited_template(edits: int) -> bytes:
+    """A template saved incrementally many times, like one edited in a desktop tool."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "edited.pdf")
+        with fitz.open(TEMPLATE) as doc:
+            doc.save(path)
+        for index in range(edits):
+            with fitz.open(path) as doc:
+                doc[0].insert_text((72, 72 + index), f"edit {index}", fontsize=4)
+                doc.save(path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def test_register_once():
+    """The same upload maps to one id and one master, which opens like the original"""
+    with tempfile.TemporaryDirectory() as root:
+        store = SharedTemplateStore(root=root)
+        entry, created = store.register(_read_template())
+        assert created and len(entry["template_id"]) == 64
+        again, created_again = store.register(_read_template())
+        assert not created_again and again["template_id"] == entry["template_id"]
+
+        # Another worker's store finds it through the shared files
+        resolved = SharedTemplateStore(root=root).resolve(entry["template_id"])
+        assert resolved["path"] == entry["path"] and resolved["pages"] == 1
+        with fitz.open(resolved["path"]) as master, fitz.open(TEMPLATE) as original:
+            assert master[0].rect == original[0].rect
+        assert store.stats()["custom_files"] == 1
+    print(f"✅ Registered once as {entry['template_id'][:12]}")
+
+
+def test_master_is_compacted():
+    """Incremental saves are folded into a single compact master"""
+    content = _edited_template(20)
+    with tempfile.TemporaryDirectory() as root:
+        entry, _ = SharedTemplateStore(root=root).register(content)
+        with open(entry["path"], "rb") as f:
+            master = f.read()
+    assert len(master) < len(content)
+    assert master.count(b"startxref") == 1
+    print(f"✅ Master compacted ({len(content)} -> {len(master)} bytes)")
+
+
+def test_rejects_unusable_uploads():
+    """Garbage, empty and encrypted uploads are refused; bad ids don't resolve"""
+    with fitz.open(TEMPLATE) as doc:
+        encrypted = doc.tobytes(encryption=fitz.PDF_ENCRYPT_AES_256, user_pw="secret", owner_pw="secret")
+    with tempfile.TemporaryDirectory() as root:
+        store = SharedTemplateStore(root=root)
+        for content in (b"not a pdf", b"", encrypted):
+            try:
+                store.register(content)
+                assert False, "upload should be rejected"
+            except TemplateRejected:
+                pass
+        assert store.resolve("0" * 64) is None
+        assert store.resolve("../../etc/passwd") is None
+        assert store.stats()["custom_files"] == 0
+    print("✅ Unusable uploads rejected")
+
+
+def test_prune_least_recently_used():
+    """Past max_custom the least recently used templates are removed"""
+    with tempfile.TemporaryDirectory() as root:
+        store = SharedTemplateStore(root=root, max_custom=2)
+        first, _ = store.register(_edited_template(1))
+        second, _ = store.register(_edited_template(2))
+        os.utime(first["path"], (1, 1))
+        os.utime(second["path"], (2, 2))
+        # Using the first template makes the second one the oldest
+        store.resolve(first["template_id"])
+        third, _ = store.register(_edited_template(3))
+        assert store.resolve(second["template_id"]) is None
+        assert store.resolve(first["template_id"]) and store.resolve(third["template_id"])
+    print("✅ Least recently used template pruned")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing template registry...")
+    test_register_once()
+    test_master_is_compacted()
+    test_rejects_unusable_uploads()
+    test_prune_least_recently_used()
+    print("🎉 All template registry tests passed!")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the batch text-fitting kernel matches the generators' shrink loops
+"""
+
+import sys
+import os
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz
+
+import rise.text_fit as text_fit
+
+CASES = [
+    ("", 100, 36, 20),
+    ("Manufacture and supply of precision engineered widgets", 492, 100, 20),
+    (" ".join(["Design, manufacture and servicing of industrial valves"] * 12), 492, 110, 20),
+    ("ISO 9001:2015", 266, 36, 80),
+    ("Extraordinarilylongwordwithoutanyspaces and more words", 120, 60, 30),
+    ("Too small to shrink", 50, 10, 11),
+]
+
+
+def get_text_height(text, fontsize, fontname, max_width):
+    # The generators' original string-building wrap, kept here as the reference
+    font = fitz.Font(fontname=fontname)
+    lines = []
+    current_line = ""
+    for word in text.split():
+        test_line = current_line + (" " if current_line else "") + word
+        if font.text_length(test_line, fontsize) <= max_width:
+            current_line = test_line
+        else:
+            lines.append(current_line)
+            current_line = word
+    if current_line:
+        lines.append(current_line)
+    return len(lines) * fontsize * 1.2
+
+
+def _reference_size(text, max_width, limit, start_size):
+    font_size = start_size
+    while font_size >= 12:
+        if get_text_height(text, font_size, "Times-Bold", max_width) <= limit:
+            break
+        font_size -= 1
+    return font_size
+
+
+def test_kernel_matches_shrink_loop():
+    """NumPy and pure Python paths pick the same size as the original loop"""
+    print("🧪 Testing text-fitting kernel...")
+    numpy_module = text_fit.np
+    try:
+        for use_numpy in [True, False]:
+            if use_numpy and numpy_module is None:
+                continue
+            text_fit.np = numpy_module if use_numpy else None
+            for text, max_width, limit, start_size in CASES:
+                expected = _reference_size(text, max_width, limit, start_size)
+                assert text_fit.fit_font_size(text, "Times-Bold", max_width, limit, start_size) == expected, text[:30]
+    finally:
+        text_fit.np = numpy_module
+    print(f"✅ Kernel OK (numpy {'available' if numpy_module is not None else 'not installed'})")
+
+
+if __name__ == "__main__":
+    test_kernel_matches_shrink_loop()
+    print("\n🎉 All tests completed successfully!")